@@ -35,6 +35,7 @@ pip install -r requirements.txt
 echo " Applying migrations..."
 python manage.py makemigrations
 python manage.py migrate
+python manage.py createcachetable
 
 # Check and create the admin superuser if necessary
 echo " Checking for superuser..."
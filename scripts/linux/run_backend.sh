@@ -56,6 +56,7 @@ fi
 echo "🗃️ Applying migrations..."
 python manage.py makemigrations
 python manage.py migrate
+python manage.py createcachetable
 echo "✅ Migrations applied"
 
 # Superuser
@@ -71,6 +72,23 @@ else:
     print("ℹ️ Superuser already exists")
 EOF
 
+# Workers (stopped together with the server)
+WORKER_PIDS=()
+stop_workers() {
+    for pid in "${WORKER_PIDS[@]}"; do
+        kill "$pid" 2>/dev/null || true
+    done
+}
+trap stop_workers EXIT
+
+echo "⚙️ Starting workers..."
+python manage.py process_donations --loop &
+WORKER_PIDS+=($!)
+python manage.py drain_hcs_outbox --loop &
+WORKER_PIDS+=($!)
+python manage.py refill_wallet_pool --loop &
+WORKER_PIDS+=($!)
+
 # Start server
 echo ""
 echo "🌐 Starting Django server..."
@@ -0,0 +1,74 @@
+#!/bin/bash
+set -e
+
+echo "=============================="
+echo " Load test (offline)"
+echo "=============================="
+
+# Usage : ./scripts/linux/run_load_test.sh [options de load_test, ex. --users 50 --duration 120]
+# Lance le remplaçant Hedera, le serveur Django et les workers, puis le test de charge.
+# Premier passage (pas de référence) : le rapport est enregistré comme référence.
+
+cd "$(dirname "$0")/../../solidavenir" || exit
+
+if [ -f "venv/bin/activate" ]; then
+    source venv/bin/activate
+fi
+
+export HEDERA_STANDIN=True
+export HEDERA_STANDIN_PORT=${HEDERA_STANDIN_PORT:-3002}
+export HEDERA_STANDIN_LATENCY_SCALE=${HEDERA_STANDIN_LATENCY_SCALE:-1}
+PORT=${LOAD_TEST_PORT:-8000}
+LOG_DIR=${LOAD_TEST_LOG_DIR:-/tmp/solidavenir_load_test}
+BASELINE=${LOAD_TEST_BASELINE:-loadtests/baseline.json}
+mkdir -p "$LOG_DIR"
+
+PIDS=()
+cleanup() {
+    echo "🛑 Stopping services..."
+    for pid in "${PIDS[@]}"; do
+        kill "$pid" 2>/dev/null || true
+    done
+    wait 2>/dev/null || true
+}
+trap cleanup EXIT
+
+python manage.py migrate --noinput > "$LOG_DIR/migrate.log"
+python manage.py createcachetable >> "$LOG_DIR/migrate.log"
+
+echo "🔗 Hedera stand-in on port $HEDERA_STANDIN_PORT (latency x$HEDERA_STANDIN_LATENCY_SCALE)"
+python manage.py run_hedera_standin > "$LOG_DIR/standin.log" 2>&1 &
+PIDS+=($!)
+
+echo "🌐 Django on port $PORT"
+if command -v gunicorn &> /dev/null; then
+    gunicorn solidavenir.wsgi --bind "127.0.0.1:$PORT" --workers "${LOAD_TEST_WORKERS:-4}" --threads 4 \
+        > "$LOG_DIR/django.log" 2>&1 &
+else
+    python manage.py runserver "127.0.0.1:$PORT" --noreload > "$LOG_DIR/django.log" 2>&1 &
+fi
+PIDS+=($!)
+
+echo "⚙️ Workers (donations, HCS outbox, wallet pool)"
+python manage.py process_donations --loop > "$LOG_DIR/process_donations.log" 2>&1 &
+PIDS+=($!)
+python manage.py drain_hcs_outbox --loop > "$LOG_DIR/drain_hcs_outbox.log" 2>&1 &
+PIDS+=($!)
+python manage.py refill_wallet_pool --loop > "$LOG_DIR/refill_wallet_pool.log" 2>&1 &
+PIDS+=($!)
+
+# Attendre le serveur
+for _ in $(seq 1 30); do
+    if curl -s -o /dev/null "http://127.0.0.1:$PORT/"; then
+        break
+    fi
+    sleep 1
+done
+
+EXTRA=()
+if [ ! -f "$BASELINE" ]; then
+    echo "ℹ️ No baseline yet: this run will be saved as $BASELINE"
+    EXTRA+=(--save-baseline)
+fi
+
+python manage.py load_test --prepare --base-url "http://127.0.0.1:$PORT" --baseline "$BASELINE" "${EXTRA[@]}" "$@"
@@ -15,9 +15,15 @@ pip install -r requirements.txt
 
 python manage.py makemigrations
 python manage.py migrate
+python manage.py createcachetable
 
 echo  Checking for superuser...
 python manage.py shell < create_superuser.py
 
+echo  Starting workers (one window each)...
+start "Solidavenir - process_donations" python manage.py process_donations --loop
+start "Solidavenir - drain_hcs_outbox" python manage.py drain_hcs_outbox --loop
+start "Solidavenir - refill_wallet_pool" python manage.py refill_wallet_pool --loop
+
 echo  Django backend ready at http://localhost:8000
 python manage.py runserver
@@ -182,10 +182,10 @@ class ProjetAdmin(admin.ModelAdmin):
     
     def creer_paliers_auto(self, request, queryset):
         """Action pour créer automatiquement les paliers"""
-        from .utils import creer_paliers  # Import local pour éviter circularité
+        from .paliers import creer_paliers_standard  # Import local pour éviter circularité
         
         for projet in queryset:
-            creer_paliers(projet)
+            creer_paliers_standard(projet)
             self.message_user(request, f"Paliers créés pour {projet.titre}")
     creer_paliers_auto.short_description = "Créer les paliers automatiquement"
     
@@ -197,8 +197,8 @@ class ProjetAdmin(admin.ModelAdmin):
             
             # Créer automatiquement les paliers si nécessaire
             if not projet.paliers.exists():
-                from .utils import creer_paliers
-                creer_paliers(projet)
+                from .paliers import creer_paliers_standard
+                creer_paliers_standard(projet)
             
             projet.save()
         self.message_user(request, "Projets validés avec succès")
@@ -255,7 +255,10 @@ class TransactionAdminModel(admin.ModelAdmin):
     verify_transactions.short_description = "Marquer comme vérifiées"
     
     def mark_as_refunded(self, request, queryset):
-        queryset.update(statut='rembourse')
+        # save() par transaction : le signal retire le don du résumé de financement
+        for transaction in queryset:
+            transaction.statut = 'rembourse'
+            transaction.save(update_fields=['statut'])
     mark_as_refunded.short_description = "Marquer comme remboursées"
 
     def has_hedera_message(self, obj):
@@ -276,6 +279,72 @@ class TransactionAdminFinancial(admin.ModelAdmin):
     readonly_fields = ('transaction_hash', 'date_creation')
 
 
+# Outbox des messages HCS (livrés par la commande drain_hcs_outbox)
+from .models import OutboxHCS
+
+@admin.register(OutboxHCS)
+class OutboxHCSAdmin(admin.ModelAdmin):
+    list_display = ('type_message', 'topic_id', 'projet', 'statut', 'tentatives', 'prochaine_tentative', 'date_creation')
+    list_filter = ('statut', 'type_message')
+    search_fields = ('cle_idempotence', 'topic_id', 'hedera_message_id', 'transaction_hash')
+    readonly_fields = ('cle_idempotence', 'contenu', 'hedera_message_id', 'date_creation', 'date_envoi', 'derniere_erreur')
+    actions = ['remettre_en_file']
+
+    def remettre_en_file(self, request, queryset):
+        queryset.filter(statut='echec').update(statut='en_attente', tentatives=0, prochaine_tentative=timezone.now())
+    remettre_en_file.short_description = "Remettre en file les messages en échec"
+
+
+# Pool de wallets Hedera pré-créés (réapprovisionné par refill_wallet_pool)
+from .models import PooledWallet
+
+@admin.register(PooledWallet)
+class PooledWalletAdmin(admin.ModelAdmin):
+    list_display = ('account_id', 'attribue_a', 'date_creation', 'date_attribution')
+    list_filter = ('date_attribution',)
+    search_fields = ('account_id', 'attribue_a')
+    exclude = ('private_key_chiffree',)
+    readonly_fields = ('account_id', 'public_key', 'attribue_a', 'date_creation', 'date_attribution')
+
+
+# Dons en cours de traitement (worker process_donations) ; 'a_verifier' : contrôle manuel sur Hedera
+from .models import TraitementDon
+
+@admin.register(TraitementDon)
+class TraitementDonAdmin(admin.ModelAdmin):
+    list_display = ('transaction', 'etape', 'tentatives', 'prochaine_tentative', 'date_mise_a_jour')
+    list_filter = ('etape',)
+    search_fields = ('transaction__audit_uuid', 'transaction__contributeur__email', 'erreur')
+    readonly_fields = ('transaction', 'tentatives', 'date_creation', 'date_mise_a_jour')
+
+
+# Positions des traitements incrémentaux (reconcile_transactions...) ; vider `position` pour tout reprendre
+from .models import CurseurSynchronisation
+
+@admin.register(CurseurSynchronisation)
+class CurseurSynchronisationAdmin(admin.ModelAdmin):
+    list_display = ('nom', 'position', 'date_mise_a_jour')
+    readonly_fields = ('date_mise_a_jour',)
+
+
+# Statistiques HCS matérialisées (core/hcs_stats.py) ; recalculées par verify_topic_statistics
+from .models import StatistiquesHCS, StatistiquesTopic
+
+@admin.register(StatistiquesTopic)
+class StatistiquesTopicAdmin(admin.ModelAdmin):
+    list_display = ('projet', 'nombre_messages', 'dernier_message', 'date_verification')
+    search_fields = ('projet__titre', 'projet__topic_id')
+    readonly_fields = ('projet', 'nombre_messages', 'messages_par_type', 'dernier_message',
+                       'date_verification', 'date_mise_a_jour')
+
+
+@admin.register(StatistiquesHCS)
+class StatistiquesHCSAdmin(admin.ModelAdmin):
+    list_display = ('nombre_topics', 'topics_actifs', 'nombre_messages', 'dernier_message', 'date_verification')
+    readonly_fields = ('nombre_topics', 'topics_actifs', 'nombre_messages', 'messages_par_type',
+                       'dernier_message', 'date_verification', 'date_mise_a_jour')
+
+
 from .models import Projet, ImageProjet
 # admin.py
 from django.contrib import admin
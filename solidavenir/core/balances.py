@@ -0,0 +1,169 @@
+# core/balances.py
+"""
+Cache des soldes des comptes Hedera.
+
+Les pages (profil, wallet) et TransferDirectForm lisent le solde en cache
+(cache Django, clé par account id) sans attendre le microservice :
+
+- entrée de moins de BALANCE_CACHE_TTL secondes  -> servie telle quelle ;
+- entrée plus ancienne (jusqu'à BALANCE_CACHE_MAX_AGE) ou absente -> servie
+  (ou None) et rafraîchie en arrière-plan par un petit pool de threads,
+  un seul rafraîchissement en vol par compte.
+
+Les transferts effectués par notre code passent par `transferer` : le solde
+en cache des deux comptes est ajusté immédiatement (montant débité /
+crédité, frais exclus) puis rafraîchi en arrière-plan.
+La commande `refresh_balances` rafraîchit de nombreux comptes en parallèle.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .hedera_client import get_client
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'solde:'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _cle(account_id):
+    return f"{CACHE_PREFIX}{account_id}"
+
+
+def _enregistrer(account_id, solde, ajuste=False):
+    entry = {'solde': solde, 'fetched_at': time.time(), 'ajuste': ajuste}
+    cache.set(_cle(account_id), entry, _setting('BALANCE_CACHE_MAX_AGE', 3600))
+    return entry
+
+
+def _parser_solde(valeur):
+    """'12.5 ℏ' (Hbar.toString du microservice) -> Decimal('12.5')."""
+    try:
+        return Decimal(str(valeur).split(' ')[0])
+    except (InvalidOperation, IndexError):
+        return None
+
+
+# =============================================================================
+# LECTURE
+# =============================================================================
+
+def rafraichir(account_id):
+    """Interroge le microservice et met le solde en cache ; retourne le solde ou None."""
+    try:
+        response = get_client().balance(account_id)
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        if not data.get('success'):
+            return None
+    except Exception as e:
+        logger.info(f"Solde de {account_id} non rafraîchi: {e}")
+        return None
+
+    solde = _parser_solde(data.get('balance'))
+    if solde is not None:
+        _enregistrer(account_id, solde)
+    return solde
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_en_vol = set()
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=_setting('BALANCE_REFRESH_WORKERS', 4),
+                    thread_name_prefix='balance-refresh',
+                )
+    return _executor
+
+
+def _rafraichir_en_vol(account_id):
+    try:
+        rafraichir(account_id)
+    finally:
+        with _executor_lock:
+            _en_vol.discard(account_id)
+
+
+def rafraichir_en_arriere_plan(account_id):
+    """Planifie un rafraîchissement, sauf s'il y en a déjà un en cours pour ce compte."""
+    with _executor_lock:
+        if account_id in _en_vol:
+            return
+        _en_vol.add(account_id)
+    _pool().submit(_rafraichir_en_vol, account_id)
+
+
+def get_solde(account_id):
+    """
+    Solde en cache (Decimal) ou None s'il n'est pas encore connu.
+    Ne fait jamais d'appel réseau : un rafraîchissement est planifié si
+    l'entrée manque, a été ajustée localement ou dépasse BALANCE_CACHE_TTL.
+    """
+    if not account_id:
+        return None
+    entry = cache.get(_cle(account_id))
+    if entry is None or entry['ajuste'] or time.time() - entry['fetched_at'] > _setting('BALANCE_CACHE_TTL', 30):
+        rafraichir_en_arriere_plan(account_id)
+    return entry['solde'] if entry else None
+
+
+# =============================================================================
+# TRANSFERTS
+# =============================================================================
+
+def ajuster(account_id, delta):
+    """Ajuste le solde en cache de `delta` (s'il est connu) et planifie un rafraîchissement."""
+    if not account_id:
+        return
+    entry = cache.get(_cle(account_id))
+    if entry is not None:
+        _enregistrer(account_id, entry['solde'] + Decimal(str(delta)), ajuste=True)
+    rafraichir_en_arriere_plan(account_id)
+
+
+def invalider(account_id):
+    cache.delete(_cle(account_id))
+
+
+def transferer(from_account_id, from_private_key, to_account_id, amount):
+    """
+    Transfert HBAR via le microservice (voir HederaClient.transfer) ; en cas de
+    succès, les soldes en cache des deux comptes sont ajustés.
+    """
+    response = get_client().transfer(from_account_id, from_private_key, to_account_id, amount)
+    if response.status_code == 200:
+        ajuster(from_account_id, -Decimal(str(amount)))
+        ajuster(to_account_id, Decimal(str(amount)))
+    else:
+        # Issue incertaine : on ne garde pas un solde potentiellement faux
+        invalider(from_account_id)
+    return response
+
+
+# =============================================================================
+# RAFRAÎCHISSEMENT EN MASSE
+# =============================================================================
+
+def rafraichir_comptes(account_ids, concurrence=None):
+    """Rafraîchit les soldes de `account_ids` en parallèle ; retourne {account_id: solde ou None}."""
+    account_ids = list(dict.fromkeys(a for a in account_ids if a))
+    concurrence = concurrence or _setting('BALANCE_REFRESH_WORKERS', 4)
+    with ThreadPoolExecutor(max_workers=concurrence) as pool:
+        return dict(zip(account_ids, pool.map(rafraichir, account_ids)))
@@ -0,0 +1,139 @@
+# core/counters.py
+"""
+Compteurs bufferisés des projets (vues, partages).
+
+Chaque vue de page ajoute un incrément dans un buffer en mémoire au lieu
+d'écrire la ligne du projet. Le buffer est vidé en lot, avec des expressions
+F(), quand il atteint COUNTER_FLUSH_THRESHOLD incréments ou toutes les
+COUNTER_FLUSH_INTERVAL secondes (thread d'arrière-plan), ainsi qu'à l'arrêt
+du processus.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('vues', 'partages')
+
+_lock = threading.Lock()
+_pending = defaultdict(int)  # (projet_id, champ) -> incrément en attente
+_pending_total = 0
+
+_flusher_pid = None
+_flusher_wake = threading.Event()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def flush_interval():
+    return int(_setting('COUNTER_FLUSH_INTERVAL', 30))
+
+
+def flush_threshold():
+    return int(_setting('COUNTER_FLUSH_THRESHOLD', 100))
+
+
+def increment(projet_id, field, amount=1):
+    """Enregistre un incrément sans toucher à la base de données."""
+    global _pending_total
+    if field not in FIELDS:
+        raise ValueError(f"Compteur inconnu: {field}")
+
+    with _lock:
+        _pending[(projet_id, field)] += amount
+        _pending_total += amount
+        threshold_reached = _pending_total >= flush_threshold()
+
+    ensure_flusher()
+    if threshold_reached:
+        _flusher_wake.set()
+
+
+def _drain():
+    global _pending, _pending_total
+    with _lock:
+        batch, _pending = _pending, defaultdict(int)
+        _pending_total = 0
+    return batch
+
+
+def _restore(batch):
+    global _pending_total
+    with _lock:
+        for key, amount in batch.items():
+            _pending[key] += amount
+            _pending_total += amount
+
+
+def flush():
+    """
+    Écrit les incréments en attente avec un UPDATE ... SET champ = champ + n.
+
+    Les projets ayant le même incrément sont regroupés dans un seul UPDATE.
+    En cas d'erreur, les groupes non écrits sont remis dans le buffer.
+    Retourne le nombre d'incréments écrits.
+    """
+    from .models import Projet
+
+    batch = _drain()
+    if not batch:
+        return 0
+
+    groups = defaultdict(list)  # (champ, incrément) -> [projet_id]
+    for (projet_id, field), amount in batch.items():
+        groups[(field, amount)].append(projet_id)
+
+    written = 0
+    remaining = list(groups.items())
+    while remaining:
+        (field, amount), projet_ids = remaining[0]
+        try:
+            Projet.objects.filter(pk__in=projet_ids).update(**{field: F(field) + amount})
+        except Exception as e:
+            logger.error(f"Erreur écriture compteurs projets: {e}")
+            _restore({
+                (projet_id, field): amount
+                for (field, amount), projet_ids in remaining
+                for projet_id in projet_ids
+            })
+            break
+        written += amount * len(projet_ids)
+        remaining.pop(0)
+
+    return written
+
+
+# =============================================================================
+# VIDAGE EN ARRIÈRE-PLAN
+# =============================================================================
+
+def _flusher_loop():
+    while True:
+        _flusher_wake.wait(timeout=flush_interval())
+        _flusher_wake.clear()
+        close_old_connections()
+        flush()
+
+
+def ensure_flusher():
+    """Démarre (une fois par processus) le thread de vidage du buffer."""
+    global _flusher_pid
+    # Le pid protège contre les workers forkés après le démarrage du thread
+    if _flusher_pid == os.getpid():
+        return
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        thread = threading.Thread(target=_flusher_loop, name='counter-flusher', daemon=True)
+        thread.start()
+        _flusher_pid = os.getpid()
+        atexit.register(flush)
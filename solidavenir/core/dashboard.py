@@ -0,0 +1,140 @@
+# core/dashboard.py
+"""
+Instantané des statistiques du tableau de bord administrateur.
+
+Les compteurs sont calculés avec des agrégats conditionnels groupés, une
+requête par table (Projet, User, Association, PreuvePalier, Transaction,
+plus le classement des donateurs), puis gardés dans le cache partagé par
+tous les processus (CACHES, table de cache en base par défaut) :
+
+- pendant DASHBOARD_SNAPSHOT_TTL secondes au plus ;
+- jusqu'à la prochaine écriture qui change une file d'action (projet,
+  association, preuve, utilisateur, palier devenu prêt) : `invalider` est
+  appelé par les signaux et par paliers.evaluer_disponibilite.
+
+Les dons (table la plus écrite) ne déclenchent pas d'invalidation : les
+montants et le graphique ont au plus DASHBOARD_SNAPSHOT_TTL secondes de
+retard.
+"""
+import logging
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'tableau_de_bord:instantane'
+JOURS_GRAPHIQUE = 15
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def invalider():
+    cache.delete(CACHE_KEY)
+
+
+def _debut_jour(jour):
+    return timezone.make_aware(datetime.combine(jour, time.min))
+
+
+def calculer():
+    """Calcule l'instantané (dictionnaire sérialisable, sans instance de modèle)."""
+    from .models import Association, PreuvePalier, Projet, Transaction, User
+
+    aujourdhui = timezone.localdate()
+    jours = [aujourdhui - timedelta(days=i) for i in range(JOURS_GRAPHIQUE - 1, -1, -1)]
+    bornes = [_debut_jour(jour) for jour in jours] + [_debut_jour(aujourdhui + timedelta(days=1))]
+
+    # Projet : une ligne par statut
+    projets_par_statut = list(Projet.objects.values('statut').annotate(
+        count=Count('id'),
+        prets=Count('id', filter=Q(pret_distribution=True)),
+    ).order_by('statut'))
+    par_statut = {ligne['statut']: ligne for ligne in projets_par_statut}
+
+    # User : une ligne par type
+    utilisateurs = dict(User.objects.values_list('user_type').annotate(n=Count('id')).order_by())
+
+    associations = Association.objects.aggregate(
+        total=Count('id'),
+        validees=Count('id', filter=Q(valide=True)),
+    )
+    preuves = PreuvePalier.objects.filter(statut__in=['en_attente', 'modification']).count()
+
+    # Transaction : totaux et graphique des 15 derniers jours en une passe
+    confirme = Q(statut='confirme')
+    agregats = {
+        'confirmees': Count('id', filter=confirme),
+        'montant_total': Sum('montant', filter=confirme),
+        'en_attente': Count('id', filter=Q(statut='en_attente')),
+    }
+    for i in range(JOURS_GRAPHIQUE):
+        jour = confirme & Q(date_transaction__gte=bornes[i], date_transaction__lt=bornes[i + 1])
+        agregats[f'montant_{i}'] = Sum('montant', filter=jour)
+        agregats[f'dons_{i}'] = Count('id', filter=jour)
+    transactions = Transaction.objects.aggregate(**agregats)
+
+    top_donateurs = list(
+        Transaction.objects.filter(statut='confirme', contributeur__user_type='donateur')
+        .values('contributeur_id', 'contributeur__username')
+        .annotate(total_dons=Sum('montant'), nombre_dons=Count('id'))
+        .order_by('-total_dons')[:5]
+    )
+
+    dernier = JOURS_GRAPHIQUE - 1
+    stats = {
+        # Actions prioritaires
+        'projets_attente': par_statut.get('en_attente', {}).get('count', 0),
+        'associations_attente': associations['total'] - associations['validees'],
+        'paliers_action': par_statut.get('actif', {}).get('prets', 0),
+        'preuves_verification': preuves,
+        'transactions_verification': transactions['en_attente'],
+
+        # Projets
+        'projets_total': sum(ligne['count'] for ligne in projets_par_statut),
+        'projets_actifs': par_statut.get('actif', {}).get('count', 0),
+        'projets_termines': par_statut.get('termine', {}).get('count', 0),
+
+        # Utilisateurs
+        'utilisateurs_total': sum(utilisateurs.values()),
+        'association_total': utilisateurs.get('association', 0),
+        'porteurs_total': utilisateurs.get('porteur', 0),
+        'donateurs_total': utilisateurs.get('donateur', 0),
+
+        # Transactions
+        'transactions_confirmees': transactions['confirmees'],
+        'montant_total': transactions['montant_total'] or 0,
+        'montant_jour': transactions[f'montant_{dernier}'] or 0,
+        'dons_jour': transactions[f'dons_{dernier}'],
+    }
+
+    return {
+        'stats': stats,
+        'stats_associations': {
+            'associations_total': associations['total'],
+            'associations_validees': associations['validees'],
+            'associations_attente': associations['total'] - associations['validees'],
+        },
+        'projets_par_statut': [{'statut': l['statut'], 'count': l['count']} for l in projets_par_statut],
+        'donnees_graphique': {
+            'labels': [jour.strftime('%d/%m') for jour in jours],
+            'montants': [float(transactions[f'montant_{i}'] or 0) for i in range(JOURS_GRAPHIQUE)],
+            'nombre_dons': [transactions[f'dons_{i}'] for i in range(JOURS_GRAPHIQUE)],
+        },
+        'top_donateurs': top_donateurs,
+        'genere_le': timezone.now(),
+    }
+
+
+def instantane():
+    """Instantané du cache, recalculé s'il a expiré ou a été invalidé (ou s'il date d'un autre jour)."""
+    donnees = cache.get(CACHE_KEY)
+    if donnees is None or timezone.localdate(donnees['genere_le']) != timezone.localdate():
+        donnees = calculer()
+        cache.set(CACHE_KEY, donnees, _setting('DASHBOARD_SNAPSHOT_TTL', 60))
+    return donnees
@@ -0,0 +1,274 @@
+# core/donations.py
+"""
+Traitement asynchrone des dons (process_donation).
+
+Étapes :
+    1. requête HTTP : validation, création de la Transaction 'en_attente' et de
+       son TraitementDon ('a_transferer'), réponse immédiate ;
+    2. worker (`process_donations`) : réclamation du don, transfert HBAR
+       utilisateur -> opérateur, confirmation de la Transaction (le signal met
+       à jour le résumé de financement et la disponibilité des paliers) et
+       mise en file du message HCS (outbox) ;
+    3. la page du projet interroge `statut_don` (vue JSON) jusqu'à la fin.
+
+Le transfert n'est pas idempotent : un don n'est rejoué que si l'appel n'est
+certainement pas parti (circuit ouvert, connexion refusée). Toute issue
+incertaine (timeout de lecture, worker arrêté pendant l'appel) passe en
+'a_verifier' pour une vérification manuelle.
+"""
+import logging
+import random
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import connection, transaction as db_transaction
+from django.utils import timezone
+from urllib3.exceptions import NewConnectionError
+
+from . import balances, outbox
+from .hedera_client import HederaUnavailable
+
+logger = logging.getLogger(__name__)
+
+MESSAGES = {
+    'a_transferer': "Votre don est en file d'attente.",
+    'transfert_envoye': "Transfert HBAR en cours sur Hedera...",
+    'termine': "Don confirmé ✅",
+    'echec': "Le transfert HBAR a échoué ❌",
+    'a_verifier': "Transfert en cours de vérification par l'équipe.",
+}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# =============================================================================
+# SOUMISSION (requête)
+# =============================================================================
+
+def soumettre(user, projet, montant):
+    """Crée la Transaction en attente et son traitement ; retourne la Transaction."""
+    from .models import TraitementDon, Transaction
+
+    with db_transaction.atomic():
+        transaction = Transaction.objects.create(
+            user=user,
+            montant=montant,
+            contributeur=user,
+            projet=projet,
+            statut='en_attente',
+            destination='operator',
+        )
+        TraitementDon.objects.create(transaction=transaction)
+        if _setting('DONATION_INPROCESS', False):
+            db_transaction.on_commit(lambda: lancer(transaction.pk))
+    return transaction
+
+
+def statut_don(transaction):
+    """Représentation JSON de l'avancement d'un don."""
+    traitement = getattr(transaction, 'traitement', None)
+    etape = traitement.etape if traitement else ('termine' if transaction.statut == 'confirme' else 'echec')
+    data = {
+        'don': str(transaction.audit_uuid),
+        'etape': etape,
+        'termine': etape not in ('a_transferer', 'transfert_envoye'),
+        'statut': transaction.statut,
+        'montant': str(transaction.montant),
+        'message': MESSAGES.get(etape, ''),
+        'transaction_hash': transaction.hedera_transaction_hash,
+        'hashscan_url': transaction.hedera_hashscan_url,
+    }
+    if etape == 'echec' and traitement and traitement.erreur:
+        data['erreur'] = traitement.erreur
+    return data
+
+
+# =============================================================================
+# WORKER
+# =============================================================================
+
+def expirer_baux():
+    """Les transferts envoyés dont le bail a expiré ont une issue inconnue : à vérifier."""
+    from .models import TraitementDon
+
+    expires = TraitementDon.objects.filter(
+        etape='transfert_envoye',
+        prochaine_tentative__lt=timezone.now(),
+    ).update(etape='a_verifier', erreur="Worker interrompu pendant le transfert, issue inconnue")
+    if expires:
+        logger.warning(f"{expires} don(s) à vérifier (transfert sans réponse enregistrée)")
+    return expires
+
+
+def reclamer(limite, transaction_id=None):
+    """Réserve jusqu'à `limite` dons à transférer ; retourne leurs transaction_id."""
+    from .models import TraitementDon
+
+    maintenant = timezone.now()
+    with db_transaction.atomic():
+        a_traiter = TraitementDon.objects.filter(etape='a_transferer', prochaine_tentative__lte=maintenant)
+        if transaction_id is not None:
+            a_traiter = a_traiter.filter(pk=transaction_id)
+        a_traiter = a_traiter.order_by('prochaine_tentative', 'pk').select_for_update(
+            skip_locked=connection.features.has_select_for_update_skip_locked
+        )
+        ids = list(a_traiter.values_list('pk', flat=True)[:limite])
+        # Marqué "envoyé" avant l'appel : un worker arrêté ne provoquera pas de second transfert
+        TraitementDon.objects.filter(pk__in=ids).update(
+            etape='transfert_envoye',
+            prochaine_tentative=maintenant + timedelta(seconds=_setting('DONATION_LEASE', 120)),
+        )
+    return ids
+
+
+def _non_envoye(erreur):
+    """True si la requête de transfert n'a certainement pas atteint le microservice."""
+    if isinstance(erreur, (HederaUnavailable, requests.exceptions.ConnectTimeout)):
+        return True
+    raison = getattr(erreur.args[0], 'reason', None) if erreur.args else None
+    return isinstance(raison, NewConnectionError)
+
+
+def _terminer(traitement_id, etape, erreur='', statut_transaction=None, delai=None):
+    from .models import TraitementDon, Transaction
+
+    with db_transaction.atomic():
+        traitement = TraitementDon.objects.select_for_update().get(pk=traitement_id)
+        if traitement.etape != 'transfert_envoye':
+            return traitement.etape
+        traitement.etape = etape
+        traitement.erreur = str(erreur)[:2000]
+        if delai is not None:
+            traitement.tentatives += 1
+            traitement.prochaine_tentative = timezone.now() + timedelta(seconds=delai)
+        traitement.save()
+        if statut_transaction:
+            transaction = Transaction.objects.get(pk=traitement_id)
+            transaction.statut = statut_transaction
+            transaction.save(update_fields=['statut'])
+    return etape
+
+
+def _replanifier(traitement, erreur):
+    """Transfert non parti : nouvel essai plus tard, ou échec après DONATION_MAX_ATTEMPTS."""
+    if traitement.tentatives + 1 >= _setting('DONATION_MAX_ATTEMPTS', 5):
+        return _terminer(traitement.pk, 'echec', erreur, statut_transaction='erreur')
+    delai = _setting('DONATION_RETRY_DELAY', 10) * 2 ** traitement.tentatives * random.uniform(0.5, 1.5)
+    return _terminer(traitement.pk, 'a_transferer', erreur, delai=delai)
+
+
+def _confirmer(transaction_id, result):
+    from .models import TraitementDon, Transaction
+
+    with db_transaction.atomic():
+        traitement = TraitementDon.objects.select_for_update().get(pk=transaction_id)
+        if traitement.etape != 'transfert_envoye':
+            logger.error(f"Don {transaction_id} transféré mais déjà en état {traitement.etape}")
+            return traitement.etape
+
+        transaction = Transaction.objects.select_related('projet', 'contributeur').get(pk=transaction_id)
+        transaction.statut = 'confirme'
+        transaction.hedera_transaction_hash = result.get('transactionId')
+        transaction.hedera_status = result.get('status')
+        transaction.hedera_hashscan_url = result.get('hashscanUrl')
+        # save() : le signal met à jour le résumé de financement du projet
+        transaction.save()
+
+        projet = transaction.projet
+        if projet.topic_id:
+            outbox.enqueue_don(
+                projet.topic_id,
+                transaction.contributeur.email,
+                transaction.montant,
+                transaction.hedera_transaction_hash,
+                transaction=transaction,
+            )
+
+        traitement.etape = 'termine'
+        traitement.erreur = ''
+        traitement.save()
+    return 'termine'
+
+
+def executer(transaction_id):
+    """Effectue le transfert d'un don réclamé ; retourne l'étape atteinte."""
+    from .models import TraitementDon, Transaction
+
+    traitement = TraitementDon.objects.get(pk=transaction_id)
+    transaction = Transaction.objects.select_related('contributeur').get(pk=transaction_id)
+    user = transaction.contributeur
+
+    if not user.hedera_account_id or not user.hedera_private_key:
+        return _terminer(transaction_id, 'echec', "Wallet non configuré", statut_transaction='erreur')
+
+    try:
+        response = balances.transferer(
+            user.hedera_account_id,
+            user.hedera_private_key,
+            settings.HEDERA_OPERATOR_ID,
+            transaction.montant,
+        )
+    except requests.RequestException as e:
+        if _non_envoye(e):
+            return _replanifier(traitement, e)
+        logger.error(f"Don {transaction_id}: issue du transfert inconnue ({e})")
+        return _terminer(transaction_id, 'a_verifier', e)
+
+    try:
+        result = response.json()
+    except ValueError:
+        result = {}
+
+    if response.status_code == 200 and result.get('success'):
+        return _confirmer(transaction_id, result)
+
+    erreur = result.get('error') or f"HTTP {response.status_code}"
+    logger.warning(f"Don {transaction_id}: transfert refusé ({erreur})")
+    return _terminer(transaction_id, 'echec', erreur, statut_transaction='erreur')
+
+
+def _executer_sans_erreur(transaction_id):
+    try:
+        return executer(transaction_id)
+    except Exception as e:
+        logger.exception(f"Erreur traitement du don {transaction_id}")
+        return _terminer(transaction_id, 'a_verifier', e)
+    finally:
+        connection.close()
+
+
+def drain(taille_lot=None, concurrence=None):
+    """Traite un lot de dons ; retourne {étape atteinte: nombre}."""
+    taille_lot = taille_lot or _setting('DONATION_BATCH_SIZE', 20)
+    concurrence = concurrence or _setting('DONATION_CONCURRENCY', 4)
+
+    expirer_baux()
+    ids = reclamer(taille_lot)
+    if not ids:
+        return Counter()
+    with ThreadPoolExecutor(max_workers=concurrence) as pool:
+        return Counter(pool.map(_executer_sans_erreur, ids))
+
+
+_executor = None
+
+
+def lancer(transaction_id):
+    """Traite un don dans un thread du processus web (DONATION_INPROCESS, développement)."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_setting('DONATION_CONCURRENCY', 4), thread_name_prefix='don')
+
+    def tache():
+        try:
+            if reclamer(1, transaction_id=transaction_id):
+                _executer_sans_erreur(transaction_id)
+        finally:
+            connection.close()
+
+    _executor.submit(tache)
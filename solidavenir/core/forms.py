@@ -3,6 +3,8 @@ from django.contrib.auth.forms import UserCreationForm
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from .models import User, Projet, Transaction
+from .rates import get_rate_snapshot
+from . import balances
 from django_summernote.widgets import SummernoteWidget
 from django.utils import timezone
 from django import forms
@@ -779,9 +781,10 @@ class Transfer_fond(forms.ModelForm):
     Attributes:
         projet (Projet, optional): The project to which the contribution is made.
         contributeur (User, optional): The user making the contribution.
+        rate_snapshot (RateSnapshot, optional): Rate used for the help text. When omitted,
+            the locally cached snapshot is read; the form never calls an external API.
 
     Methods:
-        get_taux_conversion_actuel(): Retrieves the current FCFA to HBAR conversion rate from an external API.
         clean_montant(): Validates the 'montant' field according to the rules described above.
     """
     
@@ -806,6 +809,7 @@ class Transfer_fond(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         self.projet = kwargs.pop('projet', None)
         self.contributeur = kwargs.pop('contributeur', None)
+        self.rate_snapshot = kwargs.pop('rate_snapshot', None) or get_rate_snapshot()
         super().__init__(*args, **kwargs)
         
         if self.projet:
@@ -813,17 +817,12 @@ class Transfer_fond(forms.ModelForm):
             if montant_restant > 0:
                 self.fields['montant'].help_text += f". Remaining amount to collect: {montant_restant:.0f} FCFA."
         
-        taux_conversion = self.get_taux_conversion_actuel()
-        self.fields['montant'].help_text += f" (≈ 1 HBAR = {taux_conversion} FCFA)"
-    
-    def get_taux_conversion_actuel(self):
-        """Fetches the current conversion rate from FCFA to HBAR."""
-        try:
-            response = requests.get('https://api.taux-conversion.com/fcfa/hbar')
-            data = response.json()
-            return Decimal(data['taux'])
-        except:
-            return Decimal('0.8')
+        # Taux servi au plus RATE_HARD_TTL après sa récupération ; au-delà il est indicatif
+        taux_conversion = self.rate_snapshot.hbar_fcfa
+        self.fields['montant'].help_text += f" (≈ 1 HBAR = {taux_conversion:.2f} FCFA"
+        if self.rate_snapshot.source in ('last_known', 'default'):
+            self.fields['montant'].help_text += ", indicative rate"
+        self.fields['montant'].help_text += ")"
     
     def clean_montant(self):
         """
@@ -858,7 +857,6 @@ class Transfer_fond(forms.ModelForm):
         return montant
 
 # forms.py
-import requests
 from django import forms
 from django.core.validators import MinValueValidator
 from django.conf import settings
@@ -923,24 +921,13 @@ class TransferDirectForm(forms.Form):
                 f"L'association {association.nom} n'a pas de wallet actif pour recevoir des fonds."
             )
 
-        # Vérification simple du solde (optionnel pour MVP)
+        # Vérification simple du solde en cache (ignorée tant qu'il n'est pas connu)
         if montant and self.user:
-            try:
-                response = requests.get(
-                    f'http://localhost:3001/balance/{self.user.hedera_account_id}',
-                    timeout=10
+            solde = balances.get_solde(self.user.hedera_account_id)
+            if solde is not None and montant > solde:
+                raise forms.ValidationError(
+                    f"Solde insuffisant. Votre solde actuel est de {solde} HBAR."
                 )
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get('success'):
-                        solde = float(data['balance'].split(' ')[0])  
-                        if montant > solde:
-                            raise forms.ValidationError(
-                                f"Solde insuffisant. Votre solde actuel est de {solde} HBAR."
-                            )
-            except requests.RequestException:
-                # On ignore l'erreur de vérification du solde en MVP
-                pass
 
         return cleaned_data
 
@@ -0,0 +1,246 @@
+# core/funding.py
+"""
+Résumé de financement des projets maintenu de façon incrémentale.
+
+Un don compte dans le résumé (FinancementProjet) quand la transaction est
+confirmée, destinée à l'opérateur et liée à un projet. Les signaux de
+Transaction (voir core/signals.py) appellent `appliquer_changement` à chaque
+sauvegarde/suppression ; les vues lisent ensuite des colonnes au lieu
+d'agréger la table des transactions.
+
+Projet.montant_engage et Projet.contributeurs_count sont tenus à jour dans la
+même transaction base de données.
+"""
+import logging
+
+from django.db import transaction as db_transaction
+from django.db.models import Count, Max, Min, Sum
+
+logger = logging.getLogger(__name__)
+
+STATUT_COMPTE = 'confirme'
+DESTINATION_COMPTEE = 'operator'
+
+# Champs de Transaction qui déterminent la contribution au résumé
+CHAMPS_SUIVIS = ('statut', 'destination', 'projet_id', 'contributeur_id', 'montant', 'date_transaction')
+
+
+def etat_transaction(transaction, etat_initial=None):
+    """
+    Photographie des champs suivis chargés sur l'instance, lue sans
+    déclencher de requête. Les champs différés (.only()/.defer()) sont
+    absents, ou repris d'`etat_initial` : une sauvegarde ne les écrit pas.
+    """
+    etat = dict(etat_initial or {})
+    etat.update({champ: transaction.__dict__[champ] for champ in CHAMPS_SUIVIS if champ in transaction.__dict__})
+    return etat
+
+
+def champs_manquants(etat):
+    """Champs suivis absents d'une photographie (différés au chargement)."""
+    return [champ for champ in CHAMPS_SUIVIS if champ not in etat]
+
+
+def est_compte(etat):
+    return (
+        etat.get('statut') == STATUT_COMPTE
+        and etat.get('destination') == DESTINATION_COMPTEE
+        and etat.get('projet_id') is not None
+    )
+
+
+def _dons_confirmes(projet_id):
+    from .models import Transaction
+    return Transaction.objects.filter(
+        projet_id=projet_id,
+        statut=STATUT_COMPTE,
+        destination=DESTINATION_COMPTEE,
+    )
+
+
+def _verrouiller_resume(projet_id):
+    from .models import FinancementProjet
+    FinancementProjet.objects.get_or_create(projet_id=projet_id)
+    return FinancementProjet.objects.select_for_update().get(projet_id=projet_id)
+
+
+def _synchroniser_projet(resume):
+    from .models import Projet
+    from .paliers import evaluer_disponibilite
+    # update() : pas de Projet.save() ni de signal post_save sur le projet
+    Projet.objects.filter(pk=resume.projet_id).update(
+        montant_engage=resume.montant_total,
+        contributeurs_count=resume.nombre_contributeurs,
+    )
+    evaluer_disponibilite(resume.projet_id)
+
+
+def ajouter_don(etat, transaction_id):
+    """Ajoute un don confirmé au résumé de son projet."""
+    projet_id = etat['projet_id']
+    with db_transaction.atomic():
+        resume = _verrouiller_resume(projet_id)
+        deja_contributeur = _dons_confirmes(projet_id).filter(
+            contributeur_id=etat['contributeur_id']
+        ).exclude(pk=transaction_id).exists()
+
+        montant = etat['montant'] or 0
+        resume.montant_total += montant
+        resume.nombre_dons += 1
+        if not deja_contributeur:
+            resume.nombre_contributeurs += 1
+        if resume.don_max is None or montant > resume.don_max:
+            resume.don_max = montant
+        if resume.don_min is None or montant < resume.don_min:
+            resume.don_min = montant
+        date_don = etat['date_transaction']
+        if date_don and (resume.dernier_don is None or date_don > resume.dernier_don):
+            resume.dernier_don = date_don
+
+        resume.save()
+        _synchroniser_projet(resume)
+
+
+def retirer_don(etat, transaction_id):
+    """Retire du résumé un don qui n'est plus confirmé (remboursé, annulé, supprimé)."""
+    projet_id = etat['projet_id']
+    with db_transaction.atomic():
+        resume = _verrouiller_resume(projet_id)
+        autres_dons = _dons_confirmes(projet_id).exclude(pk=transaction_id)
+        encore_contributeur = autres_dons.filter(contributeur_id=etat['contributeur_id']).exists()
+
+        montant = etat['montant'] or 0
+        resume.montant_total = max(0, resume.montant_total - montant)
+        resume.nombre_dons = max(0, resume.nombre_dons - 1)
+        if not encore_contributeur:
+            resume.nombre_contributeurs = max(0, resume.nombre_contributeurs - 1)
+
+        # Les extrêmes ne se défont pas : on ne les recalcule que si le don
+        # retiré en portait un.
+        date_don = etat['date_transaction']
+        if (resume.don_max is not None and montant >= resume.don_max) or \
+                (resume.don_min is not None and montant <= resume.don_min) or \
+                (date_don and resume.dernier_don and date_don >= resume.dernier_don):
+            extremes = autres_dons.aggregate(
+                don_max=Max('montant'),
+                don_min=Min('montant'),
+                dernier_don=Max('date_transaction'),
+            )
+            resume.don_max = extremes['don_max']
+            resume.don_min = extremes['don_min']
+            resume.dernier_don = extremes['dernier_don']
+
+        resume.save()
+        _synchroniser_projet(resume)
+
+
+def appliquer_changement(etat_initial, transaction):
+    """
+    Répercute sur les résumés la transition d'une transaction entre
+    `etat_initial` (au chargement) et son état courant.
+    """
+    etat_courant = etat_transaction(transaction, etat_initial)
+    avant, apres = est_compte(etat_initial), est_compte(etat_courant)
+
+    if avant and apres and all(etat_initial.get(c) == etat_courant.get(c) for c in CHAMPS_SUIVIS):
+        return
+    if avant:
+        retirer_don(etat_initial, transaction.pk)
+    if apres:
+        ajouter_don(etat_courant, transaction.pk)
+
+
+# =============================================================================
+# RECALCUL COMPLET
+# =============================================================================
+
+def calculer_resumes(projet_ids=None):
+    """
+    Recalcule les résumés depuis la table des transactions (une requête GROUP BY).
+    Retourne {projet_id: {montant_total, nombre_dons, nombre_contributeurs, don_max, don_min, dernier_don}}.
+    """
+    from .models import Transaction
+
+    transactions = Transaction.objects.filter(
+        statut=STATUT_COMPTE,
+        destination=DESTINATION_COMPTEE,
+        projet__isnull=False,
+    )
+    if projet_ids is not None:
+        transactions = transactions.filter(projet_id__in=projet_ids)
+
+    lignes = transactions.values('projet_id').annotate(
+        montant_total=Sum('montant'),
+        nombre_dons=Count('id'),
+        nombre_contributeurs=Count('contributeur', distinct=True),
+        don_max=Max('montant'),
+        don_min=Min('montant'),
+        dernier_don=Max('date_transaction'),
+    ).order_by()
+
+    return {ligne.pop('projet_id'): ligne for ligne in lignes}
+
+
+def reconstruire_resumes(projet_ids=None, corriger=True):
+    """
+    Compare les résumés stockés avec un recalcul complet.
+
+    Retourne la liste des projet_id dont le résumé (ou Projet.montant_engage /
+    contributeurs_count) divergeait. Avec corriger=True, les écarts sont
+    réécrits en une transaction (bulk_create / bulk_update).
+    """
+    from .models import FinancementProjet, Projet
+
+    champs = ('montant_total', 'nombre_dons', 'nombre_contributeurs', 'don_max', 'don_min', 'dernier_don')
+    vide = dict.fromkeys(champs)
+    vide.update(montant_total=0, nombre_dons=0, nombre_contributeurs=0)
+
+    with db_transaction.atomic():
+        projets = Projet.objects.all()
+        if projet_ids is not None:
+            projets = projets.filter(pk__in=projet_ids)
+        projets = projets.select_for_update() if corriger else projets
+        projets = list(projets.only('id', 'montant_engage', 'contributeurs_count'))
+
+        attendus = calculer_resumes([p.pk for p in projets] if projet_ids is not None else None)
+        existants = FinancementProjet.objects.in_bulk([p.pk for p in projets])
+
+        divergents, a_creer, a_modifier, projets_a_modifier = [], [], [], []
+        for projet in projets:
+            attendu = attendus.get(projet.pk, vide)
+            resume = existants.get(projet.pk)
+            if resume is None:
+                # Pas de résumé : normal tant qu'aucun don n'est confirmé
+                ecart_resume = attendu != vide
+            else:
+                ecart_resume = any(getattr(resume, c) != attendu[c] for c in champs)
+            ecart_projet = (
+                projet.montant_engage != attendu['montant_total']
+                or projet.contributeurs_count != attendu['nombre_contributeurs']
+            )
+            if not (ecart_resume or ecart_projet):
+                continue
+
+            divergents.append(projet.pk)
+            if resume is None and ecart_resume:
+                a_creer.append(FinancementProjet(projet_id=projet.pk, **attendu))
+            elif ecart_resume:
+                for champ in champs:
+                    setattr(resume, champ, attendu[champ])
+                a_modifier.append(resume)
+            if ecart_projet:
+                projet.montant_engage = attendu['montant_total']
+                projet.contributeurs_count = attendu['nombre_contributeurs']
+                projets_a_modifier.append(projet)
+
+        if corriger:
+            from .paliers import evaluer_disponibilite
+            FinancementProjet.objects.bulk_create(a_creer, batch_size=500)
+            FinancementProjet.objects.bulk_update(a_modifier, list(champs), batch_size=500)
+            Projet.objects.bulk_update(projets_a_modifier, ['montant_engage', 'contributeurs_count'], batch_size=500)
+            for projet in projets_a_modifier:
+                evaluer_disponibilite(projet.pk)
+
+    if divergents:
+        logger.warning(f"Résumés de financement divergents: {len(divergents)} projet(s)")
+    return divergents
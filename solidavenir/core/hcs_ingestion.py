@@ -0,0 +1,334 @@
+# core/hcs_ingestion.py
+"""
+Ingestion incrémentale des messages des topics HCS des projets.
+
+Les messages sont lus sur le mirror node (GET /api/v1/topics/{id}/messages,
+servi aussi par le remplaçant local) et rangés dans TopicMessage avec leur
+numéro de séquence, leur horodatage de consensus et leur running hash :
+
+- un point de reprise par topic (CurseurSynchronisation "hcs_topic:<id>",
+  position = dernier numéro de séquence ingéré) : seuls les messages plus
+  récents sont demandés (sequencenumber=gt:N), page par page ;
+- une page = un bulk_create(ignore_conflicts=True) contre la contrainte
+  unique (projet, sequence_number), et la mise à jour du point de reprise
+  dans la même transaction. Le point de reprise est verrouillé
+  (select_for_update) pendant l'écriture : deux synchronisations du même
+  topic (commande sync_topics, vue ?sync=true) s'attendent, et la seconde
+  n'écrit ni ne compte les messages déjà ingérés par la première ;
+- les messages déjà enregistrés à l'envoi par l'outbox (sans numéro de
+  séquence) sont complétés au lieu d'être dupliqués, via la clé
+  `idempotencyKey` publiée dans le contenu ;
+- les nouveaux messages sont ajoutés aux statistiques du topic (voir
+  core/hcs_stats.py) dans la même transaction.
+
+Le coût d'une synchronisation dépend du nombre de nouveaux messages, pas de
+l'historique du topic.
+
+`synchroniser_tous` synchronise tous les topics de projets en parallèle
+(HCS_SYNC_CONCURRENCY threads) par tours de HCS_SYNC_PAGES_PER_TURN pages :
+un topic très en retard repasse en fin de file au lieu d'occuper un thread
+jusqu'au bout, et l'échec d'un topic n'arrête pas les autres.
+"""
+import base64
+import hashlib
+import json
+import logging
+import struct
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import connection, transaction as db_transaction
+from django.utils import timezone
+
+from . import hcs_stats
+from .hedera_client import get_mirror_client
+
+logger = logging.getLogger(__name__)
+
+PREFIXE_CURSEUR = 'hcs_topic:'
+TAILLE_PAGE = 100  # maximum du mirror node
+# Un message de l'outbox est enregistré juste après son consensus
+FENETRE_OUTBOX = timedelta(hours=1)
+RUNNING_HASH_VERSION = 3
+# Champs renseignés depuis le mirror node (complétés sur les messages de l'outbox)
+CHAMPS_CONSENSUS = ['sequence_number', 'consensus_timestamp', 'consensus_ns', 'running_hash',
+                    'running_hash_version', 'payer_account_id', 'message_sha384']
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class TopicIntrouvable(Exception):
+    """Le mirror node ne connaît pas ce topic (404)."""
+
+
+def nom_curseur(topic_id):
+    return f"{PREFIXE_CURSEUR}{topic_id}"
+
+
+def _entite(identifiant):
+    shard, realm, num = (int(x) for x in identifiant.split('.'))
+    return shard, realm, num
+
+
+def calculer_running_hash(precedent, topic_id, payer_account_id, consensus_timestamp, sequence_number, message):
+    """
+    Running hash HCS (version 3) : SHA-384 de l'ancien running hash suivi de
+    la version, du payeur, du topic, de l'horodatage de consensus, du numéro
+    de séquence et du SHA-384 du message. Les octets sont ceux écrits par le
+    nœud Hedera (ObjectOutputStream Java : en-tête de flux puis un bloc de
+    données). `precedent`, `message` : bytes ; horodatage 'secondes.nanos'.
+    """
+    return chainer(precedent, topic_id, payer_account_id, consensus_timestamp, sequence_number,
+                   hashlib.sha384(message).digest())
+
+
+def chainer(precedent, topic_id, payer_account_id, consensus_timestamp, sequence_number, empreinte_message):
+    """calculer_running_hash à partir du SHA-384 du message (`empreinte_message`, bytes)."""
+    secondes, _, nanos = consensus_timestamp.partition('.')
+    donnees = (
+        precedent
+        + struct.pack('>q', RUNNING_HASH_VERSION)
+        + struct.pack('>qqq', *_entite(payer_account_id))
+        + struct.pack('>qqq', *_entite(topic_id))
+        + struct.pack('>qi', int(secondes), int(nanos.ljust(9, '0')[:9]))
+        + struct.pack('>q', sequence_number)
+        + empreinte_message
+    )
+    entete = b'\xac\xed\x00\x05' + (bytes((0x77, len(donnees))) if len(donnees) < 256
+                                   else b'\x7a' + struct.pack('>i', len(donnees)))
+    return hashlib.sha384(entete + donnees).digest()
+
+
+def dates_consensus(horodatages):
+    """'secondes.nanos' -> datetime UTC, pour toute une page (microsecondes tronquées)."""
+    origine = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+    dates = []
+    for horodatage in horodatages:
+        secondes, _, nanos = str(horodatage).partition('.')
+        dates.append(origine + timedelta(seconds=int(secondes), microseconds=int(nanos.ljust(9, '0')[:6])))
+    return dates
+
+
+def _octets(message):
+    try:
+        return base64.b64decode(message or '')
+    except ValueError:
+        return None
+
+
+def _decoder(octets, message):
+    """Contenu JSON d'un message ; texte brut sous 'texte' sinon, base64 brut s'il n'est pas décodable."""
+    try:
+        texte = octets.decode('utf-8')
+    except (AttributeError, UnicodeDecodeError):
+        return {'base64': message}
+    try:
+        contenu = json.loads(texte)
+    except ValueError:
+        return {'texte': texte}
+    return contenu if isinstance(contenu, dict) else {'valeur': contenu}
+
+
+def _montant(valeur):
+    try:
+        return Decimal(str(valeur)).quantize(Decimal('0.01')) if valeur is not None else None
+    except InvalidOperation:
+        return None
+
+
+def ingerer(projet_id, messages):
+    """
+    Enregistre une page de messages du mirror node (triée par séquence).
+    Retourne le nombre de messages nouveaux ou complétés. À appeler avec le
+    point de reprise du topic verrouillé (voir synchroniser_topic) : les
+    lignes écartées par ignore_conflicts seraient sinon comptées dans les
+    statistiques.
+    """
+    from .models import TopicMessage
+
+    dates = dates_consensus(m['consensus_timestamp'] for m in messages)
+    lignes = []
+    for message, date in zip(messages, dates):
+        octets = _octets(message.get('message'))
+        contenu = _decoder(octets, message.get('message'))
+        lignes.append(TopicMessage(
+            projet_id=projet_id,
+            type_message=str(contenu.get('type') or 'inconnu')[:100],
+            utilisateur_email=contenu.get('utilisateur') if isinstance(contenu.get('utilisateur'), str) else None,
+            montant=_montant(contenu.get('montant')),
+            transaction_hash=contenu.get('transaction_hash') or contenu.get('transactionHash'),
+            contenu=contenu,
+            date_envoi=date,
+            sequence_number=message['sequence_number'],
+            consensus_timestamp=date,
+            running_hash=message.get('running_hash') or '',
+            running_hash_version=message.get('running_hash_version'),
+            consensus_ns=str(message['consensus_timestamp']),
+            payer_account_id=message.get('payer_account_id') or '',
+            message_sha384=hashlib.sha384(octets).hexdigest() if octets is not None else '',
+        ))
+
+    # Messages publiés par l'outbox : déjà enregistrés à l'envoi, sans numéro de séquence
+    par_cle = {ligne.contenu['idempotencyKey']: ligne for ligne in lignes if ligne.contenu.get('idempotencyKey')}
+    completes = []
+    if par_cle:
+        existants = TopicMessage.objects.filter(
+            projet_id=projet_id,
+            sequence_number__isnull=True,
+            date_envoi__gte=min(dates) - FENETRE_OUTBOX,
+        ).only('pk', 'contenu')
+        for existant in existants:
+            ligne = par_cle.pop(existant.contenu.get('idempotencyKey'), None)
+            if ligne is not None:
+                existant.sequence_number = ligne.sequence_number
+                existant.consensus_timestamp = ligne.consensus_timestamp
+                for champ in CHAMPS_CONSENSUS:
+                    setattr(existant, champ, getattr(ligne, champ))
+                completes.append(existant)
+                lignes.remove(ligne)
+
+    if completes:
+        TopicMessage.objects.bulk_update(completes, CHAMPS_CONSENSUS)
+    # Déjà ingérés (page relue après une reprise) : ni réécrits ni recomptés
+    deja = set(TopicMessage.objects.filter(
+        projet_id=projet_id, sequence_number__in=[ligne.sequence_number for ligne in lignes],
+    ).values_list('sequence_number', flat=True)) if lignes else set()
+    lignes = [ligne for ligne in lignes if ligne.sequence_number not in deja]
+    TopicMessage.objects.bulk_create(lignes, ignore_conflicts=True)
+    hcs_stats.enregistrer(lignes)
+    return len(lignes) + len(completes)
+
+
+def synchroniser_topic(projet_id, topic_id, pages_max=None, client=None, arret=None):
+    """
+    Ingère les messages du topic postérieurs à son point de reprise.
+    Retourne {'messages': nombre lu, 'ingeres': nombre de messages nouveaux ou complétés (voir ingerer),
+    'derniere_sequence': N, 'dernier_consensus': datetime ou None,
+    'a_jour': False si pages_max ou `arret` (threading.Event) a interrompu la lecture}.
+    Lève TopicIntrouvable, ou les exceptions `requests` du mirror node.
+    """
+    from .models import CurseurSynchronisation
+
+    client = client or get_mirror_client()
+    curseur, _ = CurseurSynchronisation.objects.get_or_create(nom=nom_curseur(topic_id))
+    derniere = int(curseur.position or 0)
+    resultat = {'messages': 0, 'ingeres': 0, 'derniere_sequence': derniere, 'dernier_consensus': None, 'a_jour': False}
+
+    pages = 0
+    while (pages_max is None or pages < pages_max) and not (arret is not None and arret.is_set()):
+        response = client.mirror_topic_messages(topic_id, {
+            'sequencenumber': f"gt:{derniere}",
+            'limit': TAILLE_PAGE,
+            'order': 'asc',
+        })
+        if response.status_code == 404:
+            raise TopicIntrouvable(topic_id)
+        response.raise_for_status()
+        messages = response.json().get('messages') or []
+        if not messages:
+            resultat['a_jour'] = True
+            break
+
+        with db_transaction.atomic():
+            position = int(CurseurSynchronisation.objects.select_for_update().filter(pk=curseur.pk)
+                           .values_list('position', flat=True).get() or 0)
+            nouveaux = [m for m in messages if m['sequence_number'] > position]
+            if nouveaux:
+                resultat['ingeres'] += ingerer(projet_id, nouveaux)
+            derniere = max(position, messages[-1]['sequence_number'])
+            curseur.position = str(derniere)
+            curseur.save(update_fields=['position', 'date_mise_a_jour'])
+
+        pages += 1
+        resultat['messages'] += len(messages)
+        resultat['derniere_sequence'] = derniere
+        resultat['dernier_consensus'] = dates_consensus([messages[-1]['consensus_timestamp']])[0]
+        if len(messages) < TAILLE_PAGE:
+            resultat['a_jour'] = True
+            break
+    return resultat
+
+
+# =============================================================================
+# SYNCHRONISATION DE TOUS LES TOPICS
+# =============================================================================
+
+def _tour(client, projet_id, topic_id, pages, arret):
+    """Un tour de synchronisation d'un topic dans un thread du pool ; retourne (résultat, durée en s)."""
+    debut = time.monotonic()
+    try:
+        if arret.is_set():
+            return {'messages': 0, 'a_jour': False, 'interrompu': True}, 0.0
+        resultat = synchroniser_topic(projet_id, topic_id, pages_max=pages, client=client, arret=arret)
+    except TopicIntrouvable:
+        resultat = {'messages': 0, 'a_jour': False, 'erreur': "topic inconnu du mirror node"}
+    except Exception as e:
+        logger.exception(f"Synchronisation HCS: échec du topic {topic_id}")
+        resultat = {'messages': 0, 'a_jour': False, 'erreur': str(e) or e.__class__.__name__}
+    finally:
+        connection.close()
+    return resultat, time.monotonic() - debut
+
+
+def synchroniser_tous(concurrence=None, pages_par_tour=None, arret=None, client=None):
+    """
+    Synchronise tous les projets qui ont un topic_id jusqu'à être à jour (ou
+    jusqu'à `arret`, un threading.Event : les tours en cours finissent leur
+    page, les suivants ne démarrent pas).
+
+    Retourne {'topics': {topic_id: état}, 'duree': s, 'interrompu': bool} où
+    l'état contient messages, derniere_sequence, dernier_consensus, duree (s
+    passées sur ce topic), a_jour, retard (s entre le dernier message ingéré
+    et la fin de la synchronisation si le topic n'est pas à jour, 0 sinon) et
+    erreur.
+    """
+    from .models import Projet
+
+    concurrence = concurrence or _setting('HCS_SYNC_CONCURRENCY', 8)
+    pages_par_tour = pages_par_tour or _setting('HCS_SYNC_PAGES_PER_TURN', 10)
+    arret = arret or threading.Event()
+    client = client or get_mirror_client()
+
+    projets = Projet.objects.exclude(topic_id__isnull=True).exclude(topic_id='').values_list('pk', 'topic_id')
+    etats = {
+        topic_id: {'projet_id': pk, 'messages': 0, 'derniere_sequence': None, 'dernier_consensus': None,
+                   'duree': 0.0, 'a_jour': False, 'retard': None, 'erreur': None}
+        for pk, topic_id in projets
+    }
+
+    debut = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrence, thread_name_prefix='hcs-sync') as pool:
+        en_cours = {
+            pool.submit(_tour, client, etat['projet_id'], topic_id, pages_par_tour, arret): topic_id
+            for topic_id, etat in etats.items()
+        }
+        while en_cours:
+            faits, _ = wait(en_cours, return_when=FIRST_COMPLETED)
+            for future in faits:
+                topic_id = en_cours.pop(future)
+                etat = etats[topic_id]
+                resultat, duree = future.result()
+                etat['duree'] += duree
+                etat['messages'] += resultat['messages']
+                etat['a_jour'] = resultat['a_jour']
+                etat['erreur'] = resultat.get('erreur')
+                if 'derniere_sequence' in resultat:
+                    etat['derniere_sequence'] = resultat['derniere_sequence']
+                etat['dernier_consensus'] = resultat.get('dernier_consensus') or etat['dernier_consensus']
+                # Tour complet sans erreur : il reste des pages, le topic repasse en fin de file
+                if not (etat['a_jour'] or etat['erreur'] or resultat.get('interrompu') or arret.is_set()):
+                    en_cours[pool.submit(_tour, client, etat['projet_id'], topic_id, pages_par_tour, arret)] = topic_id
+
+    maintenant = timezone.now()
+    for etat in etats.values():
+        if etat['a_jour']:
+            etat['retard'] = 0.0
+        elif etat['dernier_consensus'] is not None:
+            etat['retard'] = max((maintenant - etat['dernier_consensus']).total_seconds(), 0.0)
+    return {'topics': etats, 'duree': time.monotonic() - debut, 'interrompu': arret.is_set()}
@@ -1,12 +1,11 @@
-import requests
-from django.conf import settings
 import json
 from datetime import datetime
 import logging
 
-logger = logging.getLogger(__name__)
+from . import hcs_ingestion
+from .hedera_client import get_client
 
-HEDERA_API_URL = getattr(settings, 'HEDERA_API_URL', 'http://localhost:3001')
+logger = logging.getLogger(__name__)
 
 class HCSService:
     @staticmethod
@@ -19,10 +18,8 @@ class HCSService:
         }
         
         try:
-            response = requests.post(
-                f"{HEDERA_API_URL}/create-project-topic",
-                json=payload,
-                timeout=30
+            response = get_client().request(
+                'POST', '/create-project-topic', 'create-topic', json=payload
             )
             result = response.json()
             
@@ -46,10 +43,8 @@ class HCSService:
         }
         
         try:
-            response = requests.post(
-                f"{HEDERA_API_URL}/notarize-project-validation",
-                json=payload,
-                timeout=30
+            response = get_client().request(
+                'POST', '/notarize-project-validation', 'send-message', json=payload, timeout=30
             )
             result = response.json()
             
@@ -75,41 +70,17 @@ class HCSService:
         }
     
     @staticmethod
-    def sync_project_messages(project_topic):
-        """Synchronise les messages d'un topic avec la base de données"""
-        result = HCSService.get_project_messages(project_topic.project_id)
-        
-        if not result.get('success'):
-            return result
-        
-        from .models import HCSMessage
-        
-        messages_created = 0
-        for msg_data in result.get('messages', []):
-            # Vérifier si le message existe déjà
-            if not HCSMessage.objects.filter(
-                topic=project_topic, 
-                sequence_number=msg_data['sequenceNumber']
-            ).exists():
-                
-                message_content = msg_data['message']
-                message_type = message_content.get('type', 'OTHER')
-                
-                HCSMessage.objects.create(
-                    topic=project_topic,
-                    sequence_number=msg_data['sequenceNumber'],
-                    consensus_timestamp=datetime.fromtimestamp(
-                        msg_data['consensusTimestamp'].seconds + 
-                        msg_data['consensusTimestamp'].nanos / 1e9
-                    ),
-                    message_type=message_type,
-                    content=message_content,
-                    transaction_id=message_content.get('transactionId')
-                )
-                messages_created += 1
-        
+    def sync_project_messages(projet):
+        """Ingère les nouveaux messages du topic du projet (voir core/hcs_ingestion.py)"""
+        if not projet.topic_id:
+            return {"success": False, "error": "Aucun topic HCS pour ce projet"}
+        try:
+            resultat = hcs_ingestion.synchroniser_topic(projet.pk, projet.topic_id)
+        except Exception as e:
+            logger.error(f"Erreur synchronisation topic {projet.topic_id}: {e}")
+            return {"success": False, "error": str(e)}
         return {
             "success": True,
-            "messages_created": messages_created,
-            "total_messages": len(result.get('messages', []))
-        }
\ No newline at end of file
+            "messages_created": resultat['ingeres'],
+            "last_sequence_number": resultat['derniere_sequence'],
+        }
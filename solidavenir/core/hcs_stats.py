@@ -0,0 +1,189 @@
+# core/hcs_stats.py
+"""
+Statistiques des topics HCS maintenues de façon incrémentale.
+
+Chaque écriture de TopicMessage (ingestion depuis le mirror node, buffer de
+l'outbox) appelle `enregistrer` avec les lignes créées, dans la même
+transaction base de données : StatistiquesTopic (par projet) et
+StatistiquesHCS (globales) sont mises à jour par projet touché, sans relire
+la table des messages. Les pages HCS lisent ensuite ces lignes en temps
+constant.
+
+`verifier` (commande verify_topic_statistics, à lancer périodiquement)
+recalcule tout en une requête GROUP BY, corrige les écarts (suppressions,
+écritures hors de ces chemins) et recompte les topics actifs : un topic
+devient inactif par simple passage du temps, sans écriture.
+"""
+import logging
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def seuil_activite():
+    """Date avant laquelle un dernier message rend le topic inactif."""
+    return timezone.now() - timedelta(days=_setting('HCS_TOPIC_ACTIVE_DAYS', 30))
+
+
+def _ajouter_types(par_type, increments):
+    for type_message, nombre in increments.items():
+        par_type[type_message] = par_type.get(type_message, 0) + nombre
+
+
+def topic_cree(projet_id):
+    """À appeler quand un projet qui n'en avait pas reçoit un topic."""
+    from .models import StatistiquesHCS, StatistiquesTopic
+
+    with db_transaction.atomic():
+        StatistiquesTopic.objects.get_or_create(projet_id=projet_id)
+        StatistiquesHCS.courantes()
+        globales = StatistiquesHCS.objects.select_for_update().get(pk=1)
+        globales.nombre_topics += 1
+        globales.save()
+
+
+def enregistrer(lignes):
+    """Ajoute aux statistiques des TopicMessage qui viennent d'être créés."""
+    from .models import StatistiquesHCS, StatistiquesTopic
+
+    par_projet = defaultdict(lambda: {'types': Counter(), 'dernier': None})
+    for ligne in lignes:
+        entree = par_projet[ligne.projet_id]
+        entree['types'][ligne.type_message] += 1
+        if entree['dernier'] is None or ligne.date_envoi > entree['dernier']:
+            entree['dernier'] = ligne.date_envoi
+    if not par_projet:
+        return
+
+    seuil = seuil_activite()
+    with db_transaction.atomic():
+        StatistiquesTopic.objects.bulk_create(
+            [StatistiquesTopic(projet_id=pk) for pk in par_projet], ignore_conflicts=True
+        )
+        # Verrous pris dans l'ordre des pk : pas d'interblocage entre deux écritures
+        resumes = StatistiquesTopic.objects.select_for_update().filter(pk__in=list(par_projet)).order_by('pk')
+        StatistiquesHCS.courantes()
+        globales = StatistiquesHCS.objects.select_for_update().get(pk=1)
+
+        redevenus_actifs, maintenant = 0, timezone.now()
+        for resume in resumes:
+            entree = par_projet[resume.pk]
+            if resume.dernier_message is None or resume.dernier_message < seuil:
+                redevenus_actifs += int(entree['dernier'] >= seuil)
+            resume.nombre_messages += sum(entree['types'].values())
+            _ajouter_types(resume.messages_par_type, entree['types'])
+            if resume.dernier_message is None or entree['dernier'] > resume.dernier_message:
+                resume.dernier_message = entree['dernier']
+            resume.date_mise_a_jour = maintenant
+        StatistiquesTopic.objects.bulk_update(
+            resumes, ['nombre_messages', 'messages_par_type', 'dernier_message', 'date_mise_a_jour']
+        )
+
+        globales.nombre_messages += len(lignes)
+        _ajouter_types(globales.messages_par_type, sum((e['types'] for e in par_projet.values()), Counter()))
+        globales.topics_actifs += redevenus_actifs
+        dernier = max(e['dernier'] for e in par_projet.values())
+        if globales.dernier_message is None or dernier > globales.dernier_message:
+            globales.dernier_message = dernier
+        globales.save()
+
+
+# =============================================================================
+# VÉRIFICATION PÉRIODIQUE
+# =============================================================================
+
+def calculer_statistiques(projet_ids=None):
+    """
+    Recalcule les statistiques par projet depuis la table des messages (une requête GROUP BY).
+    Retourne {projet_id: {nombre_messages, messages_par_type, dernier_message}}.
+    """
+    from .models import TopicMessage
+
+    messages = TopicMessage.objects.all()
+    if projet_ids is not None:
+        messages = messages.filter(projet_id__in=projet_ids)
+    lignes = messages.values('projet_id', 'type_message').annotate(
+        nombre=Count('id'),
+        dernier=Max('date_envoi'),
+    ).order_by()
+
+    attendus = defaultdict(lambda: {'nombre_messages': 0, 'messages_par_type': {}, 'dernier_message': None})
+    for ligne in lignes:
+        attendu = attendus[ligne['projet_id']]
+        attendu['nombre_messages'] += ligne['nombre']
+        attendu['messages_par_type'][ligne['type_message']] = ligne['nombre']
+        if attendu['dernier_message'] is None or ligne['dernier'] > attendu['dernier_message']:
+            attendu['dernier_message'] = ligne['dernier']
+    return dict(attendus)
+
+
+def verifier(corriger=True):
+    """
+    Compare les statistiques stockées avec un recalcul complet.
+
+    Retourne {'topics': [projet_id divergents], 'global': bool}. Avec
+    corriger=True, les écarts sont réécrits et les dates de vérification
+    mises à jour, en une transaction.
+    """
+    from .models import Projet, StatistiquesHCS, StatistiquesTopic
+
+    champs = ('nombre_messages', 'messages_par_type', 'dernier_message')
+    maintenant = timezone.now()
+    seuil = seuil_activite()
+
+    with db_transaction.atomic():
+        StatistiquesHCS.courantes()
+        globales = StatistiquesHCS.objects.select_for_update().get(pk=1) if corriger else StatistiquesHCS.courantes()
+        resumes = StatistiquesTopic.objects.all()
+        resumes = {r.pk: r for r in (resumes.select_for_update() if corriger else resumes)}
+        attendus = calculer_statistiques()
+        avec_topic = set(Projet.objects.exclude(topic_id__isnull=True).exclude(topic_id='').values_list('pk', flat=True))
+
+        vide = {'nombre_messages': 0, 'messages_par_type': {}, 'dernier_message': None}
+        divergents, a_creer, a_modifier = [], [], []
+        for projet_id in avec_topic | set(attendus):
+            attendu = attendus.get(projet_id, vide)
+            resume = resumes.get(projet_id)
+            if resume is None:
+                divergents.append(projet_id)
+                a_creer.append(StatistiquesTopic(projet_id=projet_id, date_verification=maintenant, **attendu))
+                continue
+            if any(getattr(resume, c) != attendu[c] for c in champs):
+                divergents.append(projet_id)
+                for champ in champs:
+                    setattr(resume, champ, attendu[champ])
+            resume.date_verification = maintenant
+            a_modifier.append(resume)
+
+        global_attendu = {
+            'nombre_topics': len(avec_topic),
+            'topics_actifs': sum(1 for a in attendus.values() if a['dernier_message'] >= seuil),
+            'nombre_messages': sum(a['nombre_messages'] for a in attendus.values()),
+            'messages_par_type': {},
+            'dernier_message': max((a['dernier_message'] for a in attendus.values()), default=None),
+        }
+        for attendu in attendus.values():
+            _ajouter_types(global_attendu['messages_par_type'], attendu['messages_par_type'])
+        global_divergent = any(getattr(globales, c) != v for c, v in global_attendu.items())
+
+        if corriger:
+            StatistiquesTopic.objects.bulk_create(a_creer, batch_size=500)
+            StatistiquesTopic.objects.bulk_update(a_modifier, list(champs) + ['date_verification'], batch_size=500)
+            for champ, valeur in global_attendu.items():
+                setattr(globales, champ, valeur)
+            globales.date_verification = maintenant
+            globales.save()
+
+    if divergents or global_divergent:
+        logger.info(f"Statistiques HCS divergentes: {len(divergents)} topic(s), globales: {global_divergent}")
+    return {'topics': divergents, 'global': global_divergent}
@@ -0,0 +1,139 @@
+# core/hcs_verification.py
+"""
+Vérification de l'historique HCS stocké localement (TopicMessage).
+
+Pour chaque topic, les messages ingérés sont relus dans l'ordre des numéros
+de séquence, en flux (iterator(chunk_size=HCS_VERIFY_CHUNK_SIZE), index
+unique (projet, sequence_number)) : mémoire bornée, temps linéaire.
+
+- trou : numéro de séquence attendu absent ;
+- doublon : même running hash que le message précédent (un même numéro
+  de séquence ne peut pas être stocké deux fois : contrainte unique) ;
+- hash invalide : le running hash recalculé depuis le précédent, le payeur,
+  l'horodatage de consensus exact et le SHA-384 du message (version 3) ne
+  correspond pas à celui publié par le mirror node. Les messages ingérés
+  avant l'enregistrement de ces données, ou qui suivent un trou, sont
+  comptés comme non vérifiables.
+
+Un point de reprise par topic (CurseurSynchronisation "hcs_verif:<id>") est
+enregistré à chaque lot : position = dernier numéro de séquence contrôlé sans
+anomalie depuis la séquence 1. Il ne dépasse jamais un trou, un doublon ou
+un hash invalide : tant que l'anomalie n'est pas résolue, chaque passage la
+relit et la signale de nouveau.
+"""
+import base64
+import binascii
+import logging
+from collections import Counter
+
+from django.conf import settings
+
+from .hcs_ingestion import RUNNING_HASH_VERSION, chainer
+
+logger = logging.getLogger(__name__)
+
+PREFIXE_CURSEUR = 'hcs_verif:'
+MAX_ANOMALIES = 100  # anomalies détaillées par topic ; au-delà, seulement comptées
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def nom_curseur(topic_id):
+    return f"{PREFIXE_CURSEUR}{topic_id}"
+
+
+def _hash(valeur):
+    try:
+        return base64.b64decode(valeur, validate=True) if valeur else None
+    except (ValueError, binascii.Error):
+        return None
+
+
+def _recalculable(ligne):
+    _, running_hash, version, payer, consensus_ns, empreinte = ligne
+    return version == RUNNING_HASH_VERSION and payer and consensus_ns and empreinte and running_hash
+
+
+def verifier_topic(projet_id, topic_id, taille_lot=None, depuis_debut=False):
+    """
+    Vérifie les messages du topic postérieurs à son point de reprise.
+
+    Retourne {'compteurs': Counter(verifies, non_verifiables, trous,
+    doublons, hash_invalides), 'anomalies': [(sequence, nature, détail)],
+    'derniere_sequence': dernier numéro lu, 'point_de_reprise': N}.
+    """
+    from .models import CurseurSynchronisation, TopicMessage
+
+    taille_lot = taille_lot or _setting('HCS_VERIFY_CHUNK_SIZE', 2000)
+    curseur, _ = CurseurSynchronisation.objects.get_or_create(nom=nom_curseur(topic_id))
+    derniere = 0 if depuis_debut else int(curseur.position or 0)
+
+    messages = TopicMessage.objects.filter(projet_id=projet_id, sequence_number__isnull=False)
+    # Le running hash du dernier message vérifié sert de point de départ à la chaîne
+    if derniere == 0:
+        precedent = bytes(48)
+    else:
+        precedent = _hash(messages.filter(sequence_number=derniere).values_list('running_hash', flat=True).first())
+
+    compteurs, anomalies = Counter(), []
+    point, continu = derniere, True
+
+    def signaler(sequence, nature, detail=''):
+        nonlocal continu
+        continu = False
+        compteurs[nature] += 1
+        if len(anomalies) < MAX_ANOMALIES:
+            anomalies.append((sequence, nature, detail))
+
+    lignes = messages.filter(sequence_number__gt=derniere).order_by('sequence_number').values_list(
+        'sequence_number', 'running_hash', 'running_hash_version', 'payer_account_id', 'consensus_ns', 'message_sha384',
+    ).iterator(chunk_size=taille_lot)
+
+    lues = 0
+    for ligne in lignes:
+        sequence, running_hash = ligne[0], _hash(ligne[1])
+        if sequence != derniere + 1:
+            signaler(sequence, 'trous', f"{derniere + 1}-{sequence - 1}")
+            precedent = None
+
+        if running_hash is not None and running_hash == precedent:
+            signaler(sequence, 'doublons')
+        elif precedent is None or running_hash is None or not _recalculable(ligne):
+            compteurs['non_verifiables'] += 1
+        else:
+            attendu = chainer(precedent, topic_id, ligne[3], ligne[4], sequence, bytes.fromhex(ligne[5]))
+            if attendu == running_hash:
+                compteurs['verifies'] += 1
+            else:
+                signaler(sequence, 'hash_invalides', base64.b64encode(attendu).decode('ascii'))
+        precedent, derniere = running_hash, sequence
+        if continu:
+            point = sequence
+
+        lues += 1
+        if lues % taille_lot == 0 and str(point) != curseur.position:
+            curseur.position = str(point)
+            curseur.save(update_fields=['position', 'date_mise_a_jour'])
+
+    if str(point) != curseur.position:
+        curseur.position = str(point)
+        curseur.save(update_fields=['position', 'date_mise_a_jour'])
+
+    for sequence, nature, detail in anomalies:
+        logger.warning(f"Historique HCS {topic_id}: {nature} à la séquence {sequence} {detail}".rstrip())
+    return {'compteurs': compteurs, 'anomalies': anomalies, 'derniere_sequence': derniere, 'point_de_reprise': point}
+
+
+def verifier_tous(taille_lot=None, depuis_debut=False, topic_ids=None):
+    """Vérifie chaque topic de projet ; retourne {topic_id: résultat de verifier_topic}."""
+    from .models import Projet
+
+    projets = Projet.objects.exclude(topic_id__isnull=True).exclude(topic_id='')
+    if topic_ids:
+        projets = projets.filter(topic_id__in=topic_ids)
+    return {
+        topic_id: verifier_topic(pk, topic_id, taille_lot, depuis_debut)
+        for pk, topic_id in list(projets.order_by('pk').values_list('pk', 'topic_id'))
+    }
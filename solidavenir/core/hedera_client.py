@@ -0,0 +1,289 @@
+# core/hedera_client.py
+"""
+Client unique pour le microservice Node Hedera (settings.HEDERA_SERVICE_URL).
+
+- Une session `requests` partagée (connexions keep-alive, pool de
+  HEDERA_POOL_SIZE connexions).
+- Timeout par endpoint (HEDERA_TIMEOUTS) et timeout de connexion court.
+- Les appels idempotents (GET /balance, /health) sont rejoués avec un
+  backoff exponentiel à jitter ; les écritures (transfert, création de wallet,
+  de topic, envoi de message) ne le sont jamais, pour ne pas dupliquer une
+  opération sur le ledger.
+- Un circuit breaker coupe les appels après HEDERA_BREAKER_THRESHOLD échecs
+  consécutifs : pendant HEDERA_BREAKER_RESET secondes les appels échouent
+  immédiatement (HederaUnavailable), puis un appel d'essai est autorisé.
+
+HederaUnavailable hérite de requests.ConnectionError : les appelants qui
+traitent déjà « service indisponible » n'ont rien à changer.
+
+Les méthodes retournent la `requests.Response` brute ; `metrics()` expose
+latences et erreurs par endpoint (voir la vue `performances`).
+
+`get_mirror_client()` : même client (pool, retries, circuit) pointé sur
+l'API REST du mirror node (HEDERA_MIRROR_URL), en lecture seule.
+"""
+import logging
+import random
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from urllib.parse import urlencode
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUTS = {
+    'create-wallet': 10,
+    'transfer': 30,
+    'balance': 5,
+    'create-topic': 30,
+    'send-message': 10,
+    'health': 3,
+    'mirror': 10,
+}
+RETRY_STATUSES = (502, 503, 504)
+LATENCY_WINDOW = 500
+
+
+class HederaUnavailable(requests.exceptions.ConnectionError):
+    """Circuit ouvert : le microservice est considéré comme indisponible."""
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """True si un appel peut partir (en demi-ouverture, un seul appel d'essai)."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.warning("Microservice Hedera de nouveau disponible, circuit refermé")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                if self.state != self.OPEN:
+                    logger.warning(
+                        f"Microservice Hedera indisponible ({self.failures} échecs), "
+                        f"circuit ouvert pour {self.reset_timeout}s"
+                    )
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self.state == self.OPEN
+
+    def retry_after(self):
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0
+            return max(0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+class HederaClient:
+    def __init__(self, base_url=None, pool_size=None, timeouts=None, connect_timeout=None,
+                 retries=None, backoff=None, breaker_threshold=None, breaker_reset=None):
+        self.base_url = (base_url or settings.HEDERA_SERVICE_URL).rstrip('/')
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or getattr(settings, 'HEDERA_TIMEOUTS', {}))}
+        self.connect_timeout = connect_timeout or getattr(settings, 'HEDERA_CONNECT_TIMEOUT', 3)
+        self.retries = retries if retries is not None else getattr(settings, 'HEDERA_RETRIES', 2)
+        self.backoff = backoff or getattr(settings, 'HEDERA_RETRY_BACKOFF', 0.2)
+        self.breaker = CircuitBreaker(
+            breaker_threshold or getattr(settings, 'HEDERA_BREAKER_THRESHOLD', 5),
+            breaker_reset or getattr(settings, 'HEDERA_BREAKER_RESET', 30),
+        )
+
+        pool_size = pool_size or getattr(settings, 'HEDERA_POOL_SIZE', 10)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._metrics_lock = threading.Lock()
+        self._counts = defaultdict(Counter)
+        self._latencies = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+
+    # -------------------------------------------------------------------------
+    # Appel générique
+    # -------------------------------------------------------------------------
+
+    def request(self, method, path, endpoint, json=None, idempotent=None, timeout=None):
+        """
+        Appelle `path` sur le microservice. `endpoint` sert de clé pour le
+        timeout et les métriques. Lève HederaUnavailable si le circuit est
+        ouvert, et les exceptions `requests` usuelles sinon.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in ('GET', 'HEAD')
+        timeout = (self.connect_timeout, timeout or self.timeouts.get(endpoint, 10))
+        attempts = 1 + (self.retries if idempotent else 0)
+
+        for attempt in range(1, attempts + 1):
+            if not self.breaker.allow():
+                self._count(endpoint, 'short_circuited')
+                raise HederaUnavailable(
+                    f"Service Hedera indisponible (nouvel essai dans {self.breaker.retry_after():.0f}s)"
+                )
+
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, f"{self.base_url}{path}", json=json, timeout=timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self._record(endpoint, started, 'error')
+                self.breaker.failure()
+                if attempt == attempts or self.breaker.is_open:
+                    raise
+                logger.info(f"Appel Hedera {endpoint} en échec ({e}), nouvel essai {attempt}/{attempts - 1}")
+            except BaseException:
+                # Toute autre erreur (réponse tronquée, redirections, URL invalide...)
+                # compte aussi, sans nouvel essai : sinon un appel d'essai en
+                # demi-ouverture laisserait le circuit bloqué dans cet état.
+                self._record(endpoint, started, 'error')
+                self.breaker.failure()
+                raise
+            else:
+                if response.status_code >= 500:
+                    self._record(endpoint, started, 'error')
+                    self.breaker.failure()
+                    if (attempt == attempts or self.breaker.is_open
+                            or response.status_code not in RETRY_STATUSES):
+                        return response
+                else:
+                    self._record(endpoint, started, 'ok')
+                    self.breaker.success()
+                    return response
+
+            self._count(endpoint, 'retries')
+            time.sleep(random.uniform(0, self.backoff * 2 ** (attempt - 1)))
+
+    # -------------------------------------------------------------------------
+    # Endpoints du microservice
+    # -------------------------------------------------------------------------
+
+    def create_wallet(self, initial_balance=None):
+        payload = {'initialBalance': initial_balance} if initial_balance is not None else None
+        return self.request('POST', '/create-wallet', 'create-wallet', json=payload)
+
+    def transfer(self, from_account_id, from_private_key, to_account_id, amount):
+        return self.request('POST', '/transfer', 'transfer', json={
+            'fromAccountId': from_account_id,
+            'fromPrivateKey': from_private_key,
+            'toAccountId': to_account_id,
+            'amount': float(amount),
+        })
+
+    def balance(self, account_id):
+        return self.request('GET', f'/balance/{account_id}', 'balance')
+
+    def create_topic(self, memo):
+        return self.request('POST', '/create-topic', 'create-topic', json={'memo': memo})
+
+    def send_message(self, topic_id, message):
+        return self.request('POST', '/send-message', 'send-message', json={'topicId': topic_id, 'message': message})
+
+    def health(self):
+        return self.request('GET', '/health', 'health')
+
+    # Mirror node (API REST /api/v1, client créé par get_mirror_client)
+
+    def mirror_transaction(self, mirror_id):
+        return self.request('GET', f'/api/v1/transactions/{mirror_id}', 'mirror')
+
+    def mirror_transactions(self, params=None, path=None):
+        """Liste filtrée (account.id, timestamp...) ; `path` : lien `links.next` d'une page précédente."""
+        return self.request('GET', path or f'/api/v1/transactions?{urlencode(params or {}, doseq=True)}', 'mirror')
+
+    def mirror_topic_messages(self, topic_id, params=None):
+        return self.request('GET', f'/api/v1/topics/{topic_id}/messages?{urlencode(params or {})}', 'mirror')
+
+    # -------------------------------------------------------------------------
+    # Métriques
+    # -------------------------------------------------------------------------
+
+    def _count(self, endpoint, key):
+        with self._metrics_lock:
+            self._counts[endpoint][key] += 1
+
+    def _record(self, endpoint, started, outcome):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._metrics_lock:
+            self._counts[endpoint]['calls'] += 1
+            self._counts[endpoint][outcome] += 1
+            self._latencies[endpoint].append(elapsed_ms)
+
+    def metrics(self):
+        """Compteurs et latences (ms) par endpoint, et état du circuit."""
+        with self._metrics_lock:
+            counts = {endpoint: dict(c) for endpoint, c in self._counts.items()}
+            latencies = {endpoint: sorted(l) for endpoint, l in self._latencies.items()}
+
+        endpoints = {}
+        for endpoint, c in counts.items():
+            series = latencies.get(endpoint) or [0]
+            endpoints[endpoint] = {
+                'calls': c.get('calls', 0),
+                'errors': c.get('error', 0),
+                'retries': c.get('retries', 0),
+                'short_circuited': c.get('short_circuited', 0),
+                'latency_ms': {
+                    'p50': round(series[len(series) // 2], 2),
+                    'p95': round(series[min(len(series) - 1, int(len(series) * 0.95))], 2),
+                    'max': round(series[-1], 2),
+                },
+            }
+        return {
+            'base_url': self.base_url,
+            'circuit': self.breaker.state,
+            'consecutive_failures': self.breaker.failures,
+            'endpoints': endpoints,
+        }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Client partagé par le processus (créé au premier appel)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HederaClient()
+    return _client
+
+
+_mirror_client = None
+
+
+def get_mirror_client():
+    """Client partagé du mirror node (HEDERA_MIRROR_URL)."""
+    global _mirror_client
+    if _mirror_client is None:
+        with _client_lock:
+            if _mirror_client is None:
+                _mirror_client = HederaClient(base_url=settings.HEDERA_MIRROR_URL)
+    return _mirror_client
@@ -0,0 +1,504 @@
+# core/hedera_standin.py
+"""
+Remplaçant local du microservice Node Hedera (hedera_service/src/app.js).
+
+Pour les tests de charge et les benchmarks sans réseau ni fonds testnet :
+mêmes routes et mêmes formes JSON (/create-wallet, /transfer,
+/balance/:id, /create-topic, /send-message, /health), état en mémoire
+(soldes, topics, numéros de séquence des messages). Les transferts et les
+messages sont aussi exposés comme par le mirror node (/api/v1/transactions/:id,
+/api/v1/transactions?account.id=...&timestamp=... et
+/api/v1/topics/:id/messages, avec running hash), pour la réconciliation et
+l'ingestion des topics.
+
+Injection de pannes, pour observer le côté Django quand le consensus est
+lent ou en échec :
+- latence par endpoint (ms, DEFAULT_LATENCY_MS proche du testnet) multipliée
+  par `latency_scale`, plus un jitter aléatoire ;
+- `error_rate` : proportion de réponses 500 {"success": false} ;
+- `drop_rate` : proportion de connexions fermées sans réponse (issue
+  inconnue côté client, comme un timeout).
+
+Lancement : `python manage.py run_hedera_standin`, puis HEDERA_STANDIN=True
+côté Django (HEDERA_SERVICE_URL pointe alors sur le remplaçant).
+Les routes /_standin/config (GET/POST), /_standin/stats et /_standin/reset
+permettent de changer l'injection de pannes en cours de test.
+"""
+import base64
+import hashlib
+import json
+import logging
+import random
+import re
+import secrets
+import threading
+import time
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from .hcs_ingestion import calculer_running_hash
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS = ('create-wallet', 'transfer', 'balance', 'create-topic', 'send-message', 'health', 'mirror')
+
+# Temps de consensus typiques du testnet (receipt inclus)
+DEFAULT_LATENCY_MS = {
+    'create-wallet': 2500,
+    'transfer': 2500,
+    'balance': 300,
+    'create-topic': 2500,
+    'send-message': 3000,  # receipt + lecture mirror node
+    'health': 300,
+    'mirror': 150,
+}
+MIRROR_PAGE_MAX = 100
+
+TINYBAR = Decimal('0.00000001')
+HASHSCAN_TX_URL = "https://hashscan.io/testnet/tx/{transaction_id}"
+HASHSCAN_TRANSACTION_URL = "https://hashscan.io/testnet/transaction/{transaction_id}"
+MIRROR_TX_URL = "https://testnet.mirrornode.hedera.com/api/v1/transactions/{mirror_id}"
+
+
+class StandinError(Exception):
+    """Refus d'une opération (même message que le statut Hedera correspondant)."""
+
+    def __init__(self, message, status=500):
+        super().__init__(message)
+        self.status = status
+
+
+def mirror_id(transaction_id):
+    """0.0.X@secondes.nanos (SDK) -> 0.0.X-secondes-nanos (mirror node)."""
+    payer, valid_start = transaction_id.split('@')
+    return f"{payer}-{valid_start.replace('.', '-')}"
+
+
+def format_hbar(montant):
+    """Même rendu que Hbar.toString() du SDK : '12.5 ℏ'."""
+    texte = format(montant.quantize(TINYBAR).normalize(), 'f')
+    return f"{texte} ℏ"
+
+
+class Ledger:
+    """État en mémoire : comptes, topics et messages, protégé par un verrou."""
+
+    def __init__(self, operator_id, operator_balance=Decimal('1000000'),
+                 default_balance=Decimal('1000'), auto_accounts=True):
+        self.operator_id = operator_id
+        self.operator_balance = Decimal(operator_balance)
+        self.default_balance = Decimal(default_balance)
+        self.auto_accounts = auto_accounts
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.accounts = {self.operator_id: {'balance': self.operator_balance, 'private_key': None}}
+            self.topics = {}
+            self.transactions = []  # transferts, dans l'ordre de consensus (vue mirror node)
+            self._next_num = 5000000
+            self._last_valid_start = 0
+
+    # -------------------------------------------------------------------------
+
+    def _new_entity_id(self):
+        self._next_num += 1
+        return f"0.0.{self._next_num}"
+
+    def _transaction_id(self, payer):
+        # Format du SDK : 0.0.X@secondes.nanos, strictement croissant
+        valid_start = max(time.time_ns(), self._last_valid_start + 1)
+        self._last_valid_start = valid_start
+        seconds, nanos = divmod(valid_start, 1_000_000_000)
+        return f"{payer}@{seconds}.{nanos:09d}"
+
+    def _account(self, account_id):
+        compte = self.accounts.get(account_id)
+        if compte is None:
+            if not self.auto_accounts or not re.fullmatch(r'\d+\.\d+\.\d+', str(account_id)):
+                raise StandinError("receipt for transaction contained error status INVALID_ACCOUNT_ID")
+            # Comptes déjà connus de la base Django (données de test) : créés à la volée
+            compte = self.accounts[account_id] = {'balance': self.default_balance, 'private_key': None}
+        return compte
+
+    # -------------------------------------------------------------------------
+
+    def create_wallet(self, initial_balance):
+        try:
+            initial_balance = Decimal(str(initial_balance))
+        except InvalidOperation:
+            raise StandinError("Invalid initialBalance", status=400)
+        private_key = secrets.token_hex(32)
+        public_key = hashlib.sha256(private_key.encode()).hexdigest()
+        with self._lock:
+            operateur = self._account(self.operator_id)
+            if operateur['balance'] < initial_balance:
+                raise StandinError("receipt for transaction contained error status INSUFFICIENT_PAYER_BALANCE")
+            operateur['balance'] -= initial_balance
+            account_id = self._new_entity_id()
+            self.accounts[account_id] = {'balance': initial_balance, 'private_key': private_key}
+            transaction_id = self._transaction_id(self.operator_id)
+        return {
+            'success': True,
+            'accountId': account_id,
+            'privateKey': f"302e020100300506032b657004220420{private_key}",
+            'publicKey': f"302a300506032b6570032100{public_key}",
+            'transactionId': transaction_id,
+            'status': 'SUCCESS',
+            'hashscanUrl': HASHSCAN_TX_URL.format(transaction_id=transaction_id),
+        }
+
+    def transfer(self, from_id, from_key, to_id, amount):
+        try:
+            amount = Decimal(str(amount))
+        except (InvalidOperation, TypeError):
+            raise StandinError("Invalid amount", status=400)
+        with self._lock:
+            source = self._account(from_id)
+            destination = self._account(to_id)
+            if source['private_key'] and not str(from_key or '').endswith(source['private_key']):
+                raise StandinError("receipt for transaction contained error status INVALID_SIGNATURE")
+            if source['balance'] < amount:
+                raise StandinError("receipt for transaction contained error status INSUFFICIENT_ACCOUNT_BALANCE")
+            source['balance'] -= amount
+            destination['balance'] += amount
+            transaction_id = self._transaction_id(from_id)
+            tinybars = int(amount / TINYBAR)
+            self.transactions.append({
+                'transaction_id': mirror_id(transaction_id),
+                'consensus_timestamp': transaction_id.split('@')[1],
+                'name': 'CRYPTOTRANSFER',
+                'result': 'SUCCESS',
+                'transfers': [{'account': from_id, 'amount': -tinybars}, {'account': to_id, 'amount': tinybars}],
+            })
+        return {
+            'success': True,
+            'transactionId': transaction_id,
+            'status': 'SUCCESS',
+            'hashscanUrl': HASHSCAN_TX_URL.format(transaction_id=transaction_id),
+        }
+
+    def balance(self, account_id):
+        with self._lock:
+            return {'success': True, 'balance': format_hbar(self._account(account_id)['balance'])}
+
+    def create_topic(self, memo):
+        with self._lock:
+            topic_id = self._new_entity_id()
+            self.topics[topic_id] = {'memo': memo, 'messages': []}
+            transaction_id = self._transaction_id(self.operator_id)
+        return {
+            'success': True,
+            'topicId': topic_id,
+            'transactionId': transaction_id,
+            'status': 'SUCCESS',
+            'hashscanUrl': HASHSCAN_TX_URL.format(transaction_id=transaction_id),
+        }
+
+    def send_message(self, topic_id, message):
+        if not topic_id or not str(topic_id).startswith('0.0.'):
+            raise StandinError('Topic ID invalide', status=400)
+        with self._lock:
+            topic = self.topics.get(topic_id)
+            if topic is None:
+                # Topics créés avant le démarrage du remplaçant (base Django existante)
+                topic = self.topics[topic_id] = {'memo': '', 'messages': []}
+            transaction_id = self._transaction_id(self.operator_id)
+            contenu = message if isinstance(message, str) else json.dumps(message)
+            precedent = topic['messages'][-1]['running_hash'] if topic['messages'] else bytes(48)
+            horodatage = transaction_id.split('@')[1]
+            sequence = len(topic['messages']) + 1
+            topic['messages'].append({
+                'sequence_number': sequence,
+                'consensus_timestamp': horodatage,
+                'message': contenu.encode('utf-8'),
+                'running_hash': calculer_running_hash(precedent, topic_id, self.operator_id, horodatage, sequence,
+                                                      contenu.encode('utf-8')),
+                'payer_account_id': self.operator_id,
+                'transaction_id': transaction_id,
+            })
+        return {
+            'success': True,
+            'status': 'SUCCESS',
+            'transactionId': transaction_id,
+            'hashscanUrl': HASHSCAN_TRANSACTION_URL.format(transaction_id=transaction_id),
+            'mirrorUrl': MIRROR_TX_URL.format(mirror_id=mirror_id(transaction_id)),
+            'mirrorData': None,
+        }
+
+    def health(self):
+        with self._lock:
+            solde = self._account(self.operator_id)['balance']
+        return {
+            'status': 'healthy',
+            'operatorAccount': self.operator_id,
+            'balance': format_hbar(solde),
+            'network': 'standin',
+        }
+
+    # -------------------------------------------------------------------------
+    # Vue mirror node
+    # -------------------------------------------------------------------------
+
+    def mirror_transaction(self, identifiant):
+        with self._lock:
+            trouvees = [t for t in self.transactions if t['transaction_id'] == identifiant]
+        if not trouvees:
+            raise StandinError("Not found", status=404)
+        return {'transactions': trouvees}
+
+    def mirror_transactions(self, params):
+        """Filtres account.id, timestamp (gt/gte/lt/lte:secondes.nanos), order et limit du mirror node."""
+        compte = params.get('account.id', [None])[0]
+        ordre = params.get('order', ['desc'])[0]
+        try:
+            limite = min(MIRROR_PAGE_MAX, int(params.get('limit', [25])[0]))
+        except ValueError:
+            raise StandinError("Invalid parameter: limit", status=400)
+        bornes = []
+        for filtre in params.get('timestamp', []):
+            operateur, _, valeur = filtre.rpartition(':')
+            if operateur not in ('gt', 'gte', 'lt', 'lte', ''):
+                raise StandinError("Invalid parameter: timestamp", status=400)
+            bornes.append((operateur or 'eq', Decimal(valeur)))
+
+        def retenue(transaction):
+            if compte and not any(t['account'] == compte for t in transaction['transfers']):
+                return False
+            horodatage = Decimal(transaction['consensus_timestamp'])
+            return all({
+                'gt': horodatage > valeur, 'gte': horodatage >= valeur, 'lt': horodatage < valeur,
+                'lte': horodatage <= valeur, 'eq': horodatage == valeur,
+            }[operateur] for operateur, valeur in bornes)
+
+        with self._lock:
+            trouvees = [t for t in self.transactions if retenue(t)]
+        if ordre == 'desc':
+            trouvees.reverse()
+        page, suite = trouvees[:limite], len(trouvees) > limite
+        suivant = None
+        if suite:
+            # Même pagination que le mirror node : les filtres, avec la borne déplacée après la page
+            autres = [f for f in params.get('timestamp', []) if not f.startswith('gt' if ordre == 'asc' else 'lt')]
+            borne = f"{'gt' if ordre == 'asc' else 'lt'}:{page[-1]['consensus_timestamp']}"
+            requete = {**{k: v for k, v in params.items() if k != 'timestamp'}, 'timestamp': autres + [borne]}
+            suivant = f"/api/v1/transactions?{urlencode(requete, doseq=True)}"
+        return {'transactions': page, 'links': {'next': suivant}}
+
+    def mirror_topic_messages(self, topic_id, params):
+        """Filtres sequencenumber (gt/gte/lt/lte:N), order et limit du mirror node."""
+        ordre = params.get('order', ['asc'])[0]
+        try:
+            limite = min(MIRROR_PAGE_MAX, int(params.get('limit', [25])[0]))
+            bornes = [(f.rpartition(':')[0] or 'eq', int(f.rpartition(':')[2])) for f in params.get('sequencenumber', [])]
+        except ValueError:
+            raise StandinError("Invalid parameter", status=400)
+        with self._lock:
+            topic = self.topics.get(topic_id)
+            if topic is None:
+                raise StandinError("Not found", status=404)
+            trouves = [m for m in topic['messages'] if all({
+                'gt': m['sequence_number'] > n, 'gte': m['sequence_number'] >= n, 'lt': m['sequence_number'] < n,
+                'lte': m['sequence_number'] <= n, 'eq': m['sequence_number'] == n,
+            }[operateur] for operateur, n in bornes)]
+        if ordre == 'desc':
+            trouves.reverse()
+        page = trouves[:limite]
+        suivant = None
+        if len(trouves) > limite:
+            borne = f"{'gt' if ordre == 'asc' else 'lt'}:{page[-1]['sequence_number']}"
+            suivant = f"/api/v1/topics/{topic_id}/messages?{urlencode({'limit': limite, 'order': ordre, 'sequencenumber': borne})}"
+        return {
+            'messages': [{
+                'consensus_timestamp': m['consensus_timestamp'],
+                'topic_id': topic_id,
+                'message': base64.b64encode(m['message']).decode('ascii'),
+                'payer_account_id': m['payer_account_id'],
+                'running_hash': base64.b64encode(m['running_hash']).decode('ascii'),
+                'running_hash_version': 3,
+                'sequence_number': m['sequence_number'],
+                'chunk_info': None,
+            } for m in page],
+            'links': {'next': suivant},
+        }
+
+    def stats(self):
+        with self._lock:
+            return {
+                'accounts': len(self.accounts),
+                'topics': len(self.topics),
+                'messages': sum(len(t['messages']) for t in self.topics.values()),
+                'transfers': len(self.transactions),
+            }
+
+
+class FaultInjector:
+    """Latence et pannes simulées, modifiables à chaud (/_standin/config)."""
+
+    def __init__(self, latency_ms=None, latency_scale=1.0, jitter=0.2, error_rate=0.0, drop_rate=0.0, seed=None):
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self.latency_ms = {**DEFAULT_LATENCY_MS, **(latency_ms or {})}
+        self.latency_scale = latency_scale
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+
+    def config(self):
+        with self._lock:
+            return {
+                'latency_ms': dict(self.latency_ms),
+                'latency_scale': self.latency_scale,
+                'jitter': self.jitter,
+                'error_rate': self.error_rate,
+                'drop_rate': self.drop_rate,
+            }
+
+    def update(self, values):
+        with self._lock:
+            if 'latency_ms' in values:
+                self.latency_ms.update({k: float(v) for k, v in values['latency_ms'].items() if k in ENDPOINTS})
+            for champ in ('latency_scale', 'jitter', 'error_rate', 'drop_rate'):
+                if champ in values:
+                    setattr(self, champ, float(values[champ]))
+
+    def tirage(self, endpoint):
+        """Retourne (délai en secondes, issue) ; issue : 'ok', 'error' ou 'drop'."""
+        with self._lock:
+            base = self.latency_ms.get(endpoint, 0) * self.latency_scale / 1000
+            delai = max(0.0, base * (1 + self._random.uniform(-self.jitter, self.jitter)))
+            tirage = self._random.random()
+            if tirage < self.drop_rate:
+                return delai, 'drop'
+            if tirage < self.drop_rate + self.error_rate:
+                return delai, 'error'
+            return delai, 'ok'
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, ledger, faults):
+        super().__init__(address, StandinHandler)
+        self.ledger = ledger
+        self.faults = faults
+        self.counts = Counter()
+        self._counts_lock = threading.Lock()
+
+    def compter(self, endpoint, issue):
+        with self._counts_lock:
+            self.counts[f"{endpoint}:{issue}"] += 1
+
+    def stats(self):
+        with self._counts_lock:
+            requetes = dict(self.counts)
+        return {'requests': requetes, **self.ledger.stats()}
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, comme express
+    server_version = 'HederaStandin/1.0'
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _body(self):
+        longueur = int(self.headers.get('Content-Length') or 0)
+        if not longueur:
+            return {}
+        try:
+            return json.loads(self.rfile.read(longueur)) or {}
+        except ValueError:
+            return {}
+
+    def _send(self, status, data):
+        payload = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _route(self, method):
+        path = self.path.split('?')[0]
+        body = self._body() if method == 'POST' else {}
+        ledger = self.server.ledger
+
+        if path.startswith('/_standin/'):
+            return self._controle(method, path, body)
+
+        routes = {
+            ('POST', '/create-wallet'): ('create-wallet', lambda: ledger.create_wallet(body.get('initialBalance', 100))),
+            ('POST', '/transfer'): ('transfer', lambda: ledger.transfer(
+                body.get('fromAccountId'), body.get('fromPrivateKey'), body.get('toAccountId'), body.get('amount'))),
+            ('POST', '/create-topic'): ('create-topic', lambda: ledger.create_topic(body.get('memo', 'Topic SolidAvenir'))),
+            ('POST', '/send-message'): ('send-message', lambda: ledger.send_message(body.get('topicId'), body.get('message'))),
+            ('GET', '/health'): ('health', ledger.health),
+        }
+        match = re.fullmatch(r'/balance/([^/]+)', path)
+        mirror = re.fullmatch(r'/api/v1/transactions(?:/([^/]+))?', path)
+        messages_topic = re.fullmatch(r'/api/v1/topics/([^/]+)/messages', path)
+        if method == 'GET' and match:
+            endpoint, action = 'balance', lambda: ledger.balance(match.group(1))
+        elif method == 'GET' and messages_topic:
+            endpoint, action = 'mirror', lambda: ledger.mirror_topic_messages(
+                messages_topic.group(1), parse_qs(urlsplit(self.path).query))
+        elif method == 'GET' and mirror:
+            if mirror.group(1):
+                endpoint, action = 'mirror', lambda: ledger.mirror_transaction(mirror.group(1))
+            else:
+                endpoint, action = 'mirror', lambda: ledger.mirror_transactions(parse_qs(urlsplit(self.path).query))
+        elif (method, path) in routes:
+            endpoint, action = routes[(method, path)]
+        else:
+            return self._send(404, {'success': False, 'error': f"Cannot {method} {path}"})
+
+        delai, issue = self.server.faults.tirage(endpoint)
+        time.sleep(delai)
+        self.server.compter(endpoint, issue)
+        if issue == 'drop':
+            # Connexion coupée sans réponse : le client ne sait pas si l'opération a eu lieu
+            self.close_connection = True
+            return
+        if issue == 'error':
+            if endpoint == 'health':
+                return self._send(500, {'status': 'unhealthy', 'error': 'Injected failure'})
+            return self._send(500, {'success': False, 'error': 'Injected failure (PLATFORM_NOT_ACTIVE)'})
+
+        try:
+            return self._send(200, action())
+        except StandinError as e:
+            if endpoint == 'mirror':
+                return self._send(e.status, {'_status': {'messages': [{'message': str(e)}]}})
+            return self._send(e.status, {'success': False, 'error': str(e)})
+
+    def _controle(self, method, path, body):
+        if path == '/_standin/config':
+            if method == 'POST':
+                self.server.faults.update(body)
+            return self._send(200, self.server.faults.config())
+        if path == '/_standin/stats' and method == 'GET':
+            return self._send(200, self.server.stats())
+        if path == '/_standin/reset' and method == 'POST':
+            self.server.ledger.reset()
+            with self.server._counts_lock:
+                self.server.counts.clear()
+            return self._send(200, {'success': True})
+        return self._send(404, {'success': False, 'error': f"Cannot {method} {path}"})
+
+    def do_GET(self):
+        self._route('GET')
+
+    def do_POST(self):
+        self._route('POST')
+
+
+def creer_serveur(host, port, operator_id, latency_ms=None, latency_scale=1.0, jitter=0.2,
+                  error_rate=0.0, drop_rate=0.0, default_balance=1000, auto_accounts=True, seed=None):
+    """Construit le serveur (non démarré) ; `serve_forever()` pour le lancer."""
+    ledger = Ledger(operator_id, default_balance=Decimal(str(default_balance)), auto_accounts=auto_accounts)
+    faults = FaultInjector(latency_ms, latency_scale, jitter, error_rate, drop_rate, seed)
+    return StandinServer((host, port), ledger, faults)
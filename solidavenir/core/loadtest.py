@@ -0,0 +1,307 @@
+# core/loadtest.py
+"""
+Tests de charge par scénarios (commande `load_test`).
+
+Des utilisateurs virtuels (threads, une session HTTP chacun) rejouent les
+parcours principaux contre un serveur en marche, avec un mélange configurable :
+
+- 'anonyme'   : accueil, liste des projets, détail d'un projet, transparence,
+                liste des associations ;
+- 'donateur'  : connexion, détail d'un projet, don via process_donation puis
+                suivi de `statut_don` jusqu'à la fin du traitement ;
+- 'admin'     : connexion, tableau de bord, gestion des distributions.
+
+Pour chaque vue : débit, taux d'erreur et latences p50/p95/p99. Le rapport
+peut être enregistré comme référence (baseline) puis comparé aux exécutions
+suivantes ; toute régression au-delà du seuil fait échouer la commande.
+
+Tout tourne hors ligne sur une seule machine : serveur Django, workers
+(process_donations, drain_hcs_outbox) et remplaçant Hedera (run_hedera_standin),
+voir scripts/linux/run_load_test.sh.
+"""
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+DON_RE = re.compile(r'[?&]don=([0-9a-f-]+)')
+
+DEFAULT_MIX = {'anonyme': 70, 'donateur': 20, 'admin': 10}
+PERCENTILES = (50, 95, 99)
+# Comparées à la référence : latences (hausse) et débit (baisse)
+METRIQUES_LATENCE = ('p50', 'p95', 'p99')
+
+LOADTEST_PASSWORD = 'LoadTest!2024'
+DONOR_USERNAME = 'loadtest_donor_{}'
+ADMIN_USERNAME = 'loadtest_admin_{}'
+
+
+def percentile(valeurs_triees, p):
+    """Percentile (rang le plus proche) d'une liste déjà triée."""
+    if not valeurs_triees:
+        return 0.0
+    rang = max(0, min(len(valeurs_triees) - 1, math.ceil(p / 100 * len(valeurs_triees)) - 1))
+    return valeurs_triees[rang]
+
+
+# =============================================================================
+# COLLECTE
+# =============================================================================
+
+class Recorder:
+    """Mesures par vue, partagées par tous les utilisateurs virtuels."""
+
+    def __init__(self, debut_mesure):
+        self.debut_mesure = debut_mesure
+        self._lock = threading.Lock()
+        self._latences = defaultdict(list)
+        self._erreurs = defaultdict(int)
+        self.fin_mesure = None
+
+    def ajouter(self, vue, debut, duree_ms, ok):
+        if debut < self.debut_mesure:
+            return  # montée en charge, non comptée
+        with self._lock:
+            self._latences[vue].append(duree_ms)
+            if not ok:
+                self._erreurs[vue] += 1
+
+    def rapport(self):
+        duree = max(0.001, (self.fin_mesure or time.monotonic()) - self.debut_mesure)
+        with self._lock:
+            latences = {vue: sorted(v) for vue, v in self._latences.items()}
+            erreurs = dict(self._erreurs)
+
+        vues = {}
+        for vue, serie in sorted(latences.items()):
+            stats = {
+                'requests': len(serie),
+                'errors': erreurs.get(vue, 0),
+                'error_rate': round(erreurs.get(vue, 0) / len(serie), 4),
+                'rps': round(len(serie) / duree, 2),
+                'max': round(serie[-1], 1),
+            }
+            for p in PERCENTILES:
+                stats[f'p{p}'] = round(percentile(serie, p), 1)
+            vues[vue] = stats
+        return {'duration_s': round(duree, 1), 'views': vues}
+
+
+# =============================================================================
+# UTILISATEURS VIRTUELS
+# =============================================================================
+
+class VirtualUser(threading.Thread):
+    def __init__(self, profil, index, base_url, donnees, recorder, fin, think_time, seed,
+                 montant_don=1, attente_don=30):
+        super().__init__(name=f"{profil}-{index}", daemon=True)
+        self.profil = profil
+        self.index = index
+        self.base_url = base_url.rstrip('/')
+        self.donnees = donnees
+        self.recorder = recorder
+        self.fin = fin
+        self.think_time = think_time
+        self.random = random.Random(None if seed is None else seed + index)
+        self.montant_don = montant_don
+        self.attente_don = attente_don
+        self.session = requests.Session()
+        self.erreur_fatale = None
+
+    # -------------------------------------------------------------------------
+
+    def appel(self, vue, method, path, attendu=(200,), valider=None, **kwargs):
+        debut = time.monotonic()
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", timeout=60,
+                                            allow_redirects=False, **kwargs)
+            ok = response.status_code in attendu and (valider is None or valider(response))
+        except requests.RequestException:
+            response, ok = None, False
+        self.recorder.ajouter(vue, debut, (time.monotonic() - debut) * 1000, ok)
+        return response
+
+    def pause(self):
+        if self.think_time:
+            time.sleep(self.think_time * self.random.uniform(0.5, 1.5))
+
+    def termine(self):
+        return time.monotonic() >= self.fin
+
+    def projet(self):
+        return self.random.choice(self.donnees['projets'])
+
+    def csrf(self, response):
+        match = CSRF_RE.search(response.text) if response is not None else None
+        return match.group(1) if match else self.session.cookies.get('csrftoken', '')
+
+    def connexion(self, username):
+        page = self.appel('connexion', 'GET', '/connexion/')
+        response = self.appel('connexion_post', 'POST', '/connexion/', attendu=(302,), data={
+            'username': username,
+            'password': LOADTEST_PASSWORD,
+            'csrfmiddlewaretoken': self.csrf(page),
+        }, headers={'Referer': f"{self.base_url}/connexion/"})
+        if response is None or response.status_code != 302:
+            raise RuntimeError(f"Connexion impossible pour {username} (lancer load_test --prepare)")
+
+    # -------------------------------------------------------------------------
+    # Parcours
+    # -------------------------------------------------------------------------
+
+    def parcours_anonyme(self):
+        self.appel('accueil', 'GET', '/')
+        self.pause()
+        self.appel('liste_projets', 'GET', '/projets/')
+        self.pause()
+        self.appel('detail_projet', 'GET', f"/projet/{self.projet()['audit_uuid']}/")
+        self.pause()
+        if self.random.random() < 0.5:
+            self.appel('transparence', 'GET', '/transparence/')
+        else:
+            self.appel('liste_associations', 'GET', '/associations/')
+        self.pause()
+
+    def parcours_donateur(self):
+        projet = self.projet()
+        page = self.appel('detail_projet', 'GET', f"/projet/{projet['audit_uuid']}/")
+        self.pause()
+        # Don refusé (wallet, montant...) : redirection sans ?don=, comptée en erreur
+        response = self.appel('process_donation', 'POST', f"/donation/{projet['id']}/process/", attendu=(302,),
+                              valider=lambda r: DON_RE.search(r.headers.get('Location', '')), data={
+            'amount': self.montant_don,
+            'csrfmiddlewaretoken': self.csrf(page),
+        }, headers={'Referer': f"{self.base_url}/projet/{projet['audit_uuid']}/"})
+        don = DON_RE.search(response.headers.get('Location', '')) if response is not None else None
+        if don is None:
+            self.pause()
+            return
+
+        # Suivi comme la page du projet : interrogation de statut_don jusqu'à la fin
+        debut = time.monotonic()
+        termine = False
+        while not termine and time.monotonic() - debut < self.attente_don and not self.termine():
+            time.sleep(1)
+            statut = self.appel('statut_don', 'GET', f"/don/{don.group(1)}/statut/")
+            try:
+                termine = statut is not None and statut.json().get('termine')
+            except ValueError:
+                termine = False
+        if termine:
+            self.recorder.ajouter('don_bout_en_bout', debut, (time.monotonic() - debut) * 1000, True)
+        elif not self.termine():
+            self.recorder.ajouter('don_bout_en_bout', debut, (time.monotonic() - debut) * 1000, False)
+        self.pause()
+
+    def parcours_admin(self):
+        self.appel('tableau_de_bord', 'GET', '/tableau-de-bord/')
+        self.pause()
+        self.appel('gerer_distributions', 'GET', '/gerer_distributions/')
+        self.pause()
+
+    def run(self):
+        try:
+            if self.profil == 'donateur':
+                self.connexion(DONOR_USERNAME.format(self.index % self.donnees['donateurs']))
+            elif self.profil == 'admin':
+                self.connexion(ADMIN_USERNAME.format(self.index % self.donnees['admins']))
+            parcours = getattr(self, f"parcours_{self.profil}")
+            while not self.termine():
+                parcours()
+        except Exception as e:
+            self.erreur_fatale = e
+        finally:
+            self.session.close()
+
+
+def repartir(utilisateurs, mix):
+    """Répartit `utilisateurs` entre les profils selon les poids de `mix` (plus forts restes)."""
+    total = sum(mix.values())
+    parts = {profil: utilisateurs * poids / total for profil, poids in mix.items()}
+    nombres = {profil: int(part) for profil, part in parts.items()}
+    restes = sorted(parts, key=lambda profil: parts[profil] - nombres[profil], reverse=True)
+    for profil in restes[:utilisateurs - sum(nombres.values())]:
+        nombres[profil] += 1
+    return [profil for profil, nombre in nombres.items() for _ in range(nombre)]
+
+
+def executer(base_url, donnees, utilisateurs=20, duree=60, montee=10, mix=None, think_time=1.0,
+             seed=None, montant_don=1, attente_don=30):
+    """Lance le test ; retourne (rapport, erreurs fatales des utilisateurs virtuels)."""
+    profils = repartir(utilisateurs, mix or DEFAULT_MIX)
+    debut = time.monotonic()
+    recorder = Recorder(debut_mesure=debut + montee)
+    fin = debut + montee + duree
+
+    compteurs = defaultdict(int)
+    threads = []
+    for i, profil in enumerate(profils):
+        vu = VirtualUser(profil, compteurs[profil], base_url, donnees, recorder, fin, think_time,
+                         seed, montant_don, attente_don)
+        compteurs[profil] += 1
+        threads.append(vu)
+        vu.start()
+        if montee:
+            time.sleep(montee / len(profils))
+
+    for vu in threads:
+        vu.join(timeout=max(0, fin - time.monotonic()) + 120)
+    recorder.fin_mesure = min(time.monotonic(), fin)
+
+    rapport = recorder.rapport()
+    rapport['config'] = {
+        'users': utilisateurs,
+        'mix': dict(mix or DEFAULT_MIX),
+        'ramp_up_s': montee,
+        'think_time_s': think_time,
+    }
+    erreurs = [f"{vu.name}: {vu.erreur_fatale}" for vu in threads if vu.erreur_fatale]
+    return rapport, erreurs
+
+
+# =============================================================================
+# RÉFÉRENCE
+# =============================================================================
+
+def comparer(rapport, reference, seuil=0.2, ecart_min_ms=5.0):
+    """
+    Compare `rapport` à `reference` ; retourne la liste des régressions :
+    latence (p50/p95/p99) ou taux d'erreur en hausse, débit en baisse,
+    au-delà de `seuil` (0.2 = 20 %). Les écarts de latence inférieurs à
+    `ecart_min_ms` sont ignorés (bruit de mesure).
+    """
+    regressions = []
+    for vue, base in reference.get('views', {}).items():
+        actuel = rapport['views'].get(vue)
+        if actuel is None:
+            regressions.append(f"{vue}: aucune requête mesurée (référence : {base['requests']})")
+            continue
+        for metrique in METRIQUES_LATENCE:
+            avant, apres = base.get(metrique, 0), actuel[metrique]
+            if apres > avant * (1 + seuil) and apres - avant > ecart_min_ms:
+                regressions.append(f"{vue}: {metrique} {avant:.1f} -> {apres:.1f} ms (+{(apres / max(avant, 0.001) - 1):.0%})")
+        if actuel['rps'] < base.get('rps', 0) * (1 - seuil):
+            regressions.append(f"{vue}: débit {base['rps']:.2f} -> {actuel['rps']:.2f} req/s")
+        if actuel['error_rate'] > base.get('error_rate', 0) + seuil / 10:
+            regressions.append(f"{vue}: taux d'erreur {base.get('error_rate', 0):.1%} -> {actuel['error_rate']:.1%}")
+    return regressions
+
+
+def charger_reference(chemin):
+    try:
+        with open(chemin, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def enregistrer(chemin, rapport):
+    with open(chemin, 'w', encoding='utf-8') as f:
+        json.dump(rapport, f, indent=2, ensure_ascii=False)
+        f.write('\n')
@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
 from core.models import Projet
-import requests
+from core.hedera_client import get_client
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,7 +14,7 @@ class Command(BaseCommand):
 
         for projet in projets:
             try:
-                response = requests.post("http://localhost:3001/create-wallet", timeout=10)
+                response = get_client().create_wallet()
                 if response.status_code == 200:
                     data = response.json()
                     projet.hedera_account_id = data.get("accountId")
@@ -22,7 +22,7 @@ class Command(BaseCommand):
     
         for user in users_without_wallet:
             try:
-                if user.ensure_wallet():
+                if user.ensure_wallet(allow_create=True):
                     self.stdout.write(f"✓ Wallet créé pour {user.username}")
                 else:
                     self.stdout.write(f"✗ Échec pour {user.username}")
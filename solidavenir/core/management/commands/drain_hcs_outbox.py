@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import outbox
+
+
+class Command(BaseCommand):
+    help = "Envoie les messages HCS en attente dans l'outbox (à lancer via cron ou en boucle)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Vider l'outbox en continu.")
+        parser.add_argument("--interval", type=float, default=2, help="Pause (s) quand l'outbox est vide en mode --loop.")
+        parser.add_argument("--batch-size", type=int, help="Messages réclamés par lot (HCS_OUTBOX_BATCH_SIZE).")
+        parser.add_argument("--concurrency", type=int, help="Envois simultanés (HCS_OUTBOX_CONCURRENCY).")
+
+    def handle(self, *args, **options):
+        while True:
+            issues = outbox.drain(options['batch_size'], options['concurrency'])
+            if issues:
+                details = ", ".join(f"{issue}: {nombre}" for issue, nombre in sorted(issues.items()))
+                style = self.style.SUCCESS if set(issues) <= {'envoye', 'doublon'} else self.style.WARNING
+                self.stdout.write(style(f"📨 {sum(issues.values())} message(s) HCS traité(s) ({details})"))
+
+            if not options['loop']:
+                if not issues:
+                    self.stdout.write(self.style.SUCCESS("✅ Aucun message HCS en attente"))
+                break
+            if not issues:
+                time.sleep(options['interval'])
@@ -0,0 +1,56 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import funding, hcs_stats, synthetic
+
+
+class Command(BaseCommand):
+    help = "Génère un jeu de données synthétique à l'échelle de la production (scale=1 : ~10M lignes)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=float, default=1.0, help="Facteur d'échelle (0.01 = 1 %% des volumes).")
+        parser.add_argument("--seed", type=int, default=0, help="Graine : même graine, mêmes données.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Lignes par bulk_create.")
+        parser.add_argument("--prefix", default="synth", help="Préfixe des noms d'utilisateur générés.")
+        parser.add_argument("--end-date", help="Date de fin de l'historique (AAAA-MM-JJ, défaut : aujourd'hui).")
+        parser.add_argument("--password", default="Synthetic!2024", help="Mot de passe de tous les comptes générés.")
+        parser.add_argument("--skip-summaries", action="store_true",
+                            help="Ne pas reconstruire les résumés de financement ni les statistiques HCS à la fin.")
+
+    def handle(self, *args, **options):
+        if options['scale'] <= 0:
+            raise CommandError("--scale doit être positif")
+        try:
+            fin = date.fromisoformat(options['end_date']) if options['end_date'] else None
+        except ValueError:
+            raise CommandError("--end-date invalide, format attendu : AAAA-MM-JJ")
+
+        generateur = synthetic.Generateur(
+            scale=options['scale'],
+            seed=options['seed'],
+            fin=fin,
+            taille_lot=options['batch_size'],
+            prefixe=options['prefix'],
+            mot_de_passe=options['password'],
+            progression=lambda message: self.stdout.write(f"  ⏱️ {message}"),
+        )
+        self.stdout.write(f"🏗️ Génération (scale={options['scale']}, seed={options['seed']})...")
+        try:
+            compteurs = generateur.executer()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        duree = compteurs.pop('_duree_s')
+        for modele, nombre in compteurs.items():
+            self.stdout.write(f"  {modele:<18}{nombre:>12,}")
+        total = sum(compteurs.values())
+        self.stdout.write(self.style.SUCCESS(f"✅ {total:,} lignes en {duree:.0f}s ({total / max(duree, 0.1):,.0f} lignes/s)"))
+
+        if not options['skip_summaries']:
+            self.stdout.write("📊 Reconstruction des résumés de financement...")
+            divergents = funding.reconstruire_resumes()
+            self.stdout.write(self.style.SUCCESS(f"✅ {len(divergents)} résumé(s) reconstruit(s)"))
+            self.stdout.write("📊 Reconstruction des statistiques HCS...")
+            ecarts = hcs_stats.verifier()
+            self.stdout.write(self.style.SUCCESS(f"✅ {len(ecarts['topics'])} statistique(s) de topic reconstruite(s)"))
@@ -0,0 +1,135 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.management.base import BaseCommand, CommandError
+
+from core import loadtest
+from core.models import Projet, User
+
+
+class Command(BaseCommand):
+    help = "Test de charge par scénarios (anonymes, donateurs, admins) comparé à une référence"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Serveur Django testé.")
+        parser.add_argument("--users", type=int, default=20, help="Utilisateurs virtuels simultanés.")
+        parser.add_argument("--duration", type=float, default=60, help="Durée mesurée (s), après la montée en charge.")
+        parser.add_argument("--ramp-up", type=float, default=10, help="Montée en charge (s), non mesurée.")
+        parser.add_argument("--mix", default="anonyme=70,donateur=20,admin=10",
+                            help="Poids des profils, ex. anonyme=70,donateur=20,admin=10.")
+        parser.add_argument("--think-time", type=float, default=1.0, help="Pause moyenne (s) entre deux pages.")
+        parser.add_argument("--donation-amount", type=float, default=1, help="Montant (HBAR) de chaque don.")
+        parser.add_argument("--donation-timeout", type=float, default=30,
+                            help="Attente max (s) de la fin du traitement d'un don.")
+        parser.add_argument("--seed", type=int, help="Graine des choix aléatoires (exécutions reproductibles).")
+        parser.add_argument("--baseline", default=str(Path(settings.BASE_DIR) / "loadtests" / "baseline.json"),
+                            help="Fichier de référence.")
+        parser.add_argument("--save-baseline", action="store_true", help="Enregistrer ce rapport comme référence.")
+        parser.add_argument("--threshold", type=float, default=0.2, help="Régression tolérée (0.2 = 20 %%).")
+        parser.add_argument("--min-delta-ms", type=float, default=5, help="Écart de latence ignoré (bruit).")
+        parser.add_argument("--report", help="Écrire le rapport JSON dans ce fichier.")
+        parser.add_argument("--prepare", action="store_true",
+                            help="Créer / mettre à jour les comptes de test (donateurs avec wallet, admins).")
+        parser.add_argument("--donors", type=int, default=20, help="Comptes donateurs de test (--prepare).")
+        parser.add_argument("--admins", type=int, default=2, help="Comptes admins de test (--prepare).")
+
+    def handle(self, *args, **options):
+        try:
+            mix = {profil: int(poids) for profil, poids in (p.split('=') for p in options['mix'].split(','))}
+        except ValueError:
+            raise CommandError("--mix invalide, format attendu : anonyme=70,donateur=20,admin=10")
+        inconnus = set(mix) - set(loadtest.DEFAULT_MIX)
+        if inconnus:
+            raise CommandError(f"Profils inconnus: {', '.join(sorted(inconnus))}")
+
+        if options['prepare']:
+            self.preparer(options['donors'], options['admins'])
+
+        projets = list(Projet.objects.filter(statut='actif').values('id', 'audit_uuid'))
+        if not projets:
+            raise CommandError("Aucun projet actif : peupler la base avant le test de charge")
+        donnees = {
+            'projets': [{'id': p['id'], 'audit_uuid': str(p['audit_uuid'])} for p in projets],
+            'donateurs': User.objects.filter(username__startswith='loadtest_donor_').count(),
+            'admins': User.objects.filter(username__startswith='loadtest_admin_').count(),
+        }
+        if mix.get('donateur') and not donnees['donateurs'] or mix.get('admin') and not donnees['admins']:
+            raise CommandError("Comptes de test absents : relancer avec --prepare")
+
+        self.stdout.write(
+            f"🚀 {options['users']} utilisateur(s) virtuel(s) ({options['mix']}) sur {options['base_url']}, "
+            f"{options['ramp_up']:.0f}s de montée puis {options['duration']:.0f}s mesurées..."
+        )
+        rapport, erreurs = loadtest.executer(
+            options['base_url'],
+            donnees,
+            utilisateurs=options['users'],
+            duree=options['duration'],
+            montee=options['ramp_up'],
+            mix=mix,
+            think_time=options['think_time'],
+            seed=options['seed'],
+            montant_don=options['donation_amount'],
+            attente_don=options['donation_timeout'],
+        )
+        for erreur in erreurs:
+            self.stdout.write(self.style.ERROR(f"❌ {erreur}"))
+
+        self.afficher(rapport)
+        if options['report']:
+            loadtest.enregistrer(options['report'], rapport)
+
+        reference = loadtest.charger_reference(options['baseline'])
+        if options['save_baseline']:
+            Path(options['baseline']).parent.mkdir(parents=True, exist_ok=True)
+            loadtest.enregistrer(options['baseline'], rapport)
+            self.stdout.write(self.style.SUCCESS(f"💾 Référence enregistrée dans {options['baseline']}"))
+            return
+        if reference is None:
+            self.stdout.write(self.style.WARNING(f"⚠️ Pas de référence ({options['baseline']}) : --save-baseline pour en créer une"))
+            return
+
+        if reference.get('config') != rapport['config']:
+            self.stdout.write(self.style.WARNING(
+                f"⚠️ Configuration différente de la référence ({reference.get('config')}) : comparaison indicative"
+            ))
+        regressions = loadtest.comparer(rapport, reference, options['threshold'], options['min_delta_ms'])
+        if regressions:
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(f"📉 {regression}"))
+            raise CommandError(f"{len(regressions)} régression(s) au-delà de {options['threshold']:.0%}")
+        self.stdout.write(self.style.SUCCESS(f"✅ Aucune régression au-delà de {options['threshold']:.0%}"))
+
+    def afficher(self, rapport):
+        self.stdout.write(f"\n{'vue':<22}{'req':>7}{'req/s':>8}{'err':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)")
+        for vue, s in rapport['views'].items():
+            ligne = (f"{vue:<22}{s['requests']:>7}{s['rps']:>8.2f}{s['error_rate']:>7.1%}"
+                     f"{s['p50']:>9.1f}{s['p95']:>9.1f}{s['p99']:>9.1f}{s['max']:>9.1f}")
+            self.stdout.write(self.style.WARNING(ligne) if s['errors'] else ligne)
+        self.stdout.write("")
+
+    def preparer(self, donateurs, admins):
+        """Comptes de test au mot de passe connu ; wallets fictifs (remplaçant Hedera, comptes créés à la volée)."""
+        for i in range(donateurs):
+            user, _ = User.objects.get_or_create(
+                username=loadtest.DONOR_USERNAME.format(i),
+                defaults={'email': f"loadtest_donor_{i}@example.com", 'user_type': 'donateur'},
+            )
+            user.set_password(loadtest.LOADTEST_PASSWORD)
+            user.hedera_account_id = user.hedera_account_id or f"0.0.{8000000 + i}"
+            user.hedera_private_key = user.hedera_private_key or "loadtest"
+            user.wallet_activated = True
+            user.save()
+
+        permission = Permission.objects.get(codename='manage_users', content_type__app_label='core')
+        for i in range(admins):
+            user, _ = User.objects.get_or_create(
+                username=loadtest.ADMIN_USERNAME.format(i),
+                defaults={'email': f"loadtest_admin_{i}@example.com", 'user_type': 'admin', 'is_staff': True},
+            )
+            user.set_password(loadtest.LOADTEST_PASSWORD)
+            user.save()
+            user.user_permissions.add(permission)
+
+        self.stdout.write(self.style.SUCCESS(f"👥 {donateurs} donateur(s) et {admins} admin(s) de test prêts"))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import donations
+
+
+class Command(BaseCommand):
+    help = "Exécute les dons en attente : transfert HBAR, confirmation et mise en file HCS (cron ou boucle)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Traiter les dons en continu.")
+        parser.add_argument("--interval", type=float, default=1, help="Pause (s) quand aucun don n'est en attente en mode --loop.")
+        parser.add_argument("--batch-size", type=int, help="Dons réclamés par lot (DONATION_BATCH_SIZE).")
+        parser.add_argument("--concurrency", type=int, help="Transferts simultanés (DONATION_CONCURRENCY).")
+
+    def handle(self, *args, **options):
+        while True:
+            issues = donations.drain(options['batch_size'], options['concurrency'])
+            if issues:
+                details = ", ".join(f"{issue}: {nombre}" for issue, nombre in sorted(issues.items()))
+                style = self.style.SUCCESS if set(issues) <= {'termine', 'a_transferer'} else self.style.WARNING
+                self.stdout.write(style(f"💸 {sum(issues.values())} don(s) traité(s) ({details})"))
+
+            if not options['loop']:
+                if not issues:
+                    self.stdout.write(self.style.SUCCESS("✅ Aucun don en attente"))
+                break
+            if not issues:
+                time.sleep(options['interval'])
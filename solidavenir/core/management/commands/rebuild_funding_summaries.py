@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core import funding
+
+
+class Command(BaseCommand):
+    help = "Vérifie et reconstruit les résumés de financement des projets depuis les transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Signaler les écarts sans les corriger.")
+        parser.add_argument("--projet", type=int, action="append", dest="projets", help="Limiter à ce projet (répétable).")
+
+    def handle(self, *args, **options):
+        corriger = not options['check']
+        divergents = funding.reconstruire_resumes(projet_ids=options['projets'], corriger=corriger)
+
+        if not divergents:
+            self.stdout.write(self.style.SUCCESS("✅ Tous les résumés de financement sont cohérents"))
+            return
+
+        ids = ", ".join(str(pk) for pk in divergents)
+        if corriger:
+            self.stdout.write(self.style.SUCCESS(f"✅ {len(divergents)} résumé(s) reconstruit(s): {ids}"))
+        else:
+            self.stdout.write(self.style.WARNING(f"⚠️ {len(divergents)} résumé(s) divergent(s): {ids}"))
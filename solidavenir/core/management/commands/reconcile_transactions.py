@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import reconciliation
+from core.models import CurseurSynchronisation
+
+
+class Command(BaseCommand):
+    help = "Réconcilie les transactions en attente ou non vérifiées avec le mirror node Hedera (incrémental)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Réconcilier en continu.")
+        parser.add_argument("--interval", type=float, default=30, help="Pause (s) entre deux passes en mode --loop.")
+        parser.add_argument("--batch-size", type=int, help="Transactions par lot (RECONCILIATION_BATCH_SIZE).")
+        parser.add_argument("--concurrency", type=int, help="Appels mirror simultanés (RECONCILIATION_CONCURRENCY).")
+        parser.add_argument("--reset", action="store_true", help="Repartir du début de la table (tout recontrôler).")
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            reconciliation.reinitialiser()
+            self.stdout.write(self.style.WARNING("↩️ Curseur de réconciliation remis à zéro"))
+
+        while True:
+            issues = reconciliation.reconcilier(options['batch_size'], options['concurrency'])
+            position = CurseurSynchronisation.objects.get(nom=reconciliation.CURSEUR).position or '0'
+            if issues:
+                details = ", ".join(f"{issue}: {nombre}" for issue, nombre in sorted(issues.items()))
+                style = self.style.WARNING if set(issues) & {'erreur_mirror', 'absente', 'non_trouvee'} else self.style.SUCCESS
+                self.stdout.write(style(f"🔎 {sum(issues.values())} transaction(s) contrôlée(s) ({details}), curseur: {position}"))
+            elif not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f"✅ Aucune nouvelle transaction à réconcilier (curseur: {position})"))
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import wallets
+
+
+class Command(BaseCommand):
+    help = "Maintient le pool de wallets Hedera pré-créés au niveau cible (à lancer via cron ou en boucle)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Surveiller le stock en continu.")
+        parser.add_argument("--interval", type=float, default=5, help="Pause (s) entre deux vérifications en mode --loop.")
+        parser.add_argument("--target", type=int, help="Stock visé (WALLET_POOL_TARGET).")
+        parser.add_argument("--low-watermark", type=int, help="Réapprovisionner sous ce stock (WALLET_POOL_LOW_WATERMARK).")
+        parser.add_argument("--concurrency", type=int, help="Créations simultanées (WALLET_POOL_CONCURRENCY).")
+
+    def handle(self, *args, **options):
+        while True:
+            crees = wallets.reapprovisionner(options['target'], options['low_watermark'], options['concurrency'])
+            stock = wallets.disponibles()
+            if crees:
+                self.stdout.write(self.style.SUCCESS(f"✅ {crees} wallet(s) créé(s), {stock} disponible(s)"))
+            elif not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f"✅ {stock} wallet(s) disponible(s)"))
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
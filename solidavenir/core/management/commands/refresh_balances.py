@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import balances
+from core.models import Projet, User
+
+
+class Command(BaseCommand):
+    help = "Rafraîchit en parallèle le solde en cache des comptes Hedera (utilisateurs, projets, opérateur)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--account", action="append", dest="accounts", help="Limiter à ce compte (répétable).")
+        parser.add_argument("--concurrency", type=int, help="Requêtes simultanées (BALANCE_REFRESH_WORKERS).")
+
+    def handle(self, *args, **options):
+        accounts = options['accounts']
+        if not accounts:
+            accounts = list(
+                User.objects.filter(wallet_activated=True).exclude(hedera_account_id__isnull=True)
+                .exclude(hedera_account_id='').values_list('hedera_account_id', flat=True)
+            )
+            accounts += list(
+                Projet.objects.exclude(hedera_account_id__isnull=True).exclude(hedera_account_id='')
+                .values_list('hedera_account_id', flat=True)
+            )
+            accounts.append(settings.HEDERA_OPERATOR_ID)
+
+        resultats = balances.rafraichir_comptes(accounts, options['concurrency'])
+        echecs = [account for account, solde in resultats.items() if solde is None]
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(resultats) - len(echecs)} solde(s) rafraîchi(s)"))
+        if echecs:
+            self.stdout.write(self.style.WARNING(f"⚠️ {len(echecs)} compte(s) en échec: {', '.join(echecs[:20])}"))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import rates
+
+
+class Command(BaseCommand):
+    help = "Rafraîchit le taux HBAR/USD partagé (à lancer via cron ou en boucle)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Rafraîchir en continu avant chaque expiration souple.")
+        parser.add_argument("--force", action="store_true", help="Ignorer le verrou inter-processus.")
+
+    def handle(self, *args, **options):
+        while True:
+            snapshot = rates.refresh_rate(force=options['force'])
+            if snapshot:
+                self.stdout.write(self.style.SUCCESS(f"✅ 1 HBAR = {snapshot.hbar_usd} USD ({snapshot.hbar_fcfa:.2f} FCFA)"))
+            else:
+                self.stdout.write(self.style.WARNING("⚠️ Taux non rafraîchi (source indisponible ou verrou pris)"))
+
+            if not options['loop']:
+                break
+            time.sleep(max(1, rates.soft_ttl() - rates.refresh_margin()))
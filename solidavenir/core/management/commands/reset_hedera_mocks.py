@@ -1,12 +1,19 @@
-from django.core.management.base import BaseCommand
-from core.services.hedera_service import MOCK_BALANCES, MOCK_ACCOUNTS
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
 
 class Command(BaseCommand):
-    help = 'Réinitialiser les données mock Hedera pour les tests'
-    
+    help = 'Réinitialiser les données du remplaçant Hedera local (comptes, topics, messages) pour les tests'
+
     def handle(self, *args, **options):
-        MOCK_BALANCES.clear()
-        MOCK_ACCOUNTS.clear()
+        if not settings.HEDERA_STANDIN:
+            raise CommandError("HEDERA_STANDIN n'est pas activé : rien à réinitialiser")
+        try:
+            response = requests.post(f"{settings.HEDERA_SERVICE_URL}/_standin/reset", timeout=5)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise CommandError(f"Remplaçant Hedera injoignable: {e}")
         self.stdout.write(
             self.style.SUCCESS('Données mock Hedera réinitialisées avec succès')
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.hedera_standin import DEFAULT_LATENCY_MS, creer_serveur
+
+
+class Command(BaseCommand):
+    help = "Lance le remplaçant local du microservice Hedera (tests de charge hors ligne, HEDERA_STANDIN=True)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default=settings.HEDERA_STANDIN_HOST)
+        parser.add_argument("--port", type=int, default=settings.HEDERA_STANDIN_PORT)
+        parser.add_argument("--latency-scale", type=float, default=settings.HEDERA_STANDIN_LATENCY_SCALE,
+                            help="Multiplie les latences par endpoint (0 : réponses immédiates).")
+        parser.add_argument("--jitter", type=float, default=settings.HEDERA_STANDIN_JITTER,
+                            help="Variation aléatoire relative de la latence (0.2 = ±20 %%).")
+        parser.add_argument("--error-rate", type=float, default=settings.HEDERA_STANDIN_ERROR_RATE,
+                            help="Proportion de réponses 500 injectées.")
+        parser.add_argument("--drop-rate", type=float, default=settings.HEDERA_STANDIN_DROP_RATE,
+                            help="Proportion de connexions coupées sans réponse.")
+        parser.add_argument("--default-balance", type=float, default=1000,
+                            help="Solde (HBAR) des comptes inconnus créés à la volée.")
+        parser.add_argument("--strict-accounts", action="store_true",
+                            help="Refuser les comptes non créés par le remplaçant (INVALID_ACCOUNT_ID).")
+        parser.add_argument("--seed", type=int, help="Graine pour rendre l'injection de pannes reproductible.")
+
+    def handle(self, *args, **options):
+        latences = {**DEFAULT_LATENCY_MS, **settings.HEDERA_STANDIN_LATENCY}
+        serveur = creer_serveur(
+            options['host'],
+            options['port'],
+            settings.HEDERA_OPERATOR_ID,
+            latency_ms=latences,
+            latency_scale=options['latency_scale'],
+            jitter=options['jitter'],
+            error_rate=options['error_rate'],
+            drop_rate=options['drop_rate'],
+            default_balance=options['default_balance'],
+            auto_accounts=not options['strict_accounts'],
+            seed=options['seed'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Remplaçant Hedera démarré sur http://{options['host']}:{options['port']}"))
+        self.stdout.write(f"📊 Compte opérateur: {settings.HEDERA_OPERATOR_ID}")
+        self.stdout.write(
+            f"⏱️ Latence x{options['latency_scale']} ({', '.join(f'{e}: {ms:.0f}ms' for e, ms in latences.items())}), "
+            f"erreurs {options['error_rate']:.0%}, coupures {options['drop_rate']:.0%}"
+        )
+        try:
+            serveur.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            serveur.server_close()
+            self.stdout.write("🛑 Remplaçant Hedera arrêté")
@@ -1,15 +1,96 @@
+import signal
+import threading
+
 from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from core import hcs_ingestion
 from core.models import Projet
-from core.utils import creer_topic_pour_projet
+
 
 class Command(BaseCommand):
-    help = "Vérifie les projets actifs sans topic et en crée un"
-
-    def handle(self, *args, **kwargs):
-        projets = Projet.objects.filter(statut="actif", topic_id__isnull=True)
-        for projet in projets:
-            topic_id = creer_topic_pour_projet(projet)
-            if topic_id:
-                self.stdout.write(self.style.SUCCESS(f"Topic créé pour projet {projet.id}: {topic_id}"))
+    help = "Synchronise les messages de tous les topics HCS des projets depuis le mirror node (incrémental, en parallèle)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Synchroniser en continu.")
+        parser.add_argument("--interval", type=float, default=30, help="Pause (s) entre deux passes en mode --loop.")
+        parser.add_argument("--concurrency", type=int, help="Topics synchronisés simultanément (HCS_SYNC_CONCURRENCY).")
+        parser.add_argument("--pages-per-turn", type=int,
+                            help="Pages lues d'un topic avant de passer au suivant (HCS_SYNC_PAGES_PER_TURN).")
+        parser.add_argument("--top", type=int, default=10, help="Topics les plus en retard affichés dans le résumé.")
+        parser.add_argument("--create-missing", action="store_true",
+                            help="Créer d'abord un topic pour chaque projet actif qui n'en a pas.")
+
+    def handle(self, *args, **options):
+        arret = threading.Event()
+
+        def arreter(signum, frame):
+            if not arret.is_set():
+                self.stdout.write(self.style.WARNING("🛑 Arrêt demandé : fin des pages en cours..."))
+            arret.set()
+
+        precedents = {sig: signal.signal(sig, arreter) for sig in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            while not arret.is_set():
+                if options['create_missing']:
+                    self.creer_topics(arret)
+                bilan = hcs_ingestion.synchroniser_tous(options['concurrency'], options['pages_per_turn'], arret)
+                self.resume(bilan, options)
+                if not options['loop']:
+                    break
+                arret.wait(options['interval'])
+        finally:
+            for sig, precedent in precedents.items():
+                signal.signal(sig, precedent)
+
+    def creer_topics(self, arret):
+        from core.views import creer_topic_pour_projet
+
+        projets = Projet.objects.filter(statut="actif").filter(Q(topic_id__isnull=True) | Q(topic_id=''))
+        for projet in projets.select_related('porteur', 'valide_par').order_by('pk'):
+            if arret.is_set():
+                return
+            try:
+                # Journalisé au nom de l'administrateur qui a validé le projet, comme à la validation
+                data = creer_topic_pour_projet(projet, projet.valide_par or projet.porteur)
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"  ❌ Échec création topic pour projet {projet.id}: {e}"))
             else:
-                self.stdout.write(self.style.ERROR(f"Échec création topic pour projet {projet.id}"))
+                self.stdout.write(self.style.SUCCESS(f"  ✅ Topic créé pour projet {projet.id}: {data['topicId']}"))
+
+    def resume(self, bilan, options):
+        etats = bilan['topics']
+        if not etats:
+            self.stdout.write(self.style.SUCCESS("✅ Aucun projet avec un topic HCS"))
+            return
+
+        messages = sum(e['messages'] for e in etats.values())
+        erreurs = {t: e for t, e in etats.items() if e['erreur']}
+        en_retard = sorted((t for t, e in etats.items() if not e['a_jour'] and not e['erreur']),
+                           key=lambda t: etats[t]['retard'] or 0, reverse=True)
+
+        if options['verbosity'] >= 2:
+            for topic_id, e in sorted(etats.items()):
+                debit = e['messages'] / e['duree'] if e['duree'] else 0
+                self.stdout.write(f"  {topic_id:<16} projet {e['projet_id']:<8} {e['messages']:>8} msg "
+                                  f"{debit:>8.0f} msg/s  séquence {e['derniere_sequence']}  retard {self.retard(e)}")
+
+        for topic_id in en_retard[:options['top']]:
+            e = etats[topic_id]
+            self.stdout.write(self.style.WARNING(
+                f"  ⏳ {topic_id} (projet {e['projet_id']}) : retard {self.retard(e)}, séquence {e['derniere_sequence']}"))
+        for topic_id, e in list(erreurs.items())[:options['top']]:
+            self.stdout.write(self.style.ERROR(f"  ❌ {topic_id} (projet {e['projet_id']}) : {e['erreur']}"))
+
+        duree = bilan['duree']
+        style = self.style.WARNING if erreurs or en_retard else self.style.SUCCESS
+        self.stdout.write(style(
+            f"{'🛑' if bilan['interrompu'] else '🔄'} {len(etats)} topic(s) : {messages:,} message(s) en {duree:.1f}s "
+            f"({messages / max(duree, 0.001):,.0f} msg/s), {len(etats) - len(erreurs) - len(en_retard)} à jour, "
+            f"{len(en_retard)} en retard, {len(erreurs)} en erreur"))
+
+    @staticmethod
+    def retard(etat):
+        if etat['retard'] is None:
+            return "inconnu"
+        return f"{etat['retard']:.0f}s"
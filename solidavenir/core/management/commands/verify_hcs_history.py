@@ -0,0 +1,42 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import hcs_verification
+
+
+class Command(BaseCommand):
+    help = "Vérifie la continuité (séquences, running hash) des messages HCS stockés, depuis le dernier point vérifié"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--topic", action="append", dest="topics", help="Limiter à ce topic (répétable).")
+        parser.add_argument("--batch-size", type=int, help="Messages lus par lot (HCS_VERIFY_CHUNK_SIZE).")
+        parser.add_argument("--reset", action="store_true", help="Tout revérifier depuis la séquence 1.")
+
+    def handle(self, *args, **options):
+        resultats = hcs_verification.verifier_tous(options['batch_size'], options['reset'], options['topics'])
+        if not resultats:
+            self.stdout.write(self.style.SUCCESS("✅ Aucun topic HCS à vérifier"))
+            return
+
+        total = Counter()
+        for topic_id, resultat in resultats.items():
+            compteurs = resultat['compteurs']
+            total.update(compteurs)
+            total['topics'] += 1
+            if not any(compteurs[n] for n in ('trous', 'doublons', 'hash_invalides')):
+                continue
+            details = ", ".join(f"{nature}: {nombre}" for nature, nombre in sorted(compteurs.items()))
+            self.stdout.write(self.style.ERROR(f"  ❌ {topic_id} ({details})"))
+            for sequence, nature, detail in resultat['anomalies'][:10]:
+                self.stdout.write(f"     #{sequence} {nature} {detail}".rstrip())
+            self.stdout.write(f"     point de reprise conservé à la séquence {resultat['point_de_reprise']}")
+
+        anomalies = total['trous'] + total['doublons'] + total['hash_invalides']
+        style = self.style.ERROR if anomalies else self.style.SUCCESS
+        self.stdout.write(style(
+            f"{'⚠️' if anomalies else '✅'} {total['topics']} topic(s) : {total['verifies']:,} message(s) vérifié(s), "
+            f"{total['non_verifiables']:,} non vérifiable(s), {total['trous']} trou(s), {total['doublons']} doublon(s), "
+            f"{total['hash_invalides']} hash invalide(s)"))
+        if anomalies:
+            raise CommandError(f"{anomalies} anomalie(s) dans l'historique HCS, non résolue(s)")
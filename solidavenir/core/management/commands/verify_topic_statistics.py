@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import hcs_stats
+
+
+class Command(BaseCommand):
+    help = "Vérifie (et corrige) les statistiques des topics HCS contre la table des messages"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true", help="Signaler les écarts sans les corriger.")
+        parser.add_argument("--loop", action="store_true", help="Vérifier périodiquement.")
+        parser.add_argument("--interval", type=float, default=3600, help="Pause (s) entre deux vérifications en mode --loop.")
+
+    def handle(self, *args, **options):
+        corriger = not options['check']
+        while True:
+            ecarts = hcs_stats.verifier(corriger=corriger)
+            self.rapport(ecarts, corriger)
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def rapport(self, ecarts, corriger):
+        if not ecarts['topics'] and not ecarts['global']:
+            self.stdout.write(self.style.SUCCESS("✅ Statistiques HCS cohérentes"))
+            return
+        details = f"{len(ecarts['topics'])} topic(s){', statistiques globales' if ecarts['global'] else ''}"
+        if corriger:
+            self.stdout.write(self.style.SUCCESS(f"✅ Statistiques HCS corrigées: {details}"))
+        else:
+            self.stdout.write(self.style.WARNING(f"⚠️ Statistiques HCS divergentes: {details}"))
@@ -0,0 +1,107 @@
+# core/memo.py
+"""
+Mémoïsation des méthodes coûteuses des modèles (get_total_collecte, etc.).
+
+Pendant une requête HTTP (voir RequestMemoMiddleware), les résultats sont
+partagés par ligne (modèle, pk) : `request.user` et `projet.porteur` pointant
+vers le même utilisateur réutilisent le même résultat. Hors requête (commandes,
+shell), le résultat est mémorisé sur l'instance elle-même.
+
+Les entrées sont invalidées explicitement à la sauvegarde (voir core/signals.py).
+Avec MEMO_REPORT (DEBUG par défaut), les helpers appelés plusieurs fois dans
+une même requête sont listés dans les logs à la fin de la requête.
+"""
+import functools
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def _store():
+    return getattr(_local, 'store', None)
+
+
+def begin_request():
+    _local.store = {}
+    _local.calls = Counter()
+
+
+def end_request(path=None):
+    calls = getattr(_local, 'calls', None)
+    if calls and getattr(settings, 'MEMO_REPORT', settings.DEBUG):
+        repetes = report(calls)
+        if repetes:
+            details = ", ".join(f"{nom} x{nombre}" for nom, nombre in repetes)
+            logger.warning(f"Helpers appelés plusieurs fois ({path or 'requête'}): {details}")
+    _local.store = None
+    _local.calls = None
+
+
+def report(calls=None):
+    """Helpers appelés plus d'une fois dans la requête courante : [(nom, nombre)]."""
+    calls = calls if calls is not None else getattr(_local, 'calls', None) or Counter()
+    repetes = [
+        (f"{label}.{nom}(pk={pk})", nombre)
+        for (label, pk, nom, _args), nombre in calls.items()
+        if nombre > 1
+    ]
+    return sorted(repetes, key=lambda item: -item[1])
+
+
+def memoize(func):
+    """
+    Décorateur pour méthodes de modèle sans effet de bord.
+    Compatible avec @property (à placer sous @property) et avec les templates.
+    """
+    nom = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        args_key = (args, tuple(sorted(kwargs.items())))
+        store = _store()
+
+        if store is not None and self.pk is not None:
+            key = (self._meta.label, self.pk, nom, args_key)
+            _local.calls[key] += 1
+            if key not in store:
+                store[key] = func(self, *args, **kwargs)
+            return store[key]
+
+        cache = self.__dict__.setdefault('_memo', {})
+        key = (nom, args_key)
+        if key not in cache:
+            cache[key] = func(self, *args, **kwargs)
+        return cache[key]
+
+    return wrapper
+
+
+def invalidate(instance):
+    """Oublie les résultats mémorisés pour cette instance (et sa ligne)."""
+    instance.__dict__.pop('_memo', None)
+    if instance.pk is not None:
+        invalidate_row(instance._meta.label, instance.pk)
+
+
+def invalidate_row(label, pk):
+    """Oublie les résultats mémorisés dans la requête courante pour la ligne (label, pk)."""
+    store = _store()
+    if not store or pk is None:
+        return
+    for key in [k for k in store if k[0] == label and k[1] == pk]:
+        del store[key]
+
+
+def invalidate_model(label):
+    """Oublie les résultats mémorisés dans la requête courante pour tout un modèle."""
+    store = _store()
+    if not store:
+        return
+    for key in [k for k in store if k[0] == label]:
+        del store[key]
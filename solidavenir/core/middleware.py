@@ -1,6 +1,7 @@
 # core/middleware.py
 import requests
 from django.conf import settings
+from . import memo, perf, rates
 
 class AutoWalletMiddleware:
     def __init__(self, get_response):
@@ -11,7 +12,7 @@ class AutoWalletMiddleware:
         return response
     
     def process_view(self, request, view_func, view_args, view_kwargs):
-        # Créer un wallet automatiquement pour les utilisateurs authentifiés
+        # Attribuer un wallet du pool (sans appel réseau) aux utilisateurs authentifiés
         if request.user.is_authenticated and not request.user.is_anonymous:
             # Vérifier si l'utilisateur a besoin d'un wallet
             if (not request.user.hedera_account_id or 
@@ -20,4 +21,60 @@ class AutoWalletMiddleware:
                     request.user.ensure_wallet()
                 except Exception as e:
                     # Loguer l'erreur mais ne pas bloquer l'utilisateur
-                    print(f"Erreur création auto wallet: {e}")
\ No newline at end of file
+                    print(f"Erreur création auto wallet: {e}")
+
+
+class RateSnapshotMiddleware:
+    """
+    Ouvre une portée de requête pour le fournisseur de taux : toutes les
+    conversions HBAR/FCFA d'une même page utilisent le même snapshot.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rates.begin_request()
+        try:
+            return self.get_response(request)
+        finally:
+            rates.end_request()
+
+
+class RequestMemoMiddleware:
+    """
+    Ouvre une portée de requête pour la mémoïsation des helpers de modèles
+    (voir core/memo.py) et signale en fin de requête les appels répétés.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        memo.begin_request()
+        try:
+            return self.get_response(request)
+        finally:
+            memo.end_request(request.path)
+
+
+class PerformanceMiddleware:
+    """
+    Mesure chaque requête (temps total, SQL, appels Hedera/CoinGecko/SMTP)
+    et l'impute au nom de la vue résolue (voir core/perf.py).
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'PERF_INSTRUMENTATION', True)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+        perf.begin_request()
+        view_name = None
+        try:
+            response = self.get_response(request)
+        finally:
+            match = getattr(request, 'resolver_match', None)
+            if match is not None:
+                view_name = match.view_name
+            perf.end_request(view_name)
+        return response
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+
+
+def construire_resumes(apps, schema_editor):
+    Transaction = apps.get_model('core', 'Transaction')
+    FinancementProjet = apps.get_model('core', 'FinancementProjet')
+
+    lignes = Transaction.objects.filter(
+        statut='confirme', destination='operator', projet__isnull=False
+    ).values('projet_id').annotate(
+        montant_total=Sum('montant'),
+        nombre_dons=Count('id'),
+        nombre_contributeurs=Count('contributeur', distinct=True),
+        don_max=Max('montant'),
+        don_min=Min('montant'),
+        dernier_don=Max('date_transaction'),
+    ).order_by()
+
+    FinancementProjet.objects.bulk_create(
+        [FinancementProjet(**ligne) for ligne in lignes], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_transaction_association_alter_auditlog_action_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FinancementProjet',
+            fields=[
+                ('projet', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='financement', serialize=False, to='core.projet')),
+                ('montant_total', models.DecimalField(decimal_places=0, default=0, max_digits=15)),
+                ('nombre_dons', models.PositiveIntegerField(default=0)),
+                ('nombre_contributeurs', models.PositiveIntegerField(default=0)),
+                ('don_max', models.DecimalField(blank=True, decimal_places=0, max_digits=15, null=True)),
+                ('don_min', models.DecimalField(blank=True, decimal_places=0, max_digits=15, null=True)),
+                ('dernier_don', models.DateTimeField(blank=True, null=True)),
+                ('date_mise_a_jour', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Résumé de financement',
+                'verbose_name_plural': 'Résumés de financement',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['projet', 'statut', 'contributeur'], name='transaction_projet_statut_idx'),
+        ),
+        migrations.RunPython(construire_resumes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def evaluer_projets(apps, schema_editor):
+    Projet = apps.get_model('core', 'Projet')
+    Palier = apps.get_model('core', 'Palier')
+
+    for projet in Projet.objects.filter(paliers__transfere=False).distinct().only(
+        'id', 'montant_engage', 'montant_distribue'
+    ):
+        disponible = (projet.montant_engage or 0) - (projet.montant_distribue or 0)
+        if disponible <= 0:
+            continue
+        palier_id = (
+            Palier.objects.filter(projet_id=projet.pk, transfere=False, montant__lte=disponible)
+            .order_by('montant_minimum', 'id')
+            .values_list('id', flat=True)
+            .first()
+        )
+        if palier_id is not None:
+            Projet.objects.filter(pk=projet.pk).update(pret_distribution=True, palier_pret_id=palier_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_financementprojet'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projet',
+            name='palier_pret',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Prochain palier distribuable', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.palier'),
+        ),
+        migrations.AddField(
+            model_name='projet',
+            name='pret_distribution',
+            field=models.BooleanField(default=False, editable=False, help_text='Un palier peut être distribué avec les fonds disponibles'),
+        ),
+        migrations.AddIndex(
+            model_name='projet',
+            index=models.Index(fields=['pret_distribution', 'statut'], name='projet_pret_distribution_idx'),
+        ),
+        migrations.RunPython(evaluer_projets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:13
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_projet_pret_distribution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxHCS',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cle_idempotence', models.CharField(max_length=100, unique=True)),
+                ('topic_id', models.CharField(max_length=100)),
+                ('type_message', models.CharField(max_length=100)),
+                ('contenu', models.JSONField(default=dict)),
+                ('utilisateur_email', models.EmailField(blank=True, max_length=254, null=True)),
+                ('montant', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('transaction_hash', models.CharField(blank=True, max_length=200, null=True)),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('envoye', 'Envoyé'), ('echec', 'Échec')], default='en_attente', max_length=20)),
+                ('tentatives', models.PositiveIntegerField(default=0)),
+                ('prochaine_tentative', models.DateTimeField(default=django.utils.timezone.now)),
+                ('derniere_erreur', models.TextField(blank=True)),
+                ('hedera_message_id', models.CharField(blank=True, max_length=150, null=True)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('date_envoi', models.DateTimeField(blank=True, null=True)),
+                ('projet', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='outbox_hcs', to='core.projet')),
+                ('transaction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.transaction')),
+                ('transaction_admin', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.transactionadmin')),
+            ],
+            options={
+                'verbose_name': 'Message HCS sortant',
+                'verbose_name_plural': 'Messages HCS sortants',
+                'ordering': ['date_creation'],
+                'indexes': [models.Index(fields=['statut', 'prochaine_tentative'], name='outbox_hcs_a_envoyer_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_outboxhcs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PooledWallet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account_id', models.CharField(max_length=50, unique=True)),
+                ('public_key', models.TextField()),
+                ('private_key_chiffree', models.TextField()),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('date_attribution', models.DateTimeField(blank=True, null=True)),
+                ('attribue_a', models.CharField(blank=True, max_length=100)),
+            ],
+            options={
+                'verbose_name': 'Wallet pré-créé',
+                'verbose_name_plural': 'Wallets pré-créés',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['date_attribution', 'id'], name='wallet_pool_disponible_idx')],
+            },
+        ),
+    ]
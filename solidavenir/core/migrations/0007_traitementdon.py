@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:18
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_pooledwallet'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TraitementDon',
+            fields=[
+                ('transaction', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='traitement', serialize=False, to='core.transaction')),
+                ('etape', models.CharField(choices=[('a_transferer', 'À transférer'), ('transfert_envoye', 'Transfert envoyé'), ('termine', 'Terminé'), ('echec', 'Échec'), ('a_verifier', 'À vérifier')], default='a_transferer', max_length=20)),
+                ('tentatives', models.PositiveIntegerField(default=0)),
+                ('prochaine_tentative', models.DateTimeField(default=django.utils.timezone.now)),
+                ('erreur', models.TextField(blank=True)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('date_mise_a_jour', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Traitement de don',
+                'verbose_name_plural': 'Traitements de dons',
+                'indexes': [models.Index(fields=['etape', 'prochaine_tentative'], name='traitement_don_a_faire_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_traitementdon'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurseurSynchronisation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(max_length=100, unique=True)),
+                ('position', models.CharField(blank=True, max_length=100)),
+                ('date_mise_a_jour', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Curseur de synchronisation',
+                'verbose_name_plural': 'Curseurs de synchronisation',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:38
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_curseursynchronisation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topicmessage',
+            name='consensus_timestamp',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='topicmessage',
+            name='running_hash',
+            field=models.CharField(blank=True, max_length=128),
+        ),
+        migrations.AddField(
+            model_name='topicmessage',
+            name='sequence_number',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='topicmessage',
+            name='date_envoi',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddConstraint(
+            model_name='topicmessage',
+            constraint=models.UniqueConstraint(fields=('projet', 'sequence_number'), name='topic_message_sequence_unique'),
+        ),
+    ]
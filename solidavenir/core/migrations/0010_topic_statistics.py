@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_topicmessage_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatistiquesHCS',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre_topics', models.PositiveIntegerField(default=0)),
+                ('topics_actifs', models.PositiveIntegerField(default=0)),
+                ('nombre_messages', models.PositiveBigIntegerField(default=0)),
+                ('messages_par_type', models.JSONField(default=dict)),
+                ('dernier_message', models.DateTimeField(blank=True, null=True)),
+                ('date_verification', models.DateTimeField(blank=True, null=True)),
+                ('date_mise_a_jour', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Statistiques HCS globales',
+                'verbose_name_plural': 'Statistiques HCS globales',
+            },
+        ),
+        migrations.CreateModel(
+            name='StatistiquesTopic',
+            fields=[
+                ('projet', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistiques_hcs', serialize=False, to='core.projet')),
+                ('nombre_messages', models.PositiveBigIntegerField(default=0)),
+                ('messages_par_type', models.JSONField(default=dict)),
+                ('dernier_message', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('date_verification', models.DateTimeField(blank=True, null=True)),
+                ('date_mise_a_jour', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Statistiques de topic HCS',
+                'verbose_name_plural': 'Statistiques des topics HCS',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='topicmessage',
+            index=models.Index(fields=['projet', '-date_envoi'], name='topic_message_projet_date'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 07:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_topic_statistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='topicmessage',
+            name='consensus_ns',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='topicmessage',
+            name='message_sha384',
+            field=models.CharField(blank=True, max_length=96),
+        ),
+        migrations.AddField(
+            model_name='topicmessage',
+            name='payer_account_id',
+            field=models.CharField(blank=True, max_length=30),
+        ),
+        migrations.AddField(
+            model_name='topicmessage',
+            name='running_hash_version',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
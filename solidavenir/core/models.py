@@ -25,21 +25,18 @@ from django.db import models
 import uuid
 from django.core.validators import FileExtensionValidator
 from django.core.exceptions import ValidationError
-import requests
 from decimal import Decimal
 # --- MODELE PRINCIPAL PROJET ---
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, FileExtensionValidator
 from django.utils import timezone
-from django.utils.text import slugify
 from django.db.models import Sum, Q
 import uuid
 from datetime import timedelta
 
 from django.db import models
 from django.core.validators import FileExtensionValidator
-from django.utils.text import slugify
 import uuid
 # --- VALIDATEURS PERSONNALISÉS ---
 from django.core.exceptions import ValidationError
@@ -61,9 +58,11 @@ def validate_file_size(value):
         raise ValidationError("La taille maximale autorisée est de 10 Mo.")
 
 from decimal import Decimal, ROUND_HALF_UP
-from django.core.cache import cache
-import requests
 import logging
+from .rates import get_rate_snapshot
+from . import counters, funding
+from .slugs import save_with_unique_slug
+from .memo import memoize
 
 logger = logging.getLogger(__name__)
 
@@ -71,58 +70,120 @@ logger = logging.getLogger(__name__)
 # FONCTIONS DE CONVERSION DE DEVISES
 # =============================================================================
 
-def get_hbar_to_usd():
-    """Récupère le prix HBAR/USD avec cache"""
-    cache_key = 'hbar_usd_rate'
-    cached_rate = cache.get(cache_key)
-    
-    if cached_rate:
-        return cached_rate
-    
-    try:
-        response = requests.get(
-            "https://api.coingecko.com/api/v3/simple/price",
-            params={"ids": "hedera-hashgraph", "vs_currencies": "usd"},
-            timeout=10
-        )
-        response.raise_for_status()
-        data = response.json()
-        rate = Decimal(str(data["hedera-hashgraph"]["usd"]))
-        
-        # Cache pour 5 minutes
-        cache.set(cache_key, rate, 300)
-        return rate
-        
-    except Exception as e:
-        logger.error(f"Erreur récupération taux HBAR/USD: {e}")
-        # Retourner un taux par défaut en cas d'erreur
-        return Decimal('0.07')
+def get_hbar_to_usd(snapshot=None):
+    """
+    Prix HBAR/USD lu depuis le fournisseur de taux (voir core/rates.py).
+    Aucun appel réseau n'est fait ici : le taux est rafraîchi en arrière-plan.
+    """
+    snapshot = snapshot or get_rate_snapshot()
+    return snapshot.hbar_usd
 
-def get_usd_to_fcfa():
+def get_usd_to_fcfa(snapshot=None):
     """Taux USD/FCFA (fixe ou API)"""
     # Pour l'Afrique de l'Ouest, taux approximatif
-    return Decimal('600')
+    snapshot = snapshot or get_rate_snapshot()
+    return snapshot.usd_fcfa
 
-def convert_hbar_to_fcfa(hbar_amount):
+def convert_hbar_to_fcfa(hbar_amount, snapshot=None):
     """Convertit HBAR vers FCFA"""
     if not isinstance(hbar_amount, Decimal):
         hbar_amount = Decimal(str(hbar_amount))
     
-    usd_rate = get_hbar_to_usd()
-    fcfa_rate = get_usd_to_fcfa()
+    snapshot = snapshot or get_rate_snapshot()
+    usd_rate = get_hbar_to_usd(snapshot)
+    fcfa_rate = get_usd_to_fcfa(snapshot)
     return (hbar_amount * usd_rate * fcfa_rate).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
-def convert_fcfa_to_hbar(fcfa_amount):
+def convert_fcfa_to_hbar(fcfa_amount, snapshot=None):
     """Convertit FCFA vers HBAR"""
     if not isinstance(fcfa_amount, Decimal):
         fcfa_amount = Decimal(str(fcfa_amount))
     
-    usd_rate = get_hbar_to_usd()
-    fcfa_rate = get_usd_to_fcfa()
+    snapshot = snapshot or get_rate_snapshot()
+    usd_rate = get_hbar_to_usd(snapshot)
+    fcfa_rate = get_usd_to_fcfa(snapshot)
     if usd_rate == 0:
         raise ValueError("Taux de conversion indisponible")
     return (fcfa_amount / fcfa_rate / usd_rate).quantize(Decimal('0.0001'), rounding=ROUND_HALF_UP)
 
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel : chemin Decimal uniquement
+    np = None
+
+# Au-delà de ce nombre de montants, le chemin NumPy en virgule fixe est utilisé
+BULK_NUMPY_THRESHOLD = 256
+_INT64_MAX = 2 ** 63 - 1
+_FCFA_QUANT = Decimal('0.01')
+
+
+def _to_fixed_point(value, max_places=12):
+    """Retourne (entier, nb_décimales) représentant exactement value, ou None."""
+    exponent = value.as_tuple().exponent
+    if not isinstance(exponent, int):
+        return None
+    places = max(0, -exponent)
+    if places > max_places:
+        return None
+    return int(value.scaleb(places)), places
+
+
+def _convert_many_numpy(amounts, rate):
+    """
+    Conversion en virgule fixe (int64) : résultat identique au chemin Decimal.
+    Retourne None si les valeurs ne tiennent pas exactement sur 64 bits.
+    """
+    rate_fp = _to_fixed_point(rate)
+    if rate_fp is None:
+        return None
+    rate_int, rate_places = rate_fp
+
+    fixed = [_to_fixed_point(a, max_places=4) for a in amounts]
+    if any(f is None for f in fixed):
+        return None
+    amount_places = max(places for _, places in fixed)
+    scaled = [value * 10 ** (amount_places - places) for value, places in fixed]
+
+    # Garde-fou débordement : |montant| * |taux| doit tenir sur int64
+    max_abs = max(abs(v) for v in scaled)
+    if max_abs * abs(rate_int) > _INT64_MAX:
+        return None
+
+    shift = amount_places + rate_places - 2  # résultat au centime
+    products = np.asarray(scaled, dtype=np.int64) * np.int64(rate_int)
+    if shift > 0:
+        divisor = np.int64(10 ** shift)
+        half = divisor // 2
+        # ROUND_HALF_UP (s'éloigne de zéro sur .5, comme Decimal)
+        magnitude = (np.abs(products) + half) // divisor
+        cents = np.where(products < 0, -magnitude, magnitude)
+    else:
+        cents = products * np.int64(10 ** -shift)
+    return [Decimal(int(c)).scaleb(-2) for c in cents]
+
+
+def convert_hbar_to_fcfa_many(amounts, snapshot=None):
+    """
+    Convertit une séquence de montants HBAR en FCFA sous un seul snapshot de taux.
+
+    Même arrondi que convert_hbar_to_fcfa ; les valeurs None sont traitées comme 0.
+    Au-delà de BULK_NUMPY_THRESHOLD montants, NumPy (s'il est installé) calcule
+    en virgule fixe, avec repli automatique sur Decimal en cas de débordement.
+    """
+    snapshot = snapshot or get_rate_snapshot()
+    rate = get_hbar_to_usd(snapshot) * get_usd_to_fcfa(snapshot)
+
+    values = [a if isinstance(a, Decimal) else Decimal(str(a or 0)) for a in amounts]
+    if not values:
+        return []
+
+    if np is not None and len(values) >= BULK_NUMPY_THRESHOLD:
+        result = _convert_many_numpy(values, rate)
+        if result is not None:
+            return result
+
+    return [(v * rate).quantize(_FCFA_QUANT, rounding=ROUND_HALF_UP) for v in values]
+
 class User(AbstractUser):
     USER_TYPES = (
         ('admin', 'Administrator'),
@@ -299,6 +360,7 @@ class User(AbstractUser):
     def is_donateur(self):
         return self.user_type == 'donateur'
     
+    @memoize
     def get_profile_completion(self):
         """
         Calculate and return the profile completion percentage.
@@ -333,14 +395,17 @@ class User(AbstractUser):
     def get_projets_termines(self):
         return self.projet_set.filter(statut__in=['termine', 'echec'])
     
+    @memoize
     def get_total_collecte(self):
         return self.projet_set.aggregate(
             total=Sum('montant_collecte')
         )['total'] or 0
     
+    @memoize
     def get_nombre_projets_lances(self):
         return self.projet_set.count()
     
+    @memoize
     def get_taux_reussite(self):
         projets_termines = self.projet_set.filter(statut__in=['termine', 'echec'])
         if not projets_termines.exists():
@@ -381,39 +446,24 @@ class User(AbstractUser):
         """Vérifie si l'utilisateur peut faire des contributions"""
         return self.user_type != 'admin' and self.is_authenticated
     
-    def ensure_wallet(self):
+    def ensure_wallet(self, allow_create=False):
         """
         Ensure the user has an active Hedera wallet.
         
-        - If no wallet exists, request wallet creation from the Node.js service.
-        - On success, store account ID, public key, and private key 
-        - Activate the wallet and save changes.
+        - If no wallet exists, claim a pre-created account from the wallet pool
+          (see core/wallets.py); no call to the Node.js service is made.
+        - With allow_create=True (management commands), create the account
+          through the Node.js service when the pool is empty.
+        - Store account ID, public key, and private key and activate the wallet.
         
         Returns:
-            True if the wallet exists or was created successfully, otherwise False.
+            True if the wallet exists or was assigned successfully, otherwise False.
         """
-        """Crée un wallet automatiquement s'il n'existe pas"""
+        """Attribue un wallet du pool s'il n'existe pas"""
         if not self.hedera_account_id or not self.wallet_activated:
+            from .wallets import attribuer_a_utilisateur
             try:
-                # Appeler le service Node.js pour créer un wallet
-                response = requests.post(
-                    'http://localhost:3001/create-wallet',
-                    json={'initialBalance': 10},
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    if result['success']:
-                        # Stocker les informations du wallet
-                        self.hedera_account_id = result['accountId']
-                        # ⚠️ IMPORTANT: Stocker la clé privée de manière sécurisée
-                        # Dans un environnement de production, utilisez un service de gestion de secrets
-                        self.hedera_public_key = result['publicKey']
-                        self.hedera_private_key = result['privateKey']
-                        self.wallet_activated = True
-                        self.save()
-                        return True
+                return attribuer_a_utilisateur(self, allow_create=allow_create)
             except Exception as e:
                 print(f"Erreur création wallet: {e}")
                 return False
@@ -599,6 +649,25 @@ class Projet(models.Model):
         default=2,
         help_text="Pourcentage de commission retenue par la plateforme avant distribution au porteur"
     )
+    # État de distribution, réévalué uniquement quand le financement ou les paliers changent
+    pret_distribution = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text="Un palier peut être distribué avec les fonds disponibles"
+    )
+    palier_pret = models.ForeignKey(
+        'Palier',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        help_text="Prochain palier distribuable"
+    )
+
+    # Champs dont la modification impose de réévaluer pret_distribution
+    CHAMPS_FINANCEMENT = frozenset({'montant_engage', 'montant_distribue', 'montant_collecte'})
+
     class Meta:
         indexes = [
             models.Index(fields=['audit_uuid']),
@@ -608,6 +677,7 @@ class Projet(models.Model):
             models.Index(fields=['categorie']),
             models.Index(fields=['montant_demande']),
             models.Index(fields=['type_financement']),
+            models.Index(fields=['pret_distribution', 'statut'], name='projet_pret_distribution_idx'),
         ]
         ordering = ['-date_creation']
         permissions = [
@@ -617,28 +687,42 @@ class Projet(models.Model):
         ]
 
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.titre)
-            original_slug = self.slug
-            counter = 1
-            while Projet.objects.filter(slug=self.slug).exclude(pk=self.pk).exists():
-                self.slug = f"{original_slug}-{counter}"
-                counter += 1
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._financement_initial = instance._valeurs_financement()
+        if 'topic_id' in field_names:
+            # Topic chargé : un changement invalide la résolution topic -> projet (signals.py)
+            instance._topic_initial = instance.topic_id
+        return instance
+
+    def _valeurs_financement(self):
+        return tuple(self.__dict__.get(champ) for champ in sorted(self.CHAMPS_FINANCEMENT))
 
+    def save(self, *args, **kwargs):
         if self.date_debut and self.duree_campagne and not self.date_fin:
             self.date_fin = self.date_debut + timedelta(days=self.duree_campagne)
         
-        if self.montant_collecte > 0:
-            # Import local pour éviter circularité
-            from .views import verifier_paliers
-            verifier_paliers(self)
-        
         # Si la catégorie n'est pas "autre", effacer le champ autre_categorie
         if self.categorie != 'autre' and self.autre_categorie:
             self.autre_categorie = None
         
-        super().save(*args, **kwargs)
+        # Réévaluer les paliers seulement si un montant a changé : les sauvegardes
+        # de vues, de slug ou de statut ne paient pas cette évaluation.
+        update_fields = kwargs.get('update_fields')
+        a_evaluer = (
+            not self._state.adding
+            and (update_fields is None or self.CHAMPS_FINANCEMENT.intersection(update_fields))
+            and self._valeurs_financement() != getattr(self, '_financement_initial', None)
+        )
+        
+        # Slug alloué en une requête, réessayé en cas de course (voir core/slugs.py)
+        save_with_unique_slug(self, self.titre, super().save, *args, **kwargs)
+        
+        self._financement_initial = self._valeurs_financement()
+        if a_evaluer:
+            from .paliers import evaluer_disponibilite  # Import local : paliers importe models
+            evaluer_disponibilite(self.pk, instance=self)
 
     def __str__(self):
         return f"{self.titre} - {self.get_statut_display()}"
@@ -788,22 +872,30 @@ class Projet(models.Model):
         - Average donation
         - Maximum donation
         - Minimum donation
+        Read from the incrementally maintained FinancementProjet summary.
         """
         """Statistiques avancées des contributeurs"""
-        from django.db.models import Count, Avg
-        stats = Transaction.objects.filter(
-            projet=self, 
-            statut='confirme',
-            destination='operator'
-        ).aggregate(
-            total_contributeurs=Count('contributeur', distinct=True),
-            don_moyen=Avg('montant'),
-            don_max=Max('montant'),
-            don_min=Min('montant')
-        )
-        return stats
+        resume = self.resume_financement
+        return {
+            'total_contributeurs': resume.nombre_contributeurs,
+            'don_moyen': resume.don_moyen,
+            'don_max': resume.don_max,
+            'don_min': resume.don_min,
+        }
+
+    @property
+    def resume_financement(self):
+        """
+        Returns the project's FinancementProjet, or an unsaved empty one
+        when no donation has been confirmed yet.
+        """
+        try:
+            return self.financement
+        except FinancementProjet.DoesNotExist:
+            return FinancementProjet(projet=self)
 
     @property
+    @memoize
     def paliers_total(self):
            """Retourne la somme totale des montants des paliers"""
            return sum(palier.montant for palier in self.paliers.all())
@@ -811,16 +903,18 @@ class Projet(models.Model):
     def incrementer_vues(self):
         """
         Increments the view counter for the project.
+        The increment is buffered and written in bulk (see core/counters.py).
         """
         self.vues += 1
-        self.save(update_fields=['vues'])
+        counters.increment(self.pk, 'vues')
 
     def incrementer_partages(self):
         """
         Increments the share counter for the project.
+        The increment is buffered and written in bulk (see core/counters.py).
         """
         self.partages += 1
-        self.save(update_fields=['partages'])
+        counters.increment(self.pk, 'partages')
         
     def generer_identifiant_unique(self):
         """
@@ -1008,6 +1102,7 @@ class Projet(models.Model):
         return first_image.image if first_image else None
     
     @property
+    @memoize
     def gallerie_images(self):
         """Retourne toutes les images du projet pour la galerie"""
         images = []
@@ -1185,11 +1280,13 @@ class Association(models.Model):
         """Retourne les projets actifs liés à cette association"""
         return self.projets.filter(statut="actif")
 
+    @memoize
     def get_total_collecte(self):
         """Return the total amount collected across all projects of this association."""
         """Somme de tous les montants collectés des projets de cette association"""
         return self.projets.aggregate(total=Sum("montant_collecte"))["total"] or 0
 
+    @memoize
     def get_nombre_contributeurs(self):
         """
         Return the number of unique confirmed contributors 
@@ -1249,15 +1346,10 @@ class Association(models.Model):
             return self.images.all().order_by('-date_ajout')[:4]
 
     def save(self, *args, **kwargs):
-        if not self.slug and self.nom:
-            base_slug = slugify(self.nom)
-            slug = base_slug
-            counter = 1
-            while Association.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
-        super().save(*args, **kwargs)
+        if self.nom:
+            save_with_unique_slug(self, self.nom, super().save, *args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
 
 class AssociationImage(models.Model):
     """
@@ -1418,17 +1510,13 @@ class Palier(models.Model):
     def save(self, *args, **kwargs):
         """
         Surcharge de la méthode save pour calculer le montant minimum.
+        Les créations en lot passent par core/paliers.py, qui fixe déjà le cumul.
         """
-        # Si c'est un nouveau palier, on calcule le montant minimum
-        if self.pk is None:
-            # Récupérer le montant total des paliers existants
-            paliers_existants = Palier.objects.filter(projet=self.projet)
-            montant_total_existant = sum(palier.montant for palier in paliers_existants)
-            self.montant_minimum = montant_total_existant
-        else:
-            # Pour un palier existant, on garde le montant minimum actuel
-            # ou on recalcule si nécessaire
-            pass
+        # Nouveau palier créé hors du service : placé en fin de calendrier
+        if self.pk is None and self.montant_minimum is None:
+            self.montant_minimum = Palier.objects.filter(projet=self.projet).aggregate(
+                total=Sum('montant')
+            )['total'] or Decimal('0')
             
         super().save(*args, **kwargs)
     
@@ -1436,17 +1524,14 @@ class Palier(models.Model):
         """
         Surcharge de la suppression pour recalculer les montants minimums après
         """
-        projet = self.projet
-        super().delete(*args, **kwargs)
-        
-        # Recalculer les montants minimums des paliers restants
-        paliers_restants = Palier.objects.filter(projet=projet).order_by('id')
-        montant_cumulatif = Decimal('0')
+        from .paliers import recalculer_minimums  # Import local : paliers importe models
+
+        projet_id = self.projet_id
+        result = super().delete(*args, **kwargs)
         
-        for palier in paliers_restants:
-            palier.montant_minimum = montant_cumulatif
-            palier.save(update_fields=['montant_minimum'])
-            montant_cumulatif += palier.montant
+        # Recalculer les montants minimums des paliers restants (un bulk_update)
+        recalculer_minimums(projet_id)
+        return result
     
 class PreuvePalier(models.Model):
     """
@@ -1618,12 +1703,20 @@ class Transaction(models.Model):
             models.Index(fields=['projet']),
             models.Index(fields=['topic']),
             models.Index(fields=['hedera_message_id']),
+            models.Index(fields=['projet', 'statut', 'contributeur'], name='transaction_projet_statut_idx'),
         ]
         permissions = [
             ("verify_transaction", "Peut vérifier une transaction"),
             ("refund_transaction", "Peut rembourser une transaction"),
         ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # État chargé, pour détecter les transitions de financement (signals.py)
+        instance._etat_financement = funding.etat_transaction(instance)
+        return instance
+
     def save(self, *args, **kwargs):
 
         if self.projet and self.projet.topic_id and not self.topic:
@@ -1683,6 +1776,42 @@ class Transaction(models.Model):
         destinataire = self.association.nom if self.association else self.projet.titre if self.projet else "Inconnu"
         return f"{self.montant} HBAR → {destinataire} ({self.get_statut_display()})"
 
+class FinancementProjet(models.Model):
+    """
+    Incrementally maintained funding summary of a project.
+
+    Counts confirmed donations to the operator (destination='operator'). Updated
+    atomically by core/funding.py whenever a Transaction enters or leaves the
+    'confirme' state; `rebuild_funding_summaries` recomputes it from scratch.
+    """
+    projet = models.OneToOneField(
+        Projet,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='financement'
+    )
+    montant_total = models.DecimalField(max_digits=15, decimal_places=0, default=0)
+    nombre_dons = models.PositiveIntegerField(default=0)
+    nombre_contributeurs = models.PositiveIntegerField(default=0)
+    don_max = models.DecimalField(max_digits=15, decimal_places=0, null=True, blank=True)
+    don_min = models.DecimalField(max_digits=15, decimal_places=0, null=True, blank=True)
+    dernier_don = models.DateTimeField(null=True, blank=True)
+    date_mise_a_jour = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Résumé de financement"
+        verbose_name_plural = "Résumés de financement"
+
+    @property
+    def don_moyen(self):
+        """Average confirmed donation, or None when there is none."""
+        if not self.nombre_dons:
+            return None
+        return self.montant_total / self.nombre_dons
+
+    def __str__(self):
+        return f"{self.projet.titre} - {self.montant_total} HBAR ({self.nombre_dons} dons)"
+
 class TransactionAdmin(models.Model):
     """
     Model representing an administrative record of a transaction.
@@ -1741,10 +1870,236 @@ class TopicMessage(models.Model):
     montant = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
     transaction_hash = models.CharField(max_length=200, blank=True, null=True)
     contenu = models.JSONField(default=dict)  # message complet HCS
-    date_envoi = models.DateTimeField(auto_now_add=True)
+    date_envoi = models.DateTimeField(default=timezone.now)  # heure de consensus pour les messages ingérés
+
+    # Renseignés par l'ingestion depuis le mirror node (core/hcs_ingestion.py)
+    sequence_number = models.PositiveBigIntegerField(null=True, blank=True)
+    consensus_timestamp = models.DateTimeField(null=True, blank=True)
+    running_hash = models.CharField(max_length=128, blank=True)
+    # Entrées du running hash, pour le recalculer (core/hcs_verification.py)
+    consensus_ns = models.CharField(max_length=32, blank=True)  # 'secondes.nanos' exact du mirror node
+    running_hash_version = models.PositiveSmallIntegerField(null=True, blank=True)
+    payer_account_id = models.CharField(max_length=30, blank=True)
+    message_sha384 = models.CharField(max_length=96, blank=True)  # SHA-384 (hex) des octets publiés
 
     class Meta:
         ordering = ["-date_envoi"]
+        constraints = [
+            models.UniqueConstraint(fields=['projet', 'sequence_number'], name='topic_message_sequence_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['projet', '-date_envoi'], name='topic_message_projet_date'),
+        ]
 
     def __str__(self):
         return f"{self.projet.titre} | {self.type_message} | {self.montant or ''}"
+
+
+def _topic_actif(dernier_message):
+    jours = getattr(settings, 'HCS_TOPIC_ACTIVE_DAYS', 30)
+    return dernier_message is not None and dernier_message >= timezone.now() - timedelta(days=jours)
+
+
+class StatistiquesTopic(models.Model):
+    """
+    Incrementally maintained message statistics of a project's HCS topic.
+
+    Updated by core/hcs_stats.py in the same database transaction as the
+    TopicMessage rows it counts; `verify_topic_statistics` recomputes it from
+    the message table.
+    """
+    projet = models.OneToOneField(
+        Projet,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='statistiques_hcs'
+    )
+    nombre_messages = models.PositiveBigIntegerField(default=0)
+    messages_par_type = models.JSONField(default=dict)  # type_message -> nombre
+    dernier_message = models.DateTimeField(null=True, blank=True, db_index=True)
+    date_verification = models.DateTimeField(null=True, blank=True)
+    date_mise_a_jour = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Statistiques de topic HCS"
+        verbose_name_plural = "Statistiques des topics HCS"
+
+    @property
+    def actif(self):
+        """True when the topic received a message in the last HCS_TOPIC_ACTIVE_DAYS days."""
+        return _topic_actif(self.dernier_message)
+
+    def __str__(self):
+        return f"{self.projet.topic_id} - {self.nombre_messages} messages"
+
+
+class StatistiquesHCS(models.Model):
+    """
+    Global HCS statistics (single row, pk=1), maintained with StatistiquesTopic.
+
+    `topics_actifs` is raised when a topic becomes active again and
+    recomputed by the periodic check, which also sees topics going inactive.
+    """
+    nombre_topics = models.PositiveIntegerField(default=0)
+    topics_actifs = models.PositiveIntegerField(default=0)
+    nombre_messages = models.PositiveBigIntegerField(default=0)
+    messages_par_type = models.JSONField(default=dict)
+    dernier_message = models.DateTimeField(null=True, blank=True)
+    date_verification = models.DateTimeField(null=True, blank=True)
+    date_mise_a_jour = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Statistiques HCS globales"
+        verbose_name_plural = "Statistiques HCS globales"
+
+    @classmethod
+    def courantes(cls):
+        return cls.objects.get_or_create(pk=1)[0]
+
+    def __str__(self):
+        return f"{self.nombre_topics} topics - {self.nombre_messages} messages"
+
+
+class OutboxHCS(models.Model):
+    """
+    Outgoing HCS message written in the same database transaction as the
+    business row it documents (Transaction, TransactionAdmin, PreuvePalier...).
+
+    Delivered asynchronously by the `drain_hcs_outbox` command (see
+    core/outbox.py), which writes the Hedera message id back to the linked
+    transaction and records the TopicMessage once the service confirms it.
+    """
+    STATUTS = [
+        ('en_attente', 'En attente'),
+        ('en_cours', 'En cours'),
+        ('envoye', 'Envoyé'),
+        ('echec', 'Échec'),
+    ]
+
+    cle_idempotence = models.CharField(max_length=100, unique=True)
+    topic_id = models.CharField(max_length=100)
+    type_message = models.CharField(max_length=100)
+    contenu = models.JSONField(default=dict)
+
+    projet = models.ForeignKey(Projet, on_delete=models.CASCADE, null=True, blank=True, related_name='outbox_hcs')
+    transaction = models.ForeignKey(Transaction, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    transaction_admin = models.ForeignKey(TransactionAdmin, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    utilisateur_email = models.EmailField(blank=True, null=True)
+    montant = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
+    transaction_hash = models.CharField(max_length=200, blank=True, null=True)
+
+    statut = models.CharField(max_length=20, choices=STATUTS, default='en_attente')
+    tentatives = models.PositiveIntegerField(default=0)
+    prochaine_tentative = models.DateTimeField(default=timezone.now)
+    derniere_erreur = models.TextField(blank=True)
+    hedera_message_id = models.CharField(max_length=150, blank=True, null=True)
+    date_creation = models.DateTimeField(auto_now_add=True)
+    date_envoi = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['date_creation']
+        verbose_name = "Message HCS sortant"
+        verbose_name_plural = "Messages HCS sortants"
+        indexes = [
+            models.Index(fields=['statut', 'prochaine_tentative'], name='outbox_hcs_a_envoyer_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.type_message} -> {self.topic_id} ({self.statut})"
+
+
+class PooledWallet(models.Model):
+    """
+    Hedera account created ahead of time by `refill_wallet_pool` (see core/wallets.py).
+
+    The private key is stored Fernet-encrypted until the account is claimed by a
+    user or a project; claiming copies the keys onto the owner and stamps
+    `date_attribution`, so an account is handed out at most once.
+    """
+    account_id = models.CharField(max_length=50, unique=True)
+    public_key = models.TextField()
+    private_key_chiffree = models.TextField()
+    date_creation = models.DateTimeField(auto_now_add=True)
+    date_attribution = models.DateTimeField(null=True, blank=True)
+    attribue_a = models.CharField(max_length=100, blank=True)  # ex: user:12, projet:5
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = "Wallet pré-créé"
+        verbose_name_plural = "Wallets pré-créés"
+        indexes = [
+            models.Index(fields=['date_attribution', 'id'], name='wallet_pool_disponible_idx'),
+        ]
+
+    @property
+    def disponible(self):
+        return self.date_attribution is None
+
+    def __str__(self):
+        return f"{self.account_id} ({self.attribue_a or 'disponible'})"
+
+
+class TraitementDon(models.Model):
+    """
+    Processing state of a donation submitted through `process_donation`.
+
+    The request only creates the pending Transaction and this row; the
+    `process_donations` worker (see core/donations.py) performs the HBAR
+    transfer, confirms the Transaction and queues the HCS message.
+    A transfer whose outcome is unknown (timeout, worker stopped mid-call)
+    ends in 'a_verifier' and is never replayed automatically.
+    """
+    ETAPES = [
+        ('a_transferer', 'À transférer'),
+        ('transfert_envoye', 'Transfert envoyé'),
+        ('termine', 'Terminé'),
+        ('echec', 'Échec'),
+        ('a_verifier', 'À vérifier'),
+    ]
+
+    transaction = models.OneToOneField(
+        Transaction,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='traitement'
+    )
+    etape = models.CharField(max_length=20, choices=ETAPES, default='a_transferer')
+    tentatives = models.PositiveIntegerField(default=0)
+    prochaine_tentative = models.DateTimeField(default=timezone.now)
+    erreur = models.TextField(blank=True)
+    date_creation = models.DateTimeField(auto_now_add=True)
+    date_mise_a_jour = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Traitement de don"
+        verbose_name_plural = "Traitements de dons"
+        indexes = [
+            models.Index(fields=['etape', 'prochaine_tentative'], name='traitement_don_a_faire_idx'),
+        ]
+
+    @property
+    def en_cours(self):
+        return self.etape in ('a_transferer', 'transfert_envoye')
+
+    def __str__(self):
+        return f"Don {self.transaction_id} ({self.etape})"
+
+
+class CurseurSynchronisation(models.Model):
+    """
+    Persistent position of an incremental job that pages through a table or
+    an external feed (e.g. `reconcile_transactions`, see core/reconciliation.py).
+
+    `position` is opaque to the model (last processed id, consensus timestamp...):
+    each run resumes after it instead of rescanning everything.
+    """
+    nom = models.CharField(max_length=100, unique=True)
+    position = models.CharField(max_length=100, blank=True)
+    date_mise_a_jour = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Curseur de synchronisation"
+        verbose_name_plural = "Curseurs de synchronisation"
+
+    def __str__(self):
+        return f"{self.nom} @ {self.position or 'début'}"
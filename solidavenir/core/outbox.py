@@ -0,0 +1,261 @@
+# core/outbox.py
+"""
+Outbox des messages HCS.
+
+Le chemin de requête n'appelle plus le microservice : `enqueue` écrit une
+ligne OutboxHCS dans la transaction base de données courante, à côté de la
+ligne métier (don, distribution, preuve...). La commande `drain_hcs_outbox`
+livre ensuite les messages par lots :
+
+- réclamation d'un lot (select_for_update, skip_locked quand la base le
+  permet) avec un bail : un worker arrêté en cours de route ne bloque pas
+  ses messages plus de HCS_OUTBOX_LEASE secondes ;
+- envoi avec au plus HCS_OUTBOX_CONCURRENCY appels simultanés ;
+- en cas d'échec, nouvel essai avec backoff exponentiel à jitter, jusqu'à
+  HCS_OUTBOX_MAX_ATTEMPTS tentatives ; les refus définitifs (4xx) passent
+  directement en échec ;
+- en cas de succès, hedera_message_id est reporté sur la Transaction /
+  TransactionAdmin liée et le TopicMessage est ajouté au buffer d'écriture
+  groupée (voir core/topics.py), vidé à la fin de chaque lot.
+
+Chaque message porte une clé d'idempotence (aussi incluse dans le contenu
+publié sous `idempotencyKey`) : un même événement n'est mis en file qu'une
+fois, et un message déjà marqué envoyé n'est jamais republié.
+"""
+import logging
+import random
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import connection, transaction as db_transaction
+from django.utils import timezone
+
+from . import topics
+from .hedera_client import HederaUnavailable, get_client
+
+logger = logging.getLogger(__name__)
+
+HASHSCAN_MESSAGE_URL = "https://hashscan.io/testnet/topic/{topic_id}?message={message_id}"
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# =============================================================================
+# MISE EN FILE (chemin de requête)
+# =============================================================================
+
+def cle_par_defaut(type_message, transaction=None, transaction_admin=None):
+    if transaction is not None:
+        return f"{type_message}:transaction:{transaction.pk}"
+    if transaction_admin is not None:
+        return f"{type_message}:transaction_admin:{transaction_admin.pk}"
+    return f"{type_message}:{uuid.uuid4().hex}"
+
+
+def enqueue(topic_id, type_message, contenu, projet=None, transaction=None, transaction_admin=None,
+            utilisateur_email=None, montant=None, transaction_hash=None, cle=None):
+    """
+    Met un message HCS en file dans la transaction courante.
+    Retourne la ligne OutboxHCS (existante si la clé a déjà été mise en file) ;
+    lève ValueError sans rien écrire si `topic_id` est vide.
+    """
+    from .models import OutboxHCS
+
+    if not topic_id:
+        # Vérifié avant toute écriture : ne pas casser la transaction de l'appelant
+        raise ValueError("Aucun topic HCS pour ce message")
+    cle = cle or cle_par_defaut(type_message, transaction, transaction_admin)
+    projet_id = projet.pk if projet is not None else topics.projet_id(topic_id)
+
+    message, created = OutboxHCS.objects.get_or_create(
+        cle_idempotence=cle,
+        defaults={
+            'topic_id': topic_id,
+            'type_message': type_message,
+            'contenu': {**contenu, 'idempotencyKey': cle},
+            'projet_id': projet_id,
+            'transaction': transaction,
+            'transaction_admin': transaction_admin,
+            'utilisateur_email': utilisateur_email,
+            'montant': montant,
+            'transaction_hash': transaction_hash,
+        },
+    )
+    if not created:
+        logger.info(f"Message HCS {cle} déjà en file")
+    return message
+
+
+def enqueue_don(topic_id, utilisateur_email, montant, transaction_hash, type_message="distribution_palier",
+                transaction=None, transaction_admin=None):
+    """Met en file le message HCS d'un don ou d'une distribution (format historique)."""
+    message_data = {
+        "type": type_message,
+        "utilisateur": utilisateur_email,
+        "montant": float(montant),
+        "date": timezone.now().isoformat(),
+        "transaction_hash": transaction_hash,
+        "timestamp": int(timezone.now().timestamp())
+    }
+    return enqueue(
+        topic_id,
+        type_message,
+        message_data,
+        transaction=transaction,
+        transaction_admin=transaction_admin,
+        utilisateur_email=utilisateur_email,
+        montant=montant,
+        transaction_hash=transaction_hash,
+    )
+
+
+# =============================================================================
+# LIVRAISON (worker)
+# =============================================================================
+
+def reclamer(limite):
+    """Réserve jusqu'à `limite` messages à envoyer (en attente, ou dont le bail a expiré)."""
+    from .models import OutboxHCS
+
+    maintenant = timezone.now()
+    with db_transaction.atomic():
+        a_envoyer = OutboxHCS.objects.filter(
+            statut__in=('en_attente', 'en_cours'),
+            prochaine_tentative__lte=maintenant,
+        ).order_by('prochaine_tentative', 'id')
+        a_envoyer = a_envoyer.select_for_update(
+            skip_locked=connection.features.has_select_for_update_skip_locked
+        )
+        messages = list(a_envoyer[:limite])
+        OutboxHCS.objects.filter(pk__in=[m.pk for m in messages]).update(
+            statut='en_cours',
+            prochaine_tentative=maintenant + timedelta(seconds=_setting('HCS_OUTBOX_LEASE', 120)),
+        )
+    return messages
+
+
+def _delai(tentatives):
+    base = _setting('HCS_OUTBOX_BACKOFF', 30)
+    plafond = _setting('HCS_OUTBOX_MAX_BACKOFF', 3600)
+    return min(plafond, base * 2 ** (tentatives - 1)) * random.uniform(0.5, 1.5)
+
+
+def _reporter(message, erreur, compter=True, definitif=False):
+    """Replanifie le message, ou le passe en échec quand les tentatives sont épuisées."""
+    from .models import OutboxHCS
+
+    tentatives = message.tentatives + (1 if compter else 0)
+    epuise = definitif or tentatives >= _setting('HCS_OUTBOX_MAX_ATTEMPTS', 8)
+    if compter:
+        delai = _delai(tentatives)
+    else:
+        # Circuit ouvert : le message n'est pas parti, on attend la réouverture
+        delai = get_client().breaker.retry_after() + random.uniform(0, 5)
+
+    OutboxHCS.objects.filter(pk=message.pk, statut='en_cours').update(
+        statut='echec' if epuise else 'en_attente',
+        tentatives=tentatives,
+        prochaine_tentative=timezone.now() + timedelta(seconds=delai),
+        derniere_erreur=str(erreur)[:2000],
+    )
+    if epuise:
+        logger.error(f"Message HCS {message.cle_idempotence} abandonné après {tentatives} tentative(s): {erreur}")
+    return 'echec' if epuise else 'reporte'
+
+
+def _confirmer(message, data):
+    """Marque le message envoyé et reporte l'id Hedera (une transaction), puis met le TopicMessage en buffer."""
+    from .models import OutboxHCS, Transaction, TransactionAdmin
+
+    message_id = data.get('messageId') or data.get('transactionId')
+    hashscan_url = HASHSCAN_MESSAGE_URL.format(topic_id=message.topic_id, message_id=message_id)
+
+    with db_transaction.atomic():
+        marque = OutboxHCS.objects.filter(pk=message.pk).exclude(statut='envoye').update(
+            statut='envoye',
+            hedera_message_id=message_id,
+            date_envoi=timezone.now(),
+            derniere_erreur='',
+        )
+        if not marque:
+            return 'doublon'
+
+        # update() : hedera_message_id n'intervient pas dans les résumés de financement
+        if message.transaction_id:
+            Transaction.objects.filter(pk=message.transaction_id).update(
+                hedera_message_id=message_id, hedera_message_hashscan_url=hashscan_url
+            )
+        if message.transaction_admin_id:
+            TransactionAdmin.objects.filter(pk=message.transaction_admin_id).update(
+                hedera_message_id=message_id, hedera_message_hashscan_url=hashscan_url
+            )
+    if message.projet_id:
+        topics.tampon.ajouter(
+            projet_id=message.projet_id,
+            type_message=message.type_message,
+            utilisateur_email=message.utilisateur_email,
+            montant=message.montant,
+            transaction_hash=message.transaction_hash,
+            contenu=message.contenu,
+        )
+    return 'envoye'
+
+
+def livrer(message):
+    """Envoie un message réclamé ; retourne 'envoye', 'reporte', 'echec' ou 'doublon'."""
+    try:
+        response = get_client().send_message(message.topic_id, message.contenu)
+    except HederaUnavailable as e:
+        return _reporter(message, e, compter=False)
+    except requests.RequestException as e:
+        return _reporter(message, e)
+
+    try:
+        data = response.json()
+    except ValueError:
+        data = {}
+
+    if response.status_code == 200 and data.get('success'):
+        return _confirmer(message, data)
+
+    erreur = data.get('error') or f"HTTP {response.status_code}"
+    # 4xx : message refusé (topic invalide...), le renvoyer ne changerait rien
+    return _reporter(message, erreur, definitif=400 <= response.status_code < 500)
+
+
+def _livrer_sans_erreur(message):
+    try:
+        return livrer(message)
+    except Exception as e:
+        logger.exception(f"Erreur livraison message HCS {message.cle_idempotence}")
+        return _reporter(message, e)
+
+
+def _livrer_dans_thread(message):
+    try:
+        return _livrer_sans_erreur(message)
+    finally:
+        connection.close()
+
+
+def drain(taille_lot=None, concurrence=None):
+    """Réclame et livre un lot ; retourne le nombre de messages par issue."""
+    taille_lot = taille_lot or _setting('HCS_OUTBOX_BATCH_SIZE', 50)
+    concurrence = concurrence or _setting('HCS_OUTBOX_CONCURRENCY', 4)
+
+    messages = reclamer(taille_lot)
+    if not messages:
+        return Counter()
+    try:
+        if concurrence <= 1:
+            return Counter(_livrer_sans_erreur(message) for message in messages)
+        with ThreadPoolExecutor(max_workers=concurrence) as pool:
+            return Counter(pool.map(_livrer_dans_thread, messages))
+    finally:
+        topics.tampon.vider()
@@ -0,0 +1,193 @@
+# core/paliers.py
+"""
+Service de gestion du calendrier des paliers d'un projet.
+
+Le montant minimum d'un palier est la somme des montants des paliers qui le
+précèdent. Toute opération (création, modification, suppression, réordonnancement)
+recalcule ces cumuls en une passe sur la liste ordonnée, puis écrit en lot
+(bulk_create / bulk_update) dans une seule transaction, paliers du projet verrouillés.
+
+L'état de distribution du projet (Projet.pret_distribution / palier_pret) est
+réévalué par `evaluer_disponibilite` après chaque changement de financement ou
+de calendrier, et lu tel quel par les tableaux de bord.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Sum
+
+from . import dashboard
+from .models import Palier, Projet
+
+REPARTITION_STANDARD = (40, 30, 30)
+
+
+def _paliers_ordonnes(projet_id):
+    """Paliers du projet dans l'ordre du calendrier, verrouillés jusqu'à la fin de la transaction."""
+    return list(
+        Palier.objects.select_for_update()
+        .filter(projet_id=projet_id)
+        .order_by('montant_minimum', 'id')
+    )
+
+
+def calculer_minimums(paliers):
+    """Affecte montant_minimum (cumul des paliers précédents) ; retourne les paliers modifiés."""
+    cumul = Decimal('0')
+    modifies = []
+    for palier in paliers:
+        if palier.montant_minimum != cumul:
+            palier.montant_minimum = cumul
+            modifies.append(palier)
+        cumul += palier.montant or 0
+    return modifies
+
+
+def _enregistrer_minimums(paliers):
+    modifies = calculer_minimums(paliers)
+    if modifies:
+        Palier.objects.bulk_update(modifies, ['montant_minimum'])
+    return modifies
+
+
+def evaluer_disponibilite(projet_id, instance=None):
+    """
+    Détermine le prochain palier distribuable (non transféré, montant couvert
+    par montant_engage - montant_distribue) et l'enregistre sur le projet.
+
+    Deux lectures, et une écriture seulement si l'état change.
+    Retourne True si un palier est prêt.
+    """
+    etat = Projet.objects.filter(pk=projet_id).values(
+        'montant_engage', 'montant_distribue', 'pret_distribution', 'palier_pret_id'
+    ).first()
+    if etat is None:
+        return False
+
+    disponible = (etat['montant_engage'] or 0) - (etat['montant_distribue'] or 0)
+    palier_pret_id = None
+    if disponible > 0:
+        palier_pret_id = (
+            Palier.objects.filter(projet_id=projet_id, transfere=False, montant__lte=disponible)
+            .order_by('montant_minimum', 'id')
+            .values_list('id', flat=True)
+            .first()
+        )
+    pret = palier_pret_id is not None
+
+    if (pret, palier_pret_id) != (etat['pret_distribution'], etat['palier_pret_id']):
+        # update() : pas de Projet.save() (donc pas de réévaluation en boucle)
+        Projet.objects.filter(pk=projet_id).update(pret_distribution=pret, palier_pret_id=palier_pret_id)
+        if pret != etat['pret_distribution']:
+            # Compteur "paliers à distribuer" du tableau de bord
+            dashboard.invalider()
+
+    if instance is not None:
+        instance.pret_distribution = pret
+        instance.palier_pret_id = palier_pret_id
+    return pret
+
+
+def montant_assigne(projet, exclure=None):
+    """Somme des montants des paliers du projet (une requête)."""
+    paliers = Palier.objects.filter(projet=projet)
+    if exclure is not None:
+        paliers = paliers.exclude(pk=exclure.pk)
+    return paliers.aggregate(total=Sum('montant'))['total'] or Decimal('0')
+
+
+def remplacer_paliers(projet, definitions):
+    """
+    Remplace tous les paliers du projet par `definitions`
+    (dicts titre/description/pourcentage/montant) en un bulk_create.
+    """
+    with transaction.atomic():
+        _paliers_ordonnes(projet.pk)  # verrou
+        Palier.objects.filter(projet=projet).delete()
+        paliers = [Palier(projet=projet, **definition) for definition in definitions]
+        calculer_minimums(paliers)
+        paliers = Palier.objects.bulk_create(paliers)
+        evaluer_disponibilite(projet.pk)
+        return paliers
+
+
+def creer_paliers_standard(projet, pourcentages=REPARTITION_STANDARD):
+    """
+    Crée la répartition standard (40%-30%-30% par défaut) du montant demandé.
+
+    Les montants sont arrondis à l'unité (comme en base) ; l'écart d'arrondi
+    est porté par le dernier palier pour que le total égale le montant demandé.
+    """
+    montant_demande = projet.montant_demande or Decimal('0')
+    definitions = []
+    reste = montant_demande
+    for index, pct in enumerate(pourcentages):
+        if index == len(pourcentages) - 1:
+            montant = reste
+        else:
+            montant = (montant_demande * Decimal(pct) / 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP)
+            reste -= montant
+        definitions.append({'titre': f"Palier {index + 1}", 'pourcentage': Decimal(pct), 'montant': montant})
+    return remplacer_paliers(projet, definitions)
+
+
+def ajouter_palier(projet, palier):
+    """Ajoute `palier` (non sauvegardé) en fin de calendrier."""
+    with transaction.atomic():
+        existants = _paliers_ordonnes(projet.pk)
+        palier.projet = projet
+        palier.montant_minimum = sum((p.montant for p in existants), Decimal('0'))
+        palier.save()
+        evaluer_disponibilite(projet.pk)
+        return palier
+
+
+def modifier_palier(palier):
+    """Sauvegarde `palier` et recalcule les cumuls des paliers suivants."""
+    with transaction.atomic():
+        paliers = [palier if p.pk == palier.pk else p for p in _paliers_ordonnes(palier.projet_id)]
+        palier.save()
+        _enregistrer_minimums(paliers)
+        evaluer_disponibilite(palier.projet_id)
+        return palier
+
+
+def supprimer_palier(palier):
+    """Supprime `palier` et recalcule les cumuls des paliers restants."""
+    with transaction.atomic():
+        paliers = _paliers_ordonnes(palier.projet_id)
+        # Suppression au niveau queryset : Palier.delete() recalculerait une seconde fois
+        Palier.objects.filter(pk=palier.pk).delete()
+        _enregistrer_minimums([p for p in paliers if p.pk != palier.pk])
+        evaluer_disponibilite(palier.projet_id)
+
+
+def recalculer_minimums(projet_id):
+    """Recalcule les cumuls dans l'ordre actuel du calendrier."""
+    with transaction.atomic():
+        modifies = _enregistrer_minimums(_paliers_ordonnes(projet_id))
+        evaluer_disponibilite(projet_id)
+        return modifies
+
+
+def reordonner_paliers(projet, palier_ids):
+    """
+    Réordonne le calendrier selon `palier_ids` et recalcule les cumuls.
+    Les paliers déjà transférés doivent garder leur position.
+    """
+    with transaction.atomic():
+        paliers = _paliers_ordonnes(projet.pk)
+        par_id = {p.pk: p for p in paliers}
+        palier_ids = [int(pk) for pk in palier_ids]
+        if sorted(palier_ids) != sorted(par_id):
+            raise ValidationError("La liste des paliers ne correspond pas à ce projet.")
+
+        nouvel_ordre = [par_id[pk] for pk in palier_ids]
+        for ancien, nouveau in zip(paliers, nouvel_ordre):
+            if ancien.transfere and ancien.pk != nouveau.pk:
+                raise ValidationError(f"Le palier '{ancien.titre}' a déjà été transféré et ne peut pas être déplacé.")
+
+        _enregistrer_minimums(nouvel_ordre)
+        evaluer_disponibilite(projet.pk)
+        return nouvel_ordre
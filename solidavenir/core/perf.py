@@ -0,0 +1,242 @@
+# core/perf.py
+"""
+Instrumentation des performances par vue.
+
+Pour chaque vue résolue, PerformanceMiddleware mesure :
+    - le temps total de la requête,
+    - le nombre et la durée des requêtes SQL, et les requêtes dupliquées,
+    - le temps passé dans les appels sortants, par catégorie :
+      'hedera' (microservice Node), 'coingecko', 'smtp', 'http' (autres).
+
+Les mesures alimentent des fenêtres glissantes par vue (PERF_WINDOW dernières
+requêtes), exportées en JSON par la vue `performances` (réservée aux admins)
+et, avec PERF_LOG_REQUESTS, en une ligne de log structurée par requête.
+Un avertissement est journalisé quand une vue dépasse son budget
+(PERF_BUDGETS, sinon PERF_DEFAULT_BUDGET).
+"""
+import json
+import logging
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Bornes (ms) des histogrammes exportés
+BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+CATEGORIES = ('hedera', 'coingecko', 'smtp', 'http')
+
+_local = threading.local()
+_lock = threading.Lock()
+_samples = defaultdict(lambda: deque(maxlen=window()))
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def window():
+    return int(_setting('PERF_WINDOW', 500))
+
+
+def budget_for(view_name):
+    budgets = _setting('PERF_BUDGETS', {})
+    return budgets.get(view_name, _setting('PERF_DEFAULT_BUDGET', {}))
+
+
+# =============================================================================
+# MESURES DE LA REQUÊTE COURANTE
+# =============================================================================
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.sql_statements = Counter()
+        self.external = Counter()        # catégorie -> secondes
+        self.external_calls = Counter()  # catégorie -> nombre d'appels
+
+    @property
+    def duplicates(self):
+        return sum(n - 1 for n in self.sql_statements.values() if n > 1)
+
+    def as_sample(self):
+        return {
+            'wall_ms': (time.perf_counter() - self.started) * 1000,
+            'sql_count': self.sql_count,
+            'sql_ms': self.sql_time * 1000,
+            'sql_duplicates': self.duplicates,
+            **{f'{cat}_ms': self.external[cat] * 1000 for cat in CATEGORIES},
+            **{f'{cat}_calls': self.external_calls[cat] for cat in CATEGORIES},
+        }
+
+
+def current():
+    return getattr(_local, 'metrics', None)
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    metrics = current()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.sql_time += time.perf_counter() - started
+        metrics.sql_count += 1
+        metrics.sql_statements[(sql, repr(params))] += 1
+
+
+class track_external:
+    """Context manager : impute la durée du bloc à une catégorie d'appel sortant."""
+
+    def __init__(self, category):
+        self.category = category
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        metrics = current()
+        if metrics is not None:
+            metrics.external[self.category] += time.perf_counter() - self.started
+            metrics.external_calls[self.category] += 1
+        return False
+
+
+def categorize_url(url):
+    """Catégorie d'un appel HTTP sortant d'après son hôte."""
+    netloc = urlsplit(url).netloc
+    hedera_netloc = urlsplit(_setting('HEDERA_SERVICE_URL', '')).netloc
+    if netloc in ('localhost:3001', '127.0.0.1:3001') or (hedera_netloc and netloc == hedera_netloc):
+        return 'hedera'
+    if 'coingecko' in netloc:
+        return 'coingecko'
+    return 'http'
+
+
+# =============================================================================
+# INSTALLATION (appelée une fois depuis CoreConfig.ready)
+# =============================================================================
+
+_installed = False
+
+
+def install():
+    """Instrumente requests (Session.send) et le backend SMTP de Django."""
+    global _installed
+    if _installed or not _setting('PERF_INSTRUMENTATION', True):
+        return
+    _installed = True
+
+    import requests
+    from django.core.mail.backends.smtp import EmailBackend
+
+    original_send = requests.Session.send
+
+    def send(self, request, **kwargs):
+        with track_external(categorize_url(request.url)):
+            return original_send(self, request, **kwargs)
+
+    requests.Session.send = send
+
+    original_send_messages = EmailBackend.send_messages
+
+    def send_messages(self, email_messages):
+        with track_external('smtp'):
+            return original_send_messages(self, email_messages)
+
+    EmailBackend.send_messages = send_messages
+
+
+def begin_request():
+    _local.metrics = RequestMetrics()
+    _local.wrappers = []
+    for alias in connections:
+        wrapper = connections[alias].execute_wrapper(_sql_wrapper)
+        wrapper.__enter__()
+        _local.wrappers.append(wrapper)
+
+
+def end_request(view_name):
+    """Clôt la mesure, l'enregistre pour `view_name` et vérifie le budget."""
+    metrics = current()
+    for wrapper in reversed(getattr(_local, 'wrappers', [])):
+        wrapper.__exit__(None, None, None)
+    _local.metrics = None
+    _local.wrappers = []
+    if metrics is None or view_name is None:
+        return None
+
+    sample = metrics.as_sample()
+    with _lock:
+        _samples[view_name].append(sample)
+
+    if _setting('PERF_LOG_REQUESTS', False):
+        logger.info(json.dumps({'view': view_name, **{k: round(v, 2) for k, v in sample.items()}}))
+
+    depassements = {
+        metric: (round(sample[metric], 1), limit)
+        for metric, limit in budget_for(view_name).items()
+        if metric in sample and sample[metric] > limit
+    }
+    if depassements:
+        logger.warning(f"Budget de performance dépassé pour {view_name}: {depassements}")
+    return sample
+
+
+# =============================================================================
+# EXPORT
+# =============================================================================
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _histogram(values):
+    counts = [0] * (len(BUCKETS_MS) + 1)
+    for value in values:
+        for index, bound in enumerate(BUCKETS_MS):
+            if value <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [f"<={bound}" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+    return dict(zip(labels, counts))
+
+
+def snapshot():
+    """Statistiques glissantes par vue : percentiles, moyennes et histogramme du temps total."""
+    with _lock:
+        samples = {view: list(values) for view, values in _samples.items()}
+
+    report = {}
+    for view, values in samples.items():
+        stats = {'count': len(values), 'budget': budget_for(view)}
+        for metric in values[0]:
+            series = sorted(v[metric] for v in values)
+            stats[metric] = {
+                'avg': round(sum(series) / len(series), 2),
+                'p50': round(_percentile(series, 50), 2),
+                'p95': round(_percentile(series, 95), 2),
+                'max': round(series[-1], 2),
+            }
+        stats['wall_ms']['histogram'] = _histogram(v['wall_ms'] for v in values)
+        report[view] = stats
+    return report
+
+
+def reset():
+    with _lock:
+        _samples.clear()
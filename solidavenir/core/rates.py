@@ -0,0 +1,252 @@
+# core/rates.py
+"""
+Fournisseur de taux de conversion HBAR/USD/FCFA.
+
+Les threads de requête ne font jamais d'appel sortant : ils lisent une entrée
+partagée (cache Django) qui porte une date d'expiration "souple" et une date
+d'expiration "dure". Un thread de rafraîchissement en arrière-plan (ou la
+commande ``refresh_rates``) remplace l'entrée avant qu'elle ne devienne périmée.
+
+Ordre de repli quand la source est indisponible :
+    1. entrée fraîche            -> source = 'live'
+    2. entrée périmée (< dure)   -> source = 'stale'
+    3. dernier taux connu        -> source = 'last_known'
+    4. taux par défaut (settings)-> source = 'default'
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'taux:hbar_usd'
+LAST_KNOWN_KEY = 'taux:hbar_usd:last_known'
+LOCK_KEY = 'taux:hbar_usd:lock'
+
+COINGECKO_URL = "https://api.coingecko.com/api/v3/simple/price"
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def soft_ttl():
+    """Durée (s) pendant laquelle un taux est considéré comme frais."""
+    return int(_setting('RATE_SOFT_TTL', 300))
+
+
+def hard_ttl():
+    """Durée (s) au-delà de laquelle un taux n'est plus servi du tout."""
+    return int(_setting('RATE_HARD_TTL', 3600))
+
+
+def refresh_margin():
+    """Avance (s) prise par le rafraîchissement sur l'expiration souple."""
+    return int(_setting('RATE_REFRESH_MARGIN', 60))
+
+
+@dataclass(frozen=True)
+class RateSnapshot:
+    """Photographie immuable des taux utilisée pour toute une requête."""
+    hbar_usd: Decimal
+    usd_fcfa: Decimal
+    fetched_at: float
+    source: str
+
+    @property
+    def hbar_fcfa(self):
+        """Taux 1 HBAR -> FCFA."""
+        return self.hbar_usd * self.usd_fcfa
+
+    @property
+    def age(self):
+        """Âge du taux en secondes."""
+        return max(0.0, time.time() - self.fetched_at)
+
+    @property
+    def is_stale(self):
+        return self.source != 'live'
+
+
+def _default_snapshot():
+    return RateSnapshot(
+        hbar_usd=Decimal(str(_setting('RATE_DEFAULT_HBAR_USD', '0.07'))),
+        usd_fcfa=get_usd_to_fcfa_rate(),
+        fetched_at=0.0,
+        source='default',
+    )
+
+
+def get_usd_to_fcfa_rate():
+    """Taux USD/FCFA (fixe pour l'Afrique de l'Ouest, configurable)."""
+    return Decimal(str(_setting('RATE_USD_FCFA', '600')))
+
+
+def _snapshot_from_entry(entry, source):
+    return RateSnapshot(
+        hbar_usd=Decimal(entry['hbar_usd']),
+        usd_fcfa=get_usd_to_fcfa_rate(),
+        fetched_at=entry['fetched_at'],
+        source=source,
+    )
+
+
+# =============================================================================
+# SOURCE EXTERNE (appelée uniquement hors des threads de requête)
+# =============================================================================
+
+def fetch_hbar_usd():
+    """Interroge CoinGecko et retourne le prix HBAR/USD."""
+    response = requests.get(
+        COINGECKO_URL,
+        params={"ids": "hedera-hashgraph", "vs_currencies": "usd"},
+        timeout=int(_setting('RATE_FETCH_TIMEOUT', 5)),
+    )
+    response.raise_for_status()
+    data = response.json()
+    return Decimal(str(data["hedera-hashgraph"]["usd"]))
+
+
+def refresh_rate(force=False):
+    """
+    Récupère un nouveau taux et remplace l'entrée partagée.
+
+    Un verrou en cache évite que plusieurs processus interrogent la source en
+    même temps ; avec force=True, la source est interrogée même si un autre
+    processus le détient (il reste alors à ce processus). Retourne le
+    RateSnapshot enregistré, ou None si aucun rafraîchissement n'a eu lieu
+    (verrou pris ou source en erreur).
+    """
+    verrou = cache.add(LOCK_KEY, os.getpid(), timeout=30)
+    if not verrou and not force:
+        return None
+
+    try:
+        rate = fetch_hbar_usd()
+    except Exception as e:
+        logger.error(f"Erreur récupération taux HBAR/USD: {e}")
+        return None
+    finally:
+        if verrou:
+            cache.delete(LOCK_KEY)
+
+    entry = {'hbar_usd': str(rate), 'fetched_at': time.time()}
+    cache.set(CACHE_KEY, entry, hard_ttl())
+    # Dernier taux connu, sans expiration : utilisé si la source tombe longtemps
+    cache.set(LAST_KNOWN_KEY, entry, None)
+    _refresher_wake.clear()
+    logger.info(f"Taux HBAR/USD rafraîchi: {rate}")
+    return _snapshot_from_entry(entry, 'live')
+
+
+# =============================================================================
+# RAFRAÎCHISSEMENT EN ARRIÈRE-PLAN
+# =============================================================================
+
+_refresher_lock = threading.Lock()
+_refresher_pid = None
+_refresher_wake = threading.Event()
+_next_attempt = 0.0
+
+
+def _refresher_loop():
+    global _next_attempt
+    while True:
+        _refresher_wake.clear()
+        entry = cache.get(CACHE_KEY)
+        now = time.time()
+        refresh_at = (entry['fetched_at'] + soft_ttl() - refresh_margin()) if entry else now
+
+        if now >= refresh_at:
+            if refresh_rate() is None:
+                # Source en erreur ou autre processus en cours : on réessaie plus tard
+                delay = max(5, refresh_margin() // 4)
+                _next_attempt = now + delay
+            else:
+                delay = max(1, soft_ttl() - refresh_margin())
+        else:
+            delay = refresh_at - now
+
+        _refresher_wake.wait(timeout=delay)
+
+
+def ensure_refresher():
+    """Démarre (une fois par processus) le thread de rafraîchissement."""
+    global _refresher_pid
+    if not _setting('RATE_BACKGROUND_REFRESH', True):
+        return
+    # Le pid protège contre les workers forkés après le démarrage du thread
+    if _refresher_pid == os.getpid():
+        return
+    with _refresher_lock:
+        if _refresher_pid == os.getpid():
+            return
+        thread = threading.Thread(target=_refresher_loop, name='rate-refresher', daemon=True)
+        thread.start()
+        _refresher_pid = os.getpid()
+
+
+def _request_refresh():
+    ensure_refresher()
+    # Pas de réveil pendant le délai d'attente qui suit un échec de la source
+    if time.time() >= _next_attempt:
+        _refresher_wake.set()
+
+
+# =============================================================================
+# LECTURE (threads de requête)
+# =============================================================================
+
+_local = threading.local()
+
+
+def begin_request():
+    """Ouvre une portée de requête : le premier snapshot lu y est mémorisé."""
+    _local.in_request = True
+    _local.snapshot = None
+
+
+def end_request():
+    _local.in_request = False
+    _local.snapshot = None
+
+
+def _read_snapshot():
+    now = time.time()
+    entry = cache.get(CACHE_KEY)
+
+    if entry is not None:
+        age = now - entry['fetched_at']
+        if age < hard_ttl():
+            if age >= soft_ttl() - refresh_margin():
+                _request_refresh()
+            return _snapshot_from_entry(entry, 'live' if age < soft_ttl() else 'stale')
+
+    _request_refresh()
+
+    last_known = cache.get(LAST_KNOWN_KEY)
+    if last_known is not None:
+        return _snapshot_from_entry(last_known, 'last_known')
+
+    return _default_snapshot()
+
+
+def get_rate_snapshot():
+    """
+    Retourne le snapshot de taux courant, sans jamais appeler la source externe.
+
+    Dans une requête HTTP (voir RateSnapshotMiddleware), le même snapshot est
+    réutilisé pour toutes les conversions afin que la page soit cohérente.
+    """
+    if getattr(_local, 'in_request', False):
+        if _local.snapshot is None:
+            _local.snapshot = _read_snapshot()
+        return _local.snapshot
+    return _read_snapshot()
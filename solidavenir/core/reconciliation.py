@@ -0,0 +1,347 @@
+# core/reconciliation.py
+"""
+Réconciliation des transactions avec le ledger (commande `reconcile_transactions`).
+
+`statut` et `hedera_status` ne sont écrits qu'une fois, à la création : les
+contributions déclarées par handle_contribution restent 'en_attente', comme
+les dons dont l'issue du transfert est inconnue (TraitementDon 'a_verifier').
+Chaque passe :
+
+- lit, par id croissant et après la position du curseur persistant
+  (CurseurSynchronisation CURSEUR), les transactions à contrôler : en
+  attente, ou confirmées sans statut Hedera. Seules les nouvelles lignes
+  sont lues, jamais toute la table ;
+- les vérifie sur le mirror node (HEDERA_MIRROR_URL, servi aussi par le
+  remplaçant local), avec au plus RECONCILIATION_CONCURRENCY appels :
+    * avec hash : GET /api/v1/transactions/{id}, résultat du consensus ;
+    * sans hash : un appel par compte contributeur pour les transferts
+      autour des dates du lot (± RECONCILIATION_WINDOW), rapprochés par
+      destinataire et montant exact ;
+- écrit les issues par bulk_update, met en file le message HCS des dons
+  confirmés et reconstruit les résumés de financement touchés.
+
+Une transaction sans trace sur le ledger n'est déclarée absente qu'après
+RECONCILIATION_WINDOW. Les plus récentes, celles que le worker
+process_donations est encore en train de transférer et celles dont la
+vérification a échoué (erreur du mirror node, plus de PAGES_MAX pages de
+transferts pour le compte) restent en suspens : le curseur s'arrête sur la
+première d'entre elles et elles seront relues à la passe suivante.
+"""
+import logging
+import re
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import requests
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction as db_transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import funding, outbox
+from .hedera_client import get_mirror_client
+
+logger = logging.getLogger(__name__)
+
+CURSEUR = 'reconciliation_transactions'
+TINYBARS = Decimal(10) ** 8
+HASHSCAN_TX_URL = "https://hashscan.io/testnet/tx/{transaction_id}"
+PAGES_MAX = 10  # pages de transferts lues par compte et par lot
+
+# Issues qui ne permettent pas encore de conclure : le curseur s'arrête dessus
+EN_SUSPENS = ('en_attente', 'en_traitement', 'erreur_mirror')
+CHAMPS = ('statut', 'hedera_status', 'hedera_transaction_hash', 'hedera_hashscan_url',
+          'date_verification', 'notes_verification')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def mirror_id(transaction_hash):
+    """0.0.X@secondes.nanos (SDK) -> 0.0.X-secondes-nanos (mirror node) ; None si autre format."""
+    match = re.fullmatch(r'(\d+\.\d+\.\d+)@(\d+)\.(\d+)', transaction_hash or '')
+    return f"{match.group(1)}-{match.group(2)}-{match.group(3)}" if match else None
+
+
+def hash_sdk(transaction_id):
+    """0.0.X-secondes-nanos (mirror node) -> 0.0.X@secondes.nanos (format enregistré en base)."""
+    payer, secondes, nanos = transaction_id.rsplit('-', 2)
+    return f"{payer}@{secondes}.{nanos}"
+
+
+def _horodatage(date):
+    return f"{date.timestamp():.9f}"
+
+
+def _date_consensus(horodatage):
+    return datetime.fromtimestamp(float(horodatage), tz=dt_timezone.utc)
+
+
+def a_controler():
+    from .models import Transaction
+
+    return Transaction.objects.filter(Q(statut='en_attente') | Q(statut='confirme', hedera_status__isnull=True))
+
+
+def _en_traitement(transaction):
+    """True si le worker process_donations n'en a pas fini avec ce don."""
+    try:
+        return transaction.traitement.en_cours
+    except ObjectDoesNotExist:
+        return False
+
+
+def _destinataire(transaction):
+    if transaction.destination == 'association' and transaction.association_id:
+        return transaction.association.user.hedera_account_id
+    if transaction.destination == 'project' and transaction.projet_id:
+        return transaction.projet.hedera_account_id
+    return settings.HEDERA_OPERATOR_ID
+
+
+# =============================================================================
+# APPELS MIRROR NODE (threads, sans accès base)
+# =============================================================================
+
+def _transaction_mirror(client, identifiant):
+    """Transaction du mirror node, ou None si elle n'y est pas (encore)."""
+    response = client.mirror_transaction(identifiant)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    # Les transactions enfants éventuelles suivent la transaction mère
+    transactions = response.json().get('transactions') or []
+    return transactions[0] if transactions else None
+
+
+def _transferts(client, compte, debut, fin):
+    """
+    Transferts réussis impliquant `compte` entre debut et fin (ordre de
+    consensus). Lève ValueError s'il reste des pages après PAGES_MAX : une
+    liste tronquée ne permet pas de conclure qu'un transfert est absent.
+    """
+    response = client.mirror_transactions({
+        'account.id': compte,
+        'transactiontype': 'CRYPTOTRANSFER',
+        'result': 'success',
+        'timestamp': [f"gte:{_horodatage(debut)}", f"lte:{_horodatage(fin)}"],
+        'order': 'asc',
+        'limit': 100,
+    })
+    transferts = []
+    for page in range(PAGES_MAX):
+        if page:
+            response = client.mirror_transactions(path=suivant)
+        response.raise_for_status()
+        data = response.json()
+        transferts.extend(data.get('transactions') or [])
+        suivant = (data.get('links') or {}).get('next')
+        if not suivant:
+            return transferts
+    raise ValueError(f"plus de {PAGES_MAX} pages de transferts pour {compte}, liste incomplète")
+
+
+# =============================================================================
+# CONTRÔLE D'UN LOT
+# =============================================================================
+
+def _rapprocher(transactions, transferts, pris, fenetre):
+    """Associe à chaque transaction sans hash le premier transfert libre de même montant et destinataire."""
+    trouvees = {}
+    for transaction in sorted(transactions, key=lambda t: t.date_transaction):
+        compte = transaction.contributeur.hedera_account_id
+        destinataire = _destinataire(transaction)
+        montant = int(transaction.montant * TINYBARS)
+        for transfert in transferts:
+            hash_transfert = hash_sdk(transfert['transaction_id'])
+            if hash_transfert in pris:
+                continue
+            if abs(_date_consensus(transfert['consensus_timestamp']) - transaction.date_transaction) > fenetre:
+                continue
+            montants = {t['account']: t['amount'] for t in transfert.get('transfers', [])}
+            if montants.get(destinataire) == montant and montants.get(compte, 0) < 0:
+                trouvees[transaction.pk] = transfert
+                pris.add(hash_transfert)
+                break
+    return trouvees
+
+
+def controler_lot(transactions, concurrence=None):
+    """Vérifie `transactions` sur le mirror node ; retourne {pk: (issue, transaction mirror ou None)}."""
+    from .models import Transaction
+
+    concurrence = concurrence or _setting('RECONCILIATION_CONCURRENCY', 8)
+    fenetre = timedelta(seconds=_setting('RECONCILIATION_WINDOW', 3600))
+    maintenant = timezone.now()
+    client = get_mirror_client()
+
+    resultats = {}
+    par_hash, par_compte = {}, defaultdict(list)
+    for transaction in transactions:
+        identifiant = mirror_id(transaction.hedera_transaction_hash)
+        if _en_traitement(transaction):
+            resultats[transaction.pk] = ('en_traitement', None)
+        elif identifiant:
+            par_hash[transaction.pk] = identifiant
+        elif transaction.contributeur.hedera_account_id:
+            par_compte[transaction.contributeur.hedera_account_id].append(transaction)
+
+    taches = {('hash', pk): (_transaction_mirror, client, identifiant) for pk, identifiant in par_hash.items()}
+    for compte, lot in par_compte.items():
+        debut = min(t.date_transaction for t in lot) - fenetre
+        fin = min(maintenant, max(t.date_transaction for t in lot) + fenetre)
+        taches[('compte', compte)] = (_transferts, client, compte, debut, fin)
+
+    reponses, en_erreur = {}, set()
+    with ThreadPoolExecutor(max_workers=concurrence) as pool:
+        futures = {cle: pool.submit(*tache) for cle, tache in taches.items()}
+    for cle, future in futures.items():
+        try:
+            reponses[cle] = future.result()
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"Réconciliation: mirror node en échec pour {cle[1]} ({e})")
+            en_erreur.add(cle)
+
+    # Transferts déjà rattachés à une autre transaction : jamais rapprochés une seconde fois
+    hashes = {hash_sdk(t['transaction_id']) for (nature, _), r in reponses.items() if nature == 'compte' for t in r}
+    pris = set(Transaction.objects.filter(hedera_transaction_hash__in=hashes).values_list('hedera_transaction_hash', flat=True))
+    trouvees = {pk: reponses.get(('hash', pk)) for pk in par_hash}
+    for compte, lot in par_compte.items():
+        if ('compte', compte) not in en_erreur:
+            trouvees.update(_rapprocher(lot, reponses[('compte', compte)], pris, fenetre))
+
+    for transaction in transactions:
+        if transaction.pk in resultats:
+            continue
+        if ('hash', transaction.pk) in en_erreur or ('compte', transaction.contributeur.hedera_account_id) in en_erreur:
+            resultats[transaction.pk] = ('erreur_mirror', None)
+            continue
+        trouvee = trouvees.get(transaction.pk)
+        if trouvee is not None:
+            issue = 'confirme' if trouvee.get('result') == 'SUCCESS' else 'echec'
+        elif maintenant - transaction.date_transaction < fenetre:
+            issue = 'en_attente'
+        else:
+            # Déjà confirmée sans trace : signalée, pas annulée (le testnet est réinitialisé périodiquement)
+            issue = 'non_trouvee' if transaction.statut == 'confirme' else 'absente'
+        resultats[transaction.pk] = (issue, trouvee)
+    return resultats
+
+
+def _appliquer(transaction, issue, trouvee, maintenant):
+    """Reporte l'issue sur la transaction (sans sauvegarde) ; False si rien ne change."""
+    if issue in EN_SUSPENS:
+        return False
+    if issue == 'confirme':
+        transaction_hash = hash_sdk(trouvee['transaction_id'])
+        transaction.statut = 'confirme'
+        transaction.hedera_status = 'SUCCESS'
+        transaction.hedera_transaction_hash = transaction.hedera_transaction_hash or transaction_hash
+        transaction.hedera_hashscan_url = (transaction.hedera_hashscan_url
+                                           or HASHSCAN_TX_URL.format(transaction_id=transaction_hash))
+        note = f"confirmée sur Hedera ({transaction_hash})"
+    elif issue == 'echec':
+        transaction.statut = 'erreur'
+        transaction.hedera_status = str(trouvee.get('result'))[:20]
+        note = f"refusée par le consensus ({trouvee.get('result')})"
+    elif issue == 'absente':
+        transaction.statut = 'erreur'
+        transaction.hedera_status = 'NOT_FOUND'
+        note = "aucun transfert correspondant sur Hedera"
+    else:
+        transaction.hedera_status = 'NOT_FOUND'
+        note = "transaction confirmée introuvable sur le mirror node"
+    transaction.date_verification = maintenant
+    ligne = f"Réconciliation {maintenant:%Y-%m-%d %H:%M}: {note}"
+    transaction.notes_verification = f"{transaction.notes_verification}\n{ligne}" if transaction.notes_verification else ligne
+    return True
+
+
+def enregistrer(transactions, resultats):
+    """Écrit les issues conclues (bulk_update) et leurs suites ; retourne les transactions modifiées."""
+    from .models import TraitementDon, Transaction
+
+    maintenant = timezone.now()
+    modifiees = [t for t in transactions if _appliquer(t, *resultats[t.pk], maintenant)]
+    if not modifiees:
+        return []
+
+    with db_transaction.atomic():
+        Transaction.objects.bulk_update(modifiees, CHAMPS, batch_size=500)
+        confirmees = [t.pk for t in modifiees if t.statut == 'confirme']
+        refusees = [t.pk for t in modifiees if t.statut == 'erreur']
+        # Dons au transfert incertain : le contrôle manuel n'est plus nécessaire
+        TraitementDon.objects.filter(pk__in=confirmees, etape='a_verifier').update(etape='termine', erreur='')
+        TraitementDon.objects.filter(pk__in=refusees, etape='a_verifier').update(etape='echec')
+
+        for transaction in modifiees:
+            if (transaction.statut == 'confirme' and transaction.projet_id and transaction.projet.topic_id
+                    and not transaction.hedera_message_id):
+                outbox.enqueue_don(
+                    transaction.projet.topic_id,
+                    transaction.contributeur.email,
+                    transaction.montant,
+                    transaction.hedera_transaction_hash,
+                    transaction=transaction,
+                )
+
+        # bulk_update ne passe pas par les signaux : résumés reconstruits pour les projets touchés
+        projets = {t.projet_id for t in modifiees if t.projet_id}
+        if projets:
+            funding.reconstruire_resumes(projet_ids=sorted(projets))
+    return modifiees
+
+
+# =============================================================================
+# PASSE
+# =============================================================================
+
+def reconcilier(taille_lot=None, concurrence=None):
+    """
+    Contrôle les transactions après le curseur, par lots, jusqu'à la fin de la
+    table ; avance le curseur jusqu'à la première transaction en suspens.
+    Retourne {issue: nombre}.
+    """
+    from .models import CurseurSynchronisation
+
+    taille_lot = taille_lot or _setting('RECONCILIATION_BATCH_SIZE', 200)
+    curseur, _ = CurseurSynchronisation.objects.get_or_create(nom=CURSEUR)
+    position = lecture = int(curseur.position or 0)
+    bloque = False
+    issues = Counter()
+
+    while True:
+        lot = list(
+            a_controler()
+            .filter(pk__gt=lecture)
+            .select_related('contributeur', 'projet', 'association__user', 'traitement')
+            .order_by('pk')[:taille_lot]
+        )
+        if not lot:
+            break
+        resultats = controler_lot(lot, concurrence)
+        enregistrer(lot, resultats)
+        issues.update(issue for issue, _ in resultats.values())
+
+        for transaction in lot:
+            bloque = bloque or resultats[transaction.pk][0] in EN_SUSPENS
+            if not bloque:
+                position = transaction.pk
+        if str(position) != curseur.position:
+            curseur.position = str(position)
+            curseur.save(update_fields=['position', 'date_mise_a_jour'])
+        lecture = lot[-1].pk
+        if len(lot) < taille_lot:
+            break
+    return issues
+
+
+def reinitialiser(position=0):
+    """Repositionne le curseur (0 : tout recontrôler)."""
+    from .models import CurseurSynchronisation
+
+    CurseurSynchronisation.objects.update_or_create(nom=CURSEUR, defaults={'position': str(position)})
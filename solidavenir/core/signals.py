@@ -27,9 +27,115 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from .models import Projet,AuditLog
 
+# L'état de distribution des paliers (Projet.pret_distribution) est réévalué
+# par Projet.save() et core/paliers.py uniquement quand le financement change.
+
+
+
+from django.db import transaction as db_transaction
+from django.db.models.signals import pre_save, pre_delete, post_delete
+from .models import Transaction
+from . import funding
+
+# L'état chargé est mémorisé par Transaction.from_db (champs suivis non différés)
+
+@receiver(pre_save, sender=Transaction)
+@receiver(pre_delete, sender=Transaction)
+def completer_etat_transaction(sender, instance, **kwargs):
+    """Champs suivis différés au chargement (.only()/.defer()) ou instance non chargée : lus en base avant l'écriture"""
+    if instance.pk is None:
+        return
+    etat = getattr(instance, '_etat_financement', {})
+    manquants = funding.champs_manquants(etat)
+    if manquants:
+        valeurs = Transaction.objects.filter(pk=instance.pk).values(*manquants).first()
+        instance._etat_financement = {**etat, **(valeurs or {})}
+
+@receiver(post_save, sender=Transaction)
+def maj_financement_transaction(sender, instance, created, **kwargs):
+    """Met à jour le résumé de financement du projet (confirmation, remboursement...)"""
+    etat_initial = {} if created else getattr(instance, '_etat_financement', {})
+    funding.appliquer_changement(etat_initial, instance)
+    instance._etat_financement = funding.etat_transaction(instance, etat_initial)
+
+@receiver(post_delete, sender=Transaction)
+def retirer_financement_transaction(sender, instance, **kwargs):
+    """Retire un don confirmé supprimé du résumé de financement"""
+    etat = getattr(instance, '_etat_financement', {})
+    if funding.est_compte(etat):
+        # Après commit : la suppression peut venir d'une cascade qui supprime
+        # aussi le projet (et son résumé) dans la même transaction.
+        db_transaction.on_commit(lambda: funding.reconstruire_resumes([etat['projet_id']]))
+
+
+from .models import Palier, ImageProjet
+from . import memo
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Association)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Association)
+def invalider_memo(sender, instance, **kwargs):
+    """Oublie les helpers mémorisés de l'instance sauvegardée"""
+    memo.invalidate(instance)
+
+@receiver(post_save, sender=Projet)
+@receiver(post_delete, sender=Projet)
+def invalider_memo_projet(sender, instance, **kwargs):
+    """Un projet modifié change aussi les totaux de son porteur et de son association"""
+    memo.invalidate(instance)
+    memo.invalidate_row(User._meta.label, instance.porteur_id)
+    memo.invalidate_row(Association._meta.label, instance.association_id)
+
+@receiver(post_save, sender=Palier)
+@receiver(post_delete, sender=Palier)
+@receiver(post_save, sender=ImageProjet)
+@receiver(post_delete, sender=ImageProjet)
+def invalider_memo_projet_parent(sender, instance, **kwargs):
+    """Paliers et images : paliers_total / gallerie_images du projet"""
+    memo.invalidate_row(Projet._meta.label, instance.projet_id)
+
+@receiver(post_save, sender=Transaction)
+def invalider_memo_transaction(sender, instance, **kwargs):
+    """Contributeurs d'une association (get_nombre_contributeurs), sans requête supplémentaire"""
+    memo.invalidate_model(Association._meta.label)
+
+
+from .models import PreuvePalier
+from . import dashboard
+
+@receiver(post_save, sender=Projet)
+@receiver(post_delete, sender=Projet)
+@receiver(post_save, sender=Association)
+@receiver(post_delete, sender=Association)
+@receiver(post_save, sender=PreuvePalier)
+@receiver(post_delete, sender=PreuvePalier)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalider_tableau_de_bord(sender, instance, **kwargs):
+    """Files d'action et compteurs du tableau de bord (les dons suivent le TTL de l'instantané)"""
+    if sender is User and not kwargs.get('created', True):
+        # last_login à chaque connexion : ne change aucun compteur
+        return
+    dashboard.invalider()
+
+
+from . import topics
+
 @receiver(post_save, sender=Projet)
-def verifier_paliers_signal(sender, instance, **kwargs):
-    if instance.montant_collecte > 0:
-        from .views import verifier_paliers  
-        verifier_paliers(instance)
+def suivre_topic_projet(sender, instance, created, **kwargs):
+    """Topic retiré ou remplacé : il ne doit plus être résolu vers ce projet"""
+    if created or not hasattr(instance, '_topic_initial'):
+        return
+    if instance.topic_id != instance._topic_initial:
+        if instance._topic_initial:
+            topics.invalider(instance._topic_initial)
+        if instance.topic_id:
+            topics.associer(instance.topic_id, instance.pk)
+        instance._topic_initial = instance.topic_id
 
+@receiver(post_delete, sender=Projet)
+def oublier_topic_projet(sender, instance, **kwargs):
+    """Projet supprimé : son topic ne se résout plus"""
+    if instance.topic_id:
+        topics.invalider(instance.topic_id)
@@ -0,0 +1,88 @@
+# core/slugs.py
+"""
+Allocation de slugs uniques partagée par Projet et Association.
+
+Toutes les variantes existantes (``base`` et ``base-N``) sont lues en une
+seule requête par préfixe et le premier suffixe libre est choisi en mémoire.
+Aucune vérification préalable n'est faite avant l'INSERT : en cas de course
+sur la contrainte d'unicité, le slug est réalloué et la sauvegarde rejouée.
+"""
+import logging
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+
+
+def allocate_slug(model, source, field='slug', exclude_pk=None):
+    """Retourne le premier slug libre pour `source` ("base", puis "base-1", "base-2"...)."""
+    max_length = model._meta.get_field(field).max_length
+    base = slugify(source or '') or model._meta.model_name
+    base = base[:max_length].strip('-')
+
+    existing = model.objects.filter(
+        Q(**{field: base}) | Q(**{f'{field}__startswith': f'{base}-'})
+    )
+    if exclude_pk is not None:
+        existing = existing.exclude(pk=exclude_pk)
+    taken = set(existing.values_list(field, flat=True))
+
+    if base not in taken:
+        return base
+
+    suffix_re = re.compile(rf'^{re.escape(base)}-(\d+)$')
+    used = {int(m.group(1)) for m in map(suffix_re.match, taken) if m}
+    counter = 1
+    while counter in used:
+        counter += 1
+
+    suffix = f'-{counter}'
+    if len(base) + len(suffix) > max_length:
+        # Base tronquée : ses variantes ne sont plus couvertes par la requête,
+        # on réalloue sur la base raccourcie.
+        return allocate_slug(model, base[:max_length - len(suffix)], field, exclude_pk)
+    return f'{base}{suffix}'
+
+
+def _is_slug_conflict(instance, field):
+    """
+    True si l'IntegrityError vient bien du slug : une autre ligne l'a pris.
+    Vérifié par requête (après l'annulation du savepoint) plutôt que sur le
+    message d'erreur, qui varie selon le backend et peut citer une autre
+    contrainte contenant le même nom de champ.
+    """
+    return (
+        type(instance)._default_manager
+        .filter(**{field: getattr(instance, field)})
+        .exclude(pk=instance.pk)
+        .exists()
+    )
+
+
+def save_with_unique_slug(instance, source, save, *args, field='slug', **kwargs):
+    """
+    Appelle `save(*args, **kwargs)` après avoir alloué un slug si l'instance n'en a pas.
+
+    Chaque tentative s'exécute dans un savepoint, ce qui permet de réessayer
+    même à l'intérieur d'une transaction englobante (ex. creer_projet).
+    """
+    original = getattr(instance, field)
+    if original:
+        return save(*args, **kwargs)
+
+    model = type(instance)
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        setattr(instance, field, allocate_slug(model, source, field, exclude_pk=instance.pk))
+        try:
+            with transaction.atomic():
+                return save(*args, **kwargs)
+        except IntegrityError:
+            if attempt == MAX_ATTEMPTS or not _is_slug_conflict(instance, field):
+                setattr(instance, field, original)
+                raise
+            logger.info(f"Conflit de slug {getattr(instance, field)!r}, nouvelle tentative ({attempt})")
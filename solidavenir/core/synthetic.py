@@ -0,0 +1,656 @@
+# core/synthetic.py
+"""
+Génération de données synthétiques à l'échelle de la production
+(commande `generate_synthetic_data`).
+
+Aucune ligne ne passe par save() ni par les signaux, par lots de
+`taille_lot` :
+
+- utilisateurs, associations, projets, paliers, preuves, distributions et
+  messages des preuves : `bulk_create` (Generateur.ecrire) ;
+- Transaction, TopicMessage, AuditLog et EmailLog : INSERT direct
+  (executemany, Generateur.inserer), sans instance de modèle. Ni validation
+  ni valeur par défaut calculée par ligne : les colonnes non fournies
+  reçoivent le défaut du champ évalué une fois par appel (même date_envoi,
+  par exemple), le reste doit être passé explicitement.
+
+Les champs habituellement calculés (slug, montant_minimum des paliers,
+contributeur_anonymise, topic des transactions, résumés de financement) sont
+donc renseignés ici ou reconstruits à la fin (funding.reconstruire_resumes).
+
+Le résultat ne dépend que de (scale, seed, date de fin) : tirages par
+random.Random(seed), UUID dérivés du même générateur, dates relatives à la
+date de fin. À scale=1 : ~50k utilisateurs, 20k projets, 8M transactions,
+~1M journaux d'audit, 500k emails et 800k messages de topic (~10M lignes).
+
+Distributions :
+- inscriptions croissantes dans le temps (plus de comptes récents) ;
+- popularité des projets en loi de Pareto (quelques projets concentrent
+  l'essentiel des dons), donateurs réguliers surreprésentés ;
+- montants log-normaux autour d'un don moyen propre à chaque projet ;
+- dons répartis sur la campagne, plus nombreux au lancement et à la clôture.
+"""
+import bisect
+import hashlib
+import itertools
+import logging
+import math
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction as db_transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+logger = logging.getLogger(__name__)
+
+BASE = {
+    'donateur': 40000,
+    'porteur': 6000,
+    'investisseur': 3000,
+    'association': 1000,
+    'projets': 20000,
+    'transactions': 8000000,
+    'audit_logs': 1000000,
+    'email_logs': 500000,
+    'topic_messages': 800000,
+}
+ADMINS = 20
+HISTORIQUE_JOURS = 3 * 365
+
+STATUTS_PROJET = (
+    ('actif', 35), ('termine', 25), ('echec', 10), ('en_attente', 10),
+    ('brouillon', 8), ('rejete', 5), ('annule', 4), ('suspendu', 3),
+)
+# Projets dont la campagne a eu lieu (dons, topic HCS, wallet)
+STATUTS_FINANCES = ('actif', 'termine', 'echec', 'suspendu')
+# Part atteinte de l'objectif selon le statut
+RATIO_FINANCEMENT = {
+    'actif': (0.05, 1.1),
+    'termine': (1.0, 1.4),
+    'echec': (0.05, 0.6),
+    'suspendu': (0.1, 0.8),
+}
+STATUTS_TRANSACTION = (('confirme', 92), ('erreur', 4), ('en_attente', 3), ('rembourse', 1))
+TYPES_FINANCEMENT = (('don', 60), ('recompense', 15), ('pret', 12), ('mixte', 8), ('equity', 5))
+REPARTITIONS_PALIERS = ((40, 30, 30), (50, 50), (25, 25, 25, 25), (30, 30, 40), (20, 20, 20, 20, 20))
+ACTIONS_AUDIT = (
+    ('login', 40), ('logout', 15), ('update', 15), ('contribution_initiee', 12), ('create', 8),
+    ('validate', 3), ('verify', 3), ('approve_proof', 2), ('reject_proof', 1), ('contribution_erreur', 1),
+)
+MODELES_AUDIT = {
+    'login': 'User', 'logout': 'User', 'update': 'User', 'create': 'Projet', 'validate': 'Projet',
+    'verify': 'Transaction', 'contribution_initiee': 'Transaction', 'contribution_erreur': 'Transaction',
+    'approve_proof': 'PreuvePalier', 'reject_proof': 'PreuvePalier',
+}
+TYPES_EMAIL = (
+    ('don_received', 45), ('notification', 25), ('user_welcome', 10), ('project_approved', 8),
+    ('password_reset', 6), ('project_rejected', 3), ('other', 3),
+)
+SUJETS_EMAIL = {
+    'don_received': "Merci pour votre don",
+    'notification': "Nouvelle étape pour votre projet",
+    'user_welcome': "Bienvenue sur SolidAvenir",
+    'project_approved': "Votre projet a été approuvé",
+    'password_reset': "Réinitialisation de votre mot de passe",
+    'project_rejected': "Votre projet n'a pas été retenu",
+    'other': "Information SolidAvenir",
+}
+STATUTS_EMAIL = (('sent', 90), ('simulated', 5), ('failed', 3), ('pending', 2))
+
+PRENOMS = ("Aminata", "Moussa", "Fatoumata", "Ibrahim", "Awa", "Oumar", "Mariam", "Sekou", "Kadiatou", "Bakary",
+           "Aissata", "Mamadou", "Hawa", "Souleymane", "Rokia", "Adama", "Djeneba", "Boubacar", "Salimata", "Youssouf")
+NOMS = ("Traoré", "Diarra", "Coulibaly", "Keïta", "Koné", "Sidibé", "Diallo", "Camara", "Touré", "Sangaré",
+        "Dembélé", "Maïga", "Cissé", "Sissoko", "Konaté", "Doumbia", "Ba", "Kanté", "Sow", "Fofana")
+VILLES = ("Bamako", "Sikasso", "Ségou", "Mopti", "Kayes", "Koutiala", "Gao", "Dakar", "Abidjan", "Ouagadougou")
+OBJETS_PROJET = ("Forage", "Ferme avicole", "Atelier de couture", "École communautaire", "Centre de santé",
+                 "Moulin à karité", "Kits solaires", "Bibliothèque", "Maraîchage", "Boulangerie",
+                 "Cybercafé", "Coopérative laitière", "Pépinière", "Transport scolaire", "Salle de sport")
+LIEUX = ("de Kalaban", "de Niono", "de Bougouni", "de San", "de Kita", "de Djenné", "de Banamba",
+         "de Kati", "de Dioïla", "de Tombouctou", "de Bla", "de Nara")
+TITRES_PALIER = ("Études et démarches", "Achat du matériel", "Travaux", "Formation", "Lancement", "Équipement")
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+_CUMULS = {}
+
+
+def _pondere(rng, choix):
+    """Tirage pondéré dans un tuple ((valeur, poids), ...) ; poids cumulés calculés une fois."""
+    if choix not in _CUMULS:
+        valeurs, poids = zip(*choix)
+        _CUMULS[choix] = (valeurs, tuple(itertools.accumulate(poids)))
+    valeurs, cumuls = _CUMULS[choix]
+    return valeurs[bisect.bisect_right(cumuls, rng.random() * cumuls[-1])]
+
+
+def _lots(iterable, taille):
+    iterateur = iter(iterable)
+    while lot := list(itertools.islice(iterateur, taille)):
+        yield lot
+
+
+@contextmanager
+def dates_libres(*modeles):
+    """Désactive auto_now / auto_now_add pour écrire des dates historiques."""
+    sauvegarde = []
+    for modele in modeles:
+        for field in modele._meta.fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                sauvegarde.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in sauvegarde:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Generateur:
+    def __init__(self, scale=1.0, seed=0, fin=None, taille_lot=5000, prefixe='synth',
+                 mot_de_passe='Synthetic!2024', progression=None):
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.taille_lot = taille_lot
+        self.prefixe = prefixe
+        self.mot_de_passe = mot_de_passe
+        self.progression = progression or (lambda message: None)
+
+        fin = fin or timezone.localdate()
+        self.fin = timezone.make_aware(datetime.combine(fin, dt_time.min))
+        self.debut = self.fin - timedelta(days=HISTORIQUE_JOURS)
+        self.compteurs = {}
+        self._sequence_hash = 0
+        self._comptes_hedera = 7000000
+
+    # -------------------------------------------------------------------------
+    # Outils
+    # -------------------------------------------------------------------------
+
+    def nombre(self, cle):
+        return max(1, int(BASE[cle] * self.scale))
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def date_entre(self, debut, fin, forme=1.0):
+        """Date dans [debut, fin] ; forme < 1 concentre vers la fin (croissance)."""
+        ecart = max(0.0, (fin - debut).total_seconds())
+        return debut + timedelta(seconds=ecart * self.rng.random() ** forme)
+
+    def compte_hedera(self):
+        self._comptes_hedera += 1
+        return f"0.0.{self._comptes_hedera}"
+
+    def hash_transaction(self, compte, date):
+        self._sequence_hash += 1
+        return f"{compte}@{int(date.timestamp())}.{self._sequence_hash:09d}"
+
+    def ecrire(self, modele, objets):
+        """bulk_create de `objets` (pk renseignés au retour) par lots de taille_lot."""
+        if objets:
+            modele.objects.bulk_create(objets, batch_size=self.taille_lot)
+            self.compteurs[modele.__name__] = self.compteurs.get(modele.__name__, 0) + len(objets)
+
+    def ecrire_par_lots(self, modele, generateur):
+        """Consomme un générateur d'objets et les écrit par lots de taille_lot."""
+        for lot in _lots(generateur, self.taille_lot):
+            self.ecrire(modele, lot)
+
+    def inserer(self, modele, colonnes, lignes):
+        """
+        INSERT direct (executemany) de tuples dans l'ordre de `colonnes`, sans
+        instances de modèle : réservé aux grosses tables dont les pk ne servent
+        pas. Seuls les champs date, UUID, décimal et JSON passent par les
+        adaptateurs du backend ; les colonnes absentes reçoivent la valeur par
+        défaut du champ.
+        """
+        # Connexion résolue une fois (le proxy `connection` coûte cher par valeur)
+        connexion = connections[DEFAULT_DB_ALIAS]
+        champs = [modele._meta.get_field(nom) for nom in colonnes]
+        absents = [f for f in modele._meta.concrete_fields if not f.primary_key and f not in champs]
+        for champ in absents:
+            if champ.unique and callable(champ.default):
+                raise ValueError(f"{modele.__name__}.{champ.name} doit être fourni (valeur unique)")
+        defauts = tuple(champ.get_db_prep_save(champ.get_default(), connexion) for champ in absents)
+        conversions = []
+        for i, champ in enumerate(champs):
+            if isinstance(champ, models.DateTimeField):
+                conversions.append((i, connexion.ops.adapt_datetimefield_value))
+            elif isinstance(champ, models.DecimalField):
+                conversions.append((i, connexion.ops.adapt_decimalfield_value))
+            elif isinstance(champ, (models.UUIDField, models.JSONField)):
+                conversions.append((i, lambda valeur, champ=champ: champ.get_db_prep_value(valeur, connexion)))
+
+        qn = connexion.ops.quote_name
+        sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            qn(modele._meta.db_table),
+            ", ".join(qn(champ.column) for champ in champs + absents),
+            ", ".join(["%s"] * (len(champs) + len(absents))),
+        )
+
+        def convertir(ligne):
+            ligne = list(ligne)
+            for i, convertir_valeur in conversions:
+                if ligne[i] is not None:
+                    ligne[i] = convertir_valeur(ligne[i])
+            return tuple(ligne) + defauts
+
+        nombre = 0
+        with connexion.cursor() as cursor:
+            for lot in _lots(lignes, self.taille_lot):
+                cursor.executemany(sql, [convertir(ligne) for ligne in lot])
+                nombre += len(lot)
+        self.compteurs[modele.__name__] = self.compteurs.get(modele.__name__, 0) + nombre
+
+    # -------------------------------------------------------------------------
+    # Étapes
+    # -------------------------------------------------------------------------
+
+    def executer(self):
+        from .models import (
+            AuditLog, Association, EmailLog, FichierPreuve, PreuvePalier, Projet,
+            TopicMessage, Transaction, TransactionAdmin, User,
+        )
+        if User.objects.filter(username__startswith=f"{self.prefixe}_").exists():
+            raise ValueError(f"Des données '{self.prefixe}_' existent déjà : choisir un autre préfixe ou vider la base")
+
+        connexion = connections[DEFAULT_DB_ALIAS]
+        if connexion.vendor == 'sqlite':
+            # Index à clés aléatoires (UUID, hash) : le cache par défaut (2 Mo) s'effondre au-delà de ~100k lignes
+            with connexion.cursor() as cursor:
+                cursor.execute("PRAGMA cache_size = -512000")
+
+        debut = time.monotonic()
+        with dates_libres(User, Association, Projet, PreuvePalier, FichierPreuve, Transaction,
+                          TransactionAdmin, TopicMessage, AuditLog, EmailLog):
+            etapes = (
+                ('utilisateurs', self.generer_utilisateurs),
+                ('associations', self.generer_associations),
+                ('projets', self.generer_projets),
+                ('paliers, preuves et distributions', self.generer_paliers),
+                ('transactions et messages de topic', self.generer_transactions),
+                ("journaux d'audit", self.generer_audit_logs),
+                ("journaux d'emails", self.generer_email_logs),
+            )
+            for nom, etape in etapes:
+                t0 = time.monotonic()
+                with db_transaction.atomic():
+                    etape()
+                self.progression(f"{nom} : {time.monotonic() - t0:.1f}s")
+
+        self.compteurs['_duree_s'] = round(time.monotonic() - debut, 1)
+        return self.compteurs
+
+    def generer_utilisateurs(self):
+        from .models import User
+
+        hash_mdp = make_password(self.mot_de_passe)
+        types = [('admin', ADMINS)] + [(t, self.nombre(t)) for t in ('donateur', 'porteur', 'investisseur', 'association')]
+        self.utilisateurs = {t: [] for t, _ in types}
+
+        def objets():
+            index = 0
+            for user_type, nombre in types:
+                for _ in range(nombre):
+                    index += 1
+                    prenom, nom = self.rng.choice(PRENOMS), self.rng.choice(NOMS)
+                    inscription = self.date_entre(self.debut, self.fin, forme=0.6)
+                    wallet = user_type != 'admin' and self.rng.random() < 0.9
+                    user = User(
+                        username=f"{self.prefixe}_{user_type}_{index}",
+                        email=f"{self.prefixe}_{index}@example.com",
+                        first_name=prenom,
+                        last_name=nom,
+                        password=hash_mdp,
+                        user_type=user_type,
+                        is_staff=user_type == 'admin',
+                        ville=self.rng.choice(VILLES),
+                        pays='Mali',
+                        audit_uuid=self.uuid(),
+                        hedera_account_id=self.compte_hedera() if wallet else None,
+                        hedera_private_key=f"synthetic-{index}" if wallet else None,
+                        wallet_activated=wallet,
+                        email_verifie=self.rng.random() < 0.8,
+                        date_inscription=inscription,
+                        date_creation_profile=inscription,
+                        date_joined=inscription,
+                        last_login=self.date_entre(inscription, self.fin, forme=0.3),
+                    )
+                    self.utilisateurs[user_type].append(user)
+                    yield user
+
+        self.ecrire_par_lots(User, objets())
+        for user_type in self.utilisateurs:
+            # Seuls les champs utiles aux étapes suivantes sont gardés en mémoire
+            self.utilisateurs[user_type] = [
+                (u.pk, u.email, u.audit_uuid, u.hedera_account_id, u.date_inscription)
+                for u in self.utilisateurs[user_type]
+            ]
+
+    def generer_associations(self):
+        from .models import Association
+
+        associations = []
+        for pk, email, _, _, inscription in self.utilisateurs['association']:
+            nom = f"Association {self.rng.choice(OBJETS_PROJET).lower()} {self.rng.choice(LIEUX)}"
+            associations.append(Association(
+                user_id=pk,
+                nom=nom,
+                slug=f"{slugify(nom)[:230]}-{pk}",
+                description_courte=f"{nom} accompagne les communautés locales.",
+                domaine_principal=self.rng.choice(('education', 'sante', 'environnement', 'developpement', 'urgence')),
+                ville=self.rng.choice(VILLES),
+                pays='Mali',
+                email_contact=email,
+                valide=self.rng.random() < 0.7,
+                featured=self.rng.random() < 0.05,
+                date_creation=inscription.date(),
+                date_maj=inscription,
+            ))
+        self.ecrire(Association, associations)
+        self.associations = [a.pk for a in associations]
+
+    def generer_projets(self):
+        from .models import Projet
+
+        porteurs = self.utilisateurs['porteur']
+        admins = [u[0] for u in self.utilisateurs['admin']]
+        nombre = self.nombre('projets')
+        self.projets = []
+
+        # Popularité (Pareto) : part des transactions de chaque projet financé
+        statuts = [_pondere(self.rng, STATUTS_PROJET) for _ in range(nombre)]
+        poids = [self.rng.paretovariate(1.2) if s in STATUTS_FINANCES else 0 for s in statuts]
+        total_poids = sum(poids) or 1
+        nb_transactions = self.nombre('transactions')
+
+        projets = []
+        for index, statut in enumerate(statuts, start=1):
+            porteur_pk, _, _, porteur_compte, inscription = self.rng.choice(porteurs)
+            creation = self.date_entre(max(inscription, self.debut), self.fin - timedelta(days=1), forme=0.7)
+            finance = statut in STATUTS_FINANCES
+            duree = self.rng.choice((30, 45, 60, 90))
+            date_debut = creation + timedelta(days=self.rng.randint(1, 14)) if finance else None
+            if statut in ('termine', 'echec') and date_debut and date_debut + timedelta(days=duree) > self.fin:
+                date_debut = self.fin - timedelta(days=duree + self.rng.randint(1, 30))
+                creation = min(creation, date_debut - timedelta(days=1))
+
+            # Dons prévus : nombre (popularité) et don moyen ; l'objectif en découle
+            dons = round(nb_transactions * poids[index - 1] / total_poids)
+            don_moyen = max(1.0, self.rng.lognormvariate(math.log(40), 0.7))
+            ratio = self.rng.uniform(*RATIO_FINANCEMENT[statut]) if finance else 1
+            attendu = dons * don_moyen * 0.92  # part confirmée
+            montant_demande = max(1000, int(attendu / ratio) // 1000 * 1000) if dons else 1000 * self.rng.randint(1, 200)
+
+            titre = f"{self.rng.choice(OBJETS_PROJET)} {self.rng.choice(LIEUX)}"
+            projet = Projet(
+                audit_uuid=self.uuid(),
+                titre=titre,
+                slug=f"{slugify(titre)[:280]}-{self.prefixe}-{index}",
+                description=f"{titre} : projet porté par la communauté pour améliorer les conditions de vie locales.",
+                description_courte=f"{titre}, financement participatif transparent sur Hedera.",
+                porteur_id=porteur_pk,
+                association_id=self.rng.choice(self.associations) if self.associations and self.rng.random() < 0.15 else None,
+                statut=statut,
+                categorie=self.rng.choice(('agriculture', 'artisanat', 'commerce', 'education', 'sante',
+                                           'technologie', 'energie', 'social')),
+                type_financement=_pondere(self.rng, TYPES_FINANCEMENT),
+                montant_demande=Decimal(montant_demande),
+                commission=Decimal(self.rng.choice((2, 3, 5, 7, 10))),
+                duree_campagne=duree,
+                date_debut=date_debut,
+                date_fin=date_debut + timedelta(days=duree) if date_debut else None,
+                date_creation=creation,
+                date_mise_a_jour=self.date_entre(creation, self.fin, forme=0.5),
+                valide_par_id=self.rng.choice(admins) if finance else None,
+                date_validation=date_debut if finance else None,
+                topic_id=self.compte_hedera() if finance else None,
+                hedera_topic_created=finance,
+                hedera_account_id=self.compte_hedera() if finance else None,
+                wallet_configure=finance,
+                vues=int(self.rng.paretovariate(1.1) * 50) if finance else self.rng.randint(0, 20),
+                partages=int(self.rng.paretovariate(1.5) * 3) if finance else 0,
+            )
+            projets.append(projet)
+            self.projets.append({
+                'statut': statut,
+                'dons': dons,
+                'don_moyen': don_moyen,
+                'attendu': attendu,
+                'porteur': (porteur_pk, porteur_compte),
+                'debut': date_debut,
+                'fin': min(date_debut + timedelta(days=duree), self.fin) if date_debut else None,
+                'commission': projet.commission,
+                'objectif': projet.montant_demande,
+            })
+            if len(projets) >= self.taille_lot:
+                self._ecrire_projets(projets)
+                projets = []
+        self._ecrire_projets(projets)
+
+    def _ecrire_projets(self, projets):
+        from .models import Projet
+
+        depart = len(self.projets) - len(projets)
+        self.ecrire(Projet, projets)
+        for offset, projet in enumerate(projets):
+            self.projets[depart + offset].update(pk=projet.pk, topic_id=projet.topic_id,
+                                                 association_id=projet.association_id)
+
+    def generer_paliers(self):
+        from .models import FichierPreuve, Palier, PreuvePalier, Projet, TopicMessage, TransactionAdmin
+
+        admins = [u[0] for u in self.utilisateurs['admin']]
+        paliers, infos = [], []
+        for projet in self.projets:
+            projet['montant_distribue'] = Decimal('0')
+            cumul = Decimal('0')
+            # Distribution dans l'ordre du calendrier, tant que les dons attendus couvrent le palier
+            distribuer = projet['statut'] in ('actif', 'termine', 'suspendu')
+            for rang, pct in enumerate(self.rng.choice(REPARTITIONS_PALIERS)):
+                montant = (projet['objectif'] * pct / 100).quantize(Decimal('1'))
+                distribuer = distribuer and cumul + montant <= Decimal(projet['attendu']) and self.rng.random() < 0.9
+                paliers.append(Palier(
+                    projet_id=projet['pk'],
+                    titre=TITRES_PALIER[rang % len(TITRES_PALIER)],
+                    description=f"{TITRES_PALIER[rang % len(TITRES_PALIER)]} ({pct} % de l'objectif)",
+                    pourcentage=Decimal(pct),
+                    montant=montant,
+                    montant_minimum=cumul,
+                    transfere=distribuer,
+                ))
+                infos.append((projet, rang))
+                cumul += montant
+        self.ecrire(Palier, paliers)
+
+        preuves, distributions, messages, precedent = [], [], [], None
+        for palier, (projet, rang) in zip(paliers, infos):
+            if projet is not precedent:
+                precedent, dernier_transfert, en_cours = projet, projet['debut'], False
+            if palier.transfere:
+                # Preuve approuvée puis transfert (dates croissantes le long du calendrier)
+                soumission = self.date_entre(dernier_transfert, projet['fin'])
+                palier.date_transfert = self.date_entre(soumission, min(soumission + timedelta(days=10), self.fin))
+                palier.transaction_hash = self.hash_transaction('0.0.2', palier.date_transfert)
+                dernier_transfert = palier.date_transfert
+                preuves.append(PreuvePalier(
+                    palier_id=palier.pk, statut='approuve', date_soumission=soumission,
+                    date_verification=palier.date_transfert, verificateur_id=self.rng.choice(admins),
+                    commentaires="Justificatifs conformes",
+                ))
+                commission = (palier.montant * projet['commission'] / 100).quantize(Decimal('0.01'))
+                distributions.append(TransactionAdmin(
+                    projet_id=projet['pk'],
+                    palier_id=palier.pk,
+                    montant_brut=palier.montant,
+                    montant_net=palier.montant - commission,
+                    commission=commission,
+                    commission_pourcentage=projet['commission'],
+                    transaction_hash=palier.transaction_hash,
+                    beneficiaire_id=projet['porteur'][0],
+                    initiateur_id=self.rng.choice(admins),
+                    date_creation=palier.date_transfert,
+                    hedera_message_id=self.hash_transaction('0.0.2', palier.date_transfert),
+                    type_transaction='distribution',
+                ))
+                messages.append(TopicMessage(
+                    projet_id=projet['pk'],
+                    type_message='distribution_admin_porteur',
+                    montant=palier.montant - commission,
+                    transaction_hash=palier.transaction_hash,
+                    contenu={'type': 'distribution_admin_porteur', 'palier': rang + 1,
+                             'montant_brut': float(palier.montant), 'transaction_hash': palier.transaction_hash},
+                    date_envoi=palier.date_transfert + timedelta(seconds=self.rng.randint(3, 120)),
+                ))
+                projet['montant_distribue'] += palier.montant
+            elif not en_cours:
+                en_cours = True
+                if projet['statut'] not in ('actif', 'termine') or self.rng.random() < 0.5:
+                    continue
+                # Premier palier non distribué : preuve en cours d'examen, rejetée ou à compléter
+                statut = self.rng.choice(('en_attente', 'en_attente', 'rejete', 'modif'))
+                soumission = self.date_entre(dernier_transfert or self.debut, self.fin)
+                preuves.append(PreuvePalier(
+                    palier_id=palier.pk, statut=statut, date_soumission=soumission,
+                    date_verification=None if statut == 'en_attente' else self.date_entre(soumission, self.fin),
+                    verificateur_id=None if statut == 'en_attente' else self.rng.choice(admins),
+                ))
+        Palier.objects.bulk_update([p for p in paliers if p.transfere], ['date_transfert', 'transaction_hash'],
+                                   batch_size=self.taille_lot)
+        self.ecrire(PreuvePalier, preuves)
+        self.ecrire(TransactionAdmin, distributions)
+        self.ecrire(TopicMessage, messages)
+
+        def fichiers():
+            for preuve in preuves:
+                for _ in range(self.rng.randint(1, 3)):
+                    type_fichier = _pondere(self.rng, (('photo', 60), ('document', 30), ('video', 7), ('autre', 3)))
+                    extension = {'photo': 'jpg', 'document': 'pdf', 'video': 'mp4', 'autre': 'zip'}[type_fichier]
+                    yield FichierPreuve(
+                        preuve_id=preuve.pk,
+                        fichier=f"preuves/{preuve.date_soumission:%Y/%m/%d}/{self.prefixe}_{preuve.pk}_{self.rng.getrandbits(32):08x}.{extension}",
+                        type_fichier=type_fichier,
+                        date_upload=preuve.date_soumission,
+                        description=f"Justificatif ({type_fichier})",
+                    )
+
+        self.ecrire_par_lots(FichierPreuve, fichiers())
+
+        a_modifier = [Projet(pk=p['pk'], montant_distribue=p['montant_distribue'])
+                      for p in self.projets if p['montant_distribue']]
+        Projet.objects.bulk_update(a_modifier, ['montant_distribue'], batch_size=self.taille_lot)
+
+    def generer_transactions(self):
+        from .models import TopicMessage, Transaction
+
+        donateurs = [u for u in self.utilisateurs['donateur'] + self.utilisateurs['investisseur'] if u[3]]
+        sel = _setting('ANONYMIZATION_SALT', '')
+        anonymes = {}
+        proba_message = min(1.0, self.nombre('topic_messages') / (self.nombre('transactions') * 0.92))
+        messages = []
+        rng = self.rng
+
+        def lignes():
+            for projet in self.projets:
+                if not projet['dons']:
+                    continue
+                duree = max(1.0, (projet['fin'] - projet['debut']).total_seconds())
+                for _ in range(projet['dons']):
+                    # Donateurs réguliers surreprésentés (premiers rangs)
+                    pk, email, audit_uuid, compte, _ = donateurs[int(len(donateurs) * rng.random() ** 2)]
+                    if pk not in anonymes:
+                        unique_id = f"{audit_uuid}{sel}"
+                        anonymes[pk] = f"Contributeur_{hashlib.sha256(unique_id.encode()).hexdigest()[:20]}"
+                    date = projet['debut'] + timedelta(seconds=duree * rng.betavariate(0.6, 0.6))
+                    montant = Decimal(max(1, round(projet['don_moyen'] * rng.lognormvariate(-0.245, 0.7))))
+                    statut = _pondere(rng, STATUTS_TRANSACTION)
+                    tx_hash = self.hash_transaction(compte, date) if statut != 'en_attente' else None
+                    message_id = None
+                    if statut == 'confirme' and rng.random() < 0.95:
+                        message_id = self.hash_transaction('0.0.2', date)
+                        if rng.random() < proba_message:
+                            messages.append((
+                                projet['pk'], 'distribution_palier', email, montant, tx_hash,
+                                {'type': 'distribution_palier', 'utilisateur': email, 'montant': float(montant),
+                                 'date': date.isoformat(), 'transaction_hash': tx_hash,
+                                 'timestamp': int(date.timestamp())},
+                                date + timedelta(seconds=rng.randint(3, 120)),
+                            ))
+                    yield (
+                        pk, pk, anonymes[pk], projet['pk'], projet['association_id'], projet['topic_id'],
+                        self.uuid(), montant, date, statut, tx_hash,
+                        'SUCCESS' if statut in ('confirme', 'rembourse') else None,
+                        f"https://hashscan.io/testnet/tx/{tx_hash}" if tx_hash else None,
+                        message_id,
+                    )
+
+        self.inserer(Transaction, (
+            'user_id', 'contributeur_id', 'contributeur_anonymise', 'projet_id', 'association_id', 'topic_id',
+            'audit_uuid', 'montant', 'date_transaction', 'statut', 'hedera_transaction_hash', 'hedera_status',
+            'hedera_hashscan_url', 'hedera_message_id',
+        ), lignes())
+        self.inserer(TopicMessage, (
+            'projet_id', 'type_message', 'utilisateur_email', 'montant', 'transaction_hash', 'contenu', 'date_envoi',
+        ), messages)
+
+    def _tous_utilisateurs(self):
+        return [u for groupe in self.utilisateurs.values() for u in groupe]
+
+    def generer_audit_logs(self):
+        from .models import AuditLog
+
+        utilisateurs = self._tous_utilisateurs()
+        rng = self.rng
+
+        def lignes():
+            for _ in range(self.nombre('audit_logs')):
+                pk, _, _, _, inscription = rng.choice(utilisateurs)
+                action = _pondere(rng, ACTIONS_AUDIT)
+                details = {'method': 'form'} if action == 'login' else {'source': 'web'}
+                if action.startswith('contribution'):
+                    details = {'montant': rng.randint(1, 500)}
+                yield (
+                    self.uuid(), pk, action, MODELES_AUDIT[action], str(rng.randint(1, 10 ** 6)), details,
+                    self.date_entre(inscription, self.fin, forme=0.7),
+                    f"41.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+                    'SUCCESS' if rng.random() < 0.97 else 'FAILURE',
+                )
+
+        self.inserer(AuditLog, (
+            'audit_uuid', 'utilisateur_id', 'action', 'modele', 'objet_id', 'details', 'date_action',
+            'adresse_ip', 'statut',
+        ), lignes())
+
+    def generer_email_logs(self):
+        from .models import EmailLog
+
+        utilisateurs = self._tous_utilisateurs()
+        rng = self.rng
+
+        def lignes():
+            for _ in range(self.nombre('email_logs')):
+                pk, email, _, _, inscription = rng.choice(utilisateurs)
+                type_email = _pondere(rng, TYPES_EMAIL)
+                statut = _pondere(rng, STATUTS_EMAIL)
+                creation = self.date_entre(inscription, self.fin, forme=0.7)
+                yield (
+                    email, pk, SUJETS_EMAIL[type_email], f"{SUJETS_EMAIL[type_email]}.\n\nL'équipe SolidAvenir",
+                    type_email, statut, creation,
+                    creation + timedelta(seconds=rng.randint(1, 60)) if statut == 'sent' else None,
+                    "SMTP timeout" if statut == 'failed' else '',
+                )
+
+        self.inserer(EmailLog, (
+            'destinataire', 'utilisateur_id', 'sujet', 'corps', 'type_email', 'statut', 'date_creation',
+            'date_envoi', 'erreur',
+        ), lignes())
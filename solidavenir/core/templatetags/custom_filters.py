@@ -2,6 +2,8 @@ from django import template
 from django.contrib.humanize.templatetags.humanize import intcomma
 from django.template.defaultfilters import floatformat
 
+from core.models import convert_hbar_to_fcfa_many
+
 register = template.Library()
 
 @register.filter
@@ -22,6 +24,19 @@ def get_item(dictionary, key):
     """Retourne la valeur d'un dictionnaire par clé"""
     return dictionary.get(key)
 
+@register.filter
+def fcfa_column(objects, attribute_name):
+    """
+    Convertit en FCFA toute une colonne de montants HBAR en une seule passe.
+
+    Retourne un dictionnaire {pk: montant_fcfa} à lire avec get_item :
+        {% with goals=projets|fcfa_column:"montant_demande" %}
+            {{ goals|get_item:projet.pk }}
+    """
+    items = list(objects)
+    montants = [getattr(item, attribute_name, None) for item in items]
+    return dict(zip((item.pk for item in items), convert_hbar_to_fcfa_many(montants)))
+
 @register.filter
 def split(value, delimiter):
     """Split a string by the given delimiter"""
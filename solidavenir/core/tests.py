@@ -1,3 +1,1053 @@
-from django.test import TestCase
+import io
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .hedera_client import CircuitBreaker, HederaClient, HederaUnavailable
+from .models import Projet, User
+
+
+def creer_projet(titre='Puits du village', topic_id=None, **champs):
+    porteur = User.objects.create_user(
+        username=f"porteur-{User.objects.count()}", password='x', user_type='porteur',
+        hedera_account_id=f"0.0.{7000 + User.objects.count()}",
+    )
+    champs.setdefault('statut', 'actif')
+    return Projet.objects.create(
+        titre=titre, description=titre, description_courte=titre, montant_demande=10000,
+        porteur=porteur, topic_id=topic_id, **champs
+    )
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    """Circuit breaker du client Hedera (core/hedera_client.py)."""
+
+    def client_demi_ouvert(self):
+        client = HederaClient(base_url='http://hedera.test', retries=0, breaker_threshold=1, breaker_reset=60)
+        client.breaker.failure()
+        client.breaker.opened_at -= 60  # délai écoulé : le prochain appel est l'appel d'essai
+        return client
+
+    def test_erreur_non_reseau_pendant_l_essai_rouvre_le_circuit(self):
+        for erreur in (requests.exceptions.ChunkedEncodingError, requests.exceptions.TooManyRedirects,
+                       requests.exceptions.InvalidURL, ValueError):
+            with self.subTest(erreur=erreur.__name__):
+                client = self.client_demi_ouvert()
+                with mock.patch.object(client.session, 'request', side_effect=erreur('boom')):
+                    with self.assertRaises(erreur):
+                        client.health()
+                self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+                self.assertEqual(client.metrics()['endpoints']['health']['errors'], 1)
+                with self.assertRaises(HederaUnavailable):
+                    client.health()
+
+    def test_essai_reussi_referme_le_circuit(self):
+        client = self.client_demi_ouvert()
+        reponse = mock.Mock(status_code=200)
+        with mock.patch.object(client.session, 'request', return_value=reponse):
+            self.assertIs(client.health(), reponse)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+
+class TransfertsMirrorTests(SimpleTestCase):
+    """Pagination des transferts du mirror node (core/reconciliation.py)."""
+
+    def client_mirror(self, pages):
+        reponses = [
+            mock.Mock(status_code=200, json=mock.Mock(return_value={
+                'transactions': [{'transaction_id': f"0.0.5-{i}-0"}],
+                'links': {'next': f"/api/v1/transactions?page={i + 1}" if i + 1 < pages else None},
+            }))
+            for i in range(pages)
+        ]
+        return mock.Mock(mirror_transactions=mock.Mock(side_effect=reponses))
+
+    def test_toutes_les_pages_sont_lues(self):
+        from . import reconciliation
+
+        client = self.client_mirror(3)
+        maintenant = timezone.now()
+        transferts = reconciliation._transferts(client, '0.0.5', maintenant, maintenant)
+        self.assertEqual(len(transferts), 3)
+        self.assertEqual(client.mirror_transactions.call_count, 3)
+
+    def test_liste_tronquee_leve_une_erreur(self):
+        from . import reconciliation
+
+        client = self.client_mirror(reconciliation.PAGES_MAX + 1)
+        maintenant = timezone.now()
+        with self.assertRaises(ValueError):
+            reconciliation._transferts(client, '0.0.5', maintenant, maintenant)
+        self.assertEqual(client.mirror_transactions.call_count, reconciliation.PAGES_MAX)
+
+
+class VerificationHistoriqueHCSTests(TestCase):
+    """Vérification du running hash des messages stockés (core/hcs_verification.py)."""
+
+    TOPIC = '0.0.4242'
+
+    def setUp(self):
+        self.projet = creer_projet(topic_id=self.TOPIC)
+
+    def stocker(self, sequences, alterer=()):
+        import base64
+        import hashlib
+
+        from .hcs_ingestion import RUNNING_HASH_VERSION, chainer
+        from .models import TopicMessage
+
+        precedent = bytes(48)
+        for sequence in range(1, max(sequences) + 1):
+            empreinte = hashlib.sha384(f"message {sequence}".encode()).digest()
+            horodatage = f"1700000000.{sequence:09d}"
+            precedent = chainer(precedent, self.TOPIC, '0.0.2', horodatage, sequence, empreinte)
+            if sequence not in sequences:
+                continue
+            running_hash = bytes(48) if sequence in alterer else precedent
+            TopicMessage.objects.create(
+                projet=self.projet, type_message='don', contenu={}, sequence_number=sequence,
+                running_hash=base64.b64encode(running_hash).decode('ascii'),
+                running_hash_version=RUNNING_HASH_VERSION, payer_account_id='0.0.2',
+                consensus_ns=horodatage, message_sha384=empreinte.hex(),
+            )
+
+    def verifier(self, **options):
+        from . import hcs_verification
+
+        return hcs_verification.verifier_topic(self.projet.pk, self.TOPIC, **options)
+
+    def test_historique_intact(self):
+        self.stocker(range(1, 8))
+        resultat = self.verifier(taille_lot=3)
+        self.assertEqual(resultat['compteurs']['verifies'], 7)
+        self.assertEqual(resultat['point_de_reprise'], 7)
+        self.stocker(range(8, 10))
+        resultat = self.verifier()
+        self.assertEqual(dict(resultat['compteurs']), {'verifies': 2})
+
+    def test_le_point_de_reprise_ne_depasse_pas_une_anomalie(self):
+        self.stocker([1, 2, 3, 5, 6])
+        resultat = self.verifier(taille_lot=2)
+        self.assertEqual(resultat['compteurs']['trous'], 1)
+        self.assertEqual(resultat['point_de_reprise'], 3)
+        self.assertEqual(resultat['derniere_sequence'], 6)
+        # Toujours signalé au passage suivant, jusqu'à ce que le trou soit comblé
+        self.assertEqual(self.verifier()['compteurs']['trous'], 1)
+        self.stocker([4])
+        resultat = self.verifier()
+        self.assertEqual(dict(resultat['compteurs']), {'verifies': 3})
+        self.assertEqual(resultat['point_de_reprise'], 6)
+
+    def test_hash_invalide(self):
+        self.stocker(range(1, 6), alterer={3})
+        resultat = self.verifier()
+        self.assertEqual(resultat['compteurs']['hash_invalides'], 2)  # 3, puis 4 chaîné sur le faux hash
+        self.assertEqual(resultat['point_de_reprise'], 2)
+
+    def test_commande_en_erreur_tant_qu_il_reste_une_anomalie(self):
+        from django.core.management import CommandError, call_command
+
+        self.stocker([1, 3])
+        with self.assertRaises(CommandError):
+            call_command('verify_hcs_history', stdout=io.StringIO())
+
+
+class TopicsTests(TestCase):
+    """Résolution topic -> projet et buffer des TopicMessage (core/topics.py)."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.projet = creer_projet(topic_id='0.0.5100')
+
+    def test_changement_et_suppression_du_topic_invalident_la_resolution(self):
+        from . import topics
+
+        self.assertEqual(topics.projet_id('0.0.5100'), self.projet.pk)
+        projet = Projet.objects.get(pk=self.projet.pk)
+        projet.topic_id = '0.0.5101'
+        projet.save(update_fields=['topic_id'])
+        self.assertIsNone(topics.projet_id('0.0.5100'))
+        self.assertEqual(topics.projet_id('0.0.5101'), self.projet.pk)
+
+        Projet.objects.get(pk=self.projet.pk).delete()
+        self.assertIsNone(topics.projet_id('0.0.5101'))
+
+    def test_une_ligne_refusee_n_empeche_pas_les_autres(self):
+        from .models import StatistiquesTopic, TopicMessage
+        from .topics import TamponMessages
+
+        TopicMessage.objects.create(projet=self.projet, type_message='don', contenu={}, sequence_number=1)
+        tampon = TamponMessages(taille=10)
+        tampon.ajouter(projet_id=self.projet.pk, type_message='don', contenu={'idempotencyKey': 'a'})
+        tampon.ajouter(projet_id=self.projet.pk, type_message='don', contenu={'idempotencyKey': 'b'}, sequence_number=1)
+        tampon.ajouter(projet_id=self.projet.pk, type_message='don', contenu={'idempotencyKey': 'c'})
+
+        with self.assertLogs('core.topics', 'WARNING'):
+            self.assertEqual(tampon.vider(), 2)
+        self.assertEqual(len(tampon), 1)
+        self.assertEqual(TopicMessage.objects.filter(projet=self.projet).count(), 3)
+        self.assertEqual(StatistiquesTopic.objects.get(projet=self.projet).nombre_messages, 2)
+
+        # La ligne refusée est abandonnée au bout de TOPIC_MESSAGE_MAX_ATTEMPTS essais
+        with self.settings(TOPIC_MESSAGE_MAX_ATTEMPTS=3), self.assertLogs('core.topics', 'ERROR') as journal:
+            tampon.vider()
+            self.assertEqual(len(tampon), 1)
+            tampon.vider()
+        self.assertEqual(len(tampon), 0)
+        self.assertIn("clé b", journal.output[-1])
+
+
+def messages_mirror(topic_id, debut, fin, precedent=bytes(48)):
+    """Page du mirror node (/api/v1/topics/{id}/messages) avec de vrais running hashes."""
+    import base64
+    import json
+
+    from .hcs_ingestion import calculer_running_hash
+
+    messages = []
+    for sequence in range(debut, fin + 1):
+        octets = json.dumps({'type': 'don', 'idempotencyKey': f"cle-{sequence}"}).encode()
+        horodatage = f"1700000000.{sequence:09d}"
+        precedent = calculer_running_hash(precedent, topic_id, '0.0.2', horodatage, sequence, octets)
+        messages.append({
+            'topic_id': topic_id, 'sequence_number': sequence, 'consensus_timestamp': horodatage,
+            'message': base64.b64encode(octets).decode('ascii'), 'payer_account_id': '0.0.2',
+            'running_hash': base64.b64encode(precedent).decode('ascii'), 'running_hash_version': 3,
+        })
+    return messages
+
+
+class IngestionConcurrenteTests(TestCase):
+    """Deux synchronisations du même topic (core/hcs_ingestion.py)."""
+
+    def test_page_deja_ingeree_par_une_autre_synchronisation(self):
+        from . import hcs_ingestion
+        from .models import CurseurSynchronisation, StatistiquesTopic, TopicMessage
+
+        projet = creer_projet(topic_id='0.0.5200')
+        page = messages_mirror('0.0.5200', 1, 3)
+
+        def lire(topic_id, params):
+            if not TopicMessage.objects.filter(projet=projet).exists():
+                # L'autre synchronisation écrit la même page pendant que celle-ci la lit
+                with transaction.atomic():
+                    hcs_ingestion.ingerer(projet.pk, page)
+                    CurseurSynchronisation.objects.filter(nom=hcs_ingestion.nom_curseur(topic_id)).update(position='3')
+                return mock.Mock(status_code=200, json=mock.Mock(return_value={'messages': page}))
+            return mock.Mock(status_code=200, json=mock.Mock(return_value={'messages': []}))
+
+        client = mock.Mock(mirror_topic_messages=mock.Mock(side_effect=lire))
+        with mock.patch.object(hcs_ingestion, 'ingerer', wraps=hcs_ingestion.ingerer) as ingerer:
+            resultat = hcs_ingestion.synchroniser_topic(projet.pk, '0.0.5200', client=client)
+        self.assertEqual(ingerer.call_count, 1)  # l'appel de l'autre synchronisation
+        self.assertEqual((resultat['messages'], resultat['ingeres'], resultat['derniere_sequence']), (3, 0, 3))
+        self.assertEqual(TopicMessage.objects.filter(projet=projet).count(), 3)
+        self.assertEqual(StatistiquesTopic.objects.get(projet=projet).nombre_messages, 3)
+
+
+class SyncTopicsCommandeTests(TestCase):
+    """Commande sync_topics --create-missing."""
+
+    def test_cree_les_topics_manquants_des_projets_actifs(self):
+        from django.core.management import call_command
+
+        from . import hcs_ingestion
+        from .models import AuditLog
+
+        sans_topic = creer_projet()
+        inactif = creer_projet(titre='Brouillon')
+        Projet.objects.filter(pk=inactif.pk).update(statut='brouillon')
+        reponse = mock.Mock(status_code=200, json=mock.Mock(return_value={
+            'success': True, 'topicId': '0.0.6000', 'transactionId': '0.0.2@1700000000.000000001',
+        }))
+        client = mock.Mock(create_topic=mock.Mock(return_value=reponse))
+        bilan = {'topics': {}, 'duree': 0.0, 'interrompu': False}
+
+        with mock.patch('core.views.get_hedera_client', return_value=client), \
+                mock.patch.object(hcs_ingestion, 'synchroniser_tous', return_value=bilan) as synchroniser:
+            call_command('sync_topics', '--create-missing', stdout=io.StringIO())
+
+        client.create_topic.assert_called_once()
+        synchroniser.assert_called_once()
+        self.assertEqual(Projet.objects.get(pk=sans_topic.pk).topic_id, '0.0.6000')
+        self.assertIsNone(Projet.objects.get(pk=inactif.pk).topic_id)
+        self.assertTrue(AuditLog.objects.filter(modele='HCS_Topic', utilisateur=sans_topic.porteur).exists())
+
+
+class SlugsTests(TestCase):
+    """Allocation des slugs et reprise sur conflit (core/slugs.py)."""
+
+    def nouveau_projet(self, existant):
+        return Projet(titre=existant.titre, description='x', description_courte='x', montant_demande=100,
+                      porteur=existant.porteur)
+
+    def test_course_sur_le_slug_reessayee(self):
+        from . import slugs
+
+        existant = creer_projet()
+        projet = self.nouveau_projet(existant)
+        with mock.patch.object(slugs, 'allocate_slug', side_effect=[existant.slug, f"{existant.slug}-7"]):
+            projet.save()
+        self.assertEqual(projet.slug, f"{existant.slug}-7")
+
+    def test_autre_contrainte_non_reessayee(self):
+        from django.db import IntegrityError
+
+        from . import slugs
+
+        existant = creer_projet()
+        projet = self.nouveau_projet(existant)
+        projet.audit_uuid = existant.audit_uuid
+        with mock.patch.object(slugs, 'allocate_slug', wraps=slugs.allocate_slug) as allouer:
+            with self.assertRaises(IntegrityError):
+                projet.save()
+        self.assertEqual(allouer.call_count, 1)
+        self.assertEqual(projet.slug, '')
+
+
+class FinancementTests(TestCase):
+    """Résumé de financement maintenu par les signaux de Transaction (core/funding.py)."""
+
+    def setUp(self):
+        self.projet = creer_projet()
+        self.donateurs = [
+            User.objects.create_user(username=f"donateur-{i}", password='x', user_type='donateur')
+            for i in range(2)
+        ]
+
+    def don(self, montant, statut='confirme', donateur=0):
+        from .models import Transaction
+
+        donateur = self.donateurs[donateur]
+        return Transaction.objects.create(user=donateur, contributeur=donateur, projet=self.projet,
+                                          montant=montant, statut=statut)
+
+    def resume(self):
+        from .models import FinancementProjet
+
+        resume = FinancementProjet.objects.filter(projet=self.projet).first()
+        projet = Projet.objects.get(pk=self.projet.pk)
+        return {
+            'montant_total': resume.montant_total if resume else 0,
+            'nombre_dons': resume.nombre_dons if resume else 0,
+            'nombre_contributeurs': resume.nombre_contributeurs if resume else 0,
+            'montant_engage': projet.montant_engage,
+            'contributeurs_count': projet.contributeurs_count,
+        }
+
+    def assertResume(self, montant, dons, contributeurs):
+        self.assertEqual(self.resume(), {
+            'montant_total': montant, 'nombre_dons': dons, 'nombre_contributeurs': contributeurs,
+            'montant_engage': montant, 'contributeurs_count': contributeurs,
+        })
+
+    def test_confirmation(self):
+        don = self.don(300, statut='en_attente')
+        self.assertResume(0, 0, 0)
+        don.statut = 'confirme'
+        don.save()
+        self.assertResume(300, 1, 1)
+        # Sauvegarde sans changement de statut : rien n'est compté deux fois
+        don.save()
+        self.assertResume(300, 1, 1)
+
+    def test_remboursement(self):
+        premier, second = self.don(300), self.don(200)
+        autre = self.don(100, donateur=1)
+        self.assertResume(600, 3, 2)
+
+        second.statut = 'rembourse'
+        second.save()
+        self.assertResume(400, 2, 2)  # le donateur reste contributeur par son premier don
+        premier.statut = 'rembourse'
+        premier.save()
+        self.assertResume(100, 1, 1)
+        autre.statut = 'rembourse'
+        autre.save()
+        self.assertResume(0, 0, 0)
+
+    def test_suppression(self):
+        from .models import FinancementProjet
+
+        don = self.don(300)
+        self.don(200, donateur=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            don.delete()
+        self.assertResume(200, 1, 1)
+        resume = FinancementProjet.objects.get(projet=self.projet)
+        self.assertEqual((resume.don_min, resume.don_max), (200, 200))
+
+    def test_reconstruction_identique_au_chemin_incremental(self):
+        from . import funding
+        from .models import FinancementProjet
+
+        dons = [self.don(montant, donateur=i % 2) for i, montant in enumerate((100, 250, 400, 50))]
+        dons[1].statut = 'rembourse'
+        dons[1].save()
+        en_attente = self.don(75, statut='en_attente')
+        en_attente.statut = 'confirme'
+        en_attente.save()
+
+        champs = ('montant_total', 'nombre_dons', 'nombre_contributeurs', 'don_max', 'don_min', 'dernier_don')
+        incremental = FinancementProjet.objects.values(*champs).get(projet=self.projet)
+        self.assertEqual(funding.reconstruire_resumes(corriger=False), [])
+        self.assertEqual(funding.calculer_resumes([self.projet.pk])[self.projet.pk], incremental)
+
+        # Un écart (écriture hors des signaux) est détecté puis corrigé
+        FinancementProjet.objects.filter(projet=self.projet).update(montant_total=1)
+        with self.assertLogs('core.funding', 'WARNING'):
+            self.assertEqual(funding.reconstruire_resumes(), [self.projet.pk])
+        self.assertEqual(FinancementProjet.objects.values(*champs).get(projet=self.projet), incremental)
+        self.assertResume(625, 4, 2)
+
+    def test_transition_sur_une_instance_partielle(self):
+        from .models import Transaction
+
+        don = self.don(500)
+        self.assertResume(500, 1, 1)
+        partielle = Transaction.objects.only('pk', 'statut').get(pk=don.pk)
+        partielle.statut = 'rembourse'
+        partielle.save()
+        self.assertResume(0, 0, 0)
+
+        partielle = Transaction.objects.only('pk', 'notes_verification').get(pk=don.pk)
+        partielle.statut = 'confirme'
+        partielle.save(update_fields=['statut'])
+        self.assertResume(500, 1, 1)
+
+    def test_suppression_d_une_instance_partielle(self):
+        from .models import Transaction
+
+        don = self.don(500)
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.only('pk').get(pk=don.pk).delete()
+        self.assertResume(0, 0, 0)
+
+
+class OutboxTests(TestCase):
+    """Outbox des messages HCS et worker drain (core/outbox.py)."""
+
+    TOPIC = '0.0.5300'
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        from .models import Transaction
+
+        cache.clear()
+        self.projet = creer_projet(topic_id=self.TOPIC)
+        self.donateur = User.objects.create_user(username='donateur', password='x', user_type='donateur',
+                                                 email='donateur@example.org')
+        self.don = Transaction.objects.create(user=self.donateur, contributeur=self.donateur, projet=self.projet,
+                                              montant=250, statut='confirme',
+                                              hedera_transaction_hash='0.0.7@1700000000.000000001')
+
+    def mettre_en_file(self):
+        from . import outbox
+
+        return outbox.enqueue_don(self.TOPIC, self.donateur.email, self.don.montant,
+                                  self.don.hedera_transaction_hash, type_message='don', transaction=self.don)
+
+    def client_hedera(self, *reponses):
+        """Client stub : send_message renvoie (ou lève) les réponses dans l'ordre."""
+        client = mock.Mock()
+        client.breaker.retry_after.return_value = 0
+        client.send_message.side_effect = list(reponses)
+        return mock.patch('core.outbox.get_client', return_value=client)
+
+    @staticmethod
+    def reponse(status_code=200, **data):
+        return mock.Mock(status_code=status_code, json=mock.Mock(return_value=data))
+
+    def drain(self):
+        from . import outbox
+
+        return outbox.drain(concurrence=1)
+
+    def test_mise_en_file_dans_la_transaction_de_l_appelant(self):
+        from .models import OutboxHCS
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.mettre_en_file()
+            raise RuntimeError("don annulé")
+        self.assertFalse(OutboxHCS.objects.exists())
+
+        message = self.mettre_en_file()
+        self.assertEqual(self.mettre_en_file().pk, message.pk)
+        self.assertEqual(OutboxHCS.objects.count(), 1)
+        self.assertEqual(message.projet_id, self.projet.pk)
+        self.assertEqual(message.contenu['idempotencyKey'], f"don:transaction:{self.don.pk}")
+
+    def test_topic_vide_refuse_sans_ecriture(self):
+        from . import outbox
+        from .models import OutboxHCS
+
+        with self.assertRaises(ValueError):
+            outbox.enqueue('', 'don', {})
+        self.assertFalse(OutboxHCS.objects.exists())
+
+    def test_reclamation_avec_bail(self):
+        from django.db import connection
+
+        from . import outbox
+        from .models import OutboxHCS
+
+        message = self.mettre_en_file()
+        with mock.patch.object(connection.features, 'has_select_for_update_skip_locked', True), \
+                mock.patch('django.db.models.query.QuerySet.select_for_update', autospec=True,
+                           side_effect=lambda queryset, **options: queryset) as select_for_update:
+            self.assertEqual([m.pk for m in outbox.reclamer(10)], [message.pk])
+        self.assertTrue(select_for_update.call_args.kwargs['skip_locked'])
+
+        message.refresh_from_db()
+        self.assertEqual(message.statut, 'en_cours')
+        self.assertGreater(message.prochaine_tentative, timezone.now())
+        self.assertEqual(outbox.reclamer(10), [])  # bail en cours : pas réclamé deux fois
+
+        # Worker arrêté en cours de route : le message est repris à l'expiration du bail
+        OutboxHCS.objects.filter(pk=message.pk).update(prochaine_tentative=timezone.now())
+        self.assertEqual([m.pk for m in outbox.reclamer(10)], [message.pk])
+
+    def test_nouvel_essai_avec_backoff_puis_echec(self):
+        from .models import OutboxHCS
+
+        message = self.mettre_en_file()
+        with self.settings(HCS_OUTBOX_BACKOFF=30, HCS_OUTBOX_MAX_ATTEMPTS=2):
+            with self.client_hedera(requests.exceptions.ConnectionError("refusé")):
+                self.assertEqual(self.drain(), {'reporte': 1})
+            message.refresh_from_db()
+            self.assertEqual((message.statut, message.tentatives), ('en_attente', 1))
+            self.assertGreaterEqual(message.prochaine_tentative, timezone.now() + timedelta(seconds=14))
+
+            OutboxHCS.objects.filter(pk=message.pk).update(prochaine_tentative=timezone.now())
+            with self.client_hedera(self.reponse(503, error="indisponible")), self.assertLogs('core.outbox', 'ERROR'):
+                self.assertEqual(self.drain(), {'echec': 1})
+        message.refresh_from_db()
+        self.assertEqual((message.statut, message.tentatives), ('echec', 2))
+
+    def test_circuit_ouvert_sans_tentative_comptee_et_refus_definitif(self):
+        from .models import OutboxHCS
+
+        message = self.mettre_en_file()
+        with self.client_hedera(HederaUnavailable("circuit ouvert")):
+            self.assertEqual(self.drain(), {'reporte': 1})
+        message.refresh_from_db()
+        self.assertEqual(message.tentatives, 0)
+
+        OutboxHCS.objects.filter(pk=message.pk).update(prochaine_tentative=timezone.now())
+        with self.client_hedera(self.reponse(400, error="topic invalide")), self.assertLogs('core.outbox', 'ERROR'):
+            self.assertEqual(self.drain(), {'echec': 1})
+
+    def test_ecriture_idempotente_du_resultat(self):
+        from . import outbox, topics
+        from .models import TopicMessage, Transaction
+
+        message = self.mettre_en_file()
+        reponse = self.reponse(success=True, messageId='0.0.2@1700000000.000000002')
+        with self.client_hedera(reponse):
+            self.assertEqual(self.drain(), {'envoye': 1})
+
+        message.refresh_from_db()
+        self.assertEqual((message.statut, message.hedera_message_id), ('envoye', '0.0.2@1700000000.000000002'))
+        don = Transaction.objects.get(pk=self.don.pk)
+        self.assertEqual(don.hedera_message_id, '0.0.2@1700000000.000000002')
+        self.assertIn(self.TOPIC, don.hedera_message_hashscan_url)
+        ligne = TopicMessage.objects.get(projet=self.projet)
+        self.assertEqual(ligne.contenu['idempotencyKey'], message.cle_idempotence)
+
+        # Réponse rejouée (bail expiré pendant l'envoi) : rien n'est écrit deux fois
+        self.assertEqual(outbox._confirmer(message, {'success': True, 'messageId': 'autre'}), 'doublon')
+        topics.tampon.vider()
+        self.assertEqual(TopicMessage.objects.filter(projet=self.projet).count(), 1)
+        self.assertEqual(Transaction.objects.get(pk=self.don.pk).hedera_message_id, '0.0.2@1700000000.000000002')
+        with self.client_hedera():
+            self.assertEqual(self.drain(), {})
+
+
+@override_settings(DONATION_INPROCESS=False, HEDERA_OPERATOR_ID='0.0.2')
+class TraitementDonTests(TestCase):
+    """Worker des dons (core/donations.py) et vue statut_don."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        from . import donations
+
+        cache.clear()
+        self.projet = creer_projet(topic_id='0.0.5400')
+        self.donateur = User.objects.create_user(
+            username='donateur', password='x', user_type='donateur', email='donateur@example.org',
+            hedera_account_id='0.0.8001', hedera_private_key='302e-cle',
+        )
+        self.don = donations.soumettre(self.donateur, self.projet, 300)
+
+    def traiter(self, transfert):
+        """Réclame le don puis l'exécute avec un transfert stub (réponse ou exception)."""
+        from . import donations
+
+        self.assertEqual(donations.reclamer(10), [self.don.pk])
+        self.assertEqual(self.etape(), 'transfert_envoye')
+        reglage = {'side_effect': transfert} if isinstance(transfert, Exception) else {'return_value': transfert}
+        with mock.patch('core.donations.balances.transferer', **reglage):
+            return donations.executer(self.don.pk)
+
+    def etape(self):
+        from .models import TraitementDon
+
+        return TraitementDon.objects.get(pk=self.don.pk).etape
+
+    @staticmethod
+    def reponse(status_code=200, **data):
+        return mock.Mock(status_code=status_code, json=mock.Mock(return_value=data))
+
+    def test_transfert_confirme(self):
+        from .models import FinancementProjet, OutboxHCS, Transaction
+
+        reponse = self.reponse(success=True, transactionId='0.0.8001@1700000000.000000003', status='SUCCESS')
+        self.assertEqual(self.traiter(reponse), 'termine')
+        don = Transaction.objects.get(pk=self.don.pk)
+        self.assertEqual((don.statut, don.hedera_transaction_hash), ('confirme', '0.0.8001@1700000000.000000003'))
+        self.assertEqual(FinancementProjet.objects.get(projet=self.projet).montant_total, 300)
+        self.assertTrue(OutboxHCS.objects.filter(transaction=don, topic_id='0.0.5400').exists())
+
+    def test_transfert_refuse(self):
+        from .models import Transaction
+
+        with self.assertLogs('core.donations', 'WARNING'):
+            self.assertEqual(self.traiter(self.reponse(400, success=False, error="solde insuffisant")), 'echec')
+        self.assertEqual(Transaction.objects.get(pk=self.don.pk).statut, 'erreur')
+
+    def test_transfert_non_parti_rejoue_puis_abandonne(self):
+        from . import donations
+        from .models import TraitementDon, Transaction
+
+        with self.settings(DONATION_MAX_ATTEMPTS=2):
+            self.assertEqual(self.traiter(HederaUnavailable("circuit ouvert")), 'a_transferer')
+            traitement = TraitementDon.objects.get(pk=self.don.pk)
+            self.assertEqual(traitement.tentatives, 1)
+            self.assertGreater(traitement.prochaine_tentative, timezone.now())
+            self.assertEqual(donations.reclamer(10), [])  # pas avant le délai
+
+            TraitementDon.objects.filter(pk=self.don.pk).update(prochaine_tentative=timezone.now())
+            self.assertEqual(self.traiter(requests.exceptions.ConnectTimeout("injoignable")), 'echec')
+        self.assertEqual(Transaction.objects.get(pk=self.don.pk).statut, 'erreur')
+
+    def test_issue_incertaine_a_verifier(self):
+        from .models import Transaction
+
+        with self.assertLogs('core.donations', 'ERROR'):
+            self.assertEqual(self.traiter(requests.exceptions.ReadTimeout("pas de réponse")), 'a_verifier')
+        self.assertEqual(Transaction.objects.get(pk=self.don.pk).statut, 'en_attente')
+
+    def test_reprise_apres_arret_du_worker(self):
+        from . import donations
+        from .models import TraitementDon, Transaction
+
+        self.assertEqual(donations.reclamer(10), [self.don.pk])
+        # Worker arrêté pendant l'appel : bail expiré, issue inconnue, jamais retransféré
+        TraitementDon.objects.filter(pk=self.don.pk).update(prochaine_tentative=timezone.now() - timedelta(seconds=1))
+        with self.assertLogs('core.donations', 'WARNING'):
+            self.assertEqual(donations.expirer_baux(), 1)
+        self.assertEqual(self.etape(), 'a_verifier')
+        self.assertEqual(donations.reclamer(10), [])
+
+        # Réponse arrivée après l'expiration : le don n'est pas confirmé en double
+        with self.assertLogs('core.donations', 'ERROR'):
+            self.assertEqual(donations._confirmer(self.don.pk, {'transactionId': '0.0.8001@1.2'}), 'a_verifier')
+        self.assertEqual(Transaction.objects.get(pk=self.don.pk).statut, 'en_attente')
+
+    def test_wallet_absent(self):
+        User.objects.filter(pk=self.donateur.pk).update(hedera_private_key='')
+        self.assertEqual(self.traiter(self.reponse()), 'echec')
+
+    def test_vue_statut_don(self):
+        from django.urls import reverse
+
+        url = reverse('statut_don', args=[self.don.audit_uuid])
+        self.client.force_login(self.donateur)
+        data = self.client.get(url).json()
+        self.assertEqual((data['etape'], data['termine'], data['statut']), ('a_transferer', False, 'en_attente'))
+        self.assertEqual(data['montant'], '300')
+
+        self.traiter(self.reponse(success=True, transactionId='0.0.8001@1700000000.000000004'))
+        data = self.client.get(url).json()
+        self.assertEqual((data['etape'], data['termine'], data['statut']), ('termine', True, 'confirme'))
+        self.assertEqual(data['transaction_hash'], '0.0.8001@1700000000.000000004')
+
+        # Le don d'un autre utilisateur n'est pas visible
+        self.client.force_login(User.objects.create_user(username='autre', password='x', user_type='donateur'))
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class IngestionHCSTests(TestCase):
+    """Ingestion des topics depuis le mirror node, servi par le remplaçant local (core/hcs_ingestion.py)."""
+
+    @classmethod
+    def setUpClass(cls):
+        import threading
+
+        from .hedera_standin import creer_serveur
+
+        super().setUpClass()
+        cls.serveur = creer_serveur('127.0.0.1', 0, '0.0.2', latency_scale=0, jitter=0)
+        threading.Thread(target=cls.serveur.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.serveur.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.serveur.shutdown()
+        cls.serveur.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.ledger = self.serveur.ledger
+        self.ledger.reset()
+        self.client_hedera = HederaClient(base_url=self.url, retries=0)
+        self.topic = self.ledger.create_topic('projet')['topicId']
+        self.projet = creer_projet(topic_id=self.topic)
+
+    def publier(self, nombre, debut=1):
+        for i in range(debut, debut + nombre):
+            self.ledger.send_message(self.topic, {'type': 'don', 'montant': i})
+
+    def synchroniser(self, **options):
+        from . import hcs_ingestion
+
+        return hcs_ingestion.synchroniser_topic(self.projet.pk, self.topic, client=self.client_hedera, **options)
+
+    def test_chainer_reproduit_les_running_hash_publies(self):
+        import base64
+        import hashlib
+
+        from .hcs_ingestion import calculer_running_hash, chainer
+
+        self.publier(3)
+        messages = self.client_hedera.mirror_topic_messages(self.topic, {'limit': 10}).json()['messages']
+        precedent = bytes(48)
+        for message in messages:
+            octets = base64.b64decode(message['message'])
+            args = (precedent, self.topic, message['payer_account_id'], message['consensus_timestamp'],
+                    message['sequence_number'])
+            attendu = chainer(*args, hashlib.sha384(octets).digest())
+            self.assertEqual(attendu, calculer_running_hash(*args, octets))
+            self.assertEqual(base64.b64encode(attendu).decode('ascii'), message['running_hash'])
+            precedent = attendu
+        # Un octet du message modifié change le hash
+        self.assertNotEqual(chainer(*args, hashlib.sha384(octets + b' ').digest()), precedent)
+
+    def test_point_de_reprise_et_synchronisation_incrementale(self):
+        from . import hcs_ingestion, hcs_verification
+        from .models import CurseurSynchronisation, StatistiquesTopic, TopicMessage
+
+        self.publier(150)
+        resultat = self.synchroniser(pages_max=1)
+        self.assertEqual((resultat['messages'], resultat['derniere_sequence'], resultat['a_jour']), (100, 100, False))
+        resultat = self.synchroniser()
+        self.assertEqual((resultat['messages'], resultat['derniere_sequence'], resultat['a_jour']), (50, 150, True))
+        curseur = CurseurSynchronisation.objects.get(nom=hcs_ingestion.nom_curseur(self.topic))
+        self.assertEqual(curseur.position, '150')
+
+        self.publier(5, debut=151)
+        resultat = self.synchroniser()
+        self.assertEqual((resultat['messages'], resultat['derniere_sequence']), (5, 155))
+        self.assertEqual(self.synchroniser()['messages'], 0)
+
+        messages = TopicMessage.objects.filter(projet=self.projet)
+        self.assertEqual(messages.count(), 155)
+        self.assertEqual(messages.values('sequence_number').distinct().count(), 155)
+        self.assertEqual(StatistiquesTopic.objects.get(projet=self.projet).nombre_messages, 155)
+        self.assertEqual(messages.get(sequence_number=42).montant, 42)
+        verification = hcs_verification.verifier_topic(self.projet.pk, self.topic)
+        self.assertEqual(dict(verification['compteurs']), {'verifies': 155})
+
+    def test_message_de_l_outbox_complete_sans_doublon(self):
+        from . import outbox
+        from .models import StatistiquesTopic, TopicMessage
+
+        outbox.enqueue(self.topic, 'preuve', {'type': 'preuve', 'palier': 1}, cle='preuve:1')
+        with mock.patch('core.outbox.get_client', return_value=self.client_hedera):
+            self.assertEqual(outbox.drain(concurrence=1), {'envoye': 1})
+        envoye = TopicMessage.objects.get(projet=self.projet)
+        self.assertIsNone(envoye.sequence_number)
+
+        self.publier(1, debut=2)
+        resultat = self.synchroniser()
+        self.assertEqual((resultat['messages'], resultat['ingeres']), (2, 2))  # une ligne complétée, une créée
+        messages = TopicMessage.objects.filter(projet=self.projet).order_by('sequence_number')
+        self.assertEqual([(m.pk == envoye.pk, m.sequence_number) for m in messages], [(True, 1), (False, 2)])
+        complete = messages[0]
+        self.assertEqual(complete.contenu['idempotencyKey'], 'preuve:1')
+        self.assertTrue(complete.running_hash and complete.message_sha384 and complete.consensus_ns)
+        self.assertEqual(StatistiquesTopic.objects.get(projet=self.projet).nombre_messages, 2)
+
+    def test_service_compte_les_messages_enregistres_et_non_les_messages_lus(self):
+        from . import hcs_ingestion
+        from .hcs_service import HCSService
+        from .models import CurseurSynchronisation
+
+        self.publier(3)
+        with mock.patch('core.hcs_ingestion.get_mirror_client', return_value=self.client_hedera):
+            self.assertEqual(HCSService.sync_project_messages(self.projet)['messages_created'], 3)
+            # Point de reprise perdu : la page est relue sans rien créer
+            CurseurSynchronisation.objects.filter(nom=hcs_ingestion.nom_curseur(self.topic)).update(position='0')
+            resultat = HCSService.sync_project_messages(self.projet)
+        self.assertEqual((resultat['messages_created'], resultat['last_sequence_number']), (0, 3))
+
+    def test_topic_inconnu(self):
+        from . import hcs_ingestion
+
+        with self.assertRaises(hcs_ingestion.TopicIntrouvable):
+            hcs_ingestion.synchroniser_topic(self.projet.pk, '0.0.999999', client=self.client_hedera)
+
+
+class PoolWalletsTests(TestCase):
+    """Pool de comptes Hedera pré-créés (core/wallets.py)."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.user = User.objects.create_user(username='nouveau', password='x', user_type='donateur')
+
+    def ajouter(self, *comptes):
+        from . import wallets
+        from .models import PooledWallet
+
+        for account_id in comptes:
+            PooledWallet.objects.create(
+                account_id=account_id, public_key=f"pub-{account_id}",
+                private_key_chiffree=wallets.chiffrer(f"cle-{account_id}"),
+            )
+
+    def test_chiffrement_aller_retour(self):
+        from cryptography.fernet import InvalidToken
+
+        from . import wallets
+
+        jeton = wallets.chiffrer('302e020100300506032b6570')
+        self.assertNotIn('302e020100300506032b6570', jeton)
+        self.assertEqual(wallets.dechiffrer(jeton), '302e020100300506032b6570')
+        with override_settings(WALLET_POOL_KEY='une-autre-cle'), self.assertRaises(InvalidToken):
+            wallets.dechiffrer(jeton)
+
+    def test_un_seul_wallet_par_utilisateur_sous_requetes_concurrentes(self):
+        from . import wallets
+        from .models import PooledWallet
+
+        self.ajouter('0.0.9001', '0.0.9002', '0.0.9003')
+        # Deux requêtes du même utilisateur, chargées avant toute attribution
+        premiere, seconde = User.objects.get(pk=self.user.pk), User.objects.get(pk=self.user.pk)
+        self.assertTrue(wallets.attribuer_a_utilisateur(premiere))
+        self.assertTrue(wallets.attribuer_a_utilisateur(seconde))
+
+        self.assertEqual(PooledWallet.objects.filter(date_attribution__isnull=False).count(), 1)
+        self.assertEqual(seconde.hedera_account_id, premiere.hedera_account_id)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual((user.hedera_account_id, user.hedera_private_key), ('0.0.9001', 'cle-0.0.9001'))
+        self.assertTrue(user.wallet_activated)
+
+        autre = User.objects.create_user(username='autre', password='x', user_type='donateur')
+        self.assertTrue(wallets.attribuer_a_utilisateur(autre))
+        self.assertEqual(autre.hedera_account_id, '0.0.9002')
+        self.assertEqual(
+            dict(PooledWallet.objects.filter(date_attribution__isnull=False).values_list('account_id', 'attribue_a')),
+            {'0.0.9001': f"user:{self.user.pk}", '0.0.9002': f"user:{autre.pk}"},
+        )
+        self.assertEqual(wallets.disponibles(), 1)
+
+    def test_pool_vide_memorise_jusqu_au_reapprovisionnement(self):
+        from . import wallets
+
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.assertFalse(wallets.attribuer_a_utilisateur(self.user))
+        with CaptureQueriesContext(connection) as requetes:
+            self.assertFalse(wallets.attribuer_a_utilisateur(self.user))
+            self.assertIsNone(wallets.reclamer('projet:1'))
+        # Seule la lecture du marqueur dans le cache : ni verrou sur l'utilisateur ni lecture du pool
+        self.assertFalse([q['sql'] for q in requetes if 'core_user' in q['sql'] or 'core_pooledwallet' in q['sql']])
+
+        cree = {'success': True, 'accountId': '0.0.9100', 'publicKey': 'pub', 'privateKey': 'cle-0.0.9100'}
+        with mock.patch.object(wallets, 'creer_compte', return_value=cree), \
+                mock.patch.object(wallets.connection, 'close'):
+            self.assertTrue(wallets._creer_wallet_pool())  # une tâche de reapprovisionner
+        self.assertTrue(wallets.attribuer_a_utilisateur(self.user))
+        self.assertEqual(self.user.hedera_account_id, '0.0.9100')
+
+    def test_commande_d_administration_cree_le_compte_si_pool_vide(self):
+        from . import wallets
+
+        self.assertIsNone(wallets.reclamer('projet:1'))
+        cree = {'success': True, 'accountId': '0.0.9200', 'publicKey': 'pub', 'privateKey': 'cle'}
+        with mock.patch.object(wallets, 'creer_compte', return_value=cree) as creer:
+            self.assertTrue(self.user.ensure_wallet(allow_create=True))
+        creer.assert_called_once()
+        self.assertEqual(User.objects.get(pk=self.user.pk).hedera_account_id, '0.0.9200')
+
+    def test_middleware_ne_reessaie_pas_a_chaque_requete(self):
+        from . import wallets
+
+        self.client.force_login(self.user)
+        with mock.patch.object(wallets, 'reclamer', wraps=wallets.reclamer) as reclamer:
+            self.client.get('/')
+            self.client.get('/')
+        self.assertEqual(reclamer.call_count, 1)
+        self.assertIsNone(User.objects.get(pk=self.user.pk).hedera_account_id)
+
+
+class RafraichissementTauxTests(TestCase):
+    """Verrou de rafraîchissement du taux HBAR/USD (core/rates.py)."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+
+    def test_rafraichissement_force_ne_libere_pas_le_verrou_d_un_autre_processus(self):
+        from decimal import Decimal
+
+        from django.core.cache import cache
+
+        from . import rates
+
+        cache.set(rates.LOCK_KEY, 'autre-processus', 30)
+        with mock.patch.object(rates, 'fetch_hbar_usd', return_value=Decimal('0.08')) as fetch:
+            self.assertIsNone(rates.refresh_rate())
+            self.assertIsNotNone(rates.refresh_rate(force=True))
+        fetch.assert_called_once()
+        self.assertEqual(cache.get(rates.LOCK_KEY), 'autre-processus')
+
+    def test_verrou_libere_apres_rafraichissement(self):
+        from decimal import Decimal
+
+        from django.core.cache import cache
+
+        from . import rates
+
+        with mock.patch.object(rates, 'fetch_hbar_usd', side_effect=[Decimal('0.08'), ValueError('source')]):
+            self.assertIsNotNone(rates.refresh_rate(force=True))
+            self.assertIsNone(cache.get(rates.LOCK_KEY))
+            self.assertIsNone(rates.refresh_rate())
+        self.assertIsNone(cache.get(rates.LOCK_KEY))
+
+
+class TableauDeBordTests(TestCase):
+    """Instantané des statistiques du tableau de bord (core/dashboard.py)."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        from .models import Association, Transaction
+
+        cache.clear()
+        self.projets = [creer_projet(titre=f"Projet {i}") for i in range(3)]
+        creer_projet(titre='A valider', statut='en_attente')
+        for i, valide in enumerate([True, False]):
+            user = User.objects.create_user(username=f"asso-{i}", password='x', user_type='association')
+            Association.objects.update_or_create(user=user, defaults={'nom': f"Asso {i}", 'valide': valide})
+        self.donateurs = [
+            User.objects.create_user(username=f"donateur-{i}", password='x', user_type='donateur') for i in range(6)
+        ]
+        porteur = self.projets[2].porteur
+
+        maintenant = timezone.now()
+        # (contributeur, montant, statut, âge) : aujourd'hui, bornes de la fenêtre de 15 jours, hors fenêtre
+        dons = [
+            (self.donateurs[0], 500, 'confirme', timedelta(0)),
+            (self.donateurs[0], 250, 'confirme', timedelta(days=3)),
+            (self.donateurs[1], 900, 'confirme', timedelta(days=14)),
+            (self.donateurs[2], 100, 'confirme', timedelta(days=15)),
+            (self.donateurs[3], 300, 'confirme', timedelta(days=1)),
+            (self.donateurs[4], 50, 'confirme', timedelta(days=2)),
+            (self.donateurs[5], 75, 'confirme', timedelta(days=2)),
+            (self.donateurs[5], 999, 'en_attente', timedelta(0)),
+            (porteur, 1000, 'confirme', timedelta(0)),  # pas un donateur : absent du classement
+        ]
+        for i, (contributeur, montant, statut, age) in enumerate(dons):
+            don = Transaction.objects.create(user=contributeur, contributeur=contributeur,
+                                             projet=self.projets[i % 3], montant=montant, statut=statut)
+            Transaction.objects.filter(pk=don.pk).update(date_transaction=maintenant - age)
+        # Après les dons (qui réévaluent la disponibilité des paliers), sans signal
+        Projet.objects.filter(pk=self.projets[0].pk).update(pret_distribution=True)
+        Projet.objects.filter(pk=self.projets[1].pk).update(statut='termine', pret_distribution=True)
+
+    def test_instantane_identique_aux_requetes_par_champ(self):
+        from django.db.models import Count, Sum
+
+        from . import dashboard
+        from .models import Association, Transaction
+
+        instantane = dashboard.calculer()
+        stats, aujourdhui = instantane['stats'], timezone.localdate()
+        confirmees = Transaction.objects.filter(statut='confirme')
+
+        self.assertEqual(stats, {
+            'projets_attente': Projet.objects.filter(statut='en_attente').count(),
+            'associations_attente': Association.objects.filter(valide=False).count(),
+            'paliers_action': Projet.objects.filter(pret_distribution=True, statut='actif').count(),
+            'preuves_verification': 0,
+            'transactions_verification': Transaction.objects.filter(statut='en_attente').count(),
+            'projets_total': Projet.objects.count(),
+            'projets_actifs': Projet.objects.filter(statut='actif').count(),
+            'projets_termines': Projet.objects.filter(statut='termine').count(),
+            'utilisateurs_total': User.objects.count(),
+            'association_total': User.objects.filter(user_type='association').count(),
+            'porteurs_total': User.objects.filter(user_type='porteur').count(),
+            'donateurs_total': User.objects.filter(user_type='donateur').count(),
+            'transactions_confirmees': confirmees.count(),
+            'montant_total': confirmees.aggregate(Sum('montant'))['montant__sum'],
+            'montant_jour': confirmees.filter(date_transaction__date=aujourdhui).aggregate(Sum('montant'))['montant__sum'],
+            'dons_jour': confirmees.filter(date_transaction__date=aujourdhui).count(),
+        })
+        self.assertEqual((stats['paliers_action'], stats['montant_jour'], stats['dons_jour']), (1, 1500, 2))
+
+        jours = [aujourdhui - timedelta(days=i) for i in range(14, -1, -1)]
+        graphique = instantane['donnees_graphique']
+        self.assertEqual(graphique['labels'], [jour.strftime('%d/%m') for jour in jours])
+        for jour, montant, nombre in zip(jours, graphique['montants'], graphique['nombre_dons']):
+            du_jour = confirmees.filter(date_transaction__date=jour)
+            self.assertEqual(montant, float(du_jour.aggregate(Sum('montant'))['montant__sum'] or 0), jour)
+            self.assertEqual(nombre, du_jour.count(), jour)
+        self.assertEqual(sum(graphique['nombre_dons']), 7)  # le don d'il y a 15 jours est hors fenêtre
+
+        attendus = User.objects.filter(user_type='donateur', transactions__statut='confirme').annotate(
+            total_dons=Sum('transactions__montant'), nombre_dons=Count('transactions'),
+        ).order_by('-total_dons')[:5]
+        self.assertEqual(
+            [(d['contributeur__username'], d['total_dons'], d['nombre_dons']) for d in instantane['top_donateurs']],
+            [(u.username, u.total_dons, u.nombre_dons) for u in attendus],
+        )
+        self.assertEqual(instantane['top_donateurs'][0]['contributeur__username'], 'donateur-1')
+
+    def test_invalidation_par_les_signaux(self):
+        from . import dashboard
+        from .models import Transaction
+
+        self.assertEqual(dashboard.instantane()['stats']['projets_attente'], 1)
+        projet = creer_projet(titre='Nouveau', statut='en_attente')
+        self.assertEqual(dashboard.instantane()['stats']['projets_attente'], 2)
+
+        projet.statut = 'actif'
+        projet.save()
+        self.assertEqual(dashboard.instantane()['stats']['projets_attente'], 1)
+
+        # Connexion (last_login) et dons : l'instantané est conservé jusqu'au TTL
+        genere_le = dashboard.instantane()['genere_le']
+        donateur = self.donateurs[0]
+        donateur.last_login = timezone.now()
+        donateur.save(update_fields=['last_login'])
+        Transaction.objects.create(user=donateur, contributeur=donateur, projet=projet, montant=10, statut='confirme')
+        self.assertEqual(dashboard.instantane()['genere_le'], genere_le)
+
+        projet.delete()
+        self.assertNotEqual(dashboard.instantane()['genere_le'], genere_le)
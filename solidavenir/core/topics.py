@@ -0,0 +1,180 @@
+# core/topics.py
+"""
+Topics HCS des projets : résolution topic -> projet et écriture groupée des
+TopicMessage.
+
+- `projet_id(topic_id)` lit une table en mémoire du processus, puis le cache
+  partagé (cache Django), et ne va en base qu'en dernier recours. Un topic
+  n'est attribué qu'une fois (creer_topic_pour_projet appelle `associer`),
+  l'entrée locale expire après TOPIC_CACHE_LOCAL_TTL secondes pour qu'une
+  invalidation faite par un autre processus finisse par être vue.
+- `tampon` accumule les TopicMessage et les écrit par bulk_create (avec la
+  mise à jour des statistiques du topic, voir core/hcs_stats.py) quand il
+  atteint TOPIC_MESSAGE_BUFFER_SIZE lignes, à la fin de chaque lot de
+  l'outbox et à l'arrêt du processus. Si le lot échoue, les lignes sont
+  réécrites une par une : une ligne refusée n'empêche pas les autres
+  d'être écrites. Une ligne refusée TOPIC_MESSAGE_MAX_ATTEMPTS fois est
+  abandonnée (journalisée en erreur) ; base indisponible, les lignes sont
+  gardées sans compter d'essai.
+
+Une ligne perdue (arrêt brutal avant le vidage, ligne abandonnée) est
+recréée par la synchronisation du topic (commande sync_topics), qui retrouve
+les messages sur le mirror node.
+
+Les signaux de Projet appellent `invalider` quand un projet est supprimé ou
+change de topic.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import InterfaceError, OperationalError, transaction as db_transaction
+
+from . import hcs_stats
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'topic_projet:'
+
+_lock = threading.Lock()
+_local = {}  # topic_id -> (projet_id, expiration)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# =============================================================================
+# RÉSOLUTION TOPIC -> PROJET
+# =============================================================================
+
+def _memoriser(topic_id, projet_id):
+    with _lock:
+        _local[topic_id] = (projet_id, time.monotonic() + _setting('TOPIC_CACHE_LOCAL_TTL', 300))
+
+
+def projet_id(topic_id):
+    """Id du projet propriétaire du topic, ou None."""
+    if not topic_id:
+        return None
+    entree = _local.get(topic_id)
+    if entree is not None and entree[1] > time.monotonic():
+        return entree[0]
+
+    pk = cache.get(CACHE_PREFIX + topic_id)
+    if pk is None:
+        from .models import Projet
+        pk = Projet.objects.filter(topic_id=topic_id).values_list('pk', flat=True).first()
+        if pk is None:
+            # Pas mis en cache : le topic peut être attribué juste après
+            return None
+        cache.set(CACHE_PREFIX + topic_id, pk, _setting('TOPIC_CACHE_TTL', 86400))
+    _memoriser(topic_id, pk)
+    return pk
+
+
+def associer(topic_id, projet_id):
+    """À appeler quand un topic est attribué à un projet."""
+    cache.set(CACHE_PREFIX + topic_id, projet_id, _setting('TOPIC_CACHE_TTL', 86400))
+    _memoriser(topic_id, projet_id)
+
+
+def invalider(topic_id):
+    cache.delete(CACHE_PREFIX + topic_id)
+    with _lock:
+        _local.pop(topic_id, None)
+
+
+# =============================================================================
+# ÉCRITURE GROUPÉE DES TOPICMESSAGE
+# =============================================================================
+
+class TamponMessages:
+    """Buffer de TopicMessage partagé entre threads, écrit par bulk_create."""
+
+    def __init__(self, taille=None):
+        self._taille = taille
+        self._lock = threading.Lock()
+        self._lignes = []
+
+    @property
+    def taille(self):
+        return self._taille or _setting('TOPIC_MESSAGE_BUFFER_SIZE', 500)
+
+    def __len__(self):
+        return len(self._lignes)
+
+    def ajouter(self, **champs):
+        """Ajoute un TopicMessage (champs du modèle) ; vide le buffer quand il est plein."""
+        from .models import TopicMessage
+
+        with self._lock:
+            self._lignes.append(TopicMessage(**champs))
+            plein = len(self._lignes) >= self.taille
+        if plein:
+            self.vider()
+
+    def vider(self):
+        """
+        Écrit les lignes en attente ; retourne le nombre de lignes écrites.
+        Les lignes non écrites restent en attente, sauf celles abandonnées
+        après TOPIC_MESSAGE_MAX_ATTEMPTS refus.
+        """
+        with self._lock:
+            lignes, self._lignes = self._lignes, []
+        if not lignes:
+            return 0
+        try:
+            self._ecrire(lignes)
+        except Exception as e:
+            logger.warning(f"Erreur écriture de {len(lignes)} TopicMessage, écriture ligne par ligne: {e}")
+            _annuler(lignes)
+        else:
+            return len(lignes)
+
+        ecrites, restantes = 0, []
+        for i, ligne in enumerate(lignes):
+            try:
+                self._ecrire([ligne])
+            except (OperationalError, InterfaceError) as e:
+                # Base indisponible : inutile d'essayer les suivantes, aucun essai compté
+                logger.error(f"Base indisponible, {len(lignes) - i} TopicMessage gardés en attente: {e}")
+                _annuler(lignes[i:])
+                restantes.extend(lignes[i:])
+                break
+            except Exception as e:
+                _annuler([ligne])
+                ligne._echecs = getattr(ligne, '_echecs', 0) + 1
+                if ligne._echecs < _setting('TOPIC_MESSAGE_MAX_ATTEMPTS', 3):
+                    restantes.append(ligne)
+                else:
+                    logger.error(
+                        f"TopicMessage abandonné après {ligne._echecs} échecs (projet {ligne.projet_id}, "
+                        f"{ligne.type_message}, clé {ligne.contenu.get('idempotencyKey')}): {e}"
+                    )
+            else:
+                ecrites += 1
+        if restantes:
+            with self._lock:
+                self._lignes[:0] = restantes
+        return ecrites
+
+    def _ecrire(self, lignes):
+        from .models import TopicMessage
+
+        with db_transaction.atomic():
+            TopicMessage.objects.bulk_create(lignes, batch_size=self.taille)
+            hcs_stats.enregistrer(lignes)
+
+
+def _annuler(lignes):
+    # Transaction annulée : les pk éventuellement attribués n'existent pas
+    for ligne in lignes:
+        ligne.pk = None
+
+
+tampon = TamponMessages()
+atexit.register(tampon.vider)
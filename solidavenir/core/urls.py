@@ -26,11 +26,13 @@ urlpatterns = [
     # Dashboard / Transactions
     # -------------------------
     path('tableau-de-bord/', views.tableau_de_bord, name='tableau_de_bord'),  # Dashboard
+    path('tableau-de-bord/performances/', views.performances, name='performances'),  # Per-view performance stats
     path('mes-dons/', views.mes_dons, name='mes_dons'),  # My donations
     path('mes-dons-recus/', views.dons_recus, name='dons_recus'),  # Received donations
     path('transactions/validation/', views.liste_transactions_validation, name='liste_transactions_validation'),  # Transactions to validate
     path('valider/<uuid:audit_uuid>/', views.valider_projet, name='valider_projet'),  # Validate project
     path('donation/<int:project_id>/process/', views.process_donation, name='process_donation'),  # Process donation
+    path('don/<uuid:audit_uuid>/statut/', views.statut_don, name='statut_don'),  # Donation status (JSON polling)
 
     # -------------------------
     # Projects
@@ -99,6 +101,8 @@ urlpatterns = [
     path('gerer_distributions/', views.gerer_distributions, name='gerer_distributions'),  # Manage distributions
     path('logs_distributions/', views.logs_distributions, name='logs_distributions'),  # Distribution logs
     path('logs-audit/', views.logs_audit, name='logs_audit'),  # Audit logs
+    path('hcs/topics/', views.hcs_topic_list, name='hcs_topic_list'),  # HCS topics and statistics
+    path('hcs/topics/<str:topic_id>/', views.hcs_topic_detail, name='hcs_topic_detail'),  # HCS topic messages
 
     # -------------------------
     # Utility
@@ -1,28 +1,4 @@
 # core/utils.py ou core/admin.py
-from decimal import Decimal
-from .models import Palier
-
-def creer_paliers(projet):
-    """
-    Crée automatiquement les paliers pour un projet selon la répartition 40%-30%-30%
-    """
-    # Supprimer les paliers existants pour éviter les doublons
-    projet.paliers.all().delete()
-    
-    # Définition des paliers standard
-    pourcentages = [40, 30, 30]
-    paliers_crees = []
-    
-    for pct in pourcentages:
-        montant_palier = (projet.montant_demande * Decimal(pct)) / 100
-        palier = Palier.objects.create(
-            projet=projet,
-            pourcentage=Decimal(pct),
-            montant=montant_palier
-        )
-        paliers_crees.append(palier)
-    
-    return paliers_crees
 
 # Dans vos modèles ou utils.py
 from django.template.defaulttags import register
@@ -21,11 +21,12 @@ from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.contrib.humanize.templatetags.humanize import intcomma
 from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.core.mail import send_mail, EmailMessage
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.db import transaction as db_transaction
 from django.db.models import (
-    Sum, Count, Q, Avg, Max, Min, F, DecimalField, Prefetch
+    Sum, Count, Q, Avg, Min, F, DecimalField, Prefetch
 )
 from django.db.models.functions import Coalesce, TruncMonth,TruncDate
 from django.http import (
@@ -42,7 +43,8 @@ from django.views.decorators.csrf import csrf_protect, csrf_exempt
 # Local apps imports
 from .models import (
     Projet, Transaction, User, AuditLog, Association,
-    Palier, PreuvePalier, FichierPreuve, EmailLog, TransactionAdmin
+    Palier, PreuvePalier, FichierPreuve, EmailLog, TransactionAdmin,
+    StatistiquesHCS, StatistiquesTopic, convert_hbar_to_fcfa_many
 )
 from .forms import (
     InscriptionFormSimplifiee, CreationProjetForm,AjoutImagesProjetForm, ValidationProjetForm,
@@ -51,6 +53,11 @@ from .forms import (
     EmailFormSimple, PreuveForm, VerificationPreuveForm,PalierForm,TransferDirectForm
 )
 from .utils import safe_float, safe_int, safe_decimal
+from .rates import get_rate_snapshot
+from . import paliers as service_paliers
+from . import balances, dashboard, donations, hcs_stats, outbox, perf, topics, wallets
+from .hcs_service import HCSService
+from .hedera_client import get_client as get_hedera_client
 
 # associations/views.py
 from django.shortcuts import render, get_object_or_404, redirect
@@ -86,7 +93,7 @@ def accueil(request):
     projets_populaires = Projet.objects.filter(
         statut='actif'
     ).annotate(
-        total_collecte=Sum('transaction__montant', filter=Q(transaction__statut='confirme'))
+        total_collecte=Coalesce(F('financement__montant_total'), 0, output_field=DecimalField())
     ).order_by('-total_collecte')[:3]
     
     # Statistiques globales
@@ -628,17 +635,8 @@ def profil(request):
     """Page de profil utilisateur"""
     
     # Récupérer le solde Hedera si le wallet est configuré
-    solde = None
-    if request.user.hedera_account_id:
-        try:
-            response = requests.get(
-                f'http://localhost:3001/balance/{request.user.hedera_account_id}',
-                timeout=5
-            )
-            if response.status_code == 200:
-                solde = response.json().get('balance')
-        except Exception as e:
-            print(f"Erreur récupération solde: {e}")
+    # Solde en cache, rafraîchi en arrière-plan (voir core/balances.py)
+    solde = balances.get_solde(request.user.hedera_account_id)
 
     context = {'user': request.user,
                'solde': solde
@@ -986,15 +984,13 @@ def transfer_direct_association(request):
                     messages.error(request, "Wallet non disponible pour le transfert")
                     return render(request, 'core/associations/transfer_direct.html', {'form': form})
 
-                # Transfert HBAR via API locale
-                transfer_data = {
-                    'fromAccountId': user.hedera_account_id,
-                    'fromPrivateKey': user.hedera_private_key,
-                    'toAccountId': association.user.hedera_account_id,  # ✅ Compte réel de l’association
-                    'amount': float(montant)
-                }
-
-                response = requests.post('http://localhost:3001/transfer', json=transfer_data, timeout=30)
+                # Transfert HBAR via le microservice
+                response = balances.transferer(
+                    user.hedera_account_id,
+                    user.hedera_private_key,
+                    association.user.hedera_account_id,  # ✅ Compte réel de l’association
+                    montant,
+                )
 
                 if response.status_code != 200:
                     messages.error(request, "Erreur de connexion avec le service de transfert")
@@ -1126,16 +1122,10 @@ def creer_projet(request):
                     if est_association and association:
                         projet.association = association
 
-                    #  Création du wallet Hedera pour ce projet
+                    #  Wallet Hedera du projet, pris dans le pool de comptes pré-créés
                     try:
-                        
-                        response = requests.post("http://localhost:3001/create-wallet", timeout=10)
-                        if response.status_code == 200:
-                            data = response.json()
-                            projet.hedera_account_id = data.get("accountId")
-                            projet.hedera_private_key = data.get("privateKey")
-                        else:
-                            raise Exception("Échec de création wallet Hedera")
+                        if not wallets.attribuer_a_projet(projet):
+                            raise Exception("Pool de wallets Hedera vide")
                     except Exception as e:
                         logger.error(f"Erreur wallet Hedera: {str(e)}")
                         messages.error(request, "Le projet a été créé mais sans compte Hedera.")
@@ -1386,6 +1376,7 @@ def detail_projet(request, audit_uuid):
         - Determines if the logged-in user has a Hedera wallet configured.
         - Handles POST requests for contributions via `handle_contribution`.
         - Prepares a contribution form for authenticated users.
+        - Exposes the status of a donation being processed (`?don=<audit_uuid>`) so the page can poll it.
     
     Args:
         request (HttpRequest): The HTTP request object.
@@ -1413,21 +1404,11 @@ def detail_projet(request, audit_uuid):
     #  Incrémenter le compteur de vues
     projet.incrementer_vues()
     
-    #  Statistiques avancées
-    stats_transactions = Transaction.objects.filter(
-        projet=projet, 
-        statut='confirme',
-        destination='operator'
-    ).aggregate(
-        total_contributeurs=Count('contributeur', distinct=True),
-        montant_total=Sum('montant'),
-        don_moyen=Avg('montant'),
-        don_max=Max('montant'),
-        dernier_don=Max('date_transaction')
-    )
+    #  Statistiques avancées (résumé de financement maintenu à chaque don)
+    financement = projet.resume_financement
     
-    contributeurs_count = stats_transactions['total_contributeurs'] or 0
-    montant_total_collecte = stats_transactions['montant_total'] or 0
+    contributeurs_count = financement.nombre_contributeurs
+    montant_total_collecte = financement.montant_total
     
     #  Paliers avec statut
     paliers_avec_statut = []
@@ -1448,11 +1429,12 @@ def detail_projet(request, audit_uuid):
             'montant_fcfa': palier.montant_fcfa if hasattr(palier, 'montant_fcfa') else Decimal('0')
         })
     
-    #  Conversions de devise
+    #  Conversions de devise (un seul snapshot de taux pour toute la page)
+    rate_snapshot = get_rate_snapshot()
     try:
-        from .models import convert_hbar_to_fcfa
         conversions = {
-            'hbar_to_fcfa_rate': Decimal('0.07') * Decimal('600'),  # Taux simplifié
+            'hbar_to_fcfa_rate': rate_snapshot.hbar_fcfa,
+            'rate_source': rate_snapshot.source,
             'montant_demande_fcfa': projet.montant_demande_fcfa,
             'montant_engage_fcfa': projet.montant_engage_fcfa,
             'montant_restant_fcfa': projet.montant_restant_fcfa,
@@ -1461,7 +1443,8 @@ def detail_projet(request, audit_uuid):
     except Exception as e:
         logger.error(f"Erreur conversion devise: {e}")
         conversions = {
-            'hbar_to_fcfa_rate': Decimal('42'),
+            'hbar_to_fcfa_rate': rate_snapshot.hbar_fcfa,
+            'rate_source': rate_snapshot.source,
             'montant_demande_fcfa': Decimal('0'),
             'montant_engage_fcfa': Decimal('0'),
             'montant_restant_fcfa': Decimal('0'),
@@ -1508,7 +1491,23 @@ def detail_projet(request, audit_uuid):
         return handle_contribution(request, projet, user_has_wallet)
     
     # Formulaire de contribution
-    form = Transfer_fond(projet=projet, contributeur=request.user if request.user.is_authenticated else None)
+    form = Transfer_fond(
+        projet=projet,
+        contributeur=request.user if request.user.is_authenticated else None,
+        rate_snapshot=rate_snapshot,
+    )
+
+    # Don en cours de traitement (redirection de process_donation), suivi par la page
+    don_en_cours = None
+    if request.user.is_authenticated and request.GET.get('don'):
+        try:
+            don = Transaction.objects.select_related('traitement').filter(
+                audit_uuid=request.GET['don'], contributeur=request.user, projet=projet
+            ).first()
+        except ValidationError:
+            don = None
+        if don is not None:
+            don_en_cours = donations.statut_don(don)
     
     # Context pour le template
     context = {
@@ -1526,13 +1525,14 @@ def detail_projet(request, audit_uuid):
         'is_preview': projet.statut not in ['actif', 'termine'] and user_can_preview,
         'paliers': paliers_avec_statut,
         'conversions': conversions,
+        'don_en_cours': don_en_cours,
         'stats': {
             'vues': projet.vues,
             'partages': projet.partages,
             'taux_conversion': projet.taux_conversion,
-            'don_moyen': stats_transactions['don_moyen'] or 0,
-            'don_max': stats_transactions['don_max'] or 0,
-            'dernier_don': stats_transactions['dernier_don'],
+            'don_moyen': financement.don_moyen or 0,
+            'don_max': financement.don_max or 0,
+            'dernier_don': financement.dernier_don,
         }
     }
     
@@ -1569,12 +1569,8 @@ def liste_projets(request):
     """Liste de tous les projets actifs avec pagination et filtres"""
     # Récupérer tous les projets actifs
     projets_list = Projet.objects.filter(statut='actif').annotate(
-    montant_collectes=Coalesce(
-        Sum('transaction__montant', filter=Q(transaction__statut='confirme')),
-        0,
-        output_field=DecimalField()
-    ),
-    nombre_donateurs=Count('transaction__contributeur', filter=Q(transaction__statut='confirme'), distinct=True)
+    montant_collectes=Coalesce(F('financement__montant_total'), 0, output_field=DecimalField()),
+    nombre_donateurs=Coalesce(F('financement__nombre_contributeurs'), 0)
     ).order_by('-date_creation')
     
     # Appliquer les filtres
@@ -1653,8 +1649,8 @@ def mes_projets(request):
     
     # Récupérer tous les projets du porteur avec annotations et préchargement
     projets = Projet.objects.filter(porteur=request.user).annotate(
-        nombre_donateurs=Count('transaction__contributeur', filter=Q(transaction__statut='confirme'), distinct=True),
-        derniere_transaction=Max('transaction__date_transaction', filter=Q(transaction__statut='confirme'))
+        nombre_donateurs=Coalesce(F('financement__nombre_contributeurs'), 0),
+        derniere_transaction=F('financement__dernier_don')
     ).prefetch_related(
         Prefetch('paliers', queryset=Palier.objects.order_by('pourcentage')),
         Prefetch('paliers__preuves', queryset=PreuvePalier.objects.order_by('-date_soumission'))
@@ -2125,6 +2121,15 @@ def gerer_distributions(request):
             'total_dons': total_dons,
         })
     
+    # Conversion FCFA de toutes les colonnes en une seule passe (un seul taux)
+    colonnes = ('montant_demande', 'montant_engage', 'montant_disponible')
+    montants_fcfa = iter(convert_hbar_to_fcfa_many(
+        [dist[colonne] for dist in distributions for colonne in colonnes]
+    ))
+    for dist in distributions:
+        for colonne in colonnes:
+            dist[f'{colonne}_fcfa'] = next(montants_fcfa)
+    
     # Gestion des requêtes POST
     if request.method == 'POST':
         projet_id = request.POST.get('projet_id')
@@ -2556,6 +2561,10 @@ def tableau_de_bord(request):
        - Validated associations
        - Associations pending approval
 
+    Statistics, chart data and top donors come from a cached snapshot
+    (core/dashboard.py): one grouped query per table, recomputed at most every
+    DASHBOARD_SNAPSHOT_TTL seconds or after a write that changes an action queue.
+
     Access Control:
     - Only users with administrator privileges can access this view.
     - Non-admin users are redirected to the home page with an error message.
@@ -2572,9 +2581,10 @@ def tableau_de_bord(request):
     - donnees_graphique: donations data structured for charting
     - recent_transactions: latest confirmed transactions
     - recent_audits: latest audit logs
-    - top_donateurs: top donors by total contribution
+    - top_donateurs: top donors by total contribution (dicts: contributeur__username, total_dons, nombre_dons)
     - projets_populaires: most funded active projects
     - aujourdhui: current date for filtering and display
+    - statistiques_generees_le: time the statistics snapshot was computed
     """
 
     """Tableau de bord administrateur complet avec éléments prioritaires"""
@@ -2599,26 +2609,21 @@ def tableau_de_bord(request):
         valide=False
     ).select_related('user').order_by('date_creation_association')[:5]
     
-    # 3. Paliers atteints nécessitant une action
-    paliers_atteints = Palier.objects.filter(
-        transfere=False,
-        projet__statut='actif'
-    ).select_related('projet').order_by('projet__date_creation')
+    # 3. Paliers prêts à être distribués (état enregistré, filtré par index)
+    projets_prets = Projet.objects.filter(
+        pret_distribution=True,
+        statut='actif'
+    ).select_related('palier_pret').order_by('date_creation')
     
-    # Filtrer uniquement les paliers dont le montant minimum est atteint
     paliers_action = []
-    for palier in paliers_atteints:
-        montant_collecte = Transaction.objects.filter(
-            projet=palier.projet,
-            statut='confirme'
-        ).aggregate(Sum('montant'))['montant__sum'] or 0
-        
-        if montant_collecte >= palier.montant_minimum:
-            paliers_action.append({
-                'palier': palier,
-                'montant_collecte': montant_collecte,
-                'pourcentage_atteint': (montant_collecte / palier.projet.montant_demande * 100) if palier.projet.montant_demande > 0 else 0
-            })
+    for projet_pret in projets_prets:
+        palier = projet_pret.palier_pret
+        palier.projet = projet_pret
+        paliers_action.append({
+            'palier': palier,
+            'montant_collecte': projet_pret.montant_engage,
+            'pourcentage_atteint': (projet_pret.montant_engage / projet_pret.montant_demande * 100) if projet_pret.montant_demande > 0 else 0
+        })
     
     # 4. Preuves de palier à vérifier
     preuves_a_verifier = PreuvePalier.objects.filter(
@@ -2630,72 +2635,9 @@ def tableau_de_bord(request):
         statut='en_attente'
     ).select_related('projet', 'contributeur').order_by('-date_transaction')[:5]
     
-    # STATISTIQUES PRINCIPALES (simplifiées pour focus sur l'action)
-    stats = {
-        # Actions prioritaires
-        'projets_attente': projets_attention.count(),
-        'associations_attente': associations_attente.count(),
-        'paliers_action': len(paliers_action),
-        'preuves_verification': preuves_a_verifier.count(),
-        'transactions_verification': transactions_verification.count(),
-        
-        # Projets
-        'projets_total': Projet.objects.count(),
-        'projets_actifs': Projet.objects.filter(statut='actif').count(),
-        'projets_termines': Projet.objects.filter(statut='termine').count(),
-        
-        # Utilisateurs
-        'utilisateurs_total': User.objects.count(),
-        'association_total': User.objects.filter(user_type='association').count(),
-        'porteurs_total': User.objects.filter(user_type='porteur').count(),
-        'donateurs_total': User.objects.filter(user_type='donateur').count(),
-        
-        # Transactions
-        'transactions_confirmees': Transaction.objects.filter(statut='confirme').count(),
-        
-        # Montants
-        'montant_total': Transaction.objects.filter(statut='confirme').aggregate(
-            Sum('montant'))['montant__sum'] or 0,
-        'montant_jour': Transaction.objects.filter(
-            date_transaction__date=aujourdhui,
-            statut='confirme'
-        ).aggregate(Sum('montant'))['montant__sum'] or 0,
-        
-        # Dons
-        'dons_jour': Transaction.objects.filter(
-            date_transaction__date=aujourdhui,
-            statut='confirme'
-        ).count(),
-    }
-    
-    # Données pour les graphiques (conservées mais optionnelles)
-    projets_par_statut = Projet.objects.values('statut').annotate(
-        count=Count('id')
-    ).order_by('statut')
-    
-    # Évolution des dons sur les 15 derniers jours (réduit pour plus de rapidité)
-    derniers_15_jours = [aujourdhui - timedelta(days=i) for i in range(14, -1, -1)]
-    dons_par_jour = Transaction.objects.filter(
-        date_transaction__date__gte=aujourdhui - timedelta(days=14),
-        statut='confirme'
-    ).values('date_transaction__date').annotate(
-        total=Sum('montant'),
-        count=Count('id')
-    ).order_by('date_transaction__date')
-    
-    donnees_graphique = {
-        'labels': [date.strftime('%d/%m') for date in derniers_15_jours],
-        'montants': [0] * 15,
-        'nombre_dons': [0] * 15
-    }
-    
-    for don in dons_par_jour:
-        date_str = don['date_transaction__date'].strftime('%d/%m')
-        if date_str in donnees_graphique['labels']:
-            index = donnees_graphique['labels'].index(date_str)
-            donnees_graphique['montants'][index] = float(don['total'])
-            donnees_graphique['nombre_dons'][index] = don['count']
-    
+    # STATISTIQUES, GRAPHIQUES, TOP DONATEURS : instantané en cache (voir core/dashboard.py)
+    instantane = dashboard.instantane()
+
     # Dernières transactions confirmées (pour monitoring)
     recent_transactions = Transaction.objects.filter(
         statut='confirme'
@@ -2703,30 +2645,14 @@ def tableau_de_bord(request):
     
     # Derniers logs d'audit
     recent_audits = AuditLog.objects.select_related('utilisateur').order_by('-date_action')[:5]
-    
-    # Top donateurs
-    top_donateurs = User.objects.filter(
-        user_type='donateur',
-        transactions__statut='confirme'
-    ).annotate(
-        total_dons=Sum('transactions__montant'),  
-        nombre_dons=Count('transactions')  
-    ).order_by('-total_dons')[:5]
 
     # Projets les plus financés
     projets_populaires = Projet.objects.filter(
         statut='actif'
     ).annotate(
-        montant_collectes=Sum('transaction__montant', filter=Q(transaction__statut='confirme'))
+        montant_collectes=Coalesce(F('financement__montant_total'), 0, output_field=DecimalField())
     ).order_by('-montant_collectes')[:5]
     
-    # Statistiques associations
-    stats_associations = {
-        'associations_total': Association.objects.count(),
-        'associations_validees': Association.objects.filter(valide=True).count(),
-        'associations_attente': Association.objects.filter(valide=False).count(),
-    }
-    
     context = {
         # ÉLÉMENTS PRIORITAIRES
         'projets_attention': projets_attention,
@@ -2736,21 +2662,39 @@ def tableau_de_bord(request):
         'transactions_verification': transactions_verification,
         
         # STATISTIQUES
-        'stats': stats,
-        'stats_associations': stats_associations,
+        'stats': instantane['stats'],
+        'stats_associations': instantane['stats_associations'],
         
         # DONNÉES SECOND AIRES
-        'projets_par_statut': list(projets_par_statut),
-        'donnees_graphique': donnees_graphique,
+        'projets_par_statut': instantane['projets_par_statut'],
+        'donnees_graphique': instantane['donnees_graphique'],
         'recent_transactions': recent_transactions,
         'recent_audits': recent_audits,
-        'top_donateurs': top_donateurs,
+        'top_donateurs': instantane['top_donateurs'],
         'projets_populaires': projets_populaires,
         'aujourdhui': aujourdhui,
+        'statistiques_generees_le': instantane['genere_le'],
     }
     
     return render(request, 'core/admin/tableau_de_bord.html', context)
 
+@login_required
+@permission_required('core.manage_users', raise_exception=True)
+def performances(request):
+    """
+    Statistiques glissantes de performance par vue et métriques du client
+    Hedera (JSON). ?reset=1 vide les fenêtres.
+    """
+    if request.GET.get('reset'):
+        perf.reset()
+    return JsonResponse({
+        'window': perf.window(),
+        'buckets_ms': perf.BUCKETS_MS,
+        'views': perf.snapshot(),
+        'hedera': get_hedera_client().metrics(),
+    })
+
+
 @login_required
 @permission_required('core.view_dashboard', raise_exception=True)
 def liste_transactions_validation(request):
@@ -3447,6 +3391,65 @@ def logs_audit(request):
     return render(request, 'core/admin/logs_audit.html', context)
 
 
+@login_required
+@permission_required('core.can_audit', raise_exception=True)
+def hcs_topic_list(request):
+    """
+    List the projects' HCS topics with their message statistics.
+
+    Reads the materialized StatistiquesTopic / StatistiquesHCS rows (see
+    core/hcs_stats.py) instead of aggregating TopicMessage: each page costs
+    the same whatever the number of messages. Topics are ordered by most
+    recent message, 24 per page.
+    """
+    statistiques = (
+        StatistiquesTopic.objects
+        .filter(projet__topic_id__isnull=False)
+        .select_related('projet')
+        .order_by(F('dernier_message').desc(nulls_last=True), 'pk')
+    )
+    page_obj = Paginator(statistiques, 24).get_page(request.GET.get('page'))
+
+    return render(request, 'core/hcs/topic_list.html', {
+        'topics': page_obj,
+        'globales': StatistiquesHCS.courantes(),
+        'title': 'Topics HCS',
+    })
+
+
+@login_required
+@permission_required('core.can_audit', raise_exception=True)
+def hcs_topic_detail(request, topic_id):
+    """
+    Show a project's HCS topic: statistics and ingested messages, 50 per page.
+
+    Staff can pass ?sync=true to ingest the topic's new messages from the
+    mirror node first (see HCSService.sync_project_messages).
+    """
+    projet = get_object_or_404(Projet, topic_id=topic_id)
+
+    if request.GET.get('sync') and request.user.is_staff:
+        resultat = HCSService.sync_project_messages(projet)
+        if resultat['success']:
+            messages.success(request, f"{resultat['messages_created']} nouveau(x) message(s) synchronisé(s).")
+        else:
+            messages.error(request, f"Synchronisation impossible : {resultat['error']}")
+        return redirect('hcs_topic_detail', topic_id=topic_id)
+
+    statistiques = StatistiquesTopic.objects.filter(projet=projet).first() or StatistiquesTopic(projet=projet)
+    paginator = Paginator(projet.messages.order_by('-date_envoi', '-pk'), 50)
+    # Nombre tenu à jour par core/hcs_stats.py : pas de COUNT(*) sur les messages du topic
+    paginator.count = statistiques.nombre_messages
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    return render(request, 'core/hcs/topic_detail.html', {
+        'projet': projet,
+        'statistiques': statistiques,
+        'messages_hcs': page_obj,
+        'title': f'Messages HCS - {projet.titre}',
+    })
+
+
 @login_required
 @permission_required('core.can_audit', raise_exception=True)
 def preview_association_admin(request, association_id):
@@ -3496,7 +3499,25 @@ def gerer_paliers(request, projet_id):
     Vue principale pour gérer tous les paliers d'un projet
     """
     projet = get_object_or_404(Projet, id=projet_id, porteur=request.user)
-    paliers = projet.paliers.all().order_by('montant_minimum')
+    
+    # Déplacement d'un palier dans le calendrier (haut/bas)
+    if request.method == 'POST':
+        ordre = list(projet.paliers.order_by('montant_minimum', 'id').values_list('id', flat=True))
+        try:
+            palier_id = int(request.POST.get('palier_id'))
+            index = ordre.index(palier_id)
+            cible = index - 1 if request.POST.get('direction') == 'haut' else index + 1
+            if 0 <= cible < len(ordre):
+                ordre[index], ordre[cible] = ordre[cible], ordre[index]
+                service_paliers.reordonner_paliers(projet, ordre)
+                messages.success(request, "Ordre des paliers mis à jour.")
+        except (TypeError, ValueError):
+            messages.error(request, "Palier invalide.")
+        except ValidationError as e:
+            messages.error(request, e.messages[0])
+        return redirect('gerer_paliers', projet_id=projet.id)
+    
+    paliers = projet.paliers.all().order_by('montant_minimum', 'id')
     
     # Calcul du total des paliers pour validation
     total_paliers = sum(palier.montant for palier in paliers)
@@ -3519,7 +3540,7 @@ def ajouter_palier(request, projet_id):
     projet = get_object_or_404(Projet, id=projet_id, porteur=request.user)
     
     # Calcul du montant déjà assigné aux paliers existants
-    montant_assigné = sum(palier.montant for palier in projet.paliers.all())
+    montant_assigné = service_paliers.montant_assigne(projet)
     montant_restant = projet.montant_demande - montant_assigné
     
     if request.method == 'POST':
@@ -3528,7 +3549,6 @@ def ajouter_palier(request, projet_id):
             try:
                 with transaction.atomic():
                     palier = form.save(commit=False)
-                    palier.projet = projet
                     
                     # Validation : ne pas dépasser le montant demandé
                     nouveau_total = montant_assigné + palier.montant
@@ -3539,7 +3559,7 @@ def ajouter_palier(request, projet_id):
                             f"Montant restant à assigner : {montant_restant:,} FCFA."
                         )
                     else:
-                        palier.save()
+                        service_paliers.ajouter_palier(projet, palier)
                         messages.success(request, f"Palier '{palier.titre}' ajouté avec succès !")
                         return redirect('gerer_paliers', projet_id=projet.id)
                         
@@ -3565,7 +3585,7 @@ def modifier_palier(request, palier_id):
     projet = palier.projet
     
     # Calcul des montants pour validation
-    montant_autres_paliers = sum(p.montant for p in projet.paliers.exclude(id=palier_id))
+    montant_autres_paliers = service_paliers.montant_assigne(projet, exclure=palier)
     montant_restant = projet.montant_demande - montant_autres_paliers
     
     if request.method == 'POST':
@@ -3584,7 +3604,7 @@ def modifier_palier(request, palier_id):
                             f"Montant maximum possible : {montant_restant:,} FCFA."
                         )
                     else:
-                        palier_modifie.save()
+                        service_paliers.modifier_palier(palier_modifie)
                         messages.success(request, f"Palier '{palier_modifie.titre}' modifié avec succès !")
                         return redirect('gerer_paliers', projet_id=projet.id)
                         
@@ -3612,7 +3632,7 @@ def supprimer_palier(request, palier_id):
     if request.method == 'POST':
         try:
             titre_palier = palier.titre
-            palier.delete()
+            service_paliers.supprimer_palier(palier)
             messages.success(request, f"Palier '{titre_palier}' supprimé avec succès !")
         except Exception as e:
             messages.error(request, f"Erreur lors de la suppression : {str(e)}")
@@ -3648,17 +3668,8 @@ def voir_wallet(request):
     # S'assurer que l'utilisateur a un wallet
     request.user.ensure_wallet()
     
-    # Obtenir le solde actuel
-    solde = None
-    try:
-        response = requests.get(
-            f'http://localhost:3001/balance/{request.user.hedera_account_id}',
-            timeout=5
-        )
-        if response.status_code == 200:
-            solde = response.json().get('balance')
-    except Exception as e:
-        print(f"Erreur récupération solde: {e}")
+    # Solde en cache, rafraîchi en arrière-plan (voir core/balances.py)
+    solde = balances.get_solde(request.user.hedera_account_id)
     
     return render(request, 'core/hedera/wallet_detail.html', {
         'solde': solde,
@@ -3681,20 +3692,17 @@ def creer_topic_pour_projet(projet, utilisateur):
     Raises:
         Exception: If the microservice is unavailable, times out, or returns an error.
     """
-    url = "http://localhost:3001/create-topic"
-    
     # Créer un mémo tronqué à 100 caractères maximum
     memo_base = f"Project {projet.titre}"
     memo = memo_base[:100]  # Tronquer à 100 caractères
     
     try:
-        response = requests.post(url, json={
-            "memo": memo
-        }, timeout=30)  
+        response = get_hedera_client().create_topic(memo)
         response.raise_for_status() 
         data = response.json()
         
         if data.get("success"):
+            nouveau_topic = not projet.topic_id
             # Sauvegarder l'ID du topic dans le projet
             projet.topic_id = data["topicId"]
             projet.hedera_topic_created = True
@@ -3706,6 +3714,9 @@ def creer_topic_pour_projet(projet, utilisateur):
                 "hedera_topic_transaction_id", 
                 "hedera_topic_hashscan_url"
             ])
+            topics.associer(projet.topic_id, projet.pk)
+            if nouveau_topic:
+                hcs_stats.topic_cree(projet.pk)
             
             # Journaliser la création du topic avec l'utilisateur
             AuditLog.objects.create(
@@ -3740,13 +3751,15 @@ def creer_topic_pour_projet(projet, utilisateur):
         logger.error(f"Erreur création topic pour projet {projet.id}: {e}")
         raise e
 
-def envoyer_don_hcs(topic_id, utilisateur_email, montant, transaction_hash, type_message="distribution_palier"):
+def envoyer_don_hcs(topic_id, utilisateur_email, montant, transaction_hash, type_message="distribution_palier",
+                    transaction=None, transaction_admin=None):
     """
-    Sends a message to a Hedera Consensus Service (HCS) topic to record a donation.
+    Queues a message to a Hedera Consensus Service (HCS) topic to record a donation.
 
-    The message includes the user's email, donation amount, transaction hash, 
-    timestamp, and the type of message. It also logs the message in the local database 
-    for traceability.
+    The message includes the user's email, donation amount, transaction hash,
+    timestamp, and the type of message. It is written to the HCS outbox in the
+    current database transaction and delivered by the `drain_hcs_outbox` worker,
+    which then records the TopicMessage and the Hedera message id.
 
     Args:
         topic_id (str): The HCS topic ID where the message will be sent.
@@ -3754,67 +3767,27 @@ def envoyer_don_hcs(topic_id, utilisateur_email, montant, transaction_hash, type
         montant (Decimal or float): Amount of the donation.
         transaction_hash (str): Hash identifying the blockchain transaction.
         type_message (str, optional): Type of message being sent. Defaults to "distribution_palier".
+        transaction (Transaction, optional): Transaction that receives the Hedera message id.
+        transaction_admin (TransactionAdmin, optional): Admin transaction that receives the Hedera message id.
 
     Returns:
-        dict: Response from the HCS microservice, including success status and error details if any.
-
-    Raises:
-        ConnectionError: If the HCS microservice is not reachable.
-        TimeoutError: If the request to the HCS microservice times out.
-        HTTPError: If the HCS microservice returns an HTTP error.
-        Exception: For any other unexpected error during message sending.
+        dict: {"success": True, "queued": True, "outbox_id": ...}, or {"success": False, "error": ...}
+              if the message could not be queued.
     """
-    """Envoie un message HCS pour enregistrer un don"""
-    url = "http://localhost:3001/send-message"
-    
-    # Message structuré pour HCS
-    message_data = {
-        "type": type_message,
-        "utilisateur": utilisateur_email,
-        "montant": float(montant),
-        "date": timezone.now().isoformat(),
-        "transaction_hash": transaction_hash,
-        "timestamp": int(timezone.now().timestamp())
-    }
-    
-    payload = {
-        "topicId": topic_id,
-        "message": message_data
-    }
-    
+    """Met en file un message HCS pour enregistrer un don"""
     try:
-        response = requests.post(url, json=payload, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        from core.models import Projet, TopicMessage
-        projet = Projet.objects.filter(topic_id=topic_id).first()
-        if projet:
-            TopicMessage.objects.create(
-                projet=projet,
-                type_message=type_message,
-                utilisateur_email=utilisateur_email,
-                montant=montant,
-                transaction_hash=transaction_hash,
-                contenu=message_data
-            )
-
-        logger.info(f"Message HCS envoyé avec succès: {data}")
-        return data
-        
-    except requests.exceptions.ConnectionError:
-        logger.error("Microservice HCS non disponible")
-        return {"success": False, "error": "Service HCS indisponible"}
-    
-    except requests.exceptions.Timeout:
-        logger.error("Timeout lors de l'envoi du message HCS")
-        return {"success": False, "error": "Timeout service HCS"}
-    
-    except requests.exceptions.HTTPError as e:
-        logger.error(f"Erreur HTTP HCS: {e}")
-        return {"success": False, "error": f"Erreur HTTP: {e}"}
-    
+        message = outbox.enqueue_don(
+            topic_id,
+            utilisateur_email,
+            montant,
+            transaction_hash,
+            type_message=type_message,
+            transaction=transaction,
+            transaction_admin=transaction_admin,
+        )
+        return {"success": True, "queued": True, "outbox_id": message.pk}
     except Exception as e:
-        logger.error(f"Erreur inattendue HCS: {e}")
+        logger.error(f"Erreur mise en file HCS: {e}")
         return {"success": False, "error": str(e)}
 
 @csrf_exempt
@@ -3822,24 +3795,22 @@ def process_donation(request, project_id):
     """
     Handles a HBAR donation from an authenticated user to a specified project.
 
-    This view performs several operations:
+    The request only validates and queues the donation (see core/donations.py):
     1. Validates that the user is authenticated and has a configured Hedera wallet.
     2. Validates the donation amount.
-    3. Executes a HBAR transfer from the user's account to the operator account via a microservice.
-    4. Creates a local Transaction record with the transaction status.
-    5. Updates the project's engaged amount if the transaction is confirmed.
-    6. Sends a message to the Hedera Consensus Service (HCS) topic associated with the project.
-    7. Logs success or error messages for user feedback.
+    3. Creates a pending Transaction and its processing row, then returns immediately.
+
+    The `process_donations` worker then executes the HBAR transfer to the operator
+    account, confirms the Transaction (which updates the project's funding summary)
+    and queues the HCS message. The project page polls `statut_don` until completion.
 
     Args:
         request (HttpRequest): The incoming HTTP request object.
         project_id (int): ID of the project receiving the donation.
 
     Returns:
-        HttpResponseRedirect: Redirects back to the project detail page with success or error messages.
-
-    Raises:
-        Exception: Captures any unexpected error during the donation process.
+        HttpResponseRedirect: Redirects back to the project detail page, which then
+        follows the donation status.
     """
 
     if request.method == 'POST':
@@ -3859,82 +3830,12 @@ def process_donation(request, project_id):
                 messages.error(request, "Montant invalide")
                 return redirect('detail_projet', audit_uuid=project.audit_uuid)
 
-            user = request.user
-
-            # --- Transfert HBAR ---
-            transfer_data = {
-                'fromAccountId': user.hedera_account_id,
-                'fromPrivateKey': user.hedera_private_key,
-                'toAccountId': settings.HEDERA_OPERATOR_ID,
-                'amount': float(amount)
-            }
-            response = requests.post('http://localhost:3001/transfer', json=transfer_data, timeout=30)
-
-            if response.status_code != 200:
-                messages.error(request, "Erreur lors du transfert HBAR ❌")
-                return redirect('detail_projet', audit_uuid=project.audit_uuid)
-
-            result = response.json()
-
-            transaction = Transaction.objects.create(
-                user=user,
-                montant=amount,
-                hedera_transaction_hash=result.get('transactionId'),
-                contributeur=user,
-                projet=project,
-                statut='confirme' if result.get('success') else 'erreur',
-                destination='operator'
-            )
-
-            # Mise à jour du montant engagé
-            if transaction.statut == 'confirme':
-                project.montant_engage = (
-                    project.transaction_set.filter(statut='confirme', destination='operator')
-                    .aggregate(total=Sum('montant'))['total'] or 0
-                )
-
-                # 🔹 Vérifier si c’est la première contribution de cet utilisateur
-                deja_contributeur = project.transaction_set.filter(
-                    contributeur=user,
-                    statut='confirme',
-                    destination='operator'
-                ).exclude(id=transaction.id).exists()
-
-                if not deja_contributeur:
-                    project.contributeurs_count = F('contributeurs_count') + 1
-
-                project.save(update_fields=['montant_engage', 'contributeurs_count'])
-
+            # Transfert, confirmation et message HCS effectués par le worker
+            transaction = donations.soumettre(request.user, project, amount)
+            messages.info(request, f"Your donation of {amount} HBAR is being processed ⏳")
 
-                # --- Envoyer message HCS ---
-                if project.topic_id:
-                    hcs_response = envoyer_don_hcs(
-                        topic_id=project.topic_id,
-                        utilisateur_email=user.email,
-                        montant=amount,
-                        transaction_hash=result.get('transactionId')
-                    )
-
-                    if hcs_response and hcs_response.get('success'):
-                        transaction.hedera_message_id = hcs_response.get('messageId')
-                        transaction.hedera_message_hashscan_url = f"https://hashscan.io/testnet/topic/{project.topic_id}?message={hcs_response.get('messageId')}"
-                        transaction.save(update_fields=['hedera_message_id', 'hedera_message_hashscan_url'])
-
-                        messages.success(request, f"Your donation of {amount} HBAR has been successfully made ✅ and recorded on HCS")
-
-                        
-                        # 🔹 Optionnel : envoyer email au contributeur
-                        # send_email_hedera_confirmation(user.email, transaction)
-                    else:
-                        error_msg = hcs_response.get('error', 'Erreur HCS') if hcs_response else 'Service HCS indisponible'
-                        messages.warning(request, f"Don effectué mais erreur HCS: {error_msg} ⚠️")
-                else:
-                    messages.warning(request, "Don effectué mais aucun Topic HCS associé au projet ⚠️")
-
-            else:
-                messages.error(request, "Erreur lors de l'enregistrement de la transaction ❌")
-
-            return redirect('detail_projet', audit_uuid=project.audit_uuid)
+            url = reverse('detail_projet', kwargs={'audit_uuid': project.audit_uuid})
+            return redirect(f"{url}?don={transaction.audit_uuid}")
 
         except Exception as e:
             messages.error(request, f"Erreur: {str(e)}")
@@ -3943,6 +3844,18 @@ def process_donation(request, project_id):
     messages.warning(request, "Méthode non autorisée")
     return redirect('detail_projet', audit_uuid=project.audit_uuid)
 
+
+@login_required
+def statut_don(request, audit_uuid):
+    """État d'avancement (JSON) d'un don soumis par l'utilisateur, interrogé par la page du projet."""
+    transaction = get_object_or_404(
+        Transaction.objects.select_related('traitement'),
+        audit_uuid=audit_uuid,
+        contributeur=request.user,
+    )
+    return JsonResponse(donations.statut_don(transaction))
+
+
 def transfer_from_admin_to_doer(projet, porteur, montant_brut, palier=None, initiateur=None):
     """
     Executes a transfer from the platform operator to the project doer, applying commission,
@@ -3978,15 +3891,13 @@ def transfer_from_admin_to_doer(projet, porteur, montant_brut, palier=None, init
     montant_net = montant_brut - commission_amount
 
     # Transfert HBAR
-    transfer_data = {
-        "fromAccountId": settings.HEDERA_OPERATOR_ID,
-        "fromPrivateKey": settings.HEDERA_OPERATOR_KEY,
-        "toAccountId": porteur.hedera_account_id,
-        "amount": float(montant_net)
-    }
-
     try:
-        response = requests.post("http://localhost:3001/transfer", json=transfer_data, timeout=30)
+        response = balances.transferer(
+            settings.HEDERA_OPERATOR_ID,
+            settings.HEDERA_OPERATOR_KEY,
+            porteur.hedera_account_id,
+            montant_net,
+        )
         
         if response.status_code != 200:
             logger.error(f"Erreur transfert HBAR: {response.status_code} - {response.text}")
@@ -3995,40 +3906,34 @@ def transfer_from_admin_to_doer(projet, porteur, montant_brut, palier=None, init
         data = response.json()
         transaction_hash = data.get("transactionId")
 
-        # Journalisation en base
-        transaction_admin = TransactionAdmin.objects.create(
-            projet=projet,
-            palier=palier, 
-            montant_brut=montant_brut,
-            montant_net=montant_net,
-            commission=commission_amount,
-            commission_pourcentage=commission_pct,
-            transaction_hash=transaction_hash,
-            beneficiaire=porteur,
-            type_transaction="distribution",
-            initiateur=initiateur 
-        )
-
-        #  ENVOI HCS AVEC DÉTAILS COMPLETS
-        if projet.topic_id:
-            resultat_hcs = envoyer_don_hcs(
-                topic_id=projet.topic_id,
-                utilisateur_email=porteur.email,
-                montant=montant_brut,  # Montant brut avant commission
+        # Journalisation en base, message HCS mis en file dans la même transaction
+        with db_transaction.atomic():
+            transaction_admin = TransactionAdmin.objects.create(
+                projet=projet,
+                palier=palier, 
+                montant_brut=montant_brut,
+                montant_net=montant_net,
+                commission=commission_amount,
+                commission_pourcentage=commission_pct,
                 transaction_hash=transaction_hash,
-                type_message="distribution_admin_porteur"
+                beneficiaire=porteur,
+                type_transaction="distribution",
+                initiateur=initiateur 
             )
 
-            if resultat_hcs.get('success'):
-                # Stockage HCS dans TransactionAdmin
-                transaction_admin.hedera_message_id = resultat_hcs.get('messageId')
-                transaction_admin.hedera_message_hashscan_url = (
-                    f"https://hashscan.io/testnet/topic/{projet.topic_id}?message={resultat_hcs.get('messageId')}"
+            #  ENVOI HCS AVEC DÉTAILS COMPLETS (id du message reporté par le worker de l'outbox)
+            if projet.topic_id:
+                resultat_hcs = envoyer_don_hcs(
+                    topic_id=projet.topic_id,
+                    utilisateur_email=porteur.email,
+                    montant=montant_brut,  # Montant brut avant commission
+                    transaction_hash=transaction_hash,
+                    type_message="distribution_admin_porteur",
+                    transaction_admin=transaction_admin
                 )
-                transaction_admin.save(update_fields=['hedera_message_id', 'hedera_message_hashscan_url'])
-                logger.info(f"✅ Distribution {transaction_hash} tracée sur HCS")
-            else:
-                logger.warning(f"⚠️ HCS échoué pour {transaction_hash}")
+
+                if not resultat_hcs.get('success'):
+                    logger.warning(f"⚠️ HCS non mis en file pour {transaction_hash}")
 
         return {"success": True, "transactionId": transaction_hash}
 
@@ -4050,23 +3955,22 @@ def transfer_from_admin_to_doer(projet, porteur, montant_brut, palier=None, init
 
 def envoyer_distribution_hcs(topic_id, distribution_data):
     """
-    Sends a Hedera Consensus Service (HCS) message for a distribution event.
+    Queues a Hedera Consensus Service (HCS) message for a distribution event.
 
     This function constructs a structured message containing all distribution details
-    and posts it to the specified HCS topic via the microservice. It handles connection
-    errors, timeouts, and unexpected exceptions, logging each appropriately.
+    and writes it to the HCS outbox; the `drain_hcs_outbox` worker posts it to the
+    specified topic via the microservice.
 
     Args:
         topic_id (str): The HCS topic identifier where the message should be sent.
         distribution_data (dict): Detailed information about the distribution event.
 
     Returns:
-        dict: Contains 'success' (bool), 'data' (response JSON if successful), 
-              'message_id' (str from HCS if available), and 'error' (str if failed).
+        dict: Contains 'success' (bool), 'queued' and 'outbox_id' if queued,
+              and 'error' (str if failed).
     """
 
-    """Envoie un message HCS spécifique pour les distributions"""
-    url = "http://localhost:3001/send-message"
+    """Met en file un message HCS spécifique pour les distributions"""
     
     message_data = {
         "type": "distribution",
@@ -4076,26 +3980,16 @@ def envoyer_distribution_hcs(topic_id, distribution_data):
         "data": distribution_data  # Tous les détails de la distribution
     }
     
-    payload = {
-        "topicId": topic_id,
-        "message": message_data
-    }
-    
     try:
-        response = requests.post(url, json=payload, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        logger.info(f"Message distribution HCS envoyé: {distribution_data.get('transaction_hash')}")
-        return {"success": True, "data": data, "message_id": data.get("message_id")}
-        
-    except requests.exceptions.ConnectionError:
-        logger.error("Microservice HCS non disponible")
-        return {"success": False, "error": "Service HCS indisponible"}
-    
-    except requests.exceptions.Timeout:
-        logger.error("Timeout HCS")
-        return {"success": False, "error": "Timeout service HCS"}
+        message = outbox.enqueue(
+            topic_id,
+            "distribution",
+            message_data,
+            montant=distribution_data.get('montant'),
+            transaction_hash=distribution_data.get('transaction_hash'),
+        )
+        logger.info(f"Message distribution HCS mis en file: {distribution_data.get('transaction_hash')}")
+        return {"success": True, "queued": True, "outbox_id": message.pk}
     
     except Exception as e:
         logger.error(f"Erreur HCS: {e}")
@@ -4116,20 +4010,11 @@ def creer_paliers(projet):
 
     Side Effects:
         - Deletes existing Palier objects linked to the project.
-        - Creates new Palier objects with calculated amounts.
+        - Creates new Palier objects with calculated amounts (see core/paliers.py).
     """
 
-    # Supprimer les paliers existants
-    projet.paliers.all().delete()
-    
-    pourcentages = [40, 30, 30]
-    for pct in pourcentages:
-        montant_palier = (projet.montant_demande * Decimal(pct)) / 100
-        Palier.objects.create(
-            projet=projet, 
-            pourcentage=Decimal(pct), 
-            montant=montant_palier
-        )
+    # Remplacement en une transaction (bulk_create) via le service des paliers
+    return service_paliers.creer_paliers_standard(projet)
 
 def verifier_paliers(projet):
     """
@@ -4145,26 +4030,20 @@ def verifier_paliers(projet):
 
     Returns:
         bool: True if at least one milestone can be distributed, False otherwise.
+        The result is stored on the project (see core/paliers.evaluer_disponibilite).
     """
 
     """Vérifier si les paliers peuvent être distribués"""
-    montant_disponible = projet.montant_engage - projet.montant_distribue
-    
-    for palier in projet.paliers.order_by('montant_minimum'):
-        if (montant_disponible >= palier.montant and 
-            not palier.transfere and 
-            palier.montant <= montant_disponible):
-            
-            return True  # Palier prêt à être distribué
-    
-    return False
+    # Réévalue et enregistre l'état (Projet.pret_distribution / palier_pret)
+    return service_paliers.evaluer_disponibilite(projet.pk, instance=projet)
 
 
 def envoyer_notification_hcs(topic_id, type_notification, details):
     """
-    Sends a structured notification message to a Hedera Consensus Service (HCS) topic.
+    Queues a structured notification message to a Hedera Consensus Service (HCS) topic.
 
     The message includes the type of notification, a timestamp, and detailed payload.
+    It is delivered by the HCS outbox worker (see core/outbox.py).
 
     Args:
         topic_id (str): The HCS topic ID to send the notification to.
@@ -4172,7 +4051,7 @@ def envoyer_notification_hcs(topic_id, type_notification, details):
         details (dict): Additional details to include in the message payload.
 
     Returns:
-        dict: Response from the HCS microservice. Returns {"success": False} on failure.
+        dict: {"success": True, "queued": True, ...} once queued. Returns {"success": False} on failure.
     """
 
     """Système de notification HCS complet"""
@@ -4182,14 +4061,9 @@ def envoyer_notification_hcs(topic_id, type_notification, details):
         "details": details
     }
     
-    payload = {
-        "topicId": topic_id,
-        "message": message_data
-    }
-    
     try:
-        response = requests.post("http://localhost:3001/send-message", json=payload, timeout=10)
-        return response.json()
+        message = outbox.enqueue(topic_id, type_notification, message_data)
+        return {"success": True, "queued": True, "outbox_id": message.pk}
     except Exception as e:
         logger.error(f"Erreur HCS: {e}")
         return {"success": False}
@@ -4271,8 +4145,9 @@ def determiner_type_fichier_avance(fichier):
 
 def notifier_soumission_preuve_hcs(projet, palier, nb_fichiers):
     """
-    Sends a notification to the HCS (Hedera Consensus Service) about the submission 
-    of proof files for a project milestone (palier).
+    Queues a notification to the HCS (Hedera Consensus Service) about the submission 
+    of proof files for a project milestone (palier). The message is written in the
+    caller's database transaction and delivered by the HCS outbox worker.
 
     Args:
         projet (Projet): The project object associated with the milestone.
@@ -4280,7 +4155,7 @@ def notifier_soumission_preuve_hcs(projet, palier, nb_fichiers):
         nb_fichiers (int): Number of files submitted.
 
     Returns:
-        dict: Response from the HCS notification service, indicating success or failure.
+        dict: Result of queuing the HCS notification, indicating success or failure.
     """
 
     """Notifier dans HCS la soumission de preuves d'un palier"""
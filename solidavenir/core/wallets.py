@@ -0,0 +1,203 @@
+# core/wallets.py
+"""
+Pool de comptes Hedera pré-créés.
+
+La création d'un compte (POST /create-wallet, plusieurs secondes de consensus)
+est sortie du chemin interactif : `refill_wallet_pool` maintient un stock de
+comptes (PooledWallet, clé privée chiffrée) entre WALLET_POOL_LOW_WATERMARK et
+WALLET_POOL_TARGET, et les utilisateurs / projets en réclament un par une
+seule requête `select_for_update(skip_locked=True)`.
+
+Quand le pool est vide, l'attribution échoue sans appel réseau et le pool est
+marqué vide dans le cache partagé pendant WALLET_POOL_EMPTY_RETRY secondes (ou
+jusqu'au prochain compte créé) : AutoWalletMiddleware ne reprend ni verrou ni
+requête à chaque page d'ici là. Seules les commandes d'administration peuvent
+encore créer un compte directement (`allow_create=True`).
+"""
+import base64
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from cryptography.fernet import Fernet
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .hedera_client import HederaUnavailable, get_client
+
+logger = logging.getLogger(__name__)
+
+CLE_POOL_VIDE = 'wallets:pool_vide'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# =============================================================================
+# CHIFFREMENT DES CLÉS EN STOCK
+# =============================================================================
+
+def _fernet():
+    secret = _setting('WALLET_POOL_KEY', '') or settings.SECRET_KEY
+    return Fernet(base64.urlsafe_b64encode(hashlib.sha256(secret.encode('utf-8')).digest()))
+
+
+def chiffrer(valeur):
+    return _fernet().encrypt(valeur.encode('utf-8')).decode('ascii')
+
+
+def dechiffrer(jeton):
+    return _fernet().decrypt(jeton.encode('ascii')).decode('utf-8')
+
+
+# =============================================================================
+# CRÉATION (hors chemin interactif)
+# =============================================================================
+
+def creer_compte(initial_balance=None):
+    """Crée un compte via le microservice ; retourne {accountId, publicKey, privateKey} ou None."""
+    if initial_balance is None:
+        initial_balance = _setting('WALLET_POOL_INITIAL_BALANCE', 10)
+    response = get_client().create_wallet(initial_balance=initial_balance)
+    if response.status_code != 200:
+        logger.error(f"Création wallet refusée: HTTP {response.status_code}")
+        return None
+    result = response.json()
+    if not result.get('success'):
+        logger.error(f"Création wallet échouée: {result.get('error')}")
+        return None
+    return result
+
+
+def _creer_wallet_pool():
+    from .models import PooledWallet
+    try:
+        result = creer_compte()
+        if result is None:
+            return False
+        PooledWallet.objects.create(
+            account_id=result['accountId'],
+            public_key=result.get('publicKey', ''),
+            private_key_chiffree=chiffrer(result['privateKey']),
+        )
+        cache.delete(CLE_POOL_VIDE)
+        return True
+    except HederaUnavailable:
+        return False
+    except Exception as e:
+        logger.error(f"Erreur création wallet du pool: {e}")
+        return False
+    finally:
+        connection.close()
+
+
+def disponibles():
+    from .models import PooledWallet
+    return PooledWallet.objects.filter(date_attribution__isnull=True).count()
+
+
+def reapprovisionner(cible=None, seuil=None, concurrence=None):
+    """
+    Complète le pool jusqu'à `cible` quand il passe sous `seuil`.
+    Retourne le nombre de comptes créés.
+    """
+    cible = cible if cible is not None else _setting('WALLET_POOL_TARGET', 50)
+    seuil = seuil if seuil is not None else _setting('WALLET_POOL_LOW_WATERMARK', 20)
+    concurrence = concurrence or _setting('WALLET_POOL_CONCURRENCY', 4)
+
+    stock = disponibles()
+    if stock >= seuil:
+        return 0
+    manquants = cible - stock
+    with ThreadPoolExecutor(max_workers=concurrence) as pool:
+        crees = sum(pool.map(lambda _: _creer_wallet_pool(), range(manquants)))
+    logger.info(f"Pool de wallets: {crees}/{manquants} compte(s) créé(s), stock {stock + crees}")
+    return crees
+
+
+# =============================================================================
+# ATTRIBUTION (chemin interactif, sans appel réseau)
+# =============================================================================
+
+def reclamer(attribue_a):
+    """
+    Réserve le premier wallet disponible pour `attribue_a` et le retourne
+    avec `private_key` déchiffrée, ou None si le pool est vide.
+    À appeler dans la transaction qui enregistre le propriétaire.
+    """
+    from .models import PooledWallet
+
+    if cache.get(CLE_POOL_VIDE):
+        return None
+    with transaction.atomic():
+        wallet = (
+            PooledWallet.objects
+            .select_for_update(skip_locked=connection.features.has_select_for_update_skip_locked)
+            .filter(date_attribution__isnull=True)
+            .order_by('id')
+            .first()
+        )
+        if wallet is None:
+            logger.warning(f"Pool de wallets vide, aucun compte pour {attribue_a}")
+            cache.set(CLE_POOL_VIDE, True, _setting('WALLET_POOL_EMPTY_RETRY', 30))
+            return None
+        wallet.date_attribution = timezone.now()
+        wallet.attribue_a = attribue_a
+        wallet.save(update_fields=['date_attribution', 'attribue_a'])
+
+    wallet.private_key = dechiffrer(wallet.private_key_chiffree)
+    return wallet
+
+
+def attribuer_a_utilisateur(user, allow_create=False):
+    """
+    Donne un wallet du pool à `user` (une seule fois, même sous requêtes
+    concurrentes). Avec allow_create, crée le compte si le pool est vide.
+    Retourne True si l'utilisateur a un wallet actif.
+    """
+    from .models import User
+
+    if not allow_create and cache.get(CLE_POOL_VIDE):
+        return False
+    with transaction.atomic():
+        etat = User.objects.select_for_update().filter(pk=user.pk).values(
+            'hedera_account_id', 'hedera_public_key', 'hedera_private_key', 'wallet_activated'
+        ).first()
+        if etat and etat['hedera_account_id'] and etat['wallet_activated']:
+            # Attribué entre-temps par une autre requête
+            for champ, valeur in etat.items():
+                setattr(user, champ, valeur)
+            return True
+
+        wallet = reclamer(f"user:{user.pk}")
+        if wallet is not None:
+            compte = {'accountId': wallet.account_id, 'publicKey': wallet.public_key, 'privateKey': wallet.private_key}
+        elif allow_create:
+            compte = creer_compte()
+        else:
+            compte = None
+        if compte is None:
+            return False
+
+        user.hedera_account_id = compte['accountId']
+        user.hedera_public_key = compte.get('publicKey')
+        user.hedera_private_key = compte['privateKey']
+        user.wallet_activated = True
+        user.save(update_fields=['hedera_account_id', 'hedera_public_key', 'hedera_private_key', 'wallet_activated'])
+        return True
+
+
+def attribuer_a_projet(projet):
+    """
+    Affecte un wallet du pool à `projet` (champs renseignés, non sauvegardés).
+    Retourne True si un compte a été attribué.
+    """
+    wallet = reclamer(f"projet:{projet.pk}" if projet.pk else f"projet:{projet.titre}"[:100])
+    if wallet is None:
+        return False
+    projet.hedera_account_id = wallet.account_id
+    projet.hedera_private_key = wallet.private_key
+    return True
@@ -12,6 +12,18 @@ do
 done
 echo "✅ Postgres est prêt !"
 
+# Mode worker : "/entrypoint.sh <commande> [options]" lance une commande de gestion
+# (ex. process_donations --loop) une fois les migrations appliquées par le service web
+if [ "$#" -gt 0 ]; then
+    until python manage.py migrate --check > /dev/null 2>&1
+    do
+      echo "⏳ En attente des migrations..."
+      sleep 2
+    done
+    echo "⚙️ Lancement du worker : $*"
+    exec python manage.py "$@"
+fi
+
 # Vérifier si des migrations manquent
 echo "🔍 Vérification des migrations manquantes..."
 if ! python manage.py makemigrations --check --dry-run; then
@@ -22,6 +34,7 @@ fi
 # Appliquer les migrations
 echo "📦 Application des migrations..."
 python manage.py migrate --noinput
+python manage.py createcachetable
 
 # Création du superuser
 echo "👤 Vérification du superuser..."
@@ -56,6 +56,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -65,6 +66,8 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'core.middleware.AutoWalletMiddleware',
+    'core.middleware.RateSnapshotMiddleware',
+    'core.middleware.RequestMemoMiddleware',
 ]
 
 ROOT_URLCONF = 'solidavenir.urls'
@@ -111,6 +114,14 @@ DATABASES = {
     }
 }
 
+# Cache partagé par tous les processus (workers gunicorn, commandes --loop) :
+# une invalidation (tableau de bord, soldes, taux, topics) est vue par tous.
+# Par défaut une table de la base, créée par `python manage.py createcachetable` ;
+# CACHE_URL=redis://hote:6379/1 pour Redis (paquet redis requis).
+CACHES = {
+    'default': env.cache('CACHE_URL', default='dbcache://solidavenir_cache'),
+}
+
 
 #=================
 #POSTGRES
@@ -203,5 +214,106 @@ LOGOUT_REDIRECT_URL = 'accueil'
 import os
 
 # Configuration Hedera
-HEDERA_SERVICE_URL = env("HEDERA_SERVICE_URL", default="http://hedera_service:3001")
+HEDERA_SERVICE_URL = env("HEDERA_SERVICE_URL", default="http://localhost:3001")  # Docker : http://hedera_service:3001 (docker-compose.yml)
+# Client du microservice (voir core/hedera_client.py)
+HEDERA_POOL_SIZE = env.int("HEDERA_POOL_SIZE", default=10)
+HEDERA_CONNECT_TIMEOUT = env.float("HEDERA_CONNECT_TIMEOUT", default=3)
+HEDERA_TIMEOUTS = env.json("HEDERA_TIMEOUTS", default={})      # endpoint -> secondes, ex. {"transfer": 30}
+HEDERA_RETRIES = env.int("HEDERA_RETRIES", default=2)           # appels idempotents uniquement
+HEDERA_RETRY_BACKOFF = env.float("HEDERA_RETRY_BACKOFF", default=0.2)
+HEDERA_BREAKER_THRESHOLD = env.int("HEDERA_BREAKER_THRESHOLD", default=5)
+HEDERA_BREAKER_RESET = env.int("HEDERA_BREAKER_RESET", default=30)    # secondes
+HEDERA_MIRROR_URL = env("HEDERA_MIRROR_URL", default="https://testnet.mirrornode.hedera.com")
+
+# Remplaçant local du microservice pour les tests de charge hors ligne
+# (voir core/hedera_standin.py, commande run_hedera_standin)
+HEDERA_STANDIN = env.bool("HEDERA_STANDIN", default=False)
+HEDERA_STANDIN_HOST = env("HEDERA_STANDIN_HOST", default="127.0.0.1")
+HEDERA_STANDIN_PORT = env.int("HEDERA_STANDIN_PORT", default=3002)
+HEDERA_STANDIN_LATENCY = env.json("HEDERA_STANDIN_LATENCY", default={})  # endpoint -> ms, ex. {"transfer": 5000}
+HEDERA_STANDIN_LATENCY_SCALE = env.float("HEDERA_STANDIN_LATENCY_SCALE", default=1.0)  # 0 : sans latence
+HEDERA_STANDIN_JITTER = env.float("HEDERA_STANDIN_JITTER", default=0.2)     # ± 20 % de la latence
+HEDERA_STANDIN_ERROR_RATE = env.float("HEDERA_STANDIN_ERROR_RATE", default=0.0)  # réponses 500
+HEDERA_STANDIN_DROP_RATE = env.float("HEDERA_STANDIN_DROP_RATE", default=0.0)    # connexions coupées
+if HEDERA_STANDIN:
+    HEDERA_SERVICE_URL = f"http://{HEDERA_STANDIN_HOST}:{HEDERA_STANDIN_PORT}"
+    HEDERA_MIRROR_URL = HEDERA_SERVICE_URL  # le remplaçant sert aussi /api/v1/transactions
+
+# Outbox des messages HCS (voir core/outbox.py, commande drain_hcs_outbox)
+HCS_OUTBOX_BATCH_SIZE = env.int("HCS_OUTBOX_BATCH_SIZE", default=50)
+HCS_OUTBOX_CONCURRENCY = env.int("HCS_OUTBOX_CONCURRENCY", default=4)
+HCS_OUTBOX_MAX_ATTEMPTS = env.int("HCS_OUTBOX_MAX_ATTEMPTS", default=8)
+HCS_OUTBOX_BACKOFF = env.int("HCS_OUTBOX_BACKOFF", default=30)          # secondes, doublé à chaque échec
+HCS_OUTBOX_MAX_BACKOFF = env.int("HCS_OUTBOX_MAX_BACKOFF", default=3600)
+HCS_OUTBOX_LEASE = env.int("HCS_OUTBOX_LEASE", default=120)            # bail d'un lot réclamé
+
+# Pool de wallets Hedera pré-créés (voir core/wallets.py, commande refill_wallet_pool)
+WALLET_POOL_TARGET = env.int("WALLET_POOL_TARGET", default=50)
+WALLET_POOL_LOW_WATERMARK = env.int("WALLET_POOL_LOW_WATERMARK", default=20)  # réapprovisionner sous ce stock
+WALLET_POOL_CONCURRENCY = env.int("WALLET_POOL_CONCURRENCY", default=4)
+WALLET_POOL_INITIAL_BALANCE = env.int("WALLET_POOL_INITIAL_BALANCE", default=10)  # HBAR
+WALLET_POOL_KEY = env("WALLET_POOL_KEY", default="")  # clé de chiffrement du stock (SECRET_KEY par défaut)
+WALLET_POOL_EMPTY_RETRY = env.int("WALLET_POOL_EMPTY_RETRY", default=30)  # secondes sans nouvelle réclamation après un pool vide
+
+# Cache des soldes Hedera (voir core/balances.py, commande refresh_balances)
+BALANCE_CACHE_TTL = env.int("BALANCE_CACHE_TTL", default=30)           # solde considéré frais
+BALANCE_CACHE_MAX_AGE = env.int("BALANCE_CACHE_MAX_AGE", default=3600)  # servi (et rafraîchi) jusqu'à
+BALANCE_REFRESH_WORKERS = env.int("BALANCE_REFRESH_WORKERS", default=4)
+
+# Traitement asynchrone des dons (voir core/donations.py, commande process_donations)
+DONATION_BATCH_SIZE = env.int("DONATION_BATCH_SIZE", default=20)
+DONATION_CONCURRENCY = env.int("DONATION_CONCURRENCY", default=4)
+DONATION_MAX_ATTEMPTS = env.int("DONATION_MAX_ATTEMPTS", default=5)     # transferts certainement non partis
+DONATION_RETRY_DELAY = env.int("DONATION_RETRY_DELAY", default=10)      # secondes, doublé à chaque essai
+DONATION_LEASE = env.int("DONATION_LEASE", default=120)                 # au-delà : issue inconnue, à vérifier
+DONATION_INPROCESS = env.bool("DONATION_INPROCESS", default=False)      # dev : traiter dans le processus web
+
+# Réconciliation des transactions avec le mirror node (voir core/reconciliation.py, commande reconcile_transactions)
+RECONCILIATION_BATCH_SIZE = env.int("RECONCILIATION_BATCH_SIZE", default=200)
+RECONCILIATION_CONCURRENCY = env.int("RECONCILIATION_CONCURRENCY", default=8)    # appels mirror simultanés
+RECONCILIATION_WINDOW = env.int("RECONCILIATION_WINDOW", default=3600)   # secondes autour de la date du don ; au-delà : absente
+
+# Synchronisation des messages des topics HCS (voir core/hcs_ingestion.py, commande sync_topics)
+HCS_SYNC_CONCURRENCY = env.int("HCS_SYNC_CONCURRENCY", default=8)          # topics synchronisés simultanément
+HCS_SYNC_PAGES_PER_TURN = env.int("HCS_SYNC_PAGES_PER_TURN", default=10)   # pages de 100 messages avant de passer au topic suivant
+HCS_TOPIC_ACTIVE_DAYS = env.int("HCS_TOPIC_ACTIVE_DAYS", default=30)       # topic actif : message reçu depuis moins de N jours (core/hcs_stats.py)
+HCS_VERIFY_CHUNK_SIZE = env.int("HCS_VERIFY_CHUNK_SIZE", default=2000)     # messages lus par lot par verify_hcs_history (core/hcs_verification.py)
+
+# Résolution topic -> projet et écriture groupée des TopicMessage (voir core/topics.py)
+TOPIC_CACHE_TTL = env.int("TOPIC_CACHE_TTL", default=86400)              # cache partagé
+TOPIC_CACHE_LOCAL_TTL = env.int("TOPIC_CACHE_LOCAL_TTL", default=300)    # table en mémoire de chaque processus
+TOPIC_MESSAGE_BUFFER_SIZE = env.int("TOPIC_MESSAGE_BUFFER_SIZE", default=500)
+TOPIC_MESSAGE_MAX_ATTEMPTS = env.int("TOPIC_MESSAGE_MAX_ATTEMPTS", default=3)  # refus avant abandon d'une ligne
+
+# Taux de conversion HBAR/USD/FCFA (voir core/rates.py)
+RATE_SOFT_TTL = env.int("RATE_SOFT_TTL", default=300)          # taux frais pendant 5 min
+RATE_HARD_TTL = env.int("RATE_HARD_TTL", default=3600)         # taux périmé servi jusqu'à 1 h
+RATE_REFRESH_MARGIN = env.int("RATE_REFRESH_MARGIN", default=60)
+RATE_FETCH_TIMEOUT = env.int("RATE_FETCH_TIMEOUT", default=5)
+RATE_BACKGROUND_REFRESH = env.bool("RATE_BACKGROUND_REFRESH", default=True)
+RATE_DEFAULT_HBAR_USD = env("RATE_DEFAULT_HBAR_USD", default="0.07")
+RATE_USD_FCFA = env("RATE_USD_FCFA", default="600")
+
+# Compteurs de vues/partages bufferisés (voir core/counters.py)
+COUNTER_FLUSH_INTERVAL = env.int("COUNTER_FLUSH_INTERVAL", default=30)   # secondes
+COUNTER_FLUSH_THRESHOLD = env.int("COUNTER_FLUSH_THRESHOLD", default=100)
+
+# Instantané des statistiques du tableau de bord administrateur (voir core/dashboard.py)
+DASHBOARD_SNAPSHOT_TTL = env.int("DASHBOARD_SNAPSHOT_TTL", default=60)   # secondes
+
+# Rapport des helpers de modèles appelés plusieurs fois par requête (voir core/memo.py)
+MEMO_REPORT = env.bool("MEMO_REPORT", default=DEBUG)
+
+# Instrumentation des performances par vue (voir core/perf.py)
+PERF_INSTRUMENTATION = env.bool("PERF_INSTRUMENTATION", default=True)
+PERF_WINDOW = env.int("PERF_WINDOW", default=500)                # requêtes conservées par vue
+PERF_LOG_REQUESTS = env.bool("PERF_LOG_REQUESTS", default=False)  # une ligne JSON par requête
+# Budgets : métrique (wall_ms, sql_count, sql_ms, sql_duplicates, hedera_ms, coingecko_ms, smtp_ms...) -> limite
+PERF_DEFAULT_BUDGET = env.json("PERF_DEFAULT_BUDGET", default={"wall_ms": 1000, "sql_count": 100, "sql_duplicates": 20})
+PERF_BUDGETS = env.json("PERF_BUDGETS", default={
+    "accueil": {"wall_ms": 500, "sql_count": 30},
+    "liste_projets": {"wall_ms": 500, "sql_count": 30},
+    "detail_projet": {"wall_ms": 800, "sql_count": 50, "hedera_ms": 300},
+    "tableau_de_bord": {"wall_ms": 1500, "sql_count": 60},
+})
 # Configuration Email